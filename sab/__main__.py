@@ -5,8 +5,16 @@ import logging
 import os
 import sys
 
+from .backfill import run_backfill
+from .backtest import run_backtest
+from .config import load_config
+from .data.candle_store import migrate_json_cache, open_candle_store, store_location
+from .data.instrument import merge_duplicate_keys
+from .run import run_all
 from .scan import run_scan
 from .sell import run_sell
+from .signals.sweep import RANK_METRICS
+from .sweep import run_sweep
 
 
 def _load_dotenv_if_available() -> None:
@@ -46,6 +54,12 @@ def _build_parser() -> argparse.ArgumentParser:
         choices=["watchlist", "screener", "both"],
         help="Universe selection: watchlist only, screener only, or both",
     )
+    s.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Evaluation processes (default: strategy.eval_workers)",
+    )
 
     sell = sub.add_parser("sell", help="Evaluate holdings against sell/review rules")
     sell.add_argument(
@@ -55,6 +69,128 @@ def _build_parser() -> argparse.ArgumentParser:
         choices=["kis", "pykrx"],
         help="Data provider override",
     )
+    sell.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Evaluation processes (default: strategy.eval_workers)",
+    )
+
+    run = sub.add_parser(
+        "run",
+        help="Scan and sell in one pass: fetch the combined universe once -> buy + sell reports",
+    )
+    run.add_argument("--limit", type=int, default=None, help="Max tickers to evaluate")
+    run.add_argument("--watchlist", type=str, default=None, help="Path to watchlist file")
+    run.add_argument(
+        "--provider",
+        type=str,
+        default=None,
+        choices=["kis", "pykrx"],
+        help="Data provider override",
+    )
+    run.add_argument(
+        "--screener-limit", type=int, default=None, help="Override screener top-N size"
+    )
+    run.add_argument(
+        "--universe",
+        type=str,
+        default=None,
+        choices=["watchlist", "screener", "both"],
+        help="Universe selection: watchlist only, screener only, or both",
+    )
+    run.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Evaluation processes (default: strategy.eval_workers)",
+    )
+
+    bt = sub.add_parser(
+        "backtest",
+        help="Replay the buy/sell evaluators over cached history -> backtest report",
+    )
+    bt.add_argument("--watchlist", type=str, default=None, help="Path to watchlist file")
+    bt.add_argument(
+        "--provider",
+        type=str,
+        default=None,
+        choices=["kis", "pykrx"],
+        help="Data provider override",
+    )
+    bt.add_argument("--start", type=str, default=None, help="First signal date (YYYYMMDD)")
+    bt.add_argument("--end", type=str, default=None, help="Last bar date (YYYYMMDD)")
+    bt.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Evaluation processes (default: strategy.eval_workers)",
+    )
+
+    sw = sub.add_parser(
+        "sweep",
+        help="Backtest a grid of hybrid strategy settings -> ranked sweep report",
+    )
+    sw.add_argument(
+        "--spec", type=str, required=True, help="YAML file with value lists per parameter"
+    )
+    sw.add_argument("--watchlist", type=str, default=None, help="Path to watchlist file")
+    sw.add_argument(
+        "--provider",
+        type=str,
+        default=None,
+        choices=["kis", "pykrx"],
+        help="Data provider override",
+    )
+    sw.add_argument(
+        "--samples", type=int, default=None, help="Random sample of N grid points (default: all)"
+    )
+    sw.add_argument("--seed", type=int, default=None, help="Seed for --samples")
+    sw.add_argument(
+        "--rank-by",
+        type=str,
+        default="avg_return",
+        choices=list(RANK_METRICS),
+        help="Metric to rank combinations by",
+    )
+    sw.add_argument(
+        "--min-trades", type=int, default=10, help="Skip combinations with fewer trades"
+    )
+    sw.add_argument("--top", type=int, default=20, help="Combinations listed in the report")
+    sw.add_argument("--start", type=str, default=None, help="First signal date (YYYYMMDD)")
+    sw.add_argument("--end", type=str, default=None, help="Last bar date (YYYYMMDD)")
+    sw.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Evaluation processes (default: strategy.eval_workers)",
+    )
+
+    bf = sub.add_parser(
+        "backfill",
+        help="Fill the candle store with deep history (KIS, resumable, low priority)",
+    )
+    bf.add_argument("--watchlist", type=str, default=None, help="Path to watchlist file")
+    bf.add_argument(
+        "--years", type=int, default=None, help="Years of history (default: data.backfill_years)"
+    )
+    bf.add_argument(
+        "--pause",
+        type=float,
+        default=None,
+        help="Seconds to wait after each request (default: data.backfill_pause_seconds)",
+    )
+
+    mig = sub.add_parser(
+        "migrate-cache",
+        help=(
+            "Import legacy candles_*.json files into the configured candle store "
+            "and merge series cached under duplicate keys"
+        ),
+    )
+    mig.add_argument(
+        "--remove-json", action="store_true", help="Delete each JSON file after importing it"
+    )
     return p
 
 
@@ -72,10 +208,63 @@ def main(argv: list[str] | None = None) -> int:
             provider=ns.provider,
             screener_limit=ns.screener_limit,
             universe=ns.universe,
+            workers=ns.workers,
         )
 
     if ns.cmd == "sell":
-        return run_sell(provider=ns.provider)
+        return run_sell(provider=ns.provider, workers=ns.workers)
+
+    if ns.cmd == "run":
+        return run_all(
+            limit=ns.limit,
+            watchlist_path=ns.watchlist,
+            provider=ns.provider,
+            screener_limit=ns.screener_limit,
+            universe=ns.universe,
+            workers=ns.workers,
+        )
+
+    if ns.cmd == "backtest":
+        return run_backtest(
+            watchlist_path=ns.watchlist,
+            provider=ns.provider,
+            start_date=ns.start,
+            end_date=ns.end,
+            workers=ns.workers,
+        )
+
+    if ns.cmd == "sweep":
+        return run_sweep(
+            spec_path=ns.spec,
+            watchlist_path=ns.watchlist,
+            provider=ns.provider,
+            samples=ns.samples,
+            seed=ns.seed,
+            rank_by=ns.rank_by,
+            min_trades=ns.min_trades,
+            top=ns.top,
+            start_date=ns.start,
+            end_date=ns.end,
+            workers=ns.workers,
+        )
+
+    if ns.cmd == "backfill":
+        return run_backfill(watchlist_path=ns.watchlist, years=ns.years, pause=ns.pause)
+
+    if ns.cmd == "migrate-cache":
+        cfg = load_config()
+        migrated = migrate_json_cache(cfg.data_dir, remove=ns.remove_json, backend=cfg.candle_store)
+        location = store_location(cfg.data_dir, cfg.candle_store)
+        logger = logging.getLogger(__name__)
+        logger.info("Migrated %s candle file(s) into %s", migrated, location)
+        merged = merge_duplicate_keys(open_candle_store(cfg.data_dir, cfg.candle_store))
+        logger.info(
+            "Merged %s duplicate series into %s canonical key(s) in %s",
+            sum(len(keys) for keys in merged.values()),
+            len(merged),
+            location,
+        )
+        return 0
 
     parser.print_help()
     return 2
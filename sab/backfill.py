@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import datetime as dt
+import logging
+import os
+
+from .config import Config, load_config, load_watchlist
+from .data.backfill import (
+    STATUS_ACTIVE,
+    STATUS_DONE,
+    STATUS_RESTATED,
+    BackfillState,
+    backfill_earliest,
+    backfill_series,
+    start_cursor,
+)
+from .data.candle_store import open_candle_store
+from .data.freshness import KR_ZONE
+from .data.kis_client import KISClient, KISClientError, KISCredentials
+from .market_data import _infer_env_from_base, candle_target
+
+# Scheduler niceness for the backfill process; live scans keep the CPU.
+BACKFILL_NICENESS = 10
+
+
+def _lower_priority() -> None:
+    try:
+        os.nice(BACKFILL_NICENESS)
+    except (AttributeError, OSError):
+        pass
+
+
+def run_backfill(
+    *,
+    watchlist_path: str | None,
+    years: int | None = None,
+    pause: float | None = None,
+) -> int:
+    """Fill the candle store with up to ``years`` of history per watchlist ticker.
+
+    Safe to interrupt: per-ticker cursors are saved after every request and
+    the next run continues where this one stopped.
+    """
+    logger = logging.getLogger(__name__)
+    cfg: Config = load_config(provider_override="kis")
+    if not (cfg.kis_app_key and cfg.kis_app_secret and cfg.kis_base_url):
+        logger.error("Backfill needs KIS credentials (KIS_APP_KEY, KIS_APP_SECRET, KIS_BASE_URL)")
+        return 1
+    if cfg.candle_store == "json":
+        logger.warning(
+            "candle_store=json rewrites whole files on refresh, so backfilled history "
+            "does not survive the next scan; use columnar or sqlite"
+        )
+
+    tickers = load_watchlist(watchlist_path or cfg.watchlist_path or "watchlist.txt")
+    if not tickers:
+        logger.error("No tickers provided (watchlist empty or missing)")
+        return 1
+
+    _lower_priority()
+    creds = KISCredentials(
+        app_key=cfg.kis_app_key,
+        app_secret=cfg.kis_app_secret,
+        base_url=cfg.kis_base_url,
+        env=_infer_env_from_base(cfg.kis_base_url),
+    )
+    min_interval = None
+    if cfg.kis_min_interval_ms is not None:
+        min_interval = max(0.0, cfg.kis_min_interval_ms / 1000.0)
+    client = KISClient(
+        creds,
+        cache_dir=cfg.data_dir,
+        min_interval=min_interval,
+        adaptive_rate=cfg.kis_adaptive_rate,
+        shared_limiter=cfg.kis_shared_limiter,
+    )
+    store = open_candle_store(cfg.data_dir, backend=cfg.candle_store)
+    state = BackfillState(cfg.data_dir)
+    today = dt.datetime.now(KR_ZONE).date()
+    earliest = backfill_earliest(today, years if years is not None else cfg.backfill_years)
+    pause_s = max(0.0, pause if pause is not None else cfg.backfill_pause_seconds)
+
+    statuses: dict[str, int] = {}
+    requests = bars = failed = 0
+    logger.info("Backfill: %s tickers down to %s", len(tickers), earliest)
+    try:
+        for ticker in tickers:
+            symbol, exch, key = candle_target(ticker)
+            cursor = start_cursor(store.load(key), state.get(key), earliest=earliest, today=today)
+            if cursor.status == STATUS_ACTIVE:
+                before = (cursor.requests, cursor.bars)
+                try:
+                    backfill_series(
+                        client,
+                        store,
+                        key,
+                        symbol,
+                        cursor=cursor,
+                        exchange=exch,
+                        on_chunk=lambda c, key=key: state.put(key, c),
+                        pause=pause_s,
+                        today=today,
+                    )
+                except KISClientError as exc:
+                    # the cursor holds the last completed chunk; the next run retries
+                    logger.warning("%s: backfill stopped: %s", ticker, exc)
+                    failed += 1
+                requests += cursor.requests - before[0]
+                bars += cursor.bars - before[1]
+                if cursor.status != STATUS_ACTIVE:
+                    logger.info("%s: %s (%s bars backfilled)", ticker, cursor.status, cursor.bars)
+                state.put(key, cursor)
+            statuses[cursor.status] = statuses.get(cursor.status, 0) + 1
+    except KeyboardInterrupt:
+        logger.warning("Backfill interrupted; run `sab backfill` again to resume")
+        return 130
+
+    logger.info(
+        "Backfill finished: %s request(s), %s bar(s) added, %s done, %s restated, %s failed",
+        requests,
+        bars,
+        statuses.get(STATUS_DONE, 0),
+        statuses.get(STATUS_RESTATED, 0),
+        failed,
+    )
+    return 1 if failed else 0
+
+
+__all__ = ["run_backfill"]
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import functools
+import logging
+from typing import Any
+
+from .config import Config, load_config, load_watchlist
+from .data.candle_store import open_candle_store
+from .market_data import _infer_currency_from_ticker, candle_target
+from .report.backtest_report import write_backtest_report
+from .scan import evaluation_settings, hybrid_evaluation_settings
+from .sell import hybrid_sell_settings, sell_settings
+from .signals.backtest import BacktestSettings, backtest_batch, summarize
+from .signals.indicators import set_backend as set_indicator_backend
+from .signals.parallel import evaluate_parallel
+
+
+def _date_arg(value: str | None) -> str | None:
+    if not value:
+        return None
+    text = value.replace("-", "").strip()
+    if len(text) != 8 or not text.isdigit():
+        raise ValueError(f"Expected a YYYYMMDD or YYYY-MM-DD date, got {value!r}")
+    return text
+
+
+def backtest_settings(
+    cfg: Config, *, start_date: str | None = None, end_date: str | None = None
+) -> BacktestSettings:
+    hybrid_buy = cfg.strategy_mode == "sma_ema_hybrid"
+    hybrid_sell = cfg.sell_mode == "sma_ema_hybrid"
+    return BacktestSettings(
+        strategy_mode=cfg.strategy_mode,
+        buy=hybrid_evaluation_settings(cfg) if hybrid_buy else evaluation_settings(cfg),
+        sell_mode=cfg.sell_mode,
+        sell=hybrid_sell_settings(cfg) if hybrid_sell else sell_settings(cfg),
+        # the live scan evaluates the same number of cached bars
+        window=max(cfg.min_history_bars, 200),
+        start_date=_date_arg(start_date),
+        end_date=_date_arg(end_date),
+    )
+
+
+def load_history(
+    cfg: Config, tickers: list[str], failures: list[str]
+) -> list[tuple[str, Any, dict[str, Any]]]:
+    """``(ticker, full cached candles, meta)`` items; misses are appended to ``failures``."""
+    store = open_candle_store(cfg.data_dir, backend=cfg.candle_store)
+    keys = {ticker: candle_target(ticker) for ticker in tickers}
+    loaded = store.load_many([key for _, _, key in keys.values()])
+
+    items: list[tuple[str, Any, dict[str, Any]]] = []
+    for ticker in tickers:
+        _, exch, key = keys[ticker]
+        candles = loaded.get(key)
+        if not candles:
+            failures.append(f"{ticker}: no cached candles ({key})")
+            continue
+        meta = {
+            "name": ticker,
+            "currency": _infer_currency_from_ticker(ticker),
+            "exchange": exch,
+            "data_source": cfg.data_provider,
+            "provider": cfg.data_provider,
+        }
+        items.append((ticker, candles, meta))
+    return items
+
+
+def run_backtest(
+    *,
+    watchlist_path: str | None,
+    provider: str | None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    workers: int | None = None,
+) -> int:
+    """Replay the live buy/sell evaluators over the cached candles of the watchlist."""
+    logger = logging.getLogger(__name__)
+    cfg: Config = load_config(provider_override=provider)
+    set_indicator_backend(cfg.indicator_backend)
+
+    tickers = load_watchlist(watchlist_path or cfg.watchlist_path or "watchlist.txt")
+    failures: list[str] = []
+    if not tickers:
+        msg = "No tickers provided (watchlist empty or missing)"
+        failures.append(msg)
+        logger.error(msg)
+
+    items = load_history(cfg, tickers, failures)
+
+    settings = backtest_settings(cfg, start_date=start_date, end_date=end_date)
+    results = evaluate_parallel(
+        items,
+        functools.partial(backtest_batch, settings=settings),
+        workers=workers if workers is not None else cfg.eval_workers,
+    )
+    summary = summarize([t for r in results for t in r.trades])
+    logger.info(
+        "Backtest: %s tickers, %s trades, win rate %.1f%%, avg return %.2f%%",
+        len(results),
+        summary.trades,
+        summary.win_rate * 100,
+        summary.avg_return * 100,
+    )
+
+    out_path = write_backtest_report(
+        report_dir=cfg.report_dir,
+        strategy_mode=cfg.strategy_mode,
+        sell_mode=cfg.sell_mode,
+        window=settings.window,
+        results=results,
+        start_date=start_date,
+        end_date=end_date,
+        failures=failures,
+    )
+    logger.info("Backtest report written to: %s", out_path)
+    return 1 if not items else 0
+
+
+__all__ = ["backtest_settings", "load_history", "run_backtest"]
@@ -80,6 +80,9 @@ class Config:
     screener_limit: int = 20
     screener_only: bool = False
     strategy_mode: str = "ema_cross"
+    indicator_backend: str = "python"
+    eval_workers: int = 1
+    pipeline_depth: int = 256
     use_sma200_filter: bool = False
     gap_atr_multiplier: float = 1.0
     min_dollar_volume: float = 0.0
@@ -87,6 +90,16 @@ class Config:
     exclude_etf_etn: bool = False
     require_slope_up: bool = False
     kis_min_interval_ms: float | None = None
+    kis_fetch_workers: int = 4
+    kis_adaptive_rate: bool = True
+    kis_shared_limiter: bool = True
+    incremental_refresh: bool = True
+    freshness_check: bool = True
+    snapshot_refresh: bool = True
+    backfill_years: int = 10
+    backfill_pause_seconds: float = 1.0
+    candle_store: str = "columnar"
+    eval_cache: bool = True
     screener_cache_ttl_minutes: float = 5.0
     min_price: float = 0.0
     rs_lookback_days: int = 20
@@ -246,6 +259,22 @@ def load_config(
     else:
         kis_min_interval_ms = parse_float(from_yaml("kis.min_interval_ms"), None)  # type: ignore[arg-type]
 
+    kis_fetch_workers = max(1, env_int("KIS_FETCH_WORKERS", "kis.fetch_workers", 4))
+    kis_adaptive_rate = env_bool("KIS_ADAPTIVE_RATE", "kis.adaptive_rate", True)
+    kis_shared_limiter = env_bool("KIS_SHARED_LIMITER", "kis.shared_limiter", True)
+
+    incremental_refresh = env_bool("INCREMENTAL_REFRESH", "data.incremental_refresh", True)
+    freshness_check = env_bool("FRESHNESS_CHECK", "data.freshness_check", True)
+    snapshot_refresh = env_bool("SNAPSHOT_REFRESH", "data.snapshot_refresh", True)
+    backfill_years = min(10, max(1, env_int("BACKFILL_YEARS", "data.backfill_years", 10)))
+    backfill_pause_seconds = max(
+        0.0, env_float("BACKFILL_PAUSE_SECONDS", "data.backfill_pause_seconds", 1.0)
+    )
+    candle_store = (env_str("CANDLE_STORE", "data.candle_store", "columnar") or "").strip().lower()
+    if candle_store not in {"json", "columnar", "sqlite"}:
+        candle_store = "columnar"
+    eval_cache = env_bool("EVAL_CACHE", "data.eval_cache", True)
+
     screener_cache_ttl_minutes = env_float("SCREENER_CACHE_TTL", "screener.cache_ttl_minutes", 5.0)
     min_price = env_float("MIN_PRICE", "screener.min_price", 0.0)
     rs_lookback_days = env_int("RS_LOOKBACK_DAYS", "strategy.rs_lookback_days", 20)
@@ -259,6 +288,14 @@ def load_config(
     if strategy_mode not in {"ema_cross", "sma_ema_hybrid"}:
         strategy_mode = "ema_cross"
 
+    indicator_backend = (
+        (env_str("INDICATOR_BACKEND", "strategy.indicator_backend", "python") or "").strip().lower()
+    )
+    if indicator_backend not in {"numpy", "python"}:
+        indicator_backend = "python"
+    eval_workers = max(1, env_int("EVAL_WORKERS", "strategy.eval_workers", 1))
+    pipeline_depth = max(0, env_int("PIPELINE_DEPTH", "strategy.pipeline_depth", 256))
+
     hybrid_sma_trend_period = env_int(
         "HYBRID_SMA_TREND_PERIOD", "strategy.hybrid.sma_trend_period", 20
     )
@@ -464,6 +501,9 @@ def load_config(
         screener_limit=screener_limit,
         screener_only=screener_only,
         strategy_mode=strategy_mode,
+        indicator_backend=indicator_backend,
+        eval_workers=eval_workers,
+        pipeline_depth=pipeline_depth,
         use_sma200_filter=use_sma200_filter,
         gap_atr_multiplier=gap_atr_multiplier,
         min_dollar_volume=min_dollar_volume,
@@ -471,6 +511,16 @@ def load_config(
         exclude_etf_etn=exclude_etf_etn,
         require_slope_up=require_slope_up,
         kis_min_interval_ms=kis_min_interval_ms,
+        kis_fetch_workers=kis_fetch_workers,
+        kis_adaptive_rate=kis_adaptive_rate,
+        kis_shared_limiter=kis_shared_limiter,
+        incremental_refresh=incremental_refresh,
+        freshness_check=freshness_check,
+        snapshot_refresh=snapshot_refresh,
+        backfill_years=backfill_years,
+        backfill_pause_seconds=backfill_pause_seconds,
+        candle_store=candle_store,
+        eval_cache=eval_cache,
         screener_cache_ttl_minutes=screener_cache_ttl_minutes,
         min_price=min_price,
         rs_lookback_days=rs_lookback_days,
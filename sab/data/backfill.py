@@ -0,0 +1,245 @@
+"""Resumable deep-history backfill of the candle store.
+
+Live scans only fetch what their evaluation window needs, so long SMAs and
+backtests would otherwise trigger multi-year history pulls in the middle of
+a scan. :func:`backfill_series` walks a cached series backwards one request
+at a time (``KISClient.candle_chunk``) and prepends the older bars, so the
+store can be filled overnight instead.
+
+Progress is kept per cache key in ``backfill_cursor.json`` under
+``data_dir`` and written after every request, so an interrupted run resumes
+at the next unfetched chunk. Each chunk ends on the stored first date, and
+that overlapping bar is compared with the stored close: a mismatch means
+the provider restated the history (split, rights issue) and the stored bars
+are no longer on the same basis. The stale series is then dropped and the
+cursor restarts from ``today``, so the key is rebuilt on the new basis in
+the same walk. A key that restates again during that rebuild is parked as
+``restated`` and rebuilt by the next run.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Protocol
+
+import numpy as np
+
+from .cache import load_json, save_json
+from .candle_store import CandleStore, close_restated
+from .candles import FIELDS, Candles
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_STATE_KEY = "backfill_cursor"
+
+# KIS serves at most ten years of daily bars (see ``earliest_allowed``).
+MAX_BACKFILL_YEARS = 10
+
+# Calendar days covered by one domestic request (100 bars fit comfortably).
+CHUNK_DAYS = 240
+
+# Consecutive empty chunks after which the listing date is assumed reached.
+EMPTY_CHUNKS_DONE = 3
+
+STATUS_ACTIVE = "active"
+STATUS_DONE = "done"
+STATUS_RESTATED = "restated"
+
+
+class ChunkSource(Protocol):
+    def candle_chunk(
+        self,
+        symbol: str,
+        *,
+        start_date: str,
+        end_date: str,
+        exchange: str | None = None,
+        adjusted: bool = True,
+    ) -> Candles: ...
+
+
+@dataclass
+class BackfillCursor:
+    next_end: str  # YYYYMMDD; the next request ends here (inclusive)
+    earliest: str  # YYYYMMDD; backfill stops once the cursor passes it
+    first: str = ""  # stored first date the cursor continues from
+    status: str = STATUS_ACTIVE
+    empty: int = 0  # consecutive chunks without older bars
+    requests: int = 0
+    bars: int = 0
+
+
+class BackfillState:
+    """Per-cache-key cursors persisted as one JSON file in ``data_dir``."""
+
+    def __init__(self, data_dir: str) -> None:
+        self.data_dir = data_dir
+        raw = load_json(data_dir, BACKFILL_STATE_KEY)
+        self._cursors: dict[str, BackfillCursor] = {}
+        if isinstance(raw, dict):
+            for key, entry in raw.items():
+                try:
+                    self._cursors[key] = BackfillCursor(**entry)
+                except TypeError:
+                    logger.warning("Ignoring malformed backfill cursor for %s", key)
+
+    def get(self, key: str) -> BackfillCursor | None:
+        return self._cursors.get(key)
+
+    def put(self, key: str, cursor: BackfillCursor) -> None:
+        self._cursors[key] = cursor
+        save_json(
+            self.data_dir, BACKFILL_STATE_KEY, {k: asdict(c) for k, c in self._cursors.items()}
+        )
+
+
+def _as_date(value: str) -> dt.date:
+    return dt.datetime.strptime(value, "%Y%m%d").date()
+
+
+def _fmt(day: dt.date) -> str:
+    return day.strftime("%Y%m%d")
+
+
+def backfill_earliest(today: dt.date, years: int) -> str:
+    """First date to backfill ``years`` back from ``today`` (capped at the provider limit)."""
+    years = min(max(int(years), 1), MAX_BACKFILL_YEARS)
+    return _fmt(today - dt.timedelta(days=365 * years))
+
+
+def _prepend(older: Candles, stored: Candles | None) -> Candles:
+    if not stored:
+        return older
+    return Candles(
+        {name: np.concatenate([older.column(name), stored.column(name)]) for name in FIELDS}
+    )
+
+
+def _restated(chunk: Candles, stored: Candles) -> bool:
+    hits = np.flatnonzero(chunk.date == stored.date[0])
+    if not len(hits):
+        return False
+    return close_restated(float(stored.close[0]), float(chunk.close[hits[0]]))
+
+
+def start_cursor(
+    stored: Candles | None,
+    cursor: BackfillCursor | None,
+    *,
+    earliest: str,
+    today: dt.date,
+) -> BackfillCursor:
+    """Resume ``cursor`` (or start one) for a backfill down to ``earliest``.
+
+    The cursor restarts from the stored first bar when the store no longer
+    starts where the cursor left it (a full refetch rewrote the series) or
+    after a restatement. A key finished at a shallower depth is reopened when
+    ``earliest`` moves back, unless it stopped at the listing date.
+    """
+    first = str(int(stored.date[0])) if stored else ""
+    if cursor is None or cursor.first != first or cursor.status == STATUS_RESTATED:
+        return BackfillCursor(next_end=first or _fmt(today), earliest=earliest, first=first)
+    if (
+        cursor.status == STATUS_DONE
+        and earliest < cursor.earliest
+        and cursor.empty < EMPTY_CHUNKS_DONE
+    ):
+        cursor.status = STATUS_ACTIVE
+    cursor.earliest = earliest
+    return cursor
+
+
+def backfill_series(
+    client: ChunkSource,
+    store: CandleStore,
+    key: str,
+    symbol: str,
+    *,
+    cursor: BackfillCursor,
+    exchange: str | None = None,
+    on_chunk: Callable[[BackfillCursor], None] | None = None,
+    pause: float = 0.0,
+    sleep: Callable[[float], None] = time.sleep,
+    today: dt.date | None = None,
+) -> BackfillCursor:
+    """Walk ``key`` backwards until ``cursor`` is done or restated.
+
+    ``on_chunk`` runs after every request (and store write) to persist the
+    cursor; ``pause`` seconds are slept after each request so a concurrent
+    live scan gets most of the shared rate budget. A restated series is
+    rebuilt once from ``today`` (default: the local date).
+    """
+    stored = store.load(key)
+    rebuilt = False
+    while cursor.status == STATUS_ACTIVE:
+        if cursor.next_end < cursor.earliest:
+            cursor.status = STATUS_DONE
+            break
+        end = _as_date(cursor.next_end)
+        start = max(_fmt(end - dt.timedelta(days=CHUNK_DAYS)), cursor.earliest)
+        chunk = client.candle_chunk(
+            symbol, start_date=start, end_date=cursor.next_end, exchange=exchange
+        )
+        cursor.requests += 1
+
+        if stored and _restated(chunk, stored):
+            if rebuilt:
+                logger.warning(
+                    "%s: history restated again during the rebuild; parked until the next run",
+                    key,
+                )
+                cursor.status = STATUS_RESTATED
+            else:
+                logger.warning(
+                    "%s: close on %s differs from the cache; history restated, rebuilding",
+                    key,
+                    int(stored.date[0]),
+                )
+                # every stored bar is on the old basis; refetch from the latest session
+                store.delete(key)
+                stored = None
+                rebuilt = True
+                cursor.first = ""
+                cursor.next_end = _fmt(today or dt.date.today())
+                cursor.empty = 0
+        else:
+            cut = int(np.searchsorted(chunk.date, stored.date[0])) if stored else len(chunk)
+            older = chunk[:cut]
+            if older:
+                stored = _prepend(older, stored)
+                store.save(key, stored)
+                cursor.bars += len(older)
+                cursor.empty = 0
+                # end the next chunk on the new first bar to check the overlap again
+                cursor.first = cursor.next_end = str(int(stored.date[0]))
+            else:
+                cursor.empty += 1
+                cursor.next_end = _fmt(_as_date(start) - dt.timedelta(days=1))
+                if cursor.empty >= EMPTY_CHUNKS_DONE:
+                    cursor.status = STATUS_DONE
+        if on_chunk is not None:
+            on_chunk(cursor)
+        if pause > 0 and cursor.status == STATUS_ACTIVE:
+            sleep(pause)
+    return cursor
+
+
+__all__ = [
+    "BACKFILL_STATE_KEY",
+    "CHUNK_DAYS",
+    "EMPTY_CHUNKS_DONE",
+    "MAX_BACKFILL_YEARS",
+    "STATUS_ACTIVE",
+    "STATUS_DONE",
+    "STATUS_RESTATED",
+    "BackfillCursor",
+    "BackfillState",
+    "ChunkSource",
+    "backfill_earliest",
+    "backfill_series",
+    "start_cursor",
+]
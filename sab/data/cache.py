@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import datetime as dt
 import json
 import os
 from typing import Any
@@ -32,3 +33,11 @@ def load_json(base_dir: str, key: str) -> Any | None:
     except Exception:
         return None
 
+
+def cache_mtime(base_dir: str, key: str) -> dt.datetime | None:
+    """Return the last write time of a cached key (UTC) or None if absent."""
+    p = json_path(base_dir, key)
+    try:
+        return dt.datetime.fromtimestamp(os.path.getmtime(p), tz=dt.UTC)
+    except OSError:
+        return None
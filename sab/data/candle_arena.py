@@ -0,0 +1,196 @@
+"""Shared-memory arena holding many candle series for worker processes.
+
+:class:`CandleArena` copies the columns of every series into one
+:class:`multiprocessing.shared_memory.SharedMemory` block: six float64
+column regions (``open``, ``high``, ``low``, ``close``, ``volume``,
+``prev_close_diff``) followed by the int32 ``date`` region, each holding
+all series back to back. ``ArenaHandle.spans[i]`` is the ``(offset,
+length)`` of series ``i`` inside every region. A block built with spare
+``capacity`` can be refilled with the next batch of series in place.
+
+The handle is small and picklable. A worker attaches with
+:meth:`ArenaHandle.attach` and gets :class:`~sab.data.candles.Candles`
+views straight onto the shared pages, so nothing is copied or unpickled
+and memory stays flat however many workers attach.
+
+The creating process owns the block: use the arena as a context manager
+(or call :meth:`CandleArena.close`) so it is unlinked even when evaluation
+fails. Attached workers never unlink it.
+"""
+
+from __future__ import annotations
+
+import gc
+import logging
+from collections.abc import Sequence
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from types import TracebackType
+
+import numpy as np
+
+from .candles import PRICE_FIELDS, Candles, CandleSeries, as_candles
+
+logger = logging.getLogger(__name__)
+
+_FLOAT = np.dtype(np.float64)
+_DATE = np.dtype(np.int32)
+
+
+def _region_offsets(bars: int) -> dict[str, int]:
+    offsets = {name: i * bars * _FLOAT.itemsize for i, name in enumerate(PRICE_FIELDS)}
+    offsets["date"] = len(PRICE_FIELDS) * bars * _FLOAT.itemsize
+    return offsets
+
+
+def _arena_size(bars: int) -> int:
+    return len(PRICE_FIELDS) * bars * _FLOAT.itemsize + bars * _DATE.itemsize
+
+
+def _columns(shm: SharedMemory, bars: int) -> dict[str, np.ndarray]:
+    return {
+        name: np.ndarray(
+            (bars,), dtype=_DATE if name == "date" else _FLOAT, buffer=shm.buf, offset=offset
+        )
+        for name, offset in _region_offsets(bars).items()
+    }
+
+
+def _fill(shm: SharedMemory, bars: int, candles: Sequence[Candles]) -> tuple[tuple[int, int], ...]:
+    spans: list[tuple[int, int]] = []
+    offset = 0
+    columns = _columns(shm, bars)
+    for c in candles:
+        length = len(c)
+        for name, column in columns.items():
+            column[offset : offset + length] = c.column(name)
+        spans.append((offset, length))
+        offset += length
+    del columns
+    return tuple(spans)
+
+
+@dataclass(frozen=True)
+class ArenaHandle:
+    """Picklable description of a :class:`CandleArena` for worker processes."""
+
+    name: str
+    bars: int
+    spans: tuple[tuple[int, int], ...]
+
+    def attach(self) -> AttachedArena:
+        return AttachedArena(self)
+
+
+class CandleArena:
+    """Owner side of a shared-memory block holding many candle series."""
+
+    def __init__(self, shm: SharedMemory, handle: ArenaHandle) -> None:
+        self._shm: SharedMemory | None = shm
+        self.handle = handle
+
+    @classmethod
+    def build(cls, series: Sequence[CandleSeries], *, capacity: int = 0) -> CandleArena:
+        """Copy ``series`` into a new block; ``handle.spans`` follows their order.
+
+        ``capacity`` reserves room for at least that many bars, so later
+        batches can be written with :meth:`refill` instead of a new block.
+        """
+        candles = [as_candles(s) for s in series]
+        bars = max(sum(len(c) for c in candles), capacity)
+        shm = SharedMemory(create=True, size=max(_arena_size(bars), 1))
+        try:
+            spans = _fill(shm, bars, candles)
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+        return cls(shm, ArenaHandle(shm.name, bars, spans))
+
+    def refill(self, series: Sequence[CandleSeries]) -> bool:
+        """Overwrite the block with ``series`` if they fit; ``False`` otherwise.
+
+        Only call this once no worker still reads the previous series.
+        """
+        candles = [as_candles(s) for s in series]
+        if self._shm is None or sum(len(c) for c in candles) > self.handle.bars:
+            return False
+        spans = _fill(self._shm, self.handle.bars, candles)
+        self.handle = ArenaHandle(self.handle.name, self.handle.bars, spans)
+        return True
+
+    @property
+    def nbytes(self) -> int:
+        return _arena_size(self.handle.bars)
+
+    def close(self) -> None:
+        """Release and unlink the block; safe to call more than once."""
+        shm, self._shm = self._shm, None
+        if shm is None:
+            return
+        try:
+            shm.close()
+        finally:
+            try:
+                shm.unlink()
+            except FileNotFoundError:  # pragma: no cover - already removed
+                pass
+
+    def __enter__(self) -> CandleArena:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class AttachedArena:
+    """Worker side: read-only :class:`Candles` views of an arena's series."""
+
+    def __init__(self, handle: ArenaHandle) -> None:
+        self.handle = handle
+        # the owner unlinks the block; attaching must not register it for cleanup
+        self._shm: SharedMemory | None = SharedMemory(name=handle.name, track=False)
+        self._columns = _columns(self._shm, handle.bars)
+        for column in self._columns.values():
+            column.flags.writeable = False
+
+    def candles(self, index: int) -> Candles:
+        offset, length = self.handle.spans[index]
+        return Candles(
+            {name: column[offset : offset + length] for name, column in self._columns.items()}
+        )
+
+    def close(self) -> None:
+        """Unmap the block unless :class:`Candles` views of it are still alive."""
+        self._columns = {}
+        if self._shm is None:
+            return
+        try:
+            self._shm.close()
+        except BufferError:
+            gc.collect()
+            try:
+                self._shm.close()
+            except BufferError:
+                logger.debug("Arena %s still referenced; leaving it mapped", self.handle.name)
+                return
+        self._shm = None
+
+    def __enter__(self) -> AttachedArena:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+__all__ = ["ArenaHandle", "AttachedArena", "CandleArena"]
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import contextlib
+import logging
+import math
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from .candle_store import CandleStore
+from .candles import Candles, CandleSeries
+from .kis_client import KISAuthError, KISClient, KISClientError
+
+logger = logging.getLogger(__name__)
+
+REFRESH_FRESH = "fresh"
+REFRESH_FULL = "full"
+REFRESH_TAIL = "tail"
+
+# Relative tolerance when comparing overlapping closes between the cache and
+# a freshly fetched tail. Anything beyond this is treated as a price
+# adjustment (split, dividend-adjusted restatement) and forces a full refetch.
+_CLOSE_TOLERANCE = 1e-6
+
+
+def _same_price(a: Any, b: Any) -> bool:
+    try:
+        fa = float(a)
+        fb = float(b)
+    except (TypeError, ValueError):
+        return False
+    if math.isnan(fa) or math.isnan(fb):
+        return math.isnan(fa) and math.isnan(fb)
+    return abs(fa - fb) <= _CLOSE_TOLERANCE * max(1.0, abs(fa), abs(fb))
+
+
+def merge_tail(
+    cached: CandleSeries,
+    tail: CandleSeries,
+    *,
+    count: int,
+) -> Candles | None:
+    """Merge a freshly fetched tail into a cached series.
+
+    The tail must overlap the cache on at least the second-to-last cached bar
+    (the last cached bar may have been an intraday snapshot, so it is replaced
+    rather than verified). Returns ``None`` when the overlap is missing (gap)
+    or an overlapping close differs (adjustment), signalling a full refetch.
+    """
+    if len(cached) < 2 or not tail:
+        return None
+
+    fresh = {str(c.get("date") or ""): c for c in tail if c.get("date")}
+    anchor_date = str(cached[-2].get("date") or "")
+    if not anchor_date or anchor_date not in fresh:
+        return None
+
+    for bar in cached[:-1]:
+        date = str(bar.get("date") or "")
+        if date in fresh and not _same_price(bar.get("close"), fresh[date].get("close")):
+            logger.info("Close mismatch on %s (cache vs fetch); adjustment suspected", date)
+            return None
+
+    merged = {str(c.get("date") or ""): c for c in cached if c.get("date")}
+    merged.update(fresh)
+    series = [merged[d] for d in sorted(merged)]
+    target = max(count, 1)
+    if len(series) > target:
+        series = series[-target:]
+    return Candles.from_dicts(series)
+
+
+def refresh_candles(
+    client: KISClient,
+    *,
+    symbol: str,
+    exchange: str | None,
+    count: int,
+    cached: CandleSeries | None = None,
+) -> tuple[CandleSeries, str]:
+    """Fetch candles for one instrument, reusing ``cached`` when possible.
+
+    When the cache already holds ``count`` bars only the tail starting at the
+    second-to-last cached date is requested and merged. Otherwise (or when the
+    merge detects a gap/adjustment) the full window is refetched.
+
+    Returns ``(candles, mode)`` where mode is ``"tail"`` or ``"full"``.
+    KIS errors propagate unchanged so callers keep their fallback handling.
+    """
+    if cached and len(cached) >= max(count, 2):
+        since = str(cached[-2].get("date") or "")
+        if since:
+            if exchange:
+                tail = client.overseas_daily_candles(
+                    symbol=symbol, exchange=exchange, count=count, since=since
+                )
+            else:
+                tail = client.daily_candles(symbol, count=count, since=since)
+            merged = merge_tail(cached, tail, count=count)
+            if merged is not None:
+                return merged, REFRESH_TAIL
+            logger.info("%s: incremental refresh rejected; refetching full history", symbol)
+
+    if exchange:
+        candles = client.overseas_daily_candles(symbol=symbol, exchange=exchange, count=count)
+    else:
+        candles = client.daily_candles(symbol, count=count)
+    return candles, REFRESH_FULL
+
+
+@dataclass
+class RefreshJob:
+    ticker: str
+    symbol: str
+    exchange: str | None
+    cache_key: str
+    cached: CandleSeries | None = None
+
+
+@dataclass
+class RefreshResult:
+    job: RefreshJob
+    candles: CandleSeries
+    mode: str = REFRESH_FULL
+    error: KISClientError | KISAuthError | None = None
+
+
+def _run_job(
+    client: KISClient,
+    job: RefreshJob,
+    *,
+    count: int,
+    store: CandleStore | None,
+    incremental: bool,
+) -> RefreshResult:
+    try:
+        candles, mode = refresh_candles(
+            client,
+            symbol=job.symbol,
+            exchange=job.exchange,
+            count=count,
+            cached=job.cached if incremental else None,
+        )
+    except (KISClientError, KISAuthError) as exc:
+        return RefreshResult(job=job, candles=Candles.empty(), error=exc)
+    if candles and store is not None:
+        store.save(job.cache_key, candles)
+    return RefreshResult(job=job, candles=candles or Candles.empty(), mode=mode)
+
+
+def refresh_many(
+    client: KISClient,
+    jobs: Iterable[RefreshJob],
+    *,
+    count: int,
+    store: CandleStore | None,
+    workers: int = 1,
+    incremental: bool = True,
+) -> Iterator[RefreshResult]:
+    """Refresh ``jobs`` through a bounded worker pool, yielding in job order.
+
+    Requests from all workers share the client's token bucket, so extra
+    workers only overlap parsing and cache writes with network latency; they
+    never raise the request rate. Successful results are saved to ``store``
+    inside the worker, grouped into one ``store.batch()`` that commits when
+    iteration finishes. KIS errors are captured on the result so callers
+    keep their per-ticker fallback handling.
+    """
+    with store.batch() if store is not None else contextlib.nullcontext():
+        yield from _refresh_jobs(
+            client, jobs, count=count, store=store, workers=workers, incremental=incremental
+        )
+
+
+def _refresh_jobs(
+    client: KISClient,
+    jobs: Iterable[RefreshJob],
+    *,
+    count: int,
+    store: CandleStore | None,
+    workers: int,
+    incremental: bool,
+) -> Iterator[RefreshResult]:
+    if workers <= 1:
+        for job in jobs:
+            yield _run_job(client, job, count=count, store=store, incremental=incremental)
+        return
+
+    pending: deque[Future[RefreshResult]] = deque()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sab-fetch") as pool:
+        try:
+            for job in jobs:
+                pending.append(
+                    pool.submit(
+                        _run_job,
+                        client,
+                        job,
+                        count=count,
+                        store=store,
+                        incremental=incremental,
+                    )
+                )
+                # keep at most two jobs queued per worker
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for fut in pending:
+                fut.cancel()
+
+
+def describe_refresh(counts: dict[str, int]) -> str | None:
+    """Summarise per-mode refresh counts for report headers."""
+    parts: list[str] = []
+    if counts.get(REFRESH_FRESH):
+        parts.append(f"{counts[REFRESH_FRESH]} fresh from cache")
+    if counts.get(REFRESH_TAIL):
+        parts.append(f"{counts[REFRESH_TAIL]} incremental")
+    if counts.get(REFRESH_FULL):
+        parts.append(f"{counts[REFRESH_FULL]} full")
+    return ", ".join(parts) or None
+
+
+__all__ = [
+    "REFRESH_FRESH",
+    "REFRESH_FULL",
+    "REFRESH_TAIL",
+    "RefreshJob",
+    "RefreshResult",
+    "describe_refresh",
+    "merge_tail",
+    "refresh_candles",
+    "refresh_many",
+]
@@ -0,0 +1,446 @@
+from __future__ import annotations
+
+import contextlib
+import datetime as dt
+import json
+import logging
+import math
+import os
+import shutil
+from collections.abc import Iterable
+from typing import Any, Protocol
+
+import numpy as np
+
+from .cache import cache_mtime, ensure_dir, json_path, load_json, save_json
+from .candles import PRICE_FIELDS, Candles, CandleSeries
+from .file_lock import FileLock
+
+logger = logging.getLogger(__name__)
+
+STORE_JSON = "json"
+STORE_COLUMNAR = "columnar"
+STORE_SQLITE = "sqlite"
+STORE_BACKENDS = (STORE_JSON, STORE_COLUMNAR, STORE_SQLITE)
+
+# Float columns stored alongside the int32 YYYYMMDD date column.
+PRICE_COLUMNS = PRICE_FIELDS
+_DATE_FILE = "date.i4"
+_HEADER_FILE = "index.json"
+_FORMAT_VERSION = 1
+
+# Relative close difference above which an overlapping bar counts as restated.
+RESTATED_TOLERANCE = 1e-6
+
+
+class CandleStore(Protocol):
+    """Storage backend for per-instrument daily candle series."""
+
+    def load(self, key: str, *, limit: int | None = None) -> Candles | None: ...
+
+    def load_many(self, keys: Iterable[str], *, limit: int | None = None) -> dict[str, Candles]: ...
+
+    def save(self, key: str, candles: CandleSeries) -> None: ...
+
+    def batch(self) -> contextlib.AbstractContextManager[Any]: ...
+
+    def modified_at(self, key: str) -> dt.datetime | None: ...
+
+    def set_modified_at(self, key: str, timestamp: float) -> None: ...
+
+    def keys(self) -> list[str]: ...
+
+    def delete(self, key: str) -> None: ...
+
+
+def _load_each(store: CandleStore, keys: Iterable[str], limit: int | None) -> dict[str, Candles]:
+    loaded: dict[str, Candles] = {}
+    for key in keys:
+        candles = store.load(key, limit=limit)
+        if candles:
+            loaded[key] = candles
+    return loaded
+
+
+class JsonCandleStore:
+    """Legacy layout: one ``<key>.json`` list of dicts per instrument."""
+
+    def __init__(self, data_dir: str) -> None:
+        self.data_dir = data_dir
+
+    def load(self, key: str, *, limit: int | None = None) -> Candles | None:
+        cached = load_json(self.data_dir, key)
+        if not isinstance(cached, list) or not cached:
+            return None
+        if limit is not None and len(cached) > limit:
+            cached = cached[-limit:]
+        return Candles.from_dicts(cached)
+
+    def load_many(self, keys: Iterable[str], *, limit: int | None = None) -> dict[str, Candles]:
+        return _load_each(self, keys, limit)
+
+    def save(self, key: str, candles: CandleSeries) -> None:
+        rows = candles.to_dicts() if isinstance(candles, Candles) else candles
+        save_json(self.data_dir, key, rows)
+
+    def batch(self) -> contextlib.AbstractContextManager[JsonCandleStore]:
+        return contextlib.nullcontext(self)
+
+    def modified_at(self, key: str) -> dt.datetime | None:
+        return cache_mtime(self.data_dir, key)
+
+    def set_modified_at(self, key: str, timestamp: float) -> None:
+        os.utime(json_path(self.data_dir, key), (timestamp, timestamp))
+
+    def keys(self) -> list[str]:
+        if not os.path.isdir(self.data_dir):
+            return []
+        return sorted(
+            name[: -len(".json")]
+            for name in os.listdir(self.data_dir)
+            if name.startswith("candles_") and name.endswith(".json")
+        )
+
+    def delete(self, key: str) -> None:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(json_path(self.data_dir, key))
+
+
+def close_restated(stored: float, fresh: float) -> bool:
+    """True when ``fresh`` is not the stored close of the same session.
+
+    Adjusted histories are restated as a whole (split, rights issue,
+    dividend adjustment), so one differing overlapping close means every
+    older stored bar is on a different price basis.
+    """
+    if math.isnan(stored) or math.isnan(fresh):
+        return False
+    return abs(fresh - stored) > RESTATED_TOLERANCE * max(abs(stored), 1.0)
+
+
+def _date_int(value: Any) -> int | None:
+    text = str(value or "").replace("-", "").strip()
+    if len(text) != 8 or not text.isdigit():
+        return None
+    return int(text)
+
+
+def _float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def candles_to_columns(candles: CandleSeries) -> dict[str, np.ndarray]:
+    """Convert candles to date-sorted, de-duplicated column arrays."""
+    if isinstance(candles, Candles):
+        dates = candles.date
+        if len(dates) == 0 or (dates[0] > 0 and bool(np.all(np.diff(dates) > 0))):
+            return {name: np.array(arr) for name, arr in candles.columns().items()}
+    rows: dict[int, Any] = {}
+    for candle in candles:
+        date = _date_int(candle.get("date"))
+        if date is not None:
+            rows[date] = candle
+    dates = sorted(rows)
+    columns: dict[str, np.ndarray] = {"date": np.asarray(dates, dtype=np.int32)}
+    for name in PRICE_COLUMNS:
+        columns[name] = np.asarray([_float(rows[d].get(name)) for d in dates], dtype=np.float64)
+    return columns
+
+
+def columns_to_candles(columns: dict[str, np.ndarray]) -> Candles:
+    return Candles(columns)
+
+
+class ColumnarCandleStore:
+    """Per-instrument column files under ``<data_dir>/candles/<key>/``.
+
+    Each instrument directory holds ``date.i4`` (int32 YYYYMMDD) and one
+    ``<column>.f8`` float64 file per price column, plus an ``index.json``
+    header recording the committed row count and date range. Saves only
+    overwrite from the first row that differs from what is stored, so
+    history is not rewritten unless the incoming series restates it (see
+    :func:`close_restated`), in which case it replaces the stored rows
+    whole; the header is written last and readers
+    ignore bytes beyond its row count. Column files never shrink, which
+    keeps memory maps held by other processes valid (see :meth:`map_columns`).
+
+    When ``legacy_dir`` is set, a key missing from the store is imported from
+    the legacy ``<key>.json`` file on first load (keeping its mtime so
+    freshness checks still see when the data was written).
+    """
+
+    def __init__(self, root: str, *, legacy_dir: str | None = None) -> None:
+        self.root = root
+        self.legacy_dir = legacy_dir
+
+    # ------------------------------------------------------------------
+    def _dir(self, key: str) -> str:
+        return os.path.join(self.root, key.replace("/", "_"))
+
+    def _header_path(self, key: str) -> str:
+        return os.path.join(self._dir(key), _HEADER_FILE)
+
+    def header(self, key: str) -> dict[str, Any] | None:
+        try:
+            with open(self._header_path(key), encoding="utf-8") as fh:
+                header = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        return header if isinstance(header, dict) else None
+
+    def keys(self) -> list[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name
+            for name in os.listdir(self.root)
+            if os.path.exists(os.path.join(self.root, name, _HEADER_FILE))
+        )
+
+    def _map_column(self, key: str, name: str, rows: int, *, start: int = 0) -> np.ndarray:
+        """Read-only map of rows ``[start, rows)``; only those pages are touched."""
+        dtype = np.dtype(np.int32 if name == "date" else np.float64)
+        fname = _DATE_FILE if name == "date" else f"{name}.f8"
+        path = os.path.join(self._dir(key), fname)
+        count = max(0, rows - start)
+        if count == 0 or not os.path.exists(path):
+            return np.full(count, np.nan if name != "date" else 0, dtype=dtype)
+        if os.path.getsize(path) < rows * dtype.itemsize:
+            raise OSError(f"Column {fname} for {key} is shorter than its header")
+        return np.memmap(path, dtype=dtype, mode="r", offset=start * dtype.itemsize, shape=(count,))
+
+    def _read_column(self, key: str, name: str, rows: int, *, start: int = 0) -> np.ndarray:
+        return np.array(self._map_column(key, name, rows, start=start))
+
+    # ------------------------------------------------------------------
+    def map_columns(self, key: str, *, limit: int | None = None) -> dict[str, np.ndarray] | None:
+        """Return zero-copy, read-only memory maps of the last ``limit`` rows.
+
+        Only the pages backing the requested tail are read, and processes
+        mapping the same key share the OS page cache. The views are live: a
+        concurrent save of the same key may rewrite its tail in place, so
+        copy (``np.array(view)``) when a stable snapshot is required.
+        """
+        header = self.header(key)
+        if header is None:
+            if self._import_legacy(key):
+                header = self.header(key)
+            if header is None:
+                return None
+        rows = int(header.get("rows") or 0)
+        if rows <= 0:
+            return None
+        start = max(0, rows - limit) if limit is not None else 0
+        try:
+            columns = {"date": self._map_column(key, "date", rows, start=start)}
+            for name in PRICE_COLUMNS:
+                columns[name] = self._map_column(key, name, rows, start=start)
+        except (OSError, ValueError) as exc:
+            logger.warning("Corrupt candle store entry %s: %s", key, exc)
+            return None
+        return columns
+
+    def load_columns(self, key: str, *, limit: int | None = None) -> dict[str, np.ndarray] | None:
+        """Return private contiguous copies of the column arrays (oldest first)."""
+        columns = self.map_columns(key, limit=limit)
+        if columns is None:
+            return None
+        return {name: np.array(arr) for name, arr in columns.items()}
+
+    def load(self, key: str, *, limit: int | None = None) -> Candles | None:
+        columns = self.load_columns(key, limit=limit)
+        if columns is None:
+            return None
+        return Candles(columns)
+
+    def load_many(self, keys: Iterable[str], *, limit: int | None = None) -> dict[str, Candles]:
+        return _load_each(self, keys, limit)
+
+    def modified_at(self, key: str) -> dt.datetime | None:
+        try:
+            mtime = os.path.getmtime(self._header_path(key))
+        except OSError:
+            if self.legacy_dir and self.header(key) is None:
+                return cache_mtime(self.legacy_dir, key)
+            return None
+        return dt.datetime.fromtimestamp(mtime, tz=dt.UTC)
+
+    def set_modified_at(self, key: str, timestamp: float) -> None:
+        os.utime(self._header_path(key), (timestamp, timestamp))
+
+    def delete(self, key: str) -> None:
+        # unlinked column files stay readable through maps other processes hold
+        shutil.rmtree(self._dir(key), ignore_errors=True)
+
+    # ------------------------------------------------------------------
+    def batch(self) -> contextlib.AbstractContextManager[ColumnarCandleStore]:
+        # every save already commits atomically through its header
+        return contextlib.nullcontext(self)
+
+    def save(self, key: str, candles: CandleSeries) -> None:
+        new = candles_to_columns(candles)
+        if len(new["date"]) == 0:
+            return
+        ensure_dir(self._dir(key))
+        with FileLock(os.path.join(self._dir(key), ".lock")):
+            self._write(key, new)
+
+    def _write(self, key: str, new: dict[str, np.ndarray]) -> None:
+        header = self.header(key) or {}
+        rows = int(header.get("rows") or 0)
+        stored_dates = self._read_column(key, "date", rows) if rows else np.empty(0, np.int32)
+
+        # Rows older than the incoming series are history and stay untouched,
+        # unless the series restates them: a differing close on the first
+        # overlapping bar (with more bars after it, so not just a corrected
+        # last bar) puts the whole stored prefix on an old price basis.
+        start = int(np.searchsorted(stored_dates, new["date"][0]))
+        overlap = min(rows - start, len(new["date"]))
+        if (
+            overlap > 1
+            and stored_dates[start] == new["date"][0]
+            and close_restated(
+                float(self._read_column(key, "close", start + 1, start=start)[0]),
+                float(new["close"][0]),
+            )
+        ):
+            logger.info(
+                "%s: history restated at %s; replacing %s stored rows",
+                key,
+                int(new["date"][0]),
+                rows,
+            )
+            rows, start, overlap = 0, 0, 0
+            stored_dates = np.empty(0, np.int32)
+        keep = start
+        if overlap > 0:
+            same = stored_dates[start : start + overlap] == new["date"][:overlap]
+            for name in PRICE_COLUMNS:
+                old = self._read_column(key, name, start + overlap, start=start)
+                fresh = new[name][:overlap]
+                same &= (old == fresh) | (np.isnan(old) & np.isnan(fresh))
+            mismatch = np.flatnonzero(~same)
+            keep = start + (int(mismatch[0]) if len(mismatch) else overlap)
+        skip = keep - start
+        total = keep + len(new["date"]) - skip
+
+        if keep != rows or skip != len(new["date"]):
+            for name in ("date", *PRICE_COLUMNS):
+                fname = _DATE_FILE if name == "date" else f"{name}.f8"
+                dtype = np.int32 if name == "date" else np.float64
+                path = os.path.join(self._dir(key), fname)
+                with open(path, "r+b" if os.path.exists(path) else "wb") as fh:
+                    # overwrite in place (never truncate) so live maps stay valid
+                    fh.seek(keep * np.dtype(dtype).itemsize)
+                    new[name][skip:].astype(dtype, copy=False).tofile(fh)
+
+        # Always rewrite the header: its mtime records when the data was
+        # last confirmed, which the freshness check relies on.
+        self._write_header(
+            key,
+            {
+                "version": _FORMAT_VERSION,
+                "rows": total,
+                "first": int(stored_dates[0]) if keep else int(new["date"][skip]),
+                "last": int(new["date"][-1]),
+                "columns": ["date", *PRICE_COLUMNS],
+            },
+        )
+
+    def _write_header(self, key: str, header: dict[str, Any]) -> None:
+        path = self._header_path(key)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(header, fh)
+        os.replace(tmp, path)
+
+    # ------------------------------------------------------------------
+    def _import_legacy(self, key: str) -> bool:
+        if not self.legacy_dir:
+            return False
+        return import_json_candles(self, self.legacy_dir, key)
+
+
+def import_json_candles(
+    store: CandleStore, data_dir: str, key: str, *, remove: bool = False
+) -> bool:
+    """Copy ``<data_dir>/<key>.json`` into ``store``, preserving its mtime."""
+    cached = load_json(data_dir, key)
+    if not isinstance(cached, list) or not cached:
+        return False
+    store.save(key, cached)
+    src = json_path(data_dir, key)
+    try:
+        store.set_modified_at(key, os.path.getmtime(src))
+        if remove:
+            os.remove(src)
+    except OSError:
+        pass
+    return True
+
+
+def migrate_json_cache(
+    data_dir: str, *, remove: bool = False, backend: str = STORE_COLUMNAR
+) -> int:
+    """Import every legacy ``candles_*.json`` file into the ``backend`` store."""
+    if backend == STORE_JSON or not os.path.isdir(data_dir):
+        return 0
+    store = _open_store(data_dir, backend, legacy=False)
+    migrated = 0
+    with store.batch():
+        for name in sorted(os.listdir(data_dir)):
+            if not (name.startswith("candles_") and name.endswith(".json")):
+                continue
+            if import_json_candles(store, data_dir, name[: -len(".json")], remove=remove):
+                migrated += 1
+    return migrated
+
+
+def store_location(data_dir: str, backend: str = STORE_COLUMNAR) -> str:
+    """Path of the file or directory holding the ``backend`` store."""
+    if backend == STORE_SQLITE:
+        from .sqlite_store import sqlite_path
+
+        return sqlite_path(data_dir)
+    if backend == STORE_JSON:
+        return data_dir
+    return os.path.join(data_dir, "candles")
+
+
+def _open_store(data_dir: str, backend: str, *, legacy: bool) -> CandleStore:
+    legacy_dir = data_dir if legacy else None
+    if backend == STORE_JSON:
+        return JsonCandleStore(data_dir)
+    if backend == STORE_SQLITE:
+        from .sqlite_store import SqliteCandleStore
+
+        return SqliteCandleStore(store_location(data_dir, backend), legacy_dir=legacy_dir)
+    return ColumnarCandleStore(store_location(data_dir, backend), legacy_dir=legacy_dir)
+
+
+def open_candle_store(data_dir: str, backend: str = STORE_COLUMNAR) -> CandleStore:
+    """Return the candle store configured by ``data.candle_store``."""
+    return _open_store(data_dir, backend, legacy=True)
+
+
+__all__ = [
+    "PRICE_COLUMNS",
+    "STORE_BACKENDS",
+    "STORE_COLUMNAR",
+    "STORE_JSON",
+    "STORE_SQLITE",
+    "RESTATED_TOLERANCE",
+    "CandleStore",
+    "ColumnarCandleStore",
+    "JsonCandleStore",
+    "candles_to_columns",
+    "close_restated",
+    "columns_to_candles",
+    "import_json_candles",
+    "migrate_json_cache",
+    "open_candle_store",
+    "store_location",
+]
@@ -0,0 +1,252 @@
+"""Compact columnar container for a daily candle series.
+
+``Candles`` keeps one typed array per field instead of a dict per bar: an
+int32 ``YYYYMMDD`` date column and float64 ``open``/``high``/``low``/
+``close``/``volume``/``prev_close_diff`` columns (the same layout as the
+columnar candle store). A bar costs 52 bytes instead of a dict with seven
+boxed values and a date string.
+
+Slicing (``candles[: idx_eval + 1]``, ``candles[-20:]``) returns another
+``Candles`` over views of the same arrays, so it is O(1). Indexing returns
+a :class:`Bar`, a read-only mapping that behaves like the old candle dict
+(``bar["close"]``, ``bar.get("volume")``, ``dict(bar)``), so code written
+for ``list[dict]`` keeps working. Hot paths should read whole columns
+instead (``candles.close``, or :func:`column_values` for code that accepts
+either form).
+
+Missing or non-numeric prices are stored as NaN and missing dates as 0
+(read back as ``""``), matching what the KIS and PyKRX parsers produce.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from typing import Any, overload
+
+import numpy as np
+
+PRICE_FIELDS = ("open", "high", "low", "close", "volume", "prev_close_diff")
+FIELDS = ("date", *PRICE_FIELDS)
+
+
+def _date_int(value: Any) -> int:
+    text = str(value or "").replace("-", "").strip()
+    if len(text) != 8 or not text.isdigit():
+        return 0
+    return int(text)
+
+
+def _float(value: Any) -> float:
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class Bar(Mapping[str, Any]):
+    """Read-only dict view of one row of a :class:`Candles` series."""
+
+    __slots__ = ("_columns", "_index")
+
+    def __init__(self, columns: dict[str, np.ndarray], index: int) -> None:
+        self._columns = columns
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            column = self._columns[key]
+        except KeyError:
+            raise KeyError(key) from None
+        value = column[self._index]
+        if key == "date":
+            return str(int(value)) if value else ""
+        return float(value)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __repr__(self) -> str:
+        return f"Bar({dict(self)!r})"
+
+
+class Candles(Sequence[Bar]):
+    """Oldest-first daily candles stored as parallel typed arrays."""
+
+    __slots__ = ("_columns",)
+
+    def __init__(self, columns: Mapping[str, Any]) -> None:
+        date = np.asarray(columns["date"], dtype=np.int32)
+        cols = {"date": date}
+        for name in PRICE_FIELDS:
+            values = columns.get(name)
+            cols[name] = (
+                np.full(len(date), np.nan)
+                if values is None
+                else np.asarray(values, dtype=np.float64)
+            )
+            if len(cols[name]) != len(date):
+                raise ValueError(
+                    f"Column {name!r} has {len(cols[name])} rows, expected {len(date)}"
+                )
+        self._columns = cols
+
+    # -- construction --------------------------------------------------------------
+    @classmethod
+    def from_dicts(cls, rows: Iterable[Mapping[str, Any]]) -> Candles:
+        """Build from candle dicts (or :class:`Bar` objects), keeping their order."""
+        if isinstance(rows, Candles):
+            return rows
+        rows = list(rows)
+        columns: dict[str, Any] = {"date": [_date_int(r.get("date")) for r in rows]}
+        for name in PRICE_FIELDS:
+            columns[name] = [_float(r.get(name)) for r in rows]
+        return cls(columns)
+
+    @classmethod
+    def empty(cls) -> Candles:
+        return cls({"date": np.empty(0, dtype=np.int32)})
+
+    # -- columns -------------------------------------------------------------------
+    @property
+    def date(self) -> np.ndarray:
+        return self._columns["date"]
+
+    @property
+    def open(self) -> np.ndarray:
+        return self._columns["open"]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self._columns["high"]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self._columns["low"]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self._columns["close"]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self._columns["volume"]
+
+    @property
+    def prev_close_diff(self) -> np.ndarray:
+        return self._columns["prev_close_diff"]
+
+    def column(self, name: str) -> np.ndarray:
+        return self._columns[name]
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """Column arrays keyed by field name (views, not copies)."""
+        return dict(self._columns)
+
+    def dates(self) -> list[str]:
+        return [str(d) if d else "" for d in self.date.tolist()]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(arr.nbytes for arr in self._columns.values())
+
+    # -- sequence protocol ---------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._columns["date"])
+
+    @overload
+    def __getitem__(self, index: int) -> Bar: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Candles: ...
+
+    def __getitem__(self, index: int | slice) -> Bar | Candles:
+        if isinstance(index, slice):
+            view = Candles.__new__(Candles)
+            view._columns = {name: arr[index] for name, arr in self._columns.items()}
+            return view
+        n = len(self)
+        i = index + n if index < 0 else index
+        if not 0 <= i < n:
+            raise IndexError("candle index out of range")
+        return Bar(self._columns, i)
+
+    def __iter__(self) -> Iterator[Bar]:
+        columns = self._columns
+        for i in range(len(self)):
+            yield Bar(columns, i)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, tuple)):
+            # compare against plain candle dicts bar by bar
+            return len(self) == len(other) and all(
+                bar == row for bar, row in zip(self, other, strict=True)
+            )
+        if not isinstance(other, Candles):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            np.array_equal(self._columns[name], other._columns[name], equal_nan=name != "date")
+            for name in FIELDS
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        if not len(self):
+            return "Candles([])"
+        return f"Candles({len(self)} bars, {self[0]['date']}..{self[-1]['date']})"
+
+    # -- conversion ----------------------------------------------------------------
+    def to_dicts(self) -> list[dict[str, Any]]:
+        """Plain candle dicts, e.g. for JSON serialisation."""
+        dates = self.dates()
+        values = {name: self._columns[name].tolist() for name in PRICE_FIELDS}
+        return [
+            {"date": d, **{name: values[name][i] for name in PRICE_FIELDS}}
+            for i, d in enumerate(dates)
+        ]
+
+    def copy(self) -> Candles:
+        """Private contiguous copy (detaches views of memory maps or larger series)."""
+        return Candles({name: np.array(arr) for name, arr in self._columns.items()})
+
+
+CandleSeries = Candles | Sequence[Mapping[str, Any]]
+
+
+def as_candles(candles: CandleSeries) -> Candles:
+    return candles if isinstance(candles, Candles) else Candles.from_dicts(candles)
+
+
+def column_values(candles: CandleSeries, name: str) -> list[Any]:
+    """One field of every bar as a list; a single array conversion for :class:`Candles`.
+
+    For plain dicts the values are returned as stored (``c[name]``).
+    """
+    if isinstance(candles, Candles):
+        return candles.column(name).tolist()
+    return [c[name] for c in candles]
+
+
+def float_values(candles: CandleSeries, name: str) -> list[float]:
+    """Like :func:`column_values` but coerces dict values with ``float(v or 0.0)``."""
+    if isinstance(candles, Candles):
+        return candles.column(name).tolist()
+    return [float(c.get(name) or 0.0) for c in candles]
+
+
+__all__ = [
+    "FIELDS",
+    "PRICE_FIELDS",
+    "Bar",
+    "CandleSeries",
+    "Candles",
+    "as_candles",
+    "column_values",
+    "float_values",
+]
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import os
+import time
+from types import TracebackType
+from typing import IO, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+    import msvcrt
+
+from .cache import ensure_dir
+
+
+class FileLock:
+    """Blocking advisory lock shared by every local process using ``path``.
+
+    Uses ``flock`` on POSIX and ``msvcrt.locking`` on Windows. Each
+    ``with`` block opens its own handle, so threads of one process contend
+    for the lock just like separate processes do.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._fh: Optional[IO[str]] = None
+
+    def __enter__(self) -> FileLock:
+        ensure_dir(os.path.dirname(self.path) or ".")
+        fh = open(self.path, "a+", encoding="utf-8")
+        try:
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            else:  # pragma: no cover - Windows
+                while True:
+                    try:
+                        fh.seek(0)
+                        msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        time.sleep(0.05)
+        except BaseException:
+            fh.close()
+            raise
+        self._fh = fh
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        fh = self._fh
+        self._fh = None
+        if fh is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+            else:  # pragma: no cover - Windows
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            fh.close()
+
+
+def lock_path(base_dir: str, key: str) -> str:
+    safe = key.replace("/", "_")
+    return os.path.join(base_dir, f"{safe}.lock")
+
+
+__all__ = ["FileLock", "lock_path"]
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from .holiday_cache import load_cached_holidays
+from .kr_calendar import load_kr_trading_calendar
+from .us_calendar import load_us_trading_calendar
+
+KR_ZONE = ZoneInfo("Asia/Seoul")
+US_ZONE = ZoneInfo("America/New_York")
+
+# Regular session hours in local market time.
+_SESSIONS: dict[str, tuple[ZoneInfo, dt.time, dt.time]] = {
+    "KR": (KR_ZONE, dt.time(9, 0), dt.time(15, 30)),
+    "US": (US_ZONE, dt.time(9, 30), dt.time(16, 0)),
+}
+
+
+def closed_dates(data_dir: str | None, market: str) -> set[str]:
+    """Return YYYYMMDD dates on which ``market`` is closed (weekends excluded).
+
+    Built-in/override calendars are merged with the KIS holiday cache; cache
+    entries flagged as open win over calendar seeds.
+    """
+    market = market.upper()
+    if market == "US":
+        closed = set(load_us_trading_calendar(data_dir))
+    else:
+        closed = set(load_kr_trading_calendar(data_dir))
+    if data_dir:
+        for date, entry in load_cached_holidays(data_dir, market).items():
+            if entry.is_open:
+                closed.discard(date)
+            else:
+                closed.add(date)
+    return closed
+
+
+class SessionCalendar:
+    """Trading-session arithmetic for one market."""
+
+    def __init__(self, market: str, closed: set[str]) -> None:
+        self.market = market.upper() if market.upper() in _SESSIONS else "KR"
+        self.zone, self.open_time, self.close_time = _SESSIONS[self.market]
+        self._closed = closed
+
+    def is_trading_day(self, day: dt.date) -> bool:
+        return day.weekday() < 5 and day.strftime("%Y%m%d") not in self._closed
+
+    def close_at(self, day: dt.date) -> dt.datetime:
+        return dt.datetime.combine(day, self.close_time, tzinfo=self.zone)
+
+    def in_session(self, now: dt.datetime) -> bool:
+        local = now.astimezone(self.zone)
+        if not self.is_trading_day(local.date()):
+            return False
+        return self.open_time <= local.time() < self.close_time
+
+    def latest_completed_session(self, now: dt.datetime) -> dt.date:
+        local = now.astimezone(self.zone)
+        day = local.date()
+        if not (self.is_trading_day(day) and local.time() >= self.close_time):
+            day -= dt.timedelta(days=1)
+        # Long closures (e.g. Chuseok + weekend) rarely exceed a week.
+        for _ in range(14):
+            if self.is_trading_day(day):
+                break
+            day -= dt.timedelta(days=1)
+        return day
+
+
+class FreshnessChecker:
+    """Decide whether a cached candle series can be used without a refetch.
+
+    A series is fresh when the market is not in session, its last bar is the
+    latest completed session, and the cache was written after that session
+    closed (so the last bar is final rather than an intraday snapshot).
+    """
+
+    def __init__(self, data_dir: str | None, *, now: dt.datetime | None = None) -> None:
+        self._data_dir = data_dir
+        now = now or dt.datetime.now(dt.UTC)
+        if now.tzinfo is None:
+            now = now.replace(tzinfo=dt.UTC)
+        self._now = now
+        self._calendars: dict[str, SessionCalendar] = {}
+
+    def calendar(self, market: str) -> SessionCalendar:
+        key = market.upper()
+        cal = self._calendars.get(key)
+        if cal is None:
+            cal = SessionCalendar(key, closed_dates(self._data_dir, key))
+            self._calendars[key] = cal
+        return cal
+
+    def is_fresh(
+        self,
+        candles: list[dict[str, Any]] | None,
+        market: str,
+        cached_at: dt.datetime | None,
+    ) -> bool:
+        if not candles or cached_at is None:
+            return False
+        cal = self.calendar(market)
+        if cal.in_session(self._now):
+            return False
+        last_date = str(candles[-1].get("date") or "")
+        session = cal.latest_completed_session(self._now)
+        if last_date != session.strftime("%Y%m%d"):
+            return False
+        if cached_at.tzinfo is None:
+            cached_at = cached_at.replace(tzinfo=dt.UTC)
+        return cached_at >= cal.close_at(session)
+
+
+__all__ = ["closed_dates", "SessionCalendar", "FreshnessChecker"]
@@ -106,6 +106,15 @@ def merge_holidays(
     return cached
 
 
+def holidays_refreshed_at(cache_dir: str, country_code: str) -> Optional[dt.datetime]:
+    """Return when the holiday cache for ``country_code`` was last written (UTC)."""
+    path = _cache_path(cache_dir, country_code)
+    try:
+        return dt.datetime.fromtimestamp(os.path.getmtime(path), tz=dt.UTC)
+    except OSError:
+        return None
+
+
 def lookup_holiday(
     cache_dir: str,
     country_code: str,
@@ -120,5 +129,6 @@ __all__ = [
     "load_cached_holidays",
     "save_holidays",
     "merge_holidays",
+    "holidays_refreshed_at",
     "lookup_holiday",
 ]
@@ -0,0 +1,182 @@
+"""Instrument identity and candle cache keys.
+
+Watchlists, holdings and screeners spell the same instrument in several
+ways (``005930`` / ``005930.KS``, ``AAPL.US`` / ``AAPL.NASD`` / ``aapl.nas``).
+:meth:`Instrument.parse` reduces every spelling to one identity (market,
+KIS exchange code, upper-cased symbol, adjusted flag) and
+:attr:`Instrument.cache_key` derives the candle store key from that identity
+only, so scan, sell, run, backtest and backfill all read and write the same
+series. :func:`merge_duplicate_keys` folds series cached under older
+spellings into their canonical key.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+
+from .candle_store import PRICE_COLUMNS, CandleStore
+from .candles import Candles
+
+logger = logging.getLogger(__name__)
+
+MARKET_KR = "KR"
+MARKET_US = "US"
+
+# Ticker suffixes (and exchange names) mapped to KIS overseas exchange codes.
+SUFFIX_TO_EXCD = {
+    "US": "NAS",
+    "NASDAQ": "NAS",
+    "NASD": "NAS",
+    "NAS": "NAS",
+    "NYSE": "NYS",
+    "NYS": "NYS",
+    "AMEX": "AMS",
+    "AMS": "AMS",
+}
+
+_KR_PREFIX = "candles_"
+_OVERSEAS_PREFIX = "candles_overseas_"
+_RAW_SUFFIX = "_raw"
+
+
+def normalize_suffix(suffix: str | None) -> str:
+    if not suffix:
+        return ""
+    return "".join(ch for ch in suffix.upper() if ch.isalnum())
+
+
+_EXCD_BY_SUFFIX = {normalize_suffix(k): v for k, v in SUFFIX_TO_EXCD.items()}
+US_SUFFIXES = set(_EXCD_BY_SUFFIX)
+
+
+def split_symbol(ticker: str) -> tuple[str, str | None]:
+    """``(SYMBOL, SUFFIX or None)``; only the last dot separates a suffix."""
+    if "." not in ticker:
+        return ticker.strip().upper(), None
+    base, suffix = ticker.rsplit(".", 1)
+    return base.strip().upper(), suffix.strip().upper()
+
+
+def exchange_code(suffix: str | None) -> str | None:
+    """KIS overseas exchange code for a ticker suffix, ``None`` for KR/unknown."""
+    if not suffix:
+        return None
+    return _EXCD_BY_SUFFIX.get(normalize_suffix(suffix))
+
+
+@dataclass(frozen=True)
+class Instrument:
+    symbol: str
+    exchange: str | None = None  # KIS overseas exchange code; None for KR listings
+    adjusted: bool = True
+
+    @classmethod
+    def parse(cls, ticker: str, *, adjusted: bool = True) -> Instrument:
+        """Identity of a watchlist/holdings/screener ticker.
+
+        A suffix that is not a US exchange (``.KS``, ``.KQ``) marks a KR
+        listing and is dropped.
+        """
+        base, suffix = split_symbol(ticker)
+        return cls(symbol=base, exchange=exchange_code(suffix), adjusted=adjusted)
+
+    @classmethod
+    def from_cache_key(cls, key: str) -> Instrument | None:
+        """Inverse of :attr:`cache_key`, also accepting legacy spellings."""
+        adjusted = True
+        if key.endswith(_RAW_SUFFIX):
+            key = key[: -len(_RAW_SUFFIX)]
+            adjusted = False
+        if key.startswith(_OVERSEAS_PREFIX):
+            exch, _, symbol = key[len(_OVERSEAS_PREFIX) :].partition("_")
+            code = exchange_code(exch)
+            if code and symbol:
+                return cls(symbol=symbol.strip().upper(), exchange=code, adjusted=adjusted)
+            return None
+        if key.startswith(_KR_PREFIX) and len(key) > len(_KR_PREFIX):
+            return cls.parse(key[len(_KR_PREFIX) :], adjusted=adjusted)
+        return None
+
+    @property
+    def market(self) -> str:
+        return MARKET_US if self.exchange else MARKET_KR
+
+    @property
+    def currency(self) -> str:
+        return "USD" if self.exchange else "KRW"
+
+    @property
+    def ticker(self) -> str:
+        """Canonical ticker spelling (``005930``, ``AAPL.NAS``)."""
+        return f"{self.symbol}.{self.exchange}" if self.exchange else self.symbol
+
+    @property
+    def cache_key(self) -> str:
+        if self.exchange:
+            key = f"{_OVERSEAS_PREFIX}{self.exchange}_{self.symbol}"
+        else:
+            key = f"{_KR_PREFIX}{self.symbol}"
+        return key if self.adjusted else f"{key}{_RAW_SUFFIX}"
+
+
+def _merge_series(series: list[tuple[float, Candles]]) -> Candles:
+    """Union of bars by date; on a shared date the most recently saved series wins."""
+    ordered = [candles for _, candles in sorted(series, key=lambda item: item[0])]
+    dates = np.concatenate([candles.date for candles in ordered])
+    # np.unique keeps the first hit, so search the reversed rows for the newest one
+    _, newest = np.unique(dates[::-1], return_index=True)
+    pick = len(dates) - 1 - newest
+    columns = {"date": dates[pick]}
+    for name in PRICE_COLUMNS:
+        columns[name] = np.concatenate([candles.column(name) for candles in ordered])[pick]
+    return Candles(columns)
+
+
+def merge_duplicate_keys(store: CandleStore, *, dry_run: bool = False) -> dict[str, list[str]]:
+    """Fold series stored under non-canonical keys into their canonical key.
+
+    Returns ``{canonical key: [merged keys]}``. Each merged key is deleted
+    once its bars are saved under the canonical key; the canonical series
+    keeps the newest modification time of the series it absorbed.
+    """
+    groups: dict[str, list[str]] = {}
+    for key in store.keys():
+        instrument = Instrument.from_cache_key(key)
+        if instrument is None or instrument.cache_key == key:
+            continue
+        groups.setdefault(instrument.cache_key, []).append(key)
+    if dry_run:
+        return groups
+
+    for canonical, legacy in groups.items():
+        series: list[tuple[float, Candles]] = []
+        for key in [canonical, *legacy]:
+            candles = store.load(key)
+            if candles:
+                saved = store.modified_at(key)
+                series.append((saved.timestamp() if saved else 0.0, candles))
+        if series:
+            store.save(canonical, _merge_series(series))
+            newest = max(stamp for stamp, _ in series)
+            if newest:
+                store.set_modified_at(canonical, newest)
+        for key in legacy:
+            store.delete(key)
+        logger.info("Merged %s into %s", ", ".join(legacy), canonical)
+    return groups
+
+
+__all__ = [
+    "MARKET_KR",
+    "MARKET_US",
+    "SUFFIX_TO_EXCD",
+    "US_SUFFIXES",
+    "Instrument",
+    "exchange_code",
+    "merge_duplicate_keys",
+    "normalize_suffix",
+    "split_symbol",
+]
@@ -0,0 +1,716 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import datetime as dt
+import importlib
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from types import ModuleType
+from typing import Any
+
+from .cache import save_json
+from .candles import Candles
+from .file_lock import FileLock
+from .kis_client import (
+    KISAuthError,
+    KISClient,
+    KISClientError,
+    KISCredentials,
+    _load_cached_token,
+    _parse_since,
+    _parse_token_response,
+    _rate_limited_body,
+    _token_lock_file,
+)
+from .rate_limit import SharedTokenBucket, TokenBucket, build_limiter
+
+logger = logging.getLogger(__name__)
+
+
+class KISAsyncNotInstalledError(KISClientError):
+    """Raised when httpx is not available for the asyncio client."""
+
+
+_RETRY_STATUS = {429, 418, 503}
+
+
+def _import_httpx() -> ModuleType:
+    try:
+        return importlib.import_module("httpx")
+    except ImportError as exc:  # pragma: no cover - runtime dependency
+        raise KISAsyncNotInstalledError(
+            "httpx is required for AsyncKISClient. Install the 'async' extra: "
+            "uv sync --extra async (or pip install 'swing-trading-report[async]')."
+        ) from exc
+
+
+@contextlib.asynccontextmanager
+async def _hold(lock: FileLock) -> AsyncIterator[None]:
+    """Hold a cross-process ``lock``, waiting for it on a worker thread."""
+    acquire = asyncio.ensure_future(asyncio.to_thread(lock.__enter__))
+    try:
+        await asyncio.shield(acquire)
+    except asyncio.CancelledError:
+        # the thread still takes the lock; hand it back once it has
+        acquire.add_done_callback(
+            lambda f: f.cancelled() or f.exception() or lock.__exit__(None, None, None)
+        )
+        raise
+    try:
+        yield
+    finally:
+        lock.__exit__(None, None, None)
+
+
+def _transport_errors() -> tuple[type[BaseException], ...]:
+    try:
+        httpx = importlib.import_module("httpx")
+    except ImportError:
+        return (OSError, TimeoutError)
+    return (httpx.TransportError, OSError, TimeoutError)
+
+
+class AsyncKISClient:
+    """asyncio counterpart of :class:`KISClient` for high fan-out runs.
+
+    A library entry point: no command or config key selects it; the CLI
+    fetches through the threaded :class:`KISClient` pool. Scripts that pull
+    1,000+ symbols can use :meth:`gather_candles` directly.
+
+    All coroutines share one pooled HTTP session and the same
+    :class:`TokenBucket` as the threaded client, so ``gather``-ing hundreds of
+    tickers pipelines chunk requests without exceeding ``min_interval``.
+    ``session`` may be any object with an awaitable
+    ``request(method, url, headers=, params=, json=, timeout=)`` returning an
+    httpx-like response; when omitted an ``httpx.AsyncClient`` is created.
+    """
+
+    def __init__(
+        self,
+        creds: KISCredentials,
+        *,
+        session: Any = None,
+        cache_dir: str | None = None,
+        max_attempts: int = 3,
+        min_interval: float | None = None,
+        limiter: TokenBucket | None = None,
+        adaptive_rate: bool = False,
+        shared_limiter: bool = False,
+        max_connections: int = 10,
+        retry_delay: float = 1.0,
+    ) -> None:
+        self.creds = creds
+        self._owns_session = session is None
+        if session is None:
+            httpx = _import_httpx()
+            session = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                ),
+            )
+        self.session = session
+        self._transport_errors = _transport_errors()
+        self._cache_dir = cache_dir
+        self._token_cache_key = f"kis_token_{creds.env}"
+        self._max_attempts = max(1, max_attempts)
+        self._min_interval = (
+            float(min_interval)
+            if min_interval is not None
+            else (0.5 if creds.env == "demo" else 0.1)
+        )
+        self._retry_delay = max(0.0, retry_delay)
+        self._limiter = limiter or build_limiter(
+            self._min_interval,
+            adaptive=adaptive_rate,
+            shared=shared_limiter,
+            data_dir=cache_dir,
+            env=creds.env,
+            app_key=creds.app_key,
+            background_persist=True,
+        )
+        self._token_lock = asyncio.Lock()
+        self.cache_status, self._access_token, self._token_expiry = _load_cached_token(
+            cache_dir, self._token_cache_key
+        )
+
+    async def __aenter__(self) -> AsyncKISClient:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._owns_session:
+            await self.session.aclose()
+
+    # ------------------------------------------------------------------
+    # Transport
+    # ------------------------------------------------------------------
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: dict[str, Any] | None = None,
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | None = None,
+        timeout: float = 10.0,
+    ) -> Any:
+        backoff = 1.0
+        last_exc: BaseException | None = None
+        resp: Any = None
+
+        for attempt in range(self._max_attempts):
+            if isinstance(self._limiter, SharedTokenBucket):
+                # the shared budget lives in a locked file other processes hold too
+                wait = await asyncio.to_thread(self._limiter.reserve)
+            else:
+                wait = self._limiter.reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                resp = await self.session.request(
+                    method,
+                    url,
+                    headers=headers,
+                    params=params,
+                    json=json,
+                    timeout=timeout,
+                )
+            except self._transport_errors as exc:
+                last_exc = exc
+            else:
+                if resp.status_code in _RETRY_STATUS:
+                    self._limiter.on_throttle()
+                    if attempt < self._max_attempts - 1:
+                        await asyncio.sleep(backoff * self._retry_delay)
+                        backoff = min(backoff * 2, 8.0)
+                        continue
+                elif not _rate_limited_body(resp):
+                    # a body-level EGW00201 is throttled by the caller, never a success
+                    self._limiter.on_success()
+                return resp
+
+            if attempt < self._max_attempts - 1:
+                await asyncio.sleep(backoff * self._retry_delay)
+                backoff = min(backoff * 2, 8.0)
+
+        if last_exc is not None:
+            raise KISClientError(f"Request to {url} failed: {last_exc}") from last_exc
+        return resp
+
+    # ------------------------------------------------------------------
+    # Auth
+    # ------------------------------------------------------------------
+    def _token_valid(self) -> bool:
+        if self._access_token and self._token_expiry:
+            return dt.datetime.now(dt.UTC) < self._token_expiry
+        return False
+
+    async def ensure_token(self) -> None:
+        if self._token_valid():
+            return
+        async with self._token_lock:
+            # another coroutine may have refreshed while we waited
+            if self._token_valid():
+                return
+            await self._issue_token()
+
+    async def _refresh_expired_token(self, stale: str | None) -> None:
+        """Handle EGW00123: only the first coroutine holding ``stale`` reissues."""
+        async with self._token_lock:
+            if stale is not None and self._access_token != stale and self._token_valid():
+                return
+            self._access_token = None
+            self._token_expiry = None
+            await self._issue_token(reject=stale)
+
+    async def _issue_token(self, *, reject: str | None = None) -> None:
+        file_lock = _token_lock_file(self._cache_dir, self._token_cache_key)
+        if file_lock is None:
+            await self._request_token()
+            return
+        # Held across the token request so other processes wait for it; the
+        # asyncio lock already keeps other coroutines of this process out.
+        # Waiting happens on a worker thread so the event loop keeps running.
+        async with _hold(file_lock):
+            status, token, refresh_dt = _load_cached_token(
+                self._cache_dir, self._token_cache_key, reject=reject
+            )
+            if token and refresh_dt:
+                self._access_token = token
+                self._token_expiry = refresh_dt
+                self.cache_status = status
+                return
+            await self._request_token()
+
+    async def _request_token(self) -> None:
+        payload = {
+            "grant_type": "client_credentials",
+            "appkey": self.creds.app_key,
+            "appsecret": self.creds.app_secret,
+        }
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "charset": "UTF-8",
+        }
+
+        try:
+            resp = await self._request("POST", self.creds.token_url, headers=headers, json=payload)
+        except KISClientError as exc:
+            raise KISAuthError(f"Token request failed: {exc}") from exc
+
+        if resp.status_code != 200:
+            raise KISAuthError(f"Token request HTTP {resp.status_code}: {resp.text}")
+
+        try:
+            data = resp.json()
+        except ValueError as exc:
+            raise KISAuthError("Token response is not JSON") from exc
+
+        token, token_type, expiry_dt, refresh_dt = _parse_token_response(data)
+        self._access_token = f"{token_type} {token}".strip()
+        self._token_expiry = refresh_dt
+
+        if self._cache_dir:
+            save_json(
+                self._cache_dir,
+                self._token_cache_key,
+                {
+                    "token": token,
+                    "token_type": token_type,
+                    "expires_at": expiry_dt.isoformat(),
+                },
+            )
+            self.cache_status = "refresh"
+        else:
+            self.cache_status = "n/a"
+
+    def _headers(self, tr_id: str, tr_cont: str = "") -> dict[str, Any]:
+        headers = {
+            "Content-Type": "application/json",
+            "authorization": self._access_token or "",
+            "appkey": self.creds.app_key,
+            "appsecret": self.creds.app_secret,
+            "tr_id": tr_id,
+            "custtype": "P",
+        }
+        if tr_cont:
+            headers["tr_cont"] = tr_cont
+        return headers
+
+    async def _call(
+        self,
+        label: str,
+        url: str,
+        *,
+        tr_id: str,
+        params: dict[str, Any],
+        tr_cont: str = "",
+    ) -> tuple[dict[str, Any], Any]:
+        """GET a KIS endpoint with the sync client's retry rules.
+
+        Returns ``(payload, response_headers)``. HTTP/JSON failures are retried
+        with a fixed delay, ``EGW00201`` waits out the rate limit and
+        ``EGW00123`` triggers a single-flight token refresh.
+        """
+        await self.ensure_token()
+        last = self._max_attempts - 1
+
+        for attempt in range(self._max_attempts):
+            headers = self._headers(tr_id, tr_cont)
+            resp = await self._request("GET", url, headers=headers, params=params)
+
+            data: dict[str, Any] | None = None
+            try:
+                parsed = resp.json()
+            except ValueError:
+                parsed = None
+            if isinstance(parsed, dict):
+                data = parsed
+
+            msg_cd = str((data or {}).get("msg_cd") or "")
+            if msg_cd == "EGW00123" and attempt < last:
+                await self._refresh_expired_token(headers["authorization"])
+                await asyncio.sleep(max(1.0, self._min_interval) * self._retry_delay)
+                continue
+
+            if resp.status_code != 200:
+                if attempt < last:
+                    await asyncio.sleep(self._retry_delay)
+                    continue
+                raise KISClientError(f"{label} HTTP {resp.status_code}: {resp.text}")
+
+            if data is None:
+                if attempt < last:
+                    await asyncio.sleep(self._retry_delay)
+                    continue
+                raise KISClientError(f"{label} response is not JSON")
+
+            if str(data.get("rt_cd")) != "0":
+                if msg_cd == "EGW00201" and attempt < last:
+                    self._limiter.on_throttle()
+                    await asyncio.sleep(max(1.0, self._min_interval) * self._retry_delay)
+                    continue
+                msg1 = data.get("msg1") or msg_cd or "Unknown error"
+                raise KISClientError(f"KIS {label} error: {msg1}")
+
+            return data, resp.headers
+
+        raise KISClientError(f"{label} request failed after retries")
+
+    # ------------------------------------------------------------------
+    # Candles
+    # ------------------------------------------------------------------
+    async def _collect_candles(
+        self,
+        fetch_chunk: Callable[[str, str], Awaitable[list[dict[str, Any]]]],
+        parse: Callable[[dict[str, Any] | None], dict[str, Any] | None],
+        *,
+        count: int,
+        since: str | None,
+    ) -> Candles:
+        target = max(count, 1)
+        chunk_days = 240
+        collected: dict[str, dict[str, Any]] = {}
+
+        now = dt.datetime.now()
+        chunk_end = now
+        earliest_allowed = now - dt.timedelta(days=365 * 10)
+        since_dt = _parse_since(since)
+        if since_dt is not None and since_dt > earliest_allowed:
+            earliest_allowed = since_dt
+        empty_streak = 0
+
+        while chunk_end >= earliest_allowed:
+            if since_dt is None and len(collected) >= target:
+                break
+            start_dt = chunk_end - dt.timedelta(days=chunk_days)
+            if start_dt < earliest_allowed:
+                start_dt = earliest_allowed
+
+            items = await fetch_chunk(start_dt.strftime("%Y%m%d"), chunk_end.strftime("%Y%m%d"))
+
+            parsed_dates: list[str] = []
+            for item in items:
+                parsed = parse(item)
+                if parsed and parsed.get("date"):
+                    collected[parsed["date"]] = parsed
+                    parsed_dates.append(parsed["date"])
+
+            if not parsed_dates:
+                empty_streak += 1
+                if empty_streak >= self._max_attempts:
+                    break
+                chunk_end = start_dt - dt.timedelta(days=1)
+                continue
+
+            empty_streak = 0
+            oldest_dt = min(dt.datetime.strptime(d, "%Y%m%d") for d in parsed_dates)
+            chunk_end = oldest_dt - dt.timedelta(days=1)
+
+        candles = sorted(collected.values(), key=lambda x: x["date"])
+        if since_dt is None and len(candles) > target:
+            candles = candles[-target:]
+        return Candles.from_dicts(candles)
+
+    async def daily_candles(
+        self,
+        ticker: str,
+        *,
+        count: int = 120,
+        adjusted: bool = True,
+        since: str | None = None,
+    ) -> Candles:
+        """See :meth:`KISClient.daily_candles`."""
+        ticker = ticker.strip()
+        if not ticker:
+            raise KISClientError("Ticker is required")
+
+        async def fetch_chunk(start: str, end: str) -> list[dict[str, Any]]:
+            params = {
+                "FID_COND_MRKT_DIV_CODE": "J",
+                "FID_INPUT_ISCD": ticker,
+                "FID_INPUT_DATE_1": start,
+                "FID_INPUT_DATE_2": end,
+                "FID_PERIOD_DIV_CODE": "D",
+                "FID_ORG_ADJ_PRC": "0" if adjusted else "1",
+            }
+            data, _ = await self._call(
+                "daily candle", self.creds.candle_url, tr_id=self.creds.tr_id, params=params
+            )
+            return data.get("output2") or []
+
+        return await self._collect_candles(
+            fetch_chunk, KISClient._parse_candle, count=count, since=since
+        )
+
+    async def overseas_daily_candles(
+        self,
+        *,
+        symbol: str,
+        exchange: str = "NASD",
+        count: int = 120,
+        adjusted: bool = True,
+        since: str | None = None,
+    ) -> Candles:
+        """See :meth:`KISClient.overseas_daily_candles`."""
+        symbol = symbol.strip().upper()
+        exchange = exchange.strip().upper()
+        if not symbol or not exchange:
+            raise KISClientError("Overseas symbol and exchange are required")
+
+        async def fetch_chunk(start: str, end: str) -> list[dict[str, Any]]:
+            params = {
+                "EXCD": exchange,
+                "SYMB": symbol,
+                "GUBN": "0",
+                "BYMD": end,
+                "MODP": "1" if adjusted else "0",
+            }
+            data, _ = await self._call(
+                "overseas daily",
+                self.creds.overseas_candle_url,
+                tr_id=self.creds.overseas_tr_id,
+                params=params,
+            )
+            return data.get("output2") or data.get("output") or []
+
+        return await self._collect_candles(
+            fetch_chunk, KISClient._parse_overseas_candle, count=count, since=since
+        )
+
+    async def gather_candles(
+        self,
+        instruments: Iterable[tuple[str, str | None]],
+        *,
+        count: int = 120,
+        concurrency: int = 32,
+    ) -> list[Candles | KISClientError]:
+        """Fetch ``(symbol, exchange)`` pairs concurrently, preserving order.
+
+        ``exchange`` of ``None`` selects the domestic endpoint. Per-instrument
+        KIS errors are returned in place of the candle list.
+        """
+        gate = asyncio.Semaphore(max(1, concurrency))
+
+        async def one(symbol: str, exchange: str | None) -> Candles | KISClientError:
+            async with gate:
+                try:
+                    if exchange:
+                        return await self.overseas_daily_candles(
+                            symbol=symbol, exchange=exchange, count=count
+                        )
+                    return await self.daily_candles(symbol, count=count)
+                except KISClientError as exc:
+                    return exc
+
+        return list(await asyncio.gather(*(one(sym, exch) for sym, exch in instruments)))
+
+    # ------------------------------------------------------------------
+    # Quotes / holidays
+    # ------------------------------------------------------------------
+    async def overseas_price_detail(self, *, symbol: str, exchange: str) -> dict[str, Any]:
+        symbol = (symbol or "").strip().upper()
+        exchange = (exchange or "").strip().upper()
+        if not symbol or not exchange:
+            raise KISClientError("Symbol and exchange are required for price detail")
+
+        params = {"AUTH": "", "EXCD": exchange, "SYMB": symbol}
+        data, _ = await self._call(
+            "overseas price detail",
+            self.creds.overseas_price_detail_url,
+            tr_id="HHDFS76200200",
+            params=params,
+        )
+        output = data.get("output")
+        if isinstance(output, list):
+            return output[0] if output else {}
+        if isinstance(output, dict):
+            return output
+        return {}
+
+    async def overseas_holidays(
+        self,
+        *,
+        country_code: str = "US",
+        start_date: str,
+        end_date: str,
+    ) -> list[dict[str, Any]]:
+        """See :meth:`KISClient.overseas_holidays` (``end_date`` is unused)."""
+        params = {"TRAD_DT": start_date, "CTX_AREA_NK": "", "CTX_AREA_FK": ""}
+        data, _ = await self._call(
+            "overseas holiday",
+            self.creds.overseas_holiday_url,
+            tr_id="CTOS5011R",
+            params=params,
+        )
+        items = data.get("output") or []
+        if not isinstance(items, list):
+            items = [items]
+        return items
+
+    # ------------------------------------------------------------------
+    # Screener helpers
+    # ------------------------------------------------------------------
+    async def volume_rank(
+        self,
+        *,
+        limit: int = 100,
+        market: str = "J",
+        division_code: str = "0",
+        belonging_code: str = "3",
+        min_price: float | None = None,
+        max_price: float | None = None,
+        min_volume: float | None = None,
+    ) -> list[dict[str, Any]]:
+        if limit <= 0:
+            return []
+
+        def _fmt(val: float | None) -> str:
+            if val is None or val <= 0:
+                return "0"
+            return str(int(val))
+
+        params = {
+            "FID_COND_MRKT_DIV_CODE": market,
+            "FID_COND_SCR_DIV_CODE": "20171",
+            "FID_INPUT_ISCD": "0000",
+            "FID_DIV_CLS_CODE": division_code,
+            "FID_BLNG_CLS_CODE": belonging_code,
+            "FID_TRGT_CLS_CODE": "000000000",
+            "FID_TRGT_EXLS_CLS_CODE": "0000000000",
+            "FID_INPUT_PRICE_1": _fmt(min_price),
+            "FID_INPUT_PRICE_2": _fmt(max_price),
+            "FID_VOL_CNT": _fmt(min_volume),
+            "FID_INPUT_DATE_1": "0",
+        }
+
+        results: list[dict[str, Any]] = []
+        tr_cont = ""
+        while len(results) < limit:
+            data, resp_headers = await self._call(
+                "volume rank",
+                self.creds.volume_rank_url,
+                tr_id=self.creds.volume_rank_tr_id,
+                params=params,
+                tr_cont=tr_cont,
+            )
+            items = data.get("output") or []
+            parsed = [KISClient._parse_rank_item(it) for it in items]
+            results.extend(p for p in parsed if p)
+
+            tr_cont = (resp_headers.get("tr_cont") or "").strip()
+            if tr_cont != "M":
+                break
+            tr_cont = "N"
+
+        return results[:limit]
+
+    async def _fetch_overseas_rank_items(
+        self,
+        *,
+        url: str,
+        tr_id: str,
+        params: dict[str, Any],
+        limit: int,
+    ) -> list[dict[str, Any]]:
+        if limit <= 0:
+            return []
+
+        request_params = {k: ("" if v is None else v) for k, v in params.items()}
+        request_params.setdefault("AUTH", "")
+        request_params.setdefault("KEYB", "")
+
+        results: list[dict[str, Any]] = []
+        tr_cont = ""
+        while len(results) < limit:
+            data, resp_headers = await self._call(
+                "overseas rank", url, tr_id=tr_id, params=request_params, tr_cont=tr_cont
+            )
+            items = data.get("output2") or data.get("output") or []
+            if isinstance(items, dict):
+                items = [items]
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                results.append(item)
+                if len(results) >= limit:
+                    break
+            if len(results) >= limit:
+                break
+
+            tr_cont = (resp_headers.get("tr_cont") or "").strip()
+            request_params["KEYB"] = (
+                data.get("keyb")
+                or data.get("KEYB")
+                or (data.get("output1") or {}).get("keyb")
+                or ""
+            )
+            if tr_cont not in {"M", "F"}:
+                break
+
+        return results[:limit]
+
+    async def overseas_trade_volume_rank(
+        self,
+        *,
+        exchange: str,
+        limit: int,
+        nday: str = "0",
+        volume_filter: str = "0",
+    ) -> list[dict[str, Any]]:
+        return await self._fetch_overseas_rank_items(
+            url=self.creds.overseas_volume_rank_url(),
+            tr_id="HHDFS76310010",
+            params={"EXCD": exchange, "NDAY": nday, "VOL_RANG": volume_filter},
+            limit=limit,
+        )
+
+    async def overseas_trade_value_rank(
+        self,
+        *,
+        exchange: str,
+        limit: int,
+        nday: str = "0",
+        volume_filter: str = "0",
+        price_min: float | None = None,
+        price_max: float | None = None,
+    ) -> list[dict[str, Any]]:
+        def _price(val: float | None) -> str:
+            if val is None or val <= 0:
+                return ""
+            return str(int(val))
+
+        return await self._fetch_overseas_rank_items(
+            url=self.creds.overseas_trade_value_rank_url(),
+            tr_id="HHDFS76320010",
+            params={
+                "EXCD": exchange,
+                "NDAY": nday,
+                "VOL_RANG": volume_filter,
+                "PRC1": _price(price_min),
+                "PRC2": _price(price_max),
+            },
+            limit=limit,
+        )
+
+    async def overseas_market_cap_rank(
+        self,
+        *,
+        exchange: str,
+        limit: int,
+        volume_filter: str = "0",
+    ) -> list[dict[str, Any]]:
+        return await self._fetch_overseas_rank_items(
+            url=self.creds.overseas_market_cap_rank_url(),
+            tr_id="HHDFS76350100",
+            params={"EXCD": exchange, "VOL_RANG": volume_filter},
+            limit=limit,
+        )
+
+
+__all__ = ["AsyncKISClient", "KISAsyncNotInstalledError"]
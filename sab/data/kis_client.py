@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import datetime as dt
+import threading
 import time
 from dataclasses import dataclass
 from typing import Any, Optional
@@ -9,6 +10,9 @@ import logging
 import requests
 
 from .cache import load_json, save_json
+from .candles import Candles
+from .file_lock import FileLock, lock_path
+from .rate_limit import TokenBucket, build_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -83,6 +87,117 @@ class KISCredentials:
         return f"{self.base_url.rstrip('/')}/uapi/overseas-stock/v1/ranking/market-cap"
 
 
+def _parse_since(since: str | None) -> Optional[dt.datetime]:
+    if not since:
+        return None
+    try:
+        return dt.datetime.strptime(str(since), "%Y%m%d")
+    except ValueError as exc:
+        raise KISClientError(f"Invalid since date: {since}") from exc
+
+
+def _rate_limited_body(resp: Any) -> bool:
+    """True when a 200 response carries KIS's ``EGW00201`` (rate exceeded) body."""
+    if "EGW00201" not in (resp.text or ""):
+        return False
+    try:
+        data = resp.json()
+    except ValueError:
+        return False
+    return isinstance(data, dict) and data.get("msg_cd") == "EGW00201"
+
+
+def _load_cached_token(
+    cache_dir: Optional[str], cache_key: str, *, reject: Optional[str] = None
+) -> tuple[str, Optional[str], Optional[dt.datetime]]:
+    """Return ``(cache_status, authorization, refresh_at)`` from the token cache.
+
+    ``reject`` is an authorization value known to be revoked (EGW00123); a
+    cache still holding it is reported as ``"expired"``.
+    """
+    if not cache_dir:
+        return "disabled", None, None
+
+    cached = load_json(cache_dir, cache_key)
+    if not cached:
+        return "miss", None, None
+
+    token = cached.get("token")
+    token_type = cached.get("token_type", "Bearer")
+    expires_at = cached.get("expires_at")
+
+    if not token or not expires_at:
+        return "miss", None, None
+
+    try:
+        expiry_dt = dt.datetime.fromisoformat(expires_at)
+    except ValueError:
+        return "miss", None, None
+
+    if expiry_dt.tzinfo is None:
+        expiry_dt = expiry_dt.replace(tzinfo=dt.timezone.utc)
+
+    refresh_dt = expiry_dt - dt.timedelta(minutes=5)
+    if refresh_dt <= dt.datetime.now(dt.timezone.utc):
+        return "expired", None, None
+
+    authorization = f"{token_type} {token}".strip()
+    if reject is not None and authorization == reject:
+        return "expired", None, None
+    return "hit", authorization, refresh_dt
+
+
+def _token_lock_file(cache_dir: Optional[str], cache_key: str) -> Optional[FileLock]:
+    """Cross-process lock guarding issuance of the token cached at ``cache_key``."""
+    if not cache_dir:
+        return None
+    return FileLock(lock_path(cache_dir, cache_key))
+
+
+def _parse_token_response(data: dict[str, Any]) -> tuple[str, str, dt.datetime, dt.datetime]:
+    """Return ``(token, token_type, expires_at, refresh_at)`` from a tokenP payload."""
+    token = data.get("access_token") or data.get("ACCESS_TOKEN")
+    token_type = data.get("token_type") or data.get("TOKEN_TYPE") or "Bearer"
+    expires_in = data.get("expires_in") or data.get("EXPIRES_IN")
+    expires_at_str = (
+        data.get("access_token_token_expired")
+        or data.get("access_token_expired")
+        or data.get("expires_at")
+    )
+
+    if not token:
+        raise KISAuthError(f"Token missing in response: {data}")
+
+    try:
+        expires_seconds = int(expires_in) if expires_in is not None else 3600
+    except (TypeError, ValueError):
+        expires_seconds = 3600
+
+    expiry_dt: Optional[dt.datetime] = None
+    if expires_at_str:
+        try:
+            expiry_dt = dt.datetime.strptime(expires_at_str, "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            try:
+                expiry_dt = dt.datetime.fromisoformat(expires_at_str)
+            except ValueError:
+                expiry_dt = None
+
+    if expiry_dt is None:
+        expiry_dt = dt.datetime.now(dt.timezone.utc) + dt.timedelta(seconds=expires_seconds)
+    elif expiry_dt.tzinfo is None:
+        expiry_dt = expiry_dt.replace(tzinfo=dt.timezone.utc)
+
+    # refresh a little earlier than actual expiry
+    refresh_dt = expiry_dt - dt.timedelta(minutes=5)
+    if refresh_dt <= dt.datetime.now(dt.timezone.utc):
+        refresh_dt = dt.datetime.now(dt.timezone.utc) + dt.timedelta(
+            seconds=int(expires_seconds * 0.9)
+        )
+
+    return token, token_type, expiry_dt, refresh_dt
+
+
 class KISClient:
     """Lightweight HTTP client for KIS Developers REST endpoints."""
 
@@ -94,6 +209,9 @@ class KISClient:
         cache_dir: Optional[str] = None,
         max_attempts: int = 3,
         min_interval: Optional[float] = None,
+        limiter: Optional[TokenBucket] = None,
+        adaptive_rate: bool = False,
+        shared_limiter: bool = False,
     ):
         self.creds = creds
         self.session = session or requests.Session()
@@ -109,46 +227,26 @@ class KISClient:
             if min_interval is not None
             else (0.5 if creds.env == "demo" else 0.1)
         )
-        self._last_request_at: Optional[dt.datetime] = None
+        # shared across worker threads; one token per HTTP request
+        self._limiter = limiter or build_limiter(
+            self._min_interval,
+            adaptive=adaptive_rate,
+            shared=shared_limiter,
+            data_dir=cache_dir,
+            env=creds.env,
+            app_key=creds.app_key,
+        )
+        self._token_lock = threading.RLock()
 
         self._try_load_cached_token()
 
     # ------------------------------------------------------------------
     def _try_load_cached_token(self) -> None:
-        if not self._cache_dir:
-            self.cache_status = "disabled"
-            return
-
-        cached = load_json(self._cache_dir, self._token_cache_key)
-        if not cached:
-            self.cache_status = "miss"
-            return
-
-        token = cached.get("token")
-        token_type = cached.get("token_type", "Bearer")
-        expires_at = cached.get("expires_at")
-
-        if not token or not expires_at:
-            self.cache_status = "miss"
-            return
-
-        try:
-            expiry_dt = dt.datetime.fromisoformat(expires_at)
-        except ValueError:
-            self.cache_status = "miss"
-            return
-
-        if expiry_dt.tzinfo is None:
-            expiry_dt = expiry_dt.replace(tzinfo=dt.timezone.utc)
-
-        refresh_dt = expiry_dt - dt.timedelta(minutes=5)
-        if refresh_dt <= dt.datetime.now(dt.timezone.utc):
-            self.cache_status = "expired"
-            return
-
-        self._access_token = f"{token_type} {token}".strip()
-        self._token_expiry = refresh_dt
-        self.cache_status = "hit"
+        status, token, refresh_dt = _load_cached_token(self._cache_dir, self._token_cache_key)
+        self.cache_status = status
+        if token and refresh_dt:
+            self._access_token = token
+            self._token_expiry = refresh_dt
 
     # ------------------------------------------------------------------
     # Auth
@@ -168,11 +266,7 @@ class KISClient:
         resp: Optional[requests.Response] = None
 
         for attempt in range(self._max_attempts):
-            # simple client-side throttle
-            if self._min_interval and self._last_request_at is not None:
-                delta = (dt.datetime.now(dt.timezone.utc) - self._last_request_at).total_seconds()
-                if delta < self._min_interval:
-                    time.sleep(self._min_interval - delta)
+            self._limiter.acquire()
             try:
                 resp = self.session.request(
                     method,
@@ -182,14 +276,18 @@ class KISClient:
                     json=json,
                     timeout=timeout,
                 )
-                self._last_request_at = dt.datetime.now(dt.timezone.utc)
             except requests.RequestException as exc:
                 last_exc = exc
             else:
-                if resp.status_code in {429, 418, 503} and attempt < self._max_attempts - 1:
-                    time.sleep(backoff)
-                    backoff = min(backoff * 2, 8.0)
-                    continue
+                if resp.status_code in {429, 418, 503}:
+                    self._limiter.on_throttle()
+                    if attempt < self._max_attempts - 1:
+                        time.sleep(backoff)
+                        backoff = min(backoff * 2, 8.0)
+                        continue
+                elif not _rate_limited_body(resp):
+                    # a body-level EGW00201 is throttled by the caller, never a success
+                    self._limiter.on_success()
                 return resp
 
             if attempt < self._max_attempts - 1:
@@ -202,10 +300,46 @@ class KISClient:
         return resp
 
     def ensure_token(self) -> None:
+        if self._token_valid():
+            return
+        with self._token_lock:
+            # another worker may have refreshed while we waited for the lock
+            if self._token_valid():
+                return
+            self._issue_token()
+
+    def _token_valid(self) -> bool:
         if self._access_token and self._token_expiry:
-            if dt.datetime.now(dt.timezone.utc) < self._token_expiry:
+            return dt.datetime.now(dt.timezone.utc) < self._token_expiry
+        return False
+
+    def _refresh_expired_token(self, stale: Optional[str]) -> None:
+        """Handle EGW00123: refresh once even if several workers see the error."""
+        with self._token_lock:
+            if stale is not None and self._access_token != stale and self._token_valid():
                 return
+            self._access_token = None
+            self._token_expiry = None
+            self._issue_token(reject=stale)
+
+    def _issue_token(self, *, reject: Optional[str] = None) -> None:
+        file_lock = _token_lock_file(self._cache_dir, self._token_cache_key)
+        if file_lock is None:
+            self._request_token()
+            return
+        with file_lock:
+            # another process may have issued a token while we waited
+            status, token, refresh_dt = _load_cached_token(
+                self._cache_dir, self._token_cache_key, reject=reject
+            )
+            if token and refresh_dt:
+                self._access_token = token
+                self._token_expiry = refresh_dt
+                self.cache_status = status
+                return
+            self._request_token()
 
+    def _request_token(self) -> None:
         payload = {
             "grant_type": "client_credentials",
             "appkey": self.creds.app_key,
@@ -230,45 +364,7 @@ class KISClient:
         except ValueError as exc:
             raise KISAuthError("Token response is not JSON") from exc
 
-        token = data.get("access_token") or data.get("ACCESS_TOKEN")
-        token_type = data.get("token_type") or data.get("TOKEN_TYPE") or "Bearer"
-        expires_in = data.get("expires_in") or data.get("EXPIRES_IN")
-        expires_at_str = (
-            data.get("access_token_token_expired")
-            or data.get("access_token_expired")
-            or data.get("expires_at")
-        )
-
-        if not token:
-            raise KISAuthError(f"Token missing in response: {data}")
-
-        try:
-            expires_seconds = int(expires_in) if expires_in is not None else 3600
-        except (TypeError, ValueError):
-            expires_seconds = 3600
-
-        expiry_dt: Optional[dt.datetime] = None
-        if expires_at_str:
-            try:
-                expiry_dt = dt.datetime.strptime(expires_at_str, "%Y-%m-%d %H:%M:%S")
-            except ValueError:
-                try:
-                    expiry_dt = dt.datetime.fromisoformat(expires_at_str)
-                except ValueError:
-                    expiry_dt = None
-
-        if expiry_dt is None:
-            expiry_dt = dt.datetime.now(dt.timezone.utc) + dt.timedelta(seconds=expires_seconds)
-        elif expiry_dt.tzinfo is None:
-            expiry_dt = expiry_dt.replace(tzinfo=dt.timezone.utc)
-
-        # refresh a little earlier than actual expiry
-        refresh_dt = expiry_dt - dt.timedelta(minutes=5)
-        if refresh_dt <= dt.datetime.now(dt.timezone.utc):
-            refresh_dt = dt.datetime.now(dt.timezone.utc) + dt.timedelta(
-                seconds=int(expires_seconds * 0.9)
-            )
-
+        token, token_type, expiry_dt, refresh_dt = _parse_token_response(data)
         self._access_token = f"{token_type} {token}".strip()
         self._token_expiry = refresh_dt
 
@@ -290,8 +386,18 @@ class KISClient:
     # Data fetch
     # ------------------------------------------------------------------
     def daily_candles(
-        self, ticker: str, *, count: int = 120, adjusted: bool = True
-    ) -> list[dict[str, Any]]:
+        self,
+        ticker: str,
+        *,
+        count: int = 120,
+        adjusted: bool = True,
+        since: str | None = None,
+    ) -> Candles:
+        """Fetch daily candles, oldest first.
+
+        With ``since`` (YYYYMMDD) only the tail starting at that date is
+        collected and ``count`` no longer bounds the result.
+        """
         ticker = ticker.strip()
         if not ticker:
             raise KISClientError("Ticker is required")
@@ -305,9 +411,14 @@ class KISClient:
         now = dt.datetime.now()
         chunk_end = now
         earliest_allowed = now - dt.timedelta(days=365 * 10)  # safety limit (~10y)
+        since_dt = _parse_since(since)
+        if since_dt is not None and since_dt > earliest_allowed:
+            earliest_allowed = since_dt
         empty_streak = 0
 
-        while len(collected) < target and chunk_end > earliest_allowed:
+        while chunk_end >= earliest_allowed:
+            if since_dt is None and len(collected) >= target:
+                break
             start_dt = chunk_end - dt.timedelta(days=chunk_days)
             if start_dt < earliest_allowed:
                 start_dt = earliest_allowed
@@ -341,10 +452,50 @@ class KISClient:
             chunk_end = oldest_dt - dt.timedelta(days=1)
 
         parsed = sorted(collected.values(), key=lambda x: x["date"])
-        if len(parsed) > target:
+        if since_dt is None and len(parsed) > target:
             parsed = parsed[-target:]
 
-        return parsed
+        return Candles.from_dicts(parsed)
+
+    def candle_chunk(
+        self,
+        symbol: str,
+        *,
+        start_date: str,
+        end_date: str,
+        exchange: str | None = None,
+        adjusted: bool = True,
+    ) -> Candles:
+        """One request's worth of daily bars ending at ``end_date``, oldest first.
+
+        Domestic requests cover ``start_date``..``end_date``; the overseas
+        endpoint ignores the start and returns up to ~100 bars ending at
+        ``end_date``. Used to walk history backwards one request at a time.
+        """
+        self.ensure_token()
+        if exchange:
+            items = self._fetch_overseas_candle_chunk(
+                symbol=symbol.strip().upper(),
+                exchange=exchange.strip().upper(),
+                start_date=start_date,
+                end_date=end_date,
+                adjusted=adjusted,
+            )
+            parse = self._parse_overseas_candle
+        else:
+            items = self._fetch_candle_chunk(
+                ticker=symbol.strip(),
+                start_date=start_date,
+                end_date=end_date,
+                adjusted=adjusted,
+            )
+            parse = self._parse_candle
+        rows: dict[str, dict[str, Any]] = {}
+        for item in items:
+            parsed = parse(item)
+            if parsed and parsed.get("date"):
+                rows[parsed["date"]] = parsed
+        return Candles.from_dicts(rows[d] for d in sorted(rows))
 
     def overseas_price_detail(self, *, symbol: str, exchange: str) -> dict[str, Any]:
         symbol = (symbol or "").strip().upper()
@@ -390,9 +541,7 @@ class KISClient:
                 ) else "Unknown error"
                 if msg_cd == "EGW00123" and attempt < self._max_attempts - 1:
                     # Token expired on server side: clear, refresh, and retry
-                    self._access_token = None
-                    self._token_expiry = None
-                    self.ensure_token()
+                    self._refresh_expired_token(headers.get("authorization"))
                     headers["authorization"] = self._access_token or ""
                     time.sleep(max(1.0, self._min_interval))
                     continue
@@ -413,12 +562,11 @@ class KISClient:
                 msg_cd = data.get("msg_cd") or ""
                 msg1 = data.get("msg1") or "Unknown error"
                 if msg_cd == "EGW00201" and attempt < self._max_attempts - 1:
+                    self._limiter.on_throttle()
                     time.sleep(max(1.0, self._min_interval))
                     continue
                 if msg_cd == "EGW00123" and attempt < self._max_attempts - 1:
-                    self._access_token = None
-                    self._token_expiry = None
-                    self.ensure_token()
+                    self._refresh_expired_token(headers.get("authorization"))
                     headers["authorization"] = self._access_token or ""
                     time.sleep(max(1.0, self._min_interval))
                     continue
@@ -488,9 +636,7 @@ class KISClient:
                 msg1 = parsed.get("msg1") or "Unknown error"
                 if msg_cd == "EGW00123" and attempt < self._max_attempts - 1:
                     # Token expired: refresh and retry
-                    self._access_token = None
-                    self._token_expiry = None
-                    self.ensure_token()
+                    self._refresh_expired_token(headers.get("authorization"))
                     headers["authorization"] = self._access_token or ""
                     time.sleep(max(1.0, self._min_interval))
                     continue
@@ -503,12 +649,11 @@ class KISClient:
                 msg_cd = parsed.get("msg_cd") or ""
                 msg1 = parsed.get("msg1") or "Unknown error"
                 if msg_cd == "EGW00201" and attempt < self._max_attempts - 1:
+                    self._limiter.on_throttle()
                     time.sleep(max(1.0, self._min_interval))
                     continue
                 if msg_cd == "EGW00123" and attempt < self._max_attempts - 1:
-                    self._access_token = None
-                    self._token_expiry = None
-                    self.ensure_token()
+                    self._refresh_expired_token(headers.get("authorization"))
                     headers["authorization"] = self._access_token or ""
                     time.sleep(max(1.0, self._min_interval))
                     continue
@@ -578,9 +723,7 @@ class KISClient:
                 msg1 = data.get("msg1") or msg_cd or "Unknown error"
                 if msg_cd == "EGW00123" and attempt < self._max_attempts - 1:
                     # Token expired: refresh and retry
-                    self._access_token = None
-                    self._token_expiry = None
-                    self.ensure_token()
+                    self._refresh_expired_token(headers.get("authorization"))
                     headers["authorization"] = self._access_token or ""
                     time.sleep(max(1.0, self._min_interval))
                     continue
@@ -593,9 +736,7 @@ class KISClient:
                 msg_cd = data.get("msg_cd") or ""
                 msg1 = data.get("msg1") or msg_cd or "Unknown error"
                 if msg_cd == "EGW00123" and attempt < self._max_attempts - 1:
-                    self._access_token = None
-                    self._token_expiry = None
-                    self.ensure_token()
+                    self._refresh_expired_token(headers.get("authorization"))
                     headers["authorization"] = self._access_token or ""
                     time.sleep(max(1.0, self._min_interval))
                     continue
@@ -625,7 +766,9 @@ class KISClient:
         exchange: str = "NASD",
         count: int = 120,
         adjusted: bool = True,
-    ) -> list[dict[str, Any]]:
+        since: str | None = None,
+    ) -> Candles:
+        """Overseas counterpart of :meth:`daily_candles` (same ``since`` semantics)."""
         symbol = symbol.strip().upper()
         exchange = exchange.strip().upper()
         if not symbol or not exchange:
@@ -640,9 +783,14 @@ class KISClient:
         now = dt.datetime.now()
         chunk_end = now
         earliest_allowed = now - dt.timedelta(days=365 * 10)
+        since_dt = _parse_since(since)
+        if since_dt is not None and since_dt > earliest_allowed:
+            earliest_allowed = since_dt
         empty_streak = 0
 
-        while len(collected) < target and chunk_end > earliest_allowed:
+        while chunk_end >= earliest_allowed:
+            if since_dt is None and len(collected) >= target:
+                break
             start_dt = chunk_end - dt.timedelta(days=chunk_days)
             if start_dt < earliest_allowed:
                 start_dt = earliest_allowed
@@ -676,9 +824,9 @@ class KISClient:
             chunk_end = oldest_dt - dt.timedelta(days=1)
 
         parsed = sorted(collected.values(), key=lambda x: x["date"])
-        if len(parsed) > target:
+        if since_dt is None and len(parsed) > target:
             parsed = parsed[-target:]
-        return parsed
+        return Candles.from_dicts(parsed)
 
     def _fetch_overseas_candle_chunk(
         self,
@@ -737,9 +885,7 @@ class KISClient:
                 msg1 = parsed.get("msg1") or "Unknown error"
                 if msg_cd == "EGW00123" and attempt < self._max_attempts - 1:
                     # Token expired: refresh and retry
-                    self._access_token = None
-                    self._token_expiry = None
-                    self.ensure_token()
+                    self._refresh_expired_token(headers.get("authorization"))
                     headers["authorization"] = self._access_token or ""
                     time.sleep(max(1.0, self._min_interval))
                     continue
@@ -752,12 +898,11 @@ class KISClient:
                 msg_cd = parsed.get("msg_cd") or ""
                 msg1 = parsed.get("msg1") or "Unknown error"
                 if msg_cd == "EGW00201" and attempt < self._max_attempts - 1:
+                    self._limiter.on_throttle()
                     time.sleep(max(1.0, self._min_interval))
                     continue
                 if msg_cd == "EGW00123" and attempt < self._max_attempts - 1:
-                    self._access_token = None
-                    self._token_expiry = None
-                    self.ensure_token()
+                    self._refresh_expired_token(headers.get("authorization"))
                     headers["authorization"] = self._access_token or ""
                     time.sleep(max(1.0, self._min_interval))
                     continue
@@ -892,9 +1037,7 @@ class KISClient:
                     ) else "Unknown error"
                     if msg_cd == "EGW00123" and attempt < self._max_attempts - 1:
                         # Token expired on server side: clear, refresh, and retry
-                        self._access_token = None
-                        self._token_expiry = None
-                        self.ensure_token()
+                        self._refresh_expired_token(headers.get("authorization"))
                         headers["authorization"] = self._access_token or ""
                         time.sleep(max(1.0, self._min_interval))
                         continue
@@ -915,13 +1058,12 @@ class KISClient:
                     msg_cd = data.get("msg_cd") or ""
                     msg1 = data.get("msg1") or "Unknown error"
                     if msg_cd == "EGW00201" and attempt < self._max_attempts - 1:
+                        self._limiter.on_throttle()
                         time.sleep(max(1.0, self._min_interval))
                         continue
                     if msg_cd == "EGW00123" and attempt < self._max_attempts - 1:
                         # Token expired according to body: refresh and retry
-                        self._access_token = None
-                        self._token_expiry = None
-                        self.ensure_token()
+                        self._refresh_expired_token(headers.get("authorization"))
                         headers["authorization"] = self._access_token or ""
                         time.sleep(max(1.0, self._min_interval))
                         continue
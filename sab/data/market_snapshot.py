@@ -0,0 +1,215 @@
+"""Daily refresh of KR candles from whole-market snapshots.
+
+Pulling history per ticker costs one or more requests per symbol, which
+does not scale to a universe of thousands. A snapshot is one session's bar
+for every listed ticker in a single call (pykrx's by-ticker OHLCV), so
+bringing a cached universe up to date costs one call per missed session
+instead. :func:`refresh_from_snapshots` applies the snapshots oldest first
+to each cached series and reports the tickers that still need a
+per-ticker history fetch:
+
+- no cached series yet (new listings, tickers never fetched);
+- the cache ends before the oldest fetched session, or a trading day is
+  missing between the cache and the snapshot (gap);
+- KRX's change rate for the day disagrees with the cached previous close,
+  which means the history was restated (split, rights, dividend
+  adjustment) and the cached bars are no longer on the same basis;
+- the ticker is absent from the latest snapshot (ETFs, halted listings).
+
+A cached last bar from the snapshot's own session is replaced rather than
+appended, since it may have been an intraday snapshot.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import datetime as dt
+import logging
+import math
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+import numpy as np
+
+from .candle_store import PRICE_COLUMNS, CandleStore
+from .candles import Candles
+from .freshness import FreshnessChecker, SessionCalendar
+
+logger = logging.getLogger(__name__)
+
+# Sessions fetched at most per refresh; older caches go through per-ticker history.
+SNAPSHOT_MAX_SESSIONS = 5
+
+# KRX rounds 등락률 to two decimals (percentage points).
+_RATE_TOLERANCE = 0.01
+
+
+class SnapshotSource(Protocol):
+    def market_snapshot(self, date: str, *, market: str = "ALL") -> dict[str, dict[str, Any]]: ...
+
+
+def _as_date(value: int) -> dt.date:
+    return dt.datetime.strptime(str(value), "%Y%m%d").date()
+
+
+def _has_gap(calendar: SessionCalendar, last: int, day: int) -> bool:
+    cursor = _as_date(last) + dt.timedelta(days=1)
+    end = _as_date(day)
+    while cursor < end:
+        if calendar.is_trading_day(cursor):
+            return True
+        cursor += dt.timedelta(days=1)
+    return False
+
+
+def merge_snapshot_bar(
+    cached: Candles,
+    bar: Mapping[str, Any],
+    *,
+    count: int,
+    calendar: SessionCalendar | None = None,
+) -> Candles | None:
+    """Append (or replace the last bar with) one snapshot ``bar``.
+
+    Returns ``cached`` unchanged when it already has a later bar, and
+    ``None`` on a gap or a restated history, signalling a full refetch.
+    """
+    if not cached:
+        return None
+    day = int(bar["date"])
+    last = int(cached.date[-1])
+    if day < last:
+        return cached
+    base = cached[:-1] if day == last else cached
+    if day > last and calendar is not None and _has_gap(calendar, last, day):
+        return None
+
+    close = float(bar["close"])
+    prev_close = float(base.close[-1]) if base else math.nan
+    change = float(bar.get("change_pct", math.nan))
+    if prev_close > 0 and not math.isnan(change):
+        implied = (close / prev_close - 1.0) * 100.0
+        if abs(implied - change) > _RATE_TOLERANCE:
+            logger.info("%s: change rate %.2f%% vs cache %.2f%%; restated", day, change, implied)
+            return None
+
+    row = {name: float(bar.get(name, math.nan)) for name in PRICE_COLUMNS}
+    row["prev_close_diff"] = close - prev_close if prev_close > 0 else math.nan
+    columns: dict[str, Any] = {"date": np.append(base.date, np.int32(day))}
+    for name in PRICE_COLUMNS:
+        columns[name] = np.append(base.column(name), row[name])
+    merged = Candles(columns)
+    target = max(count, 1)
+    return merged[-target:] if len(merged) > target else merged
+
+
+def snapshot_session(calendar: SessionCalendar, now: dt.datetime | None = None) -> dt.date:
+    """Latest session with data: today once the market has opened, else the last close."""
+    now = now or dt.datetime.now(dt.UTC)
+    local = now.astimezone(calendar.zone)
+    if calendar.is_trading_day(local.date()) and local.time() >= calendar.open_time:
+        return local.date()
+    return calendar.latest_completed_session(now)
+
+
+def _sessions(calendar: SessionCalendar, target: dt.date, oldest: int, limit: int) -> list[str]:
+    days: list[str] = []
+    cursor = target
+    while len(days) < limit and int(cursor.strftime("%Y%m%d")) >= oldest:
+        if calendar.is_trading_day(cursor):
+            days.append(cursor.strftime("%Y%m%d"))
+        cursor -= dt.timedelta(days=1)
+    return days[::-1]
+
+
+@dataclass
+class SnapshotRefresh:
+    candles: dict[str, Candles] = field(default_factory=dict)
+    # ticker -> why it still needs a per-ticker history fetch
+    refetch: dict[str, str] = field(default_factory=dict)
+    fresh_tickers: set[str] = field(default_factory=set)
+    fresh: int = 0
+    appended: int = 0
+    calls: int = 0
+
+    def describe(self) -> str:
+        return (
+            f"{self.calls} snapshot call(s), {self.appended} appended, "
+            f"{self.fresh} fresh, {len(self.refetch)} need history"
+        )
+
+
+def refresh_from_snapshots(
+    client: SnapshotSource,
+    store: CandleStore,
+    keys: Mapping[str, str],
+    *,
+    count: int,
+    checker: FreshnessChecker,
+    freshness: bool = True,
+    now: dt.datetime | None = None,
+    max_sessions: int = SNAPSHOT_MAX_SESSIONS,
+) -> SnapshotRefresh:
+    """Bring the cached series of ``keys`` (``{ticker: cache_key}``) up to date.
+
+    Every updated series is saved to ``store``. Tickers listed in
+    ``refetch`` are left for the caller's per-ticker fetch.
+    """
+    result = SnapshotRefresh()
+    calendar = checker.calendar("KR")
+    cached = store.load_many(list(keys.values()), limit=max(count, 2))
+
+    pending: dict[str, Candles] = {}
+    for ticker, key in keys.items():
+        series = cached.get(key)
+        if not series:
+            result.refetch[ticker] = "not cached"
+        elif freshness and checker.is_fresh(series, "KR", store.modified_at(key)):
+            result.candles[ticker] = series
+            result.fresh_tickers.add(ticker)
+            result.fresh += 1
+        else:
+            pending[ticker] = series
+    if not pending:
+        return result
+
+    target = snapshot_session(calendar, now)
+    oldest = min(int(series.date[-1]) for series in pending.values())
+    sessions = _sessions(calendar, target, oldest, max(max_sessions, 1))
+    current: set[str] = set()
+    for date in sessions:
+        snapshot = client.market_snapshot(date)
+        result.calls += 1
+        for ticker in list(pending):
+            bar = snapshot.get(ticker)
+            if bar is None:
+                continue
+            merged = merge_snapshot_bar(pending[ticker], bar, count=count, calendar=calendar)
+            if merged is None:
+                result.refetch[ticker] = "gap or restated history"
+                del pending[ticker]
+            else:
+                pending[ticker] = merged
+                if date == sessions[-1]:
+                    current.add(ticker)
+
+    with store.batch() if pending else contextlib.nullcontext():
+        for ticker, series in pending.items():
+            if ticker not in current:
+                result.refetch[ticker] = "not in market snapshot"
+                continue
+            store.save(keys[ticker], series)
+            result.candles[ticker] = series
+            result.appended += 1
+    return result
+
+
+__all__ = [
+    "SNAPSHOT_MAX_SESSIONS",
+    "SnapshotRefresh",
+    "SnapshotSource",
+    "merge_snapshot_bar",
+    "refresh_from_snapshots",
+    "snapshot_session",
+]
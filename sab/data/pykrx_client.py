@@ -5,6 +5,10 @@ import importlib
 from types import ModuleType
 from typing import Any, Optional
 
+import numpy as np
+
+from .candles import Candles
+
 
 class PykrxClientError(RuntimeError):
     """Base error for PyKRX client."""
@@ -28,7 +32,7 @@ class PykrxClient:
         *,
         count: int = 120,
         adjusted: bool = True,
-    ) -> list[dict[str, Any]]:
+    ) -> Candles:
         ticker = ticker.strip()
         if not ticker:
             raise PykrxClientError("Ticker is required")
@@ -58,10 +62,9 @@ class PykrxClient:
             attempts += 1
 
         if df is None or df.empty:
-            return []
+            return Candles.empty()
 
         df = df.sort_index()
-        records: list[dict[str, Any]] = []
 
         def _col(*names: str) -> Any:
             for name in names:
@@ -75,37 +78,70 @@ class PykrxClient:
         closes = _col("종가", "Close", "close")
         volumes = _col("거래량", "Volume", "volume")
 
-        prev_close = None
-        for idx, date_idx in enumerate(df.index):
-            row_open = _to_float(opens.iloc[idx])
-            row_high = _to_float(highs.iloc[idx])
-            row_low = _to_float(lows.iloc[idx])
-            row_close = _to_float(closes.iloc[idx])
-            row_volume = _to_float(volumes.iloc[idx])
-
-            date_str = _format_date(date_idx)
-
-            diff = float("nan")
-            if prev_close not in (None, 0) and not _is_nan(row_close):
-                diff = row_close - float(prev_close)
-
-            records.append(
-                {
-                    "date": date_str,
-                    "open": row_open,
-                    "high": row_high,
-                    "low": row_low,
-                    "close": row_close,
-                    "volume": row_volume,
-                    "prev_close_diff": diff,
-                }
+        def _floats(column: Any) -> np.ndarray:
+            return np.array([_to_float(v) for v in column.tolist()], dtype=np.float64)
+
+        row_close = _floats(closes)
+        prev_close = np.concatenate(([np.nan], row_close[:-1]))
+        with np.errstate(invalid="ignore"):
+            diff = np.where(
+                (prev_close != 0) & ~np.isnan(row_close), row_close - prev_close, np.nan
             )
-            prev_close = row_close
 
-        if len(records) > target:
-            records = records[-target:]
+        candles = Candles(
+            {
+                "date": [_date_int(d) for d in df.index],
+                "open": _floats(opens),
+                "high": _floats(highs),
+                "low": _floats(lows),
+                "close": row_close,
+                "volume": _floats(volumes),
+                "prev_close_diff": diff,
+            }
+        )
+        if len(candles) > target:
+            candles = candles[-target:]
+
+        return candles
+
+    def market_snapshot(self, date: str, *, market: str = "ALL") -> dict[str, dict[str, Any]]:
+        """One session's bar for every listed ticker of ``market`` in a single call.
+
+        Returns ``{ticker: bar}`` where ``bar`` carries the candle fields
+        plus ``change_pct`` (KRX 등락률 against the session's base price).
+        Prices are as traded that day, which matches the adjusted history
+        up to that date unless a corporate action takes effect on it.
+        Empty on non-trading days.
+        """
+        data = self._stock_module.get_market_ohlcv_by_ticker(date, market=market)
+        if data is None or data.empty:
+            return {}
+
+        def _col(*names: str) -> list[Any]:
+            for name in names:
+                if name in data.columns:
+                    return data[name].tolist()
+            raise PykrxClientError(f"Missing required column(s): {names}")
 
-        return records
+        columns = {
+            "open": _col("시가", "Open", "open"),
+            "high": _col("고가", "High", "high"),
+            "low": _col("저가", "Low", "low"),
+            "close": _col("종가", "Close", "close"),
+            "volume": _col("거래량", "Volume", "volume"),
+            "change_pct": _col("등락률", "Change", "change"),
+        }
+        day = _date_int(date)
+        out: dict[str, dict[str, Any]] = {}
+        for i, ticker in enumerate(data.index):
+            bar: dict[str, Any] = {"date": day}
+            for name, values in columns.items():
+                bar[name] = _to_float(values[i])
+            # KRX lists every ticker on holidays too, with zero prices
+            if not bar["close"] > 0:
+                continue
+            out[str(ticker)] = bar
+        return out
 
 
 def _import_pykrx_stock() -> ModuleType:
@@ -136,6 +172,11 @@ def _is_nan(value: Any) -> bool:
         return False
 
 
+def _date_int(value: Any) -> int:
+    text = _format_date(value)
+    return int(text) if len(text) == 8 and text.isdigit() else 0
+
+
 def _format_date(value: Any) -> str:
     if isinstance(value, dt.datetime):
         return value.strftime("%Y%m%d")
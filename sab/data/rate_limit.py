@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import functools
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+
+from .cache import ensure_dir, json_path, load_json
+from .file_lock import FileLock
+
+logger = logging.getLogger(__name__)
+
+# Documented KIS REST ceilings (requests per second) used as the AIMD cap.
+_MAX_RATE = {"real": 20.0, "demo": 2.0}
+_MIN_RATE = 0.5
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every request issued by a client.
+
+    ``interval`` is the steady-state spacing between requests in seconds
+    (``kis_min_interval_ms / 1000``); ``burst`` is how many requests may be
+    issued back-to-back after an idle period. Callers reserve a slot under
+    the lock and sleep outside it, so waiting threads never block each other
+    from computing their own start time.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        *,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.interval = max(0.0, float(interval))
+        self.burst = max(1, int(burst))
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = clock()
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller must wait before using it."""
+        if self.interval <= 0:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            elapsed = max(0.0, now - self._updated)
+            self._tokens = min(float(self.burst), self._tokens + elapsed / self.interval)
+            self._updated = now
+            self._tokens -= 1.0
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens * self.interval
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        wait = self.reserve()
+        if wait > 0:
+            self._sleep(wait)
+
+    def on_success(self) -> None:
+        """Feedback hook: a request was accepted (no-op for a fixed bucket)."""
+
+    def on_throttle(self) -> None:
+        """Feedback hook: the server signalled throttling (no-op for a fixed bucket)."""
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """Token bucket whose rate is tuned by AIMD feedback from the server.
+
+    Each accepted request raises the rate by ``increase / rate`` requests per
+    second (about ``increase`` per second of sustained success); each
+    throttling response (429/418/503, ``EGW00201``) multiplies it by
+    ``decrease``. Throttles arriving within one cooldown window after a
+    decrease are treated as the same event, since they were already in
+    flight. ``store`` receives the learned rate after every decrease and
+    whenever the rate has grown by ``persist_step`` since the last save.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        *,
+        min_rate: float = _MIN_RATE,
+        max_rate: float = _MAX_RATE["real"],
+        increase: float = 0.5,
+        decrease: float = 0.5,
+        cooldown: float = 1.0,
+        persist_step: float = 0.1,
+        store: Callable[[float], None] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.min_rate = max(1e-3, min_rate)
+        self.max_rate = max(self.min_rate, max_rate)
+        self.rate = min(self.max_rate, max(self.min_rate, rate))
+        super().__init__(1.0 / self.rate, clock=clock, sleep=sleep)
+        self._increase = increase
+        self._decrease = decrease
+        self._cooldown = cooldown
+        self._persist_step = persist_step
+        self._store = store
+        self._saved_rate = self.rate
+        self._last_decrease: float | None = None
+
+    def _set_rate(self, rate: float) -> None:
+        self.rate = min(self.max_rate, max(self.min_rate, rate))
+        self.interval = 1.0 / self.rate
+
+    def on_success(self) -> None:
+        with self._lock:
+            if self.rate >= self.max_rate:
+                return
+            self._set_rate(self.rate + self._increase / self.rate)
+            grown = self.rate >= self._saved_rate * (1.0 + self._persist_step)
+            if grown:
+                self._saved_rate = self.rate
+            rate = self.rate
+        if grown:
+            self._persist(rate)
+
+    def on_throttle(self) -> None:
+        with self._lock:
+            now = self._clock()
+            if self._last_decrease is not None and now - self._last_decrease < self._cooldown:
+                return
+            self._last_decrease = now
+            self._set_rate(self.rate * self._decrease)
+            self._saved_rate = self.rate
+            rate = self.rate
+        logger.info("KIS throttled; lowering request rate to %.2f/s", rate)
+        self._persist(rate)
+
+    def _persist(self, rate: float) -> None:
+        if self._store is None:
+            return
+        try:
+            self._store(rate)
+        except OSError as exc:  # pragma: no cover - best effort
+            logger.debug("Failed to persist learned KIS rate: %s", exc)
+
+
+class SharedTokenBucket(TokenBucket):
+    """Spread one request budget across every local process.
+
+    The next free send time lives in ``state_path`` and is updated under a
+    :class:`FileLock`, so concurrent ``sab scan``/``sab sell`` runs queue
+    behind each other instead of each spending the full rate. The spacing
+    comes from ``inner`` (fixed or adaptive), which also receives the
+    success/throttle feedback. Times are wall-clock so processes agree.
+    """
+
+    def __init__(
+        self,
+        inner: TokenBucket,
+        state_path: str,
+        *,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        super().__init__(inner.interval, clock=clock, sleep=sleep)
+        self.inner = inner
+        self._state_path = state_path
+        self._file_lock = FileLock(f"{state_path}.lock")
+
+    def _read_next(self) -> float:
+        try:
+            with open(self._state_path, encoding="utf-8") as fh:
+                return float(fh.read().strip() or 0.0)
+        except (OSError, ValueError):
+            return 0.0
+
+    def reserve(self) -> float:
+        interval = self.inner.interval
+        if interval <= 0:
+            return 0.0
+        with self._lock, self._file_lock:
+            now = self._clock()
+            # ignore slots from a far-future clock skew or a crashed writer
+            next_free = min(self._read_next(), now + 60.0)
+            start = max(now, next_free)
+            with open(self._state_path, "w", encoding="utf-8") as fh:
+                fh.write(repr(start + interval))
+        return start - now
+
+    def on_success(self) -> None:
+        self.inner.on_success()
+
+    def on_throttle(self) -> None:
+        self.inner.on_throttle()
+
+
+def _key_digest(app_key: str) -> str:
+    return hashlib.sha256(app_key.encode("utf-8")).hexdigest()[:12]
+
+
+def rate_cache_key(env: str, app_key: str) -> str:
+    """Cache key for the learned rate of one environment/app key."""
+    return f"kis_rate_{env}_{_key_digest(app_key)}"
+
+
+def load_learned_rate(data_dir: str | None, env: str, app_key: str) -> float | None:
+    if not data_dir:
+        return None
+    cached = load_json(data_dir, rate_cache_key(env, app_key))
+    if not isinstance(cached, dict):
+        return None
+    try:
+        rate = float(cached.get("rate"))
+    except (TypeError, ValueError):
+        return None
+    return rate if rate > 0 else None
+
+
+def save_learned_rate(data_dir: str, env: str, app_key: str, rate: float) -> None:
+    """Persist ``rate`` atomically; concurrent clients never read a torn file."""
+    ensure_dir(data_dir)
+    path = json_path(data_dir, rate_cache_key(env, app_key))
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"rate": rate, "updated_at": dt.datetime.now(dt.UTC).isoformat()}, fh)
+    os.replace(tmp, path)
+
+
+class BackgroundStore:
+    """Runs a learned-rate ``store`` on a worker thread when called from an event loop.
+
+    :class:`AdaptiveTokenBucket` persists from ``on_success``/``on_throttle``,
+    which the asyncio client calls on the loop. Each write stores the latest
+    rate at the time it runs, so writes that finish out of order still leave
+    the newest rate on disk. Outside a running loop the write is inline.
+    """
+
+    def __init__(self, store: Callable[[float], None]) -> None:
+        self._store = store
+        self._lock = threading.Lock()
+        self._rate: float | None = None
+
+    def __call__(self, rate: float) -> None:
+        self._rate = rate
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write()
+            return
+        loop.run_in_executor(None, self._write).add_done_callback(self._report)
+
+    def _write(self) -> None:
+        with self._lock:
+            if self._rate is not None:
+                self._store(self._rate)
+
+    @staticmethod
+    def _report(future: asyncio.Future[None]) -> None:
+        exc = None if future.cancelled() else future.exception()
+        if exc is not None:
+            logger.debug("Failed to persist learned KIS rate: %s", exc)
+
+
+def build_limiter(
+    interval: float,
+    *,
+    adaptive: bool = False,
+    shared: bool = False,
+    data_dir: str | None = None,
+    env: str = "real",
+    app_key: str = "",
+    background_persist: bool = False,
+) -> TokenBucket:
+    """Create the request limiter for a KIS client.
+
+    With ``adaptive`` the bucket starts at the rate learned by a previous run
+    (capped at the documented KIS ceiling; ``1 / interval`` before anything
+    is learned), probes upwards on success and persists what it learns under
+    ``data_dir``. With ``shared`` (and a ``data_dir``) the budget is
+    coordinated across processes through a lock file. A non-positive ``interval`` disables throttling entirely. With
+    ``background_persist`` the learned rate is written through
+    :class:`BackgroundStore`, off the caller's event loop.
+    """
+    if interval <= 0:
+        return TokenBucket(interval)
+    bucket = _local_limiter(
+        interval,
+        adaptive=adaptive,
+        data_dir=data_dir,
+        env=env,
+        app_key=app_key,
+        background_persist=background_persist,
+    )
+    if shared and data_dir:
+        state = os.path.join(data_dir, f"kis_limiter_{env}_{_key_digest(app_key)}.state")
+        return SharedTokenBucket(bucket, state)
+    return bucket
+
+
+def _local_limiter(
+    interval: float,
+    *,
+    adaptive: bool,
+    data_dir: str | None,
+    env: str,
+    app_key: str,
+    background_persist: bool = False,
+) -> TokenBucket:
+    if not adaptive:
+        return TokenBucket(interval)
+
+    # the configured spacing is only the cold start; a learned rate replaces
+    # it, capped at the documented ceiling for ``env``
+    max_rate = _MAX_RATE.get(env, _MAX_RATE["real"])
+    learned = load_learned_rate(data_dir, env, app_key)
+    start = min(learned, max_rate) if learned is not None else 1.0 / interval
+    if learned is not None:
+        logger.info("Starting KIS limiter at learned rate %.2f/s", start)
+
+    store: Callable[[float], None] | None = None
+    if data_dir:
+        store = functools.partial(save_learned_rate, data_dir, env, app_key)
+        if background_persist:
+            store = BackgroundStore(store)
+    return AdaptiveTokenBucket(
+        start,
+        max_rate=max_rate,
+        store=store,
+    )
+
+
+__all__ = [
+    "AdaptiveTokenBucket",
+    "BackgroundStore",
+    "SharedTokenBucket",
+    "TokenBucket",
+    "build_limiter",
+    "load_learned_rate",
+    "rate_cache_key",
+    "save_learned_rate",
+]
@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import contextlib
+import datetime as dt
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+import numpy as np
+
+from .cache import cache_mtime, ensure_dir
+from .candle_store import (
+    PRICE_COLUMNS,
+    candles_to_columns,
+    close_restated,
+    columns_to_candles,
+    import_json_candles,
+)
+from .candles import Candles, CandleSeries
+
+logger = logging.getLogger(__name__)
+
+DB_FILENAME = "market.sqlite3"
+_SCHEMA_VERSION = 1
+
+_SCHEMA = (
+    f"""CREATE TABLE IF NOT EXISTS candles (
+        market TEXT NOT NULL,
+        ticker TEXT NOT NULL,
+        date INTEGER NOT NULL,
+        {", ".join(f"{name} REAL" for name in PRICE_COLUMNS)},
+        PRIMARY KEY (market, ticker, date)
+    ) WITHOUT ROWID""",
+    # cross-sectional reads ("every KR bar on date X") for backtests
+    "CREATE INDEX IF NOT EXISTS candles_by_date ON candles (market, date)",
+    """CREATE TABLE IF NOT EXISTS series (
+        market TEXT NOT NULL,
+        ticker TEXT NOT NULL,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (market, ticker)
+    ) WITHOUT ROWID""",
+)
+
+_OVERSEAS_PREFIX = "candles_overseas_"
+_KR_PREFIX = "candles_"
+
+
+def split_cache_key(key: str) -> tuple[str, str]:
+    """Map a candle cache key to its ``(market, ticker)`` row key.
+
+    ``candles_overseas_<EXCH>_<SYMBOL>`` becomes ``(EXCH, SYMBOL)`` and
+    ``candles_<TICKER>`` becomes ``("KR", TICKER)``; anything else is kept
+    whole under an empty market.
+    """
+    if key.startswith(_OVERSEAS_PREFIX):
+        exch, _, symbol = key[len(_OVERSEAS_PREFIX) :].partition("_")
+        if exch and symbol:
+            return exch.upper(), symbol
+    if key.startswith(_KR_PREFIX):
+        return "KR", key[len(_KR_PREFIX) :]
+    return "", key
+
+
+def join_cache_key(market: str, ticker: str) -> str:
+    """Inverse of :func:`split_cache_key`."""
+    if market == "KR":
+        return f"{_KR_PREFIX}{ticker}"
+    if market:
+        return f"{_OVERSEAS_PREFIX}{market}_{ticker}"
+    return ticker
+
+
+def _tail(candles: Candles, limit: int | None) -> Candles:
+    return candles[-limit:] if limit is not None and len(candles) > limit else candles
+
+
+class SqliteCandleStore:
+    """All candle series in one SQLite database (``<data_dir>/market.sqlite3``).
+
+    Rows are keyed by ``(market, ticker, date)`` in a ``WITHOUT ROWID``
+    table, so a series tail is one index range scan and :meth:`load_many`
+    fetches the last N bars of hundreds of instruments in a single query.
+    The database runs in WAL mode: readers never block the writer, and
+    concurrent ``sab`` processes wait on ``busy_timeout`` instead of
+    failing. A save whose first overlapping close differs from the stored
+    one (:func:`~sab.data.candle_store.close_restated`) replaces the whole
+    series. Inside :meth:`batch` saves are buffered and written in one
+    transaction when the batch closes; outside a batch each save is its own
+    transaction.
+
+    When ``legacy_dir`` is set, a key missing from the database is imported
+    from the legacy ``<key>.json`` file on first load (keeping its mtime).
+    """
+
+    def __init__(self, path: str, *, legacy_dir: str | None = None, timeout: float = 30.0) -> None:
+        self.path = path
+        self.legacy_dir = legacy_dir
+        ensure_dir(os.path.dirname(path) or ".")
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            path, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA busy_timeout={int(timeout * 1000)}")
+        self._depth = 0
+        self._pending: dict[str, tuple[dict[str, np.ndarray], float]] = {}
+        with self._transaction() as conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    # ------------------------------------------------------------------
+    def keys(self) -> list[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT market, ticker FROM series ORDER BY market, ticker"
+            ).fetchall()
+        return [join_cache_key(market, ticker) for market, ticker in rows]
+
+    def load(self, key: str, *, limit: int | None = None) -> Candles | None:
+        return self.load_many([key], limit=limit).get(key)
+
+    def load_many(self, keys: Iterable[str], *, limit: int | None = None) -> dict[str, Candles]:
+        """Return the last ``limit`` candles for every stored key in one query.
+
+        Keys with no stored series are left out of the result.
+        """
+        pairs = {key: split_cache_key(key) for key in keys}
+        result: dict[str, Candles] = {}
+        missing: list[str] = []
+        with self._lock:
+            for key in pairs:
+                pending = self._pending.get(key)
+                if pending is not None:
+                    result[key] = _tail(columns_to_candles(pending[0]), limit)
+                else:
+                    missing.append(key)
+            if missing:
+                found = self._select([pairs[key] for key in missing], limit)
+                for key in missing:
+                    if pairs[key] in found:
+                        result[key] = found[pairs[key]]
+        for key in missing:
+            if key not in result and self._import_legacy(key):
+                loaded = self.load(key, limit=limit)
+                if loaded:
+                    result[key] = loaded
+        return result
+
+    def _select(
+        self, pairs: list[tuple[str, str]], limit: int | None
+    ) -> dict[tuple[str, str], Candles]:
+        columns = ", ".join(PRICE_COLUMNS)
+        conn = self._conn
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (market TEXT, ticker TEXT)")
+        conn.execute("DELETE FROM wanted")
+        conn.executemany("INSERT INTO wanted VALUES (?, ?)", pairs)
+        query = f"""
+            SELECT market, ticker, date, {columns} FROM (
+                SELECT c.market, c.ticker, c.date, {", ".join(f"c.{name}" for name in PRICE_COLUMNS)},
+                       ROW_NUMBER() OVER (
+                           PARTITION BY c.market, c.ticker ORDER BY c.date DESC
+                       ) AS rn
+                FROM candles c JOIN wanted w ON c.market = w.market AND c.ticker = w.ticker
+            )
+            WHERE ? IS NULL OR rn <= ?
+            ORDER BY market, ticker, date
+        """
+        rows: dict[tuple[str, str], list[tuple[Any, ...]]] = {}
+        for row in conn.execute(query, (limit, limit)):
+            rows.setdefault((row[0], row[1]), []).append(row[2:])
+        out: dict[tuple[str, str], Candles] = {}
+        for pair, values in rows.items():
+            # NULL prices come back as None, which float64 conversion maps to NaN
+            matrix = np.array(values, dtype=np.float64)
+            columns = {"date": matrix[:, 0].astype(np.int32)}
+            for i, name in enumerate(PRICE_COLUMNS, start=1):
+                columns[name] = matrix[:, i]
+            out[pair] = Candles(columns)
+        return out
+
+    def modified_at(self, key: str) -> dt.datetime | None:
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                return dt.datetime.fromtimestamp(pending[1], tz=dt.UTC)
+            row = self._conn.execute(
+                "SELECT updated_at FROM series WHERE market = ? AND ticker = ?",
+                split_cache_key(key),
+            ).fetchone()
+        if row is None:
+            if self.legacy_dir:
+                return cache_mtime(self.legacy_dir, key)
+            return None
+        return dt.datetime.fromtimestamp(row[0], tz=dt.UTC)
+
+    def set_modified_at(self, key: str, timestamp: float) -> None:
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                self._pending[key] = (pending[0], timestamp)
+                return
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE series SET updated_at = ? WHERE market = ? AND ticker = ?",
+                (timestamp, *split_cache_key(key)),
+            )
+
+    def delete(self, key: str) -> None:
+        market, ticker = split_cache_key(key)
+        with self._lock:
+            self._pending.pop(key, None)
+        with self._transaction() as conn:
+            for table in ("candles", "series"):
+                conn.execute(
+                    f"DELETE FROM {table} WHERE market = ? AND ticker = ?", (market, ticker)
+                )
+
+    # ------------------------------------------------------------------
+    def save(self, key: str, candles: CandleSeries) -> None:
+        columns = candles_to_columns(candles)
+        if len(columns["date"]) == 0:
+            return
+        with self._lock:
+            if self._depth:
+                self._pending[key] = (columns, time.time())
+                return
+        self._flush({key: (columns, time.time())})
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[SqliteCandleStore]:
+        """Buffer saves and commit them together when the outermost batch exits."""
+        with self._lock:
+            self._depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._depth -= 1
+                pending = self._pending if self._depth == 0 else {}
+                if self._depth == 0:
+                    self._pending = {}
+            if pending:
+                self._flush(pending)
+
+    def _flush(self, pending: dict[str, tuple[dict[str, np.ndarray], float]]) -> None:
+        columns = ", ".join(PRICE_COLUMNS)
+        placeholders = ", ".join("?" for _ in PRICE_COLUMNS)
+        updates = ", ".join(f"{name} = excluded.{name}" for name in PRICE_COLUMNS)
+        upsert = (
+            f"INSERT INTO candles (market, ticker, date, {columns}) "
+            f"VALUES (?, ?, ?, {placeholders}) "
+            f"ON CONFLICT (market, ticker, date) DO UPDATE SET {updates}"
+        )
+        with self._transaction() as conn:
+            for key, (data, saved_at) in pending.items():
+                market, ticker = split_cache_key(key)
+                dates = data["date"].tolist()
+                if self._restated(conn, market, ticker, dates, float(data["close"][0])):
+                    # older rows are on the pre-restatement price basis
+                    logger.info("%s: history restated at %s; replacing stored rows", key, dates[0])
+                    conn.execute(
+                        "DELETE FROM candles WHERE market = ? AND ticker = ?", (market, ticker)
+                    )
+                # Bars after the new series' last date came from a superseded
+                # fetch; drop them so the stored tail matches what was saved.
+                conn.execute(
+                    "DELETE FROM candles WHERE market = ? AND ticker = ? AND date > ?",
+                    (market, ticker, dates[-1]),
+                )
+                values = [data[name].tolist() for name in PRICE_COLUMNS]
+                conn.executemany(
+                    upsert,
+                    (
+                        (
+                            market,
+                            ticker,
+                            date,
+                            *(None if math.isnan(v[i]) else v[i] for v in values),
+                        )
+                        for i, date in enumerate(dates)
+                    ),
+                )
+                conn.execute(
+                    "INSERT INTO series (market, ticker, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (market, ticker) DO UPDATE SET updated_at = excluded.updated_at",
+                    (market, ticker, saved_at),
+                )
+        logger.debug("Committed %s candle series to %s", len(pending), self.path)
+
+    @staticmethod
+    def _restated(
+        conn: sqlite3.Connection, market: str, ticker: str, dates: list[int], close: float
+    ) -> bool:
+        """The columnar store's restatement rule, checked against the stored rows."""
+        if len(dates) < 2:
+            return False
+        row = conn.execute(
+            "SELECT close, EXISTS (SELECT 1 FROM candles WHERE market = ? AND ticker = ? "
+            "AND date > ?) FROM candles WHERE market = ? AND ticker = ? AND date = ?",
+            (market, ticker, dates[0], market, ticker, dates[0]),
+        ).fetchone()
+        if row is None or row[0] is None or not row[1]:
+            return False
+        return close_restated(float(row[0]), close)
+
+    # ------------------------------------------------------------------
+    def _import_legacy(self, key: str) -> bool:
+        if not self.legacy_dir:
+            return False
+        return import_json_candles(self, self.legacy_dir, key)
+
+
+def sqlite_path(data_dir: str) -> str:
+    return os.path.join(data_dir, DB_FILENAME)
+
+
+__all__ = ["DB_FILENAME", "SqliteCandleStore", "join_cache_key", "split_cache_key", "sqlite_path"]
@@ -5,18 +5,9 @@ import logging
 
 from .config import Config
 from .data.cache import load_json, save_json
+from .data.instrument import Instrument
 from .data.kis_client import KISClient, KISClientError
 
-SUFFIX_TO_EXCD = {
-    "US": "NAS",
-    "NASDAQ": "NAS",
-    "NASD": "NAS",
-    "NAS": "NAS",
-    "NYSE": "NYS",
-    "NYS": "NYS",
-    "AMEX": "AMS",
-    "AMS": "AMS",
-}
 FX_CACHE_KEY = "fx_usdkrw"
 DEFAULT_SYMBOL = "SPY"
 DEFAULT_EXCHANGE = "NAS"
@@ -114,40 +105,25 @@ def _select_symbol(
     tickers: list[str],
 ) -> tuple[str, str, str]:
     if cfg.fx_kis_symbol:
-        base, suffix = _split_symbol(cfg.fx_kis_symbol)
-        if base:
-            exchange = _to_exchange(suffix) or DEFAULT_EXCHANGE
-            return base, exchange, _format_symbol_label(base, exchange)
+        instrument = Instrument.parse(cfg.fx_kis_symbol)
+        if instrument.symbol:
+            return _symbol_choice(instrument)
 
     for ticker in tickers:
         currency = ticker_currency.get(ticker, "KRW")
         if currency and currency.upper() == "USD":
-            base, suffix = _split_symbol(ticker)
-            if not base:
+            instrument = Instrument.parse(ticker)
+            if not instrument.symbol:
                 continue
-            exchange = _to_exchange(suffix) or DEFAULT_EXCHANGE
-            return base, exchange, _format_symbol_label(base, exchange)
+            return _symbol_choice(instrument)
 
     # fallback symbol if no USD ticker is available
-    base, suffix = _split_symbol(f"{DEFAULT_SYMBOL}.{DEFAULT_EXCHANGE}")
-    exchange = _to_exchange(suffix) or DEFAULT_EXCHANGE
-    return base, exchange, _format_symbol_label(base, exchange)
+    return _symbol_choice(Instrument(symbol=DEFAULT_SYMBOL, exchange=DEFAULT_EXCHANGE))
 
 
-def _split_symbol(raw: str | None) -> tuple[str, str | None]:
-    if not raw:
-        return "", None
-    text = raw.strip().upper()
-    if "." not in text:
-        return text, None
-    base, suffix = text.rsplit(".", 1)
-    return base.strip(), suffix.strip()
-
-
-def _to_exchange(suffix: str | None) -> str | None:
-    if not suffix:
-        return None
-    return SUFFIX_TO_EXCD.get(suffix.upper())
+def _symbol_choice(instrument: Instrument) -> tuple[str, str, str]:
+    exchange = instrument.exchange or DEFAULT_EXCHANGE
+    return instrument.symbol, exchange, _format_symbol_label(instrument.symbol, exchange)
 
 
 def _format_symbol_label(symbol: str, exchange: str) -> str:
@@ -0,0 +1,454 @@
+"""Candle, FX and holiday loading shared by scan, sell and run.
+
+One :class:`MarketDataSession` per command owns the provider clients and
+everything resolved through them. Series, the FX rate and the US holiday
+calendar are loaded at most once per session, so ``sab run`` can fetch the
+union of the scan and sell universes up front and let both reports read the
+same in-memory data. :meth:`MarketDataSession.stream` hands each series over
+as soon as it is settled, so evaluation can start before the last ticker is
+fetched.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import logging
+from collections.abc import Iterable, Iterator
+
+from .config import Config
+from .data.candle_refresh import (
+    REFRESH_FRESH,
+    REFRESH_FULL,
+    REFRESH_TAIL,
+    RefreshJob,
+    RefreshResult,
+    describe_refresh,
+    refresh_many,
+)
+from .data.candle_store import open_candle_store
+from .data.candles import CandleSeries
+from .data.freshness import FreshnessChecker
+from .data.holiday_cache import (
+    HolidayEntry,
+    holidays_refreshed_at,
+    load_cached_holidays,
+    merge_holidays,
+)
+from .data.instrument import Instrument
+from .data.kis_client import KISClient, KISClientError, KISCredentials
+from .data.market_snapshot import refresh_from_snapshots
+from .data.pykrx_client import PykrxClient, PykrxClientError, PykrxNotInstalledError
+from .fx import resolve_fx_rate
+
+# Tickers whose cached series are loaded together before their refresh jobs run.
+FETCH_CHUNK = 128
+
+
+def _infer_env_from_base(base_url: str) -> str:
+    return "demo" if "vts" in base_url.lower() else "real"
+
+
+def _infer_currency_from_ticker(ticker: str) -> str:
+    return Instrument.parse(ticker).currency
+
+
+def candle_target(ticker: str) -> tuple[str, str | None, str]:
+    """``(symbol, KIS exchange or None, cache key)`` for a watchlist/holdings ticker."""
+    instrument = Instrument.parse(ticker)
+    return instrument.symbol, instrument.exchange, instrument.cache_key
+
+
+class MarketDataSession:
+    """Provider clients plus the candles, FX rate and holidays loaded through them.
+
+    ``notes`` collects run-wide messages (credentials, FX, provider caveats)
+    that belong in every report; per-ticker fetch problems are kept apart and
+    returned by :meth:`failures_for` so each report only lists its own.
+    """
+
+    def __init__(self, cfg: Config, *, logger: logging.Logger | None = None) -> None:
+        self.cfg = cfg
+        self.logger = logger or logging.getLogger(__name__)
+        self.kis_client: KISClient | None = None
+        self.pykrx_client: PykrxClient | None = None
+        self.cache_hint: str | None = None
+        self.notes: list[str] = []
+        self.fatal = False
+
+        self.candles: dict[str, CandleSeries] = {}
+        self.sources: dict[str, str] = {}
+        self.latest_dates: dict[str, str] = {}
+        self._modes: dict[str, str] = {}
+        self._errors: dict[str, list[str]] = {}
+        self._fetched: set[str] = set()
+
+        self._fx: tuple[float | None, str | None] | None = None
+        self._us_holidays: dict[str, HolidayEntry] | None = None
+        self._pykrx_error: str | None = None
+        self._pykrx_warned = False
+        self._unsupported_noted = False
+
+        self.target_bars = max(cfg.min_history_bars, 200)
+        self.store = open_candle_store(cfg.data_dir, backend=cfg.candle_store)
+        self.freshness = FreshnessChecker(cfg.data_dir) if cfg.freshness_check else None
+        self._connect()
+
+    # ------------------------------------------------------------------
+    def _fail(self, msg: str) -> None:
+        self.notes.append(msg)
+        self.logger.error(msg)
+        self.fatal = True
+
+    def _connect(self) -> None:
+        cfg = self.cfg
+        if cfg.data_provider == "kis":
+            if not (cfg.kis_app_key and cfg.kis_app_secret and cfg.kis_base_url):
+                self._fail(
+                    "KIS credentials missing. Set KIS_APP_KEY, KIS_APP_SECRET, KIS_BASE_URL in .env (see docs/kis-setup.md)."
+                )
+                return
+            creds = KISCredentials(
+                app_key=cfg.kis_app_key,
+                app_secret=cfg.kis_app_secret,
+                base_url=cfg.kis_base_url,
+                env=_infer_env_from_base(cfg.kis_base_url),
+            )
+            min_interval = None
+            if cfg.kis_min_interval_ms is not None:
+                min_interval = max(0.0, cfg.kis_min_interval_ms / 1000.0)
+            self.kis_client = KISClient(
+                creds,
+                cache_dir=cfg.data_dir,
+                min_interval=min_interval,
+                adaptive_rate=cfg.kis_adaptive_rate,
+                shared_limiter=cfg.kis_shared_limiter,
+            )
+            self.cache_hint = self.kis_client.cache_status
+        elif cfg.data_provider == "pykrx":
+            if self.ensure_pykrx_client() is None:
+                self._fail(
+                    "PyKRX provider selected but pykrx package is unavailable. Install with 'uv add pykrx'."
+                )
+                return
+            self.cache_hint = "pykrx"
+
+    def ensure_pykrx_client(self) -> PykrxClient | None:
+        if self.pykrx_client is not None:
+            return self.pykrx_client
+        if self._pykrx_error:
+            return None
+        try:
+            self.pykrx_client = PykrxClient(cache_dir=self.cfg.data_dir)
+            self.logger.info("PyKRX client initialized for fallback/provider usage")
+            return self.pykrx_client
+        except PykrxNotInstalledError as exc:
+            self._pykrx_error = str(exc)
+            self.logger.warning("PyKRX unavailable: %s", exc)
+        except PykrxClientError as exc:
+            self._pykrx_error = str(exc)
+            self.logger.error("PyKRX init failed: %s", exc)
+        return None
+
+    # ------------------------------------------------------------------
+    def resolve_fx(
+        self, ticker_currency: dict[str, str], tickers: list[str]
+    ) -> tuple[float | None, str | None]:
+        """USD/KRW rate and note; resolved on the first call only."""
+        if self._fx is None:
+            rate, note, messages = resolve_fx_rate(
+                cfg=self.cfg,
+                ticker_currency=ticker_currency,
+                tickers=tickers,
+                kis_client=self.kis_client,
+                logger=self.logger,
+            )
+            self.notes.extend(messages)
+            self._fx = (rate, note)
+        return self._fx
+
+    def us_holidays(self) -> dict[str, HolidayEntry]:
+        """US holiday entries for the next month, refreshed via KIS once per session."""
+        if self._us_holidays is None:
+            self._us_holidays = self._refresh_us_holidays()
+        return self._us_holidays
+
+    def _refresh_us_holidays(self) -> dict[str, HolidayEntry]:
+        cfg = self.cfg
+        logger = self.logger
+        if not self.kis_client or cfg.data_provider != "kis":
+            return {}
+        if cfg.freshness_check:
+            refreshed_at = holidays_refreshed_at(cfg.data_dir, "US")
+            if refreshed_at and refreshed_at.astimezone().date() == dt.date.today():
+                logger.info("US holiday cache already refreshed today; skipping KIS call")
+                return load_cached_holidays(cfg.data_dir, "US")
+        try:
+            now = dt.datetime.now()
+            start = now.strftime("%Y%m%d")
+            end = (now + dt.timedelta(days=30)).strftime("%Y%m%d")
+        except Exception:
+            start = end = dt.date.today().strftime("%Y%m%d")
+
+        logger.info("Refreshing US holidays via KIS: %s -> %s", start, end)
+        try:
+            items = self.kis_client.overseas_holidays(
+                country_code="US",
+                start_date=start,
+                end_date=end,
+            )
+        except KISClientError as exc:
+            msg = str(exc)
+            if "HTTP 404" in msg:
+                logger.info("US holiday API returned 404 (no entries from %s to %s)", start, end)
+                return {}
+            logger.warning("Failed to refresh US holidays: %s", msg)
+            return {}
+
+        logger.info("US holiday API succeeded: %s rows for %s -> %s", len(items), start, end)
+        if items:
+            logger.debug("US holiday sample row: %s", items[0])
+        return merge_holidays(cfg.data_dir, "US", items)
+
+    # ------------------------------------------------------------------
+    def fetch(self, tickers: Iterable[str]) -> None:
+        """Load or refresh the series of every ticker not fetched yet in this session."""
+        for _ in self.stream(tickers):
+            pass
+
+    def stream(
+        self, tickers: Iterable[str], *, keep: bool = True
+    ) -> Iterator[tuple[str, CandleSeries | None]]:
+        """Fetch like :meth:`fetch`, yielding ``(ticker, candles or None)`` per ticker.
+
+        Tickers fetched earlier in the session come first, from memory; the
+        rest follow in the order their fetch settles, which is not the order
+        of ``tickers``. With ``keep=False`` newly fetched series are handed
+        to the caller instead of being kept in :attr:`candles`, so memory
+        follows what the caller holds rather than the universe size.
+        """
+        ordered = [t for t in dict.fromkeys(tickers) if t]
+        pending = [t for t in ordered if t not in self._fetched]
+        for ticker in ordered:
+            if ticker in self._fetched:
+                yield ticker, self.candles.get(ticker)
+        if not pending:
+            return
+        self._fetched.update(pending)
+        if self.cfg.data_provider == "kis" and self.kis_client:
+            settled: Iterable[str] = self._fetch_kis(pending)
+        elif self.cfg.data_provider == "pykrx" and self.pykrx_client:
+            settled = self._fetch_pykrx(pending)
+        else:
+            if self.cfg.data_provider not in {"kis", "pykrx"} and not self._unsupported_noted:
+                self._unsupported_noted = True
+                self._fail(f"Provider '{self.cfg.data_provider}' not yet implemented")
+            settled = pending
+        for ticker in settled:
+            yield ticker, self.candles.get(ticker) if keep else self.candles.pop(ticker, None)
+
+    def failures_for(self, tickers: Iterable[str]) -> list[str]:
+        """Fetch problems recorded for ``tickers``, in ticker order."""
+        out: list[str] = []
+        for ticker in dict.fromkeys(tickers):
+            out.extend(self._errors.get(ticker, ()))
+        return out
+
+    def refresh_note(self, tickers: Iterable[str]) -> str | None:
+        """Report-header summary of how the series of ``tickers`` were refreshed."""
+        counts = {REFRESH_FRESH: 0, REFRESH_TAIL: 0, REFRESH_FULL: 0}
+        for ticker in dict.fromkeys(tickers):
+            mode = self._modes.get(ticker)
+            if mode:
+                counts[mode] += 1
+        return describe_refresh(counts)
+
+    def _error(self, ticker: str, msg: str, level: int = logging.WARNING) -> None:
+        self._errors.setdefault(ticker, []).append(msg)
+        self.logger.log(level, msg)
+
+    def _store_candles(self, ticker: str, candles: CandleSeries, source: str) -> None:
+        self.candles[ticker] = candles
+        self.sources[ticker] = source
+        last_date = str(candles[-1].get("date") or "")
+        if last_date:
+            self.latest_dates[ticker] = last_date
+
+    def _warn_pykrx(self, msg: str) -> None:
+        if not self._pykrx_warned:
+            self.notes.append(msg)
+            self._pykrx_warned = True
+
+    def _log_refresh(self, tickers: list[str]) -> None:
+        counts = {REFRESH_FRESH: 0, REFRESH_TAIL: 0, REFRESH_FULL: 0}
+        for ticker in tickers:
+            mode = self._modes.get(ticker)
+            if mode:
+                counts[mode] += 1
+        self.logger.info(
+            "Candle refresh: %s fresh, %s incremental, %s full",
+            counts[REFRESH_FRESH],
+            counts[REFRESH_TAIL],
+            counts[REFRESH_FULL],
+        )
+
+    def _fetch_kis(self, tickers: list[str]) -> Iterator[str]:
+        for start in range(0, len(tickers), FETCH_CHUNK):
+            yield from self._fetch_kis_chunk(tickers[start : start + FETCH_CHUNK])
+        self._log_refresh(tickers)
+
+    def _fetch_kis_chunk(self, tickers: list[str]) -> Iterator[str]:
+        cfg = self.cfg
+        logger = self.logger
+        assert self.kis_client is not None
+        targets = [(ticker, *candle_target(ticker)) for ticker in tickers]
+        cached_by_key = self.store.load_many(
+            [target[3] for target in targets], limit=self.target_bars
+        )
+
+        jobs: list[RefreshJob] = []
+        for ticker, base_symbol, exch, cache_key in targets:
+            cached = cached_by_key.get(cache_key)
+            if cached:
+                self._store_candles(ticker, cached, cfg.data_provider)
+            # a current but short series (saved under a smaller min_history_bars)
+            # still needs the full window, so only a complete one skips the fetch
+            if (
+                self.freshness
+                and cached
+                and len(cached) >= self.target_bars
+                and self.freshness.is_fresh(
+                    cached, "US" if exch else "KR", self.store.modified_at(cache_key)
+                )
+            ):
+                self._modes[ticker] = REFRESH_FRESH
+                logger.info("Using fresh cached candles for %s", ticker)
+                yield ticker
+                continue
+            jobs.append(
+                RefreshJob(
+                    ticker=ticker,
+                    symbol=base_symbol,
+                    exchange=exch,
+                    cache_key=cache_key,
+                    cached=cached,
+                )
+            )
+
+        for result in refresh_many(
+            self.kis_client,
+            jobs,
+            count=self.target_bars,
+            store=self.store,
+            workers=cfg.kis_fetch_workers,
+            incremental=cfg.incremental_refresh,
+        ):
+            self._apply_kis_result(result)
+            yield result.job.ticker
+
+    def _apply_kis_result(self, result: RefreshResult) -> None:
+        logger = self.logger
+        ticker = result.job.ticker
+        base_symbol = result.job.symbol
+        exch = result.job.exchange
+        exc = result.error
+        if exc is None:
+            candles = result.candles
+            if candles:
+                self._modes[ticker] = result.mode
+                self._store_candles(ticker, candles, "kis")
+                logger.info(
+                    "Fetched %s candles for %s (%s refresh)", len(candles), ticker, result.mode
+                )
+            else:
+                self._error(ticker, f"{ticker}: No candle data returned")
+            return
+        if ticker in self.candles:
+            self._error(ticker, f"{ticker}: API error, using cached data ({exc})")
+            return
+
+        fallback_client = self.ensure_pykrx_client()
+        fallback_error = self._pykrx_error
+        if fallback_client is not None and not exch:
+            # PyKRX supports KR tickers only
+            try:
+                candles = fallback_client.daily_candles(base_symbol, count=self.target_bars)
+            except PykrxClientError as py_exc:
+                fallback_client = None
+                fallback_error = str(py_exc)
+            else:
+                if candles:
+                    self._store_candles(ticker, candles, "pykrx")
+                    logger.warning(
+                        "%s: KIS error (%s); used PyKRX fallback (%s candles)",
+                        ticker,
+                        exc,
+                        len(candles),
+                    )
+                    self._errors.setdefault(ticker, []).append(
+                        f"{ticker}: KIS error ({exc}); used PyKRX fallback"
+                    )
+                    self._warn_pykrx(
+                        "Warning: PyKRX fallback data is end-of-day and may differ from KIS."
+                    )
+                    return
+                fallback_error = "No data from PyKRX"
+                fallback_client = None
+        elif exch:
+            fallback_error = "Overseas symbol; no PyKRX fallback"
+        msg = f"{ticker}: {exc}"
+        if (fallback_client is None or exch) and fallback_error:
+            msg += f" (PyKRX fallback unavailable: {fallback_error})"
+        self._error(ticker, msg, logging.ERROR)
+
+    def _fetch_pykrx(self, tickers: list[str]) -> Iterator[str]:
+        cfg = self.cfg
+        logger = self.logger
+        assert self.pykrx_client is not None
+        history_tickers = list(tickers)
+        if cfg.snapshot_refresh:
+            # one whole-market call per session; per-ticker history only for the rest
+            try:
+                snapshot = refresh_from_snapshots(
+                    self.pykrx_client,
+                    self.store,
+                    {ticker: candle_target(ticker)[2] for ticker in tickers},
+                    count=self.target_bars,
+                    checker=self.freshness or FreshnessChecker(cfg.data_dir),
+                    freshness=cfg.freshness_check,
+                )
+            except Exception as exc:
+                logger.warning("Market snapshot refresh failed (%s); fetching per ticker", exc)
+            else:
+                history_tickers = [t for t in tickers if t in snapshot.refetch]
+                logger.info("Market snapshot: %s", snapshot.describe())
+                for ticker in list(snapshot.candles):
+                    # one whole-market pass; release each series as it is handed over
+                    self._store_candles(ticker, snapshot.candles.pop(ticker), "pykrx")
+                    fresh = ticker in snapshot.fresh_tickers
+                    self._modes[ticker] = REFRESH_FRESH if fresh else REFRESH_TAIL
+                    yield ticker
+
+        for ticker in history_tickers:
+            try:
+                candles = self.pykrx_client.daily_candles(ticker, count=self.target_bars)
+            except PykrxClientError as exc:
+                self._error(ticker, f"{ticker}: PyKRX error ({exc})", logging.ERROR)
+                yield ticker
+                continue
+
+            if candles:
+                self._store_candles(ticker, candles, "pykrx")
+                self._modes[ticker] = REFRESH_FULL
+                if cfg.snapshot_refresh:
+                    # seed the cache so the next run only appends snapshot bars
+                    self.store.save(candle_target(ticker)[2], candles)
+                logger.info("Fetched %s candles via PyKRX for %s", len(candles), ticker)
+            else:
+                self._error(ticker, f"{ticker}: PyKRX returned no data")
+            yield ticker
+
+        self._warn_pykrx("Warning: PyKRX provider data is end-of-day and may lag intraday feeds.")
+        self._log_refresh(tickers)
+
+
+__all__ = ["MarketDataSession", "candle_target"]
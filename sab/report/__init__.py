@@ -1,4 +1,12 @@
+from .backtest_report import write_backtest_report
 from .markdown import write_report
 from .sell_report import SellReportRow, write_sell_report
+from .sweep_report import write_sweep_report
 
-__all__ = ["write_report", "SellReportRow", "write_sell_report"]
+__all__ = [
+    "write_report",
+    "SellReportRow",
+    "write_sell_report",
+    "write_backtest_report",
+    "write_sweep_report",
+]
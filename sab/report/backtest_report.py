@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import csv
+import datetime as _dt
+import os
+from collections.abc import Iterable
+
+from ..signals.backtest import BacktestSummary, TickerBacktest, Trade, summarize
+
+
+def _ensure_dir(path: str) -> None:
+    os.makedirs(path, exist_ok=True)
+
+
+def _fmt_percent(value: float | None) -> str:
+    if value is None:
+        return "-"
+    return f"{value * 100:+.2f}%"
+
+
+def _next_path(report_dir: str, date: str, suffix: str) -> str:
+    out_path = os.path.join(report_dir, f"{date}{suffix}")
+    i = 1
+    while os.path.exists(out_path):
+        out_path = os.path.join(report_dir, f"{date}-{i}{suffix}")
+        i += 1
+    return out_path
+
+
+def _summary_lines(summary: BacktestSummary) -> list[str]:
+    pf = f"{summary.profit_factor:.2f}" if summary.profit_factor is not None else "-"
+    return [
+        f"- Trades: {summary.trades} (wins {summary.wins}, win rate {summary.win_rate * 100:.1f}%)",
+        f"- Avg return: {_fmt_percent(summary.avg_return)} / median "
+        f"{_fmt_percent(summary.median_return)}",
+        f"- Best / worst: {_fmt_percent(summary.best)} / {_fmt_percent(summary.worst)}",
+        f"- Profit factor: {pf}",
+        f"- Avg bars held: {summary.avg_bars_held:.1f}",
+    ]
+
+
+def write_trades_csv(path: str, trades: Iterable[Trade]) -> str:
+    with open(path, "w", encoding="utf-8", newline="") as fp:
+        writer = csv.writer(fp)
+        writer.writerow(
+            [
+                "ticker",
+                "entry_date",
+                "entry_price",
+                "exit_date",
+                "exit_price",
+                "return_pct",
+                "bars_held",
+                "pattern",
+                "exit_reason",
+            ]
+        )
+        for t in trades:
+            writer.writerow(
+                [
+                    t.ticker,
+                    t.entry_date,
+                    f"{t.entry_price:.4f}",
+                    t.exit_date,
+                    f"{t.exit_price:.4f}",
+                    f"{t.return_pct:.6f}",
+                    t.bars_held,
+                    t.pattern or "",
+                    t.exit_reason,
+                ]
+            )
+    return path
+
+
+def write_backtest_report(
+    *,
+    report_dir: str,
+    strategy_mode: str,
+    sell_mode: str,
+    window: int,
+    results: Iterable[TickerBacktest],
+    start_date: str | None = None,
+    end_date: str | None = None,
+    failures: Iterable[str] | None = None,
+) -> str:
+    """Write ``YYYY-MM-DD.backtest.md`` plus a ``.trades.csv`` with every trade."""
+    _ensure_dir(report_dir)
+    today = _dt.datetime.now().strftime("%Y-%m-%d")
+    now_str = _dt.datetime.now().strftime("%Y-%m-%d %H:%M")
+    out_path = _next_path(report_dir, today, ".backtest.md")
+    csv_path = out_path[: -len(".backtest.md")] + ".trades.csv"
+
+    rows = list(results)
+    failures_list = list(failures or [])
+    trades = [t for r in rows for t in r.trades]
+    trades.sort(key=lambda t: (t.entry_date, t.ticker))
+    write_trades_csv(csv_path, trades)
+
+    lines: list[str] = []
+    lines.append(f"# Backtest — {today}")
+    lines.append(f"- Run at: {now_str} KST")
+    lines.append(f"- Buy mode: {strategy_mode} / Sell mode: {sell_mode}")
+    lines.append(f"- Period: {start_date or 'start of cache'} → {end_date or 'end of cache'}")
+    lines.append(f"- Evaluation window: {window} bars")
+    lines.append(f"- Tickers: {len(rows)}, signals: {sum(r.signals for r in rows)}")
+    lines.append(f"- Trades CSV: {os.path.basename(csv_path)}")
+    if failures_list:
+        lines.append(f"- Notes: {len(failures_list)} issue(s) logged (see Appendix)")
+    lines.append("")
+
+    lines.append("## Summary")
+    lines.extend(_summary_lines(summarize(trades)))
+    lines.append("")
+
+    traded = [r for r in rows if r.trades]
+    if traded:
+        lines.append("## By Ticker")
+        lines.append("| Ticker | Signals | Trades | Win rate | Avg return | Avg bars |")
+        lines.append("|--------|--------:|-------:|---------:|-----------:|---------:|")
+        for r in traded:
+            s = summarize(r.trades)
+            lines.append(
+                f"| {r.ticker} | {r.signals} | {s.trades} | {s.win_rate * 100:.1f}% "
+                f"| {_fmt_percent(s.avg_return)} | {s.avg_bars_held:.1f} |"
+            )
+        lines.append("")
+    else:
+        lines.append("_No trades._")
+        lines.append("")
+
+    if failures_list:
+        lines.append("### Appendix — Issues")
+        for item in failures_list:
+            lines.append(f"- {item}")
+        lines.append("")
+
+    with open(out_path, "w", encoding="utf-8") as fp:
+        fp.write("\n".join(lines))
+    return out_path
+
+
+__all__ = ["write_backtest_report", "write_trades_csv"]
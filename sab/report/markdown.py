@@ -39,6 +39,7 @@ def write_report(
     cache_hint: str | None = None,
     report_type: str = "buy",
     strategy_mode: str | None = None,
+    candle_note: str | None = None,
 ) -> str:
     _ensure_dir(report_dir)
     today = _dt.datetime.now().strftime("%Y-%m-%d")
@@ -54,6 +55,8 @@ def write_report(
     lines.append(f"- Run at: {now_str} KST")
     cache_note = f" (cache: {cache_hint})" if cache_hint else ""
     lines.append(f"- Provider: {provider}{cache_note}")
+    if candle_note:
+        lines.append(f"- Candles: {candle_note}")
     if strategy_mode and report_type == "buy":
         mode_label = strategy_mode
         if strategy_mode == "sma_ema_hybrid":
@@ -84,6 +84,7 @@ def write_sell_report(
     fx_note: str | None = None,
     sell_mode: str | None = None,
     sell_mode_note: str | None = None,
+    candle_note: str | None = None,
 ) -> str:
     _ensure_dir(report_dir)
 
@@ -116,6 +117,8 @@ def write_sell_report(
     lines.append(f"- Run at: {now_str} KST")
     cache_note = f" (cache: {cache_hint})" if cache_hint else ""
     lines.append(f"- Provider: {provider}{cache_note}")
+    if candle_note:
+        lines.append(f"- Candles: {candle_note}")
     lines.append(f"- Evaluated holdings: {len(rows)}")
     if has_usd:
         if fx_rate:
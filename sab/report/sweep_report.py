@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import datetime as _dt
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+import yaml
+
+from ..signals.sweep import SweepResult
+from .backtest_report import _ensure_dir, _fmt_percent, _next_path
+
+
+def _fmt_value(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:g}"
+    return str(value)
+
+
+def write_sweep_report(
+    *,
+    report_dir: str,
+    spec_path: str,
+    params: Sequence[str],
+    ranked: Sequence[SweepResult],
+    combos: int,
+    tickers: int,
+    rank_by: str,
+    min_trades: int,
+    best_block: dict[str, Any] | None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    failures: Iterable[str] | None = None,
+) -> str:
+    """Write ``YYYY-MM-DD.sweep.md`` with the ranked combinations and the best config block."""
+    _ensure_dir(report_dir)
+    today = _dt.datetime.now().strftime("%Y-%m-%d")
+    now_str = _dt.datetime.now().strftime("%Y-%m-%d %H:%M")
+    out_path = _next_path(report_dir, today, ".sweep.md")
+    failures_list = list(failures or [])
+
+    lines: list[str] = []
+    lines.append(f"# Parameter Sweep — {today}")
+    lines.append(f"- Run at: {now_str} KST")
+    lines.append(f"- Spec: {spec_path}")
+    lines.append(f"- Period: {start_date or 'start of cache'} → {end_date or 'end of cache'}")
+    lines.append(f"- Combinations: {combos}, tickers: {tickers}")
+    lines.append(f"- Ranked by: {rank_by} (min {min_trades} trades)")
+    if failures_list:
+        lines.append(f"- Notes: {len(failures_list)} issue(s) logged (see Appendix)")
+    lines.append("")
+
+    if best_block is not None:
+        lines.append("## Best Settings")
+        lines.append("Paste into `config.yaml`:")
+        lines.append("")
+        lines.append("```yaml")
+        lines.extend(yaml.safe_dump(best_block, sort_keys=False).splitlines())
+        lines.append("```")
+        lines.append("")
+
+    lines.append("## Ranking")
+    if ranked:
+        # buy and sell share names like ema_short_period
+        names = [p.replace("strategy.hybrid.", "").replace("sell.hybrid.", "sell.") for p in params]
+        header = ["#", *names, "Trades", "Win rate", "Avg", "Median", "PF", "Avg bars"]
+        lines.append("| " + " | ".join(header) + " |")
+        lines.append("|" + "|".join("---:" for _ in header) + "|")
+        for rank, result in enumerate(ranked, start=1):
+            s = result.summary
+            pf = f"{s.profit_factor:.2f}" if s.profit_factor is not None else "∞"
+            cells = [
+                str(rank),
+                *(_fmt_value(result.combo.overrides[p]) for p in params),
+                str(s.trades),
+                f"{s.win_rate * 100:.1f}%",
+                _fmt_percent(s.avg_return),
+                _fmt_percent(s.median_return),
+                pf,
+                f"{s.avg_bars_held:.1f}",
+            ]
+            lines.append("| " + " | ".join(cells) + " |")
+    else:
+        lines.append(f"_No combination reached {min_trades} trades._")
+    lines.append("")
+
+    if failures_list:
+        lines.append("### Appendix — Issues")
+        for item in failures_list:
+            lines.append(f"- {item}")
+        lines.append("")
+
+    with open(out_path, "w", encoding="utf-8") as fp:
+        fp.write("\n".join(lines))
+    return out_path
+
+
+__all__ = ["write_sweep_report"]
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import logging
+
+from .config import Config, load_config
+from .market_data import MarketDataSession
+from .scan import evaluate_scan, scan_universe
+from .sell import evaluate_sell, holding_currencies
+from .signals.indicator_memo import IndicatorMemo
+from .signals.indicators import set_backend as set_indicator_backend
+
+
+def run_all(
+    *,
+    limit: int | None,
+    watchlist_path: str | None,
+    provider: str | None,
+    screener_limit: int | None = None,
+    universe: str | None = None,
+    workers: int | None = None,
+) -> int:
+    """Scan and sell in one pass: buy and sell reports from a single fetch.
+
+    Every ticker of the scan universe and the holdings is fetched once and
+    FX is resolved once for the union; both evaluations share one indicator
+    memo.
+    """
+    logger = logging.getLogger(__name__)
+    cfg: Config = load_config(provider_override=provider, limit_override=limit)
+    set_indicator_backend(cfg.indicator_backend)
+
+    session = MarketDataSession(cfg, logger=logger)
+    scan = scan_universe(
+        cfg,
+        session,
+        watchlist_path=watchlist_path,
+        screener_limit=screener_limit,
+        universe=universe,
+    )
+    holding_currency = holding_currencies(cfg.holdings.holdings)
+    holding_tickers = list(holding_currency)
+    ticker_currency = {**scan.currencies, **holding_currency}
+    tickers = list(ticker_currency)
+    logger.info(
+        "Combined universe: %s tickers (%s scan, %s more from holdings)",
+        len(tickers),
+        len(scan.tickers),
+        len(tickers) - len(set(scan.tickers)),
+    )
+
+    session.resolve_fx(ticker_currency, tickers)
+    # Holdings stay in memory for the sell pass; the scan universe streams
+    # through the evaluator and reuses whatever the holdings fetch loaded.
+    session.fetch(holding_tickers)
+
+    memo = IndicatorMemo()
+    buy_status = evaluate_scan(cfg, session, scan, indicator_memo=memo, workers=workers)
+    sell_status = evaluate_sell(cfg, session, indicator_memo=memo, workers=workers)
+    return max(buy_status, sell_status)
+
+
+__all__ = ["run_all"]
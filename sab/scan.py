@@ -1,20 +1,19 @@
 from __future__ import annotations
 
 import datetime as dt
+import functools
 import logging
 import math
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
 from typing import Any
 
 from .config import Config, load_config, load_watchlist
-from .data.cache import load_json, save_json
-from .data.holiday_cache import HolidayEntry, lookup_holiday, merge_holidays
-from .data.kis_client import KISAuthError, KISClient, KISClientError, KISCredentials
-from .data.pykrx_client import (
-    PykrxClient,
-    PykrxClientError,
-    PykrxNotInstalledError,
-)
-from .fx import resolve_fx_rate
+from .data.candles import CandleSeries
+from .data.holiday_cache import HolidayEntry, lookup_holiday
+from .data.instrument import Instrument
+from .data.kis_client import KISClient
+from .market_data import MarketDataSession, candle_target
 from .report.markdown import write_report
 from .screener import KISScreener, ScreenRequest
 from .screener.kis_overseas_screener import (
@@ -25,28 +24,25 @@ from .screener.kis_overseas_screener import (
 )
 from .screener.overseas_screener import ScreenRequest as USScreenRequest
 from .screener.overseas_screener import USSimpleScreener as USScreener
-from .signals.evaluator import EvaluationSettings, evaluate_ticker
-from .signals.hybrid_buy import (
-    HybridEvaluationSettings,
-    evaluate_ticker_hybrid,
+from .signals.batch_eval import (
+    NO_HYBRID_SIGNAL,
+    BatchItem,
+    evaluate_batch,
+    evaluate_batch_hybrid,
 )
+from .signals.eval_cache import EvalResultCache, evaluate_cached
+from .signals.evaluator import EvaluationResult, EvaluationSettings
+from .signals.filters import FilterStats, use_filter_stats
+from .signals.hybrid_buy import HybridEvaluationResult, HybridEvaluationSettings
+from .signals.indicator_memo import IndicatorMemo, use_indicator_memo
+from .signals.indicators import set_backend as set_indicator_backend
+from .signals.parallel import EvaluationPool
 from .utils.market_time import us_market_status
-
-
-def _infer_env_from_base(base_url: str) -> str:
-    return "demo" if "vts" in base_url.lower() else "real"
-
-
-US_SUFFIXES = {"US", "NASDAQ", "NASD", "NAS", "NYSE", "NYS", "AMEX", "AMS"}
+from .utils.pipeline import staged
 
 
 def _infer_currency(ticker: str) -> str:
-    suffix = None
-    if "." in ticker:
-        suffix = ticker.rsplit(".", 1)[1].strip().upper()
-    if suffix in US_SUFFIXES:
-        return "USD"
-    return "KRW"
+    return Instrument.parse(ticker).currency
 
 
 def _to_float(value: Any) -> float | None:
@@ -87,51 +83,83 @@ def _apply_currency_display(
         candidate["price"] = f"₩{price_value:,.0f}"
 
 
-def run_scan(
+def evaluation_settings(cfg: Config) -> EvaluationSettings:
+    """Buy settings for the EMA cross strategy from the loaded config."""
+    return EvaluationSettings(
+        use_sma200_filter=cfg.use_sma200_filter,
+        gap_atr_multiplier=cfg.gap_atr_multiplier,
+        min_dollar_volume=cfg.min_dollar_volume,
+        us_min_dollar_volume=cfg.us_min_dollar_volume,
+        min_history_bars=cfg.min_history_bars,
+        exclude_etf_etn=cfg.exclude_etf_etn,
+        require_slope_up=cfg.require_slope_up,
+        rs_lookback_days=cfg.rs_lookback_days,
+        rs_benchmark_return=cfg.rs_benchmark_return,
+        min_price=cfg.min_price,
+        us_min_price=cfg.us_min_price,
+    )
+
+
+def hybrid_evaluation_settings(cfg: Config) -> HybridEvaluationSettings:
+    """Buy settings for the SMA+EMA hybrid strategy from the loaded config."""
+    return HybridEvaluationSettings(
+        sma_trend_period=cfg.hybrid.sma_trend_period,
+        ema_short_period=cfg.hybrid.ema_short_period,
+        ema_mid_period=cfg.hybrid.ema_mid_period,
+        rsi_period=cfg.hybrid.rsi_period,
+        rsi_zone_low=cfg.hybrid.rsi_zone_low,
+        rsi_zone_high=cfg.hybrid.rsi_zone_high,
+        rsi_oversold_low=cfg.hybrid.rsi_oversold_low,
+        rsi_oversold_high=cfg.hybrid.rsi_oversold_high,
+        pullback_max_bars=cfg.hybrid.pullback_max_bars,
+        breakout_consolidation_min_bars=cfg.hybrid.breakout_consolidation_min_bars,
+        breakout_consolidation_max_bars=cfg.hybrid.breakout_consolidation_max_bars,
+        volume_lookback_days=cfg.hybrid.volume_lookback_days,
+        max_gap_pct=cfg.hybrid.max_gap_pct,
+        use_sma60_filter=cfg.hybrid.use_sma60_filter,
+        sma60_period=cfg.hybrid.sma60_period,
+        kr_breakout_requires_confirmation=cfg.hybrid.kr_breakout_requires_confirmation,
+        gap_atr_multiplier=cfg.gap_atr_multiplier,
+        min_history_bars=cfg.min_history_bars,
+        min_price=cfg.min_price,
+        us_min_price=cfg.us_min_price,
+        min_dollar_volume=cfg.min_dollar_volume,
+        us_min_dollar_volume=cfg.us_min_dollar_volume,
+        exclude_etf_etn=cfg.exclude_etf_etn,
+    )
+
+
+@dataclass
+class ScanUniverse:
+    tickers: list[str]
+    screener_meta: dict[str, dict[str, Any]] = field(default_factory=dict)
+    failures: list[str] = field(default_factory=list)
+    fatal: bool = False
+
+    @property
+    def currencies(self) -> dict[str, str]:
+        return {t: _infer_currency(t) for t in self.tickers}
+
+
+def scan_universe(
+    cfg: Config,
+    session: MarketDataSession,
     *,
-    limit: int | None,
     watchlist_path: str | None,
-    provider: str | None,
     screener_limit: int | None = None,
     universe: str | None = None,
-) -> int:
+) -> ScanUniverse:
+    """Watchlist tickers, combined with the KR/US screeners when enabled."""
     logger = logging.getLogger(__name__)
-    cfg: Config = load_config(provider_override=provider, limit_override=limit)
-
     resolved_watchlist_path = watchlist_path or cfg.watchlist_path or "watchlist.txt"
     tickers = load_watchlist(resolved_watchlist_path)
     if cfg.screen_limit and tickers:
         tickers = tickers[: cfg.screen_limit]
 
     failures: list[str] = []
-    market_data: dict[str, list[dict]] = {}
-    ticker_data_source: dict[str, str] = {}
-    cache_hint: str | None = None
     fatal_failure = False
-
-    kis_client: KISClient | None = None
-    pykrx_client: PykrxClient | None = None
-    pykrx_import_error: str | None = None
-    pykrx_warning_added = False
     screener_meta_map: dict[str, dict[str, Any]] = {}
-
-    def ensure_pykrx_client() -> PykrxClient | None:
-        nonlocal pykrx_client, pykrx_import_error
-        if pykrx_client is not None:
-            return pykrx_client
-        if pykrx_import_error:
-            return None
-        try:
-            pykrx_client = PykrxClient()
-            logger.info("PyKRX client initialized for fallback/provider usage")
-            return pykrx_client
-        except PykrxNotInstalledError as exc:
-            pykrx_import_error = str(exc)
-            logger.warning("PyKRX unavailable: %s", exc)
-        except PykrxClientError as exc:
-            pykrx_import_error = str(exc)
-            logger.error("PyKRX init failed: %s", exc)
-        return None
+    kis_client: KISClient | None = session.kis_client
 
     if screener_limit is None:
         screener_limit = cfg.screener_limit
@@ -149,40 +177,11 @@ def run_scan(
         screener_enabled = cfg.screener_enabled
         screener_only = cfg.screener_only if screener_enabled else False
 
-    if cfg.data_provider == "kis":
-        if not (cfg.kis_app_key and cfg.kis_app_secret and cfg.kis_base_url):
-            msg = "KIS credentials missing. Set KIS_APP_KEY, KIS_APP_SECRET, KIS_BASE_URL in .env (see docs/kis-setup.md)."
-            failures.append(msg)
-            logger.error(msg)
-            fatal_failure = True
-        else:
-            creds = KISCredentials(
-                app_key=cfg.kis_app_key,
-                app_secret=cfg.kis_app_secret,
-                base_url=cfg.kis_base_url,
-                env=_infer_env_from_base(cfg.kis_base_url),
-            )
-            min_interval = None
-            if cfg.kis_min_interval_ms is not None:
-                min_interval = max(0.0, cfg.kis_min_interval_ms / 1000.0)
-            kis_client = KISClient(creds, cache_dir=cfg.data_dir, min_interval=min_interval)
-            cache_hint = kis_client.cache_status
-    elif cfg.data_provider == "pykrx":
-        client = ensure_pykrx_client()
-        if client is None:
-            msg = "PyKRX provider selected but pykrx package is unavailable. Install with 'uv add pykrx'."
-            failures.append(msg)
-            logger.error(msg)
-            fatal_failure = True
-        else:
-            pykrx_client = client
-            cache_hint = "pykrx"
-    else:
-        if screener_enabled:
-            msg = "Screener currently supports KIS provider only."
-            failures.append(msg)
-            logger.error(msg)
-            fatal_failure = True
+    if screener_enabled and cfg.data_provider not in {"kis", "pykrx"}:
+        msg = "Screener currently supports KIS provider only."
+        failures.append(msg)
+        logger.error(msg)
+        fatal_failure = True
 
     if screener_enabled:
         if not kis_client:
@@ -285,275 +284,150 @@ def run_scan(
                     "Screener enabled but no markets selected or no defaults configured for US"
                 )
 
-    def _split_overseas(t: str) -> tuple[str, str | None]:
-        # Accept formats: SYMBOL.US (default NASD), SYMBOL.NASD/NYSE/AMEX
-        if "." not in t:
-            return t, None
-        base, suff = t.rsplit(".", 1)
-        return base.strip().upper(), suff.strip().upper()
-
-    def _excd_from_suffix(suffix: str | None) -> str | None:
-        if not suffix:
-            return None
-        mapping = {
-            # KIS EXCD codes: NAS (NASDAQ), NYS (NYSE), AMS (AMEX)
-            "US": "NAS",
-            "NASDAQ": "NAS",
-            "NASD": "NAS",
-            "NAS": "NAS",
-            "NYSE": "NYS",
-            "NYS": "NYS",
-            "AMEX": "AMS",
-            "AMS": "AMS",
-        }
-        return mapping.get(suffix, None)
-
-    ticker_currency: dict[str, str] = {t: _infer_currency(t) for t in tickers}
-    fx_rate: float | None = None
-    fx_meta_note: str | None = None
-    resolved_rate, resolved_note, fx_messages = resolve_fx_rate(
-        cfg=cfg,
-        ticker_currency=ticker_currency,
-        tickers=tickers,
-        kis_client=kis_client,
-        logger=logger,
-    )
-    fx_rate = resolved_rate
-    fx_meta_note = resolved_note
-    if fx_messages:
-        failures.extend(fx_messages)
-
-    us_holidays_cache: dict[str, HolidayEntry] = {}
-    latest_dates: dict[str, str] = {}
-
-    def refresh_us_holidays() -> dict[str, HolidayEntry]:
-        if not kis_client:
-            return {}
-        try:
-            now = dt.datetime.now()
-            start = now.strftime("%Y%m%d")
-            end = (now + dt.timedelta(days=30)).strftime("%Y%m%d")
-        except Exception:
-            start = end = dt.date.today().strftime("%Y%m%d")
-
-        logger.info("Refreshing US holidays via KIS: %s -> %s", start, end)
-        try:
-            items = kis_client.overseas_holidays(
-                country_code="US",
-                start_date=start,
-                end_date=end,
-            )
-        except KISClientError as exc:
-            msg = str(exc)
-            if "HTTP 404" in msg:
-                logger.info("US holiday API returned 404 (no entries from %s to %s)", start, end)
-                return {}
-            logger.warning("Failed to refresh US holidays: %s", msg)
-            return {}
-
-        logger.info("US holiday API succeeded: %s rows for %s -> %s", len(items), start, end)
-        if items:
-            logger.debug("US holiday sample row: %s", items[0])
-        return merge_holidays(cfg.data_dir, "US", items)
-
-    if cfg.data_provider == "kis" and kis_client:
-        # Preload US holiday cache once when needed
-        if "US" in cfg.universe_markets or any(
-            ticker_currency[t].upper() == "USD" for t in ticker_currency
-        ):
-            us_holidays_cache = refresh_us_holidays()
-        for ticker in tickers:
-            base_symbol, suffix = _split_overseas(ticker)
-            exch = _excd_from_suffix(suffix)
-            # Cache key reflects market to avoid collisions
-            cache_key = f"candles_overseas_{exch}_{base_symbol}" if exch else f"candles_{ticker}"
-            cached = load_json(cfg.data_dir, cache_key)
-            if isinstance(cached, list) and cached:
-                market_data[ticker] = cached
-                ticker_data_source.setdefault(ticker, cfg.data_provider)
-                last_date = str(cached[-1].get("date") or "")
-                if last_date:
-                    latest_dates[ticker] = last_date
-            try:
-                if exch:
-                    candles = kis_client.overseas_daily_candles(
-                        symbol=base_symbol, exchange=exch, count=max(cfg.min_history_bars, 200)
-                    )
-                else:
-                    candles = kis_client.daily_candles(
-                        base_symbol, count=max(cfg.min_history_bars, 200)
-                    )
-                if candles:
-                    market_data[ticker] = candles
-                    ticker_data_source[ticker] = "kis"
-                    save_json(cfg.data_dir, cache_key, candles)
-                    last_date = str(candles[-1].get("date") or "")
-                    if last_date:
-                        latest_dates[ticker] = last_date
-                    logger.info("Fetched %s candles for %s", len(candles), ticker)
-                else:
-                    msg = f"{ticker}: No candle data returned"
-                    failures.append(msg)
-                    logger.warning(msg)
-            except (KISClientError, KISAuthError) as exc:
-                if ticker in market_data:
-                    msg = f"{ticker}: API error, using cached data ({exc})"
-                    failures.append(msg)
-                    logger.warning(msg)
-                else:
-                    fallback_client = ensure_pykrx_client()
-                    fallback_error: str | None = None
-                    if fallback_client is not None and not exch:
-                        # PyKRX only supports KR tickers, skip if overseas
-                        try:
-                            candles = fallback_client.daily_candles(
-                                base_symbol, count=max(cfg.min_history_bars, 200)
-                            )
-                        except PykrxClientError as py_exc:
-                            fallback_client = None
-                            fallback_error = str(py_exc)
-                        else:
-                            if candles:
-                                market_data[ticker] = candles
-                                ticker_data_source[ticker] = "pykrx"
-                                last_date = str(candles[-1].get("date") or "")
-                                if last_date:
-                                    latest_dates[ticker] = last_date
-                                logger.warning(
-                                    "%s: KIS error (%s); used PyKRX fallback (%s candles)",
-                                    ticker,
-                                    exc,
-                                    len(candles),
-                                )
-                                failures.append(f"{ticker}: KIS error ({exc}); used PyKRX fallback")
-                                if not pykrx_warning_added:
-                                    failures.append(
-                                        "Warning: PyKRX fallback data is end-of-day and may differ from KIS."
-                                    )
-                                    pykrx_warning_added = True
-                                continue
-                            fallback_error = "No data from PyKRX"
-                            fallback_client = None
-                    else:
-                        fallback_error = (
-                            pykrx_import_error if not exch else "Overseas symbol; no PyKRX fallback"
-                        )
-
-                    msg = f"{ticker}: {exc}"
-                    if fallback_client is None and fallback_error:
-                        msg += f" ({fallback_error})"
-                    failures.append(msg)
-                    logger.error(msg)
-    elif cfg.data_provider == "pykrx" and pykrx_client:
-        for ticker in tickers:
-            try:
-                candles = pykrx_client.daily_candles(ticker, count=max(cfg.min_history_bars, 200))
-            except PykrxClientError as exc:
-                msg = f"{ticker}: PyKRX error ({exc})"
-                failures.append(msg)
-                logger.error(msg)
-                continue
-
-            if candles:
-                market_data[ticker] = candles
-                ticker_data_source[ticker] = "pykrx"
-                logger.info("Fetched %s candles via PyKRX for %s", len(candles), ticker)
-                last_date = str(candles[-1].get("date") or "")
-                if last_date:
-                    latest_dates[ticker] = last_date
-            else:
-                msg = f"{ticker}: PyKRX returned no data"
-                failures.append(msg)
-                logger.warning(msg)
-
-        if tickers and not pykrx_warning_added:
-            failures.append(
-                "Warning: PyKRX provider data is end-of-day and may lag intraday feeds."
-            )
-            pykrx_warning_added = True
-    else:
-        if tickers:
-            failures.append(f"Provider '{cfg.data_provider}' not yet implemented")
-            fatal_failure = True
-
     if not tickers:
         msg = "No tickers provided (watchlist empty or missing)"
         failures.append(msg)
         logger.error(msg)
         fatal_failure = True
 
-    candidates = []
-    eval_settings = EvaluationSettings(
-        use_sma200_filter=cfg.use_sma200_filter,
-        gap_atr_multiplier=cfg.gap_atr_multiplier,
-        min_dollar_volume=cfg.min_dollar_volume,
-        us_min_dollar_volume=cfg.us_min_dollar_volume,
-        min_history_bars=cfg.min_history_bars,
-        exclude_etf_etn=cfg.exclude_etf_etn,
-        require_slope_up=cfg.require_slope_up,
-        rs_lookback_days=cfg.rs_lookback_days,
-        rs_benchmark_return=cfg.rs_benchmark_return,
-        min_price=cfg.min_price,
-        us_min_price=cfg.us_min_price,
+    return ScanUniverse(
+        tickers=tickers, screener_meta=screener_meta_map, failures=failures, fatal=fatal_failure
     )
-    hybrid_settings = HybridEvaluationSettings(
-        sma_trend_period=cfg.hybrid.sma_trend_period,
-        ema_short_period=cfg.hybrid.ema_short_period,
-        ema_mid_period=cfg.hybrid.ema_mid_period,
-        rsi_period=cfg.hybrid.rsi_period,
-        rsi_zone_low=cfg.hybrid.rsi_zone_low,
-        rsi_zone_high=cfg.hybrid.rsi_zone_high,
-        rsi_oversold_low=cfg.hybrid.rsi_oversold_low,
-        rsi_oversold_high=cfg.hybrid.rsi_oversold_high,
-        pullback_max_bars=cfg.hybrid.pullback_max_bars,
-        breakout_consolidation_min_bars=cfg.hybrid.breakout_consolidation_min_bars,
-        breakout_consolidation_max_bars=cfg.hybrid.breakout_consolidation_max_bars,
-        volume_lookback_days=cfg.hybrid.volume_lookback_days,
-        max_gap_pct=cfg.hybrid.max_gap_pct,
-        use_sma60_filter=cfg.hybrid.use_sma60_filter,
-        sma60_period=cfg.hybrid.sma60_period,
-        kr_breakout_requires_confirmation=cfg.hybrid.kr_breakout_requires_confirmation,
-        gap_atr_multiplier=cfg.gap_atr_multiplier,
-        min_history_bars=cfg.min_history_bars,
-        min_price=cfg.min_price,
-        us_min_price=cfg.us_min_price,
-        min_dollar_volume=cfg.min_dollar_volume,
-        us_min_dollar_volume=cfg.us_min_dollar_volume,
-        exclude_etf_etn=cfg.exclude_etf_etn,
+
+
+def needs_us_holidays(cfg: Config, ticker_currency: dict[str, str]) -> bool:
+    return "US" in cfg.universe_markets or any(
+        currency.upper() == "USD" for currency in ticker_currency.values()
     )
-    for ticker in tickers:
-        candles = market_data.get(ticker)
-        if not candles:
-            continue
-        meta = dict(screener_meta_map.get(ticker, {}))
+
+
+def _fetched_batches(
+    session: MarketDataSession,
+    tickers: list[str],
+    item_for: Callable[[str, CandleSeries], BatchItem],
+    *,
+    depth: int,
+) -> Iterator[list[BatchItem]]:
+    """Batch items of the tickers with candles, grouped for evaluation.
+
+    With ``depth`` 0 everything is fetched first and evaluated as one batch
+    in universe order. Otherwise the session streams on a background stage
+    into a queue of ``depth`` items, and each batch of ``depth`` items is
+    evaluated while the next one is still being fetched.
+    """
+    if depth <= 0:
+        session.fetch(tickers)
+        batch = [item_for(t, session.candles[t]) for t in tickers if session.candles.get(t)]
+        if batch:
+            yield batch
+        return
+
+    fetched = (
+        item_for(ticker, candles)
+        for ticker, candles in session.stream(tickers, keep=False)
+        if candles
+    )
+    batch = []
+    for item in staged(fetched, depth=depth, name="sab-fetch-stage"):
+        batch.append(item)
+        if len(batch) >= depth:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def evaluate_scan(
+    cfg: Config,
+    session: MarketDataSession,
+    universe: ScanUniverse,
+    *,
+    indicator_memo: IndicatorMemo | None = None,
+    workers: int | None = None,
+) -> int:
+    """Fetch (unless already loaded), evaluate and write the buy report for ``universe``."""
+    logger = logging.getLogger(__name__)
+    tickers = universe.tickers
+    ticker_currency = universe.currencies
+    fx_rate, fx_meta_note = session.resolve_fx(ticker_currency, tickers)
+
+    us_holidays_cache: dict[str, HolidayEntry] = {}
+    if cfg.data_provider == "kis" and session.kis_client:
+        # Preload US holiday cache once when needed
+        if needs_us_holidays(cfg, ticker_currency):
+            us_holidays_cache = session.us_holidays()
+    eval_settings = evaluation_settings(cfg)
+    hybrid_settings = hybrid_evaluation_settings(cfg)
+
+    def item_for(ticker: str, candles: CandleSeries) -> BatchItem:
+        meta = dict(universe.screener_meta.get(ticker, {}))
         meta["currency"] = ticker_currency.get(ticker, "KRW")
-        base_symbol, suffix = _split_overseas(ticker)
         if "exchange" not in meta:
-            meta["exchange"] = _excd_from_suffix(suffix)
-        data_source = ticker_data_source.get(ticker, cfg.data_provider)
+            meta["exchange"] = candle_target(ticker)[1]
+        data_source = session.sources.get(ticker, cfg.data_provider)
         meta["data_source"] = data_source
         meta["provider"] = data_source
         if fx_rate is not None:
             meta["usd_krw_rate"] = fx_rate
-        if cfg.strategy_mode == "sma_ema_hybrid":
-            result_hybrid = evaluate_ticker_hybrid(ticker, candles, hybrid_settings, meta)
-            if result_hybrid.candidate:
-                candidates.append(result_hybrid.candidate)
-            elif (
-                result_hybrid.reason
-                and result_hybrid.reason != "Did not meet hybrid signal criteria"
-            ):
-                failures.append(f"{ticker}: {result_hybrid.reason}")
-                logger.warning("%s: %s", ticker, result_hybrid.reason)
-            continue
-
-        result = evaluate_ticker(ticker, candles, eval_settings, meta)
+        return (ticker, candles, meta)
+
+    hybrid = cfg.strategy_mode == "sma_ema_hybrid"
+    settings = hybrid_settings if hybrid else eval_settings
+    evaluate = functools.partial(
+        evaluate_batch_hybrid if hybrid else evaluate_batch, settings=settings
+    )
+    result_type = HybridEvaluationResult if hybrid else EvaluationResult
+    eval_cache = (
+        EvalResultCache(cfg.data_dir, cfg.strategy_mode, settings) if cfg.eval_cache else None
+    )
+    eval_workers = workers if workers is not None else cfg.eval_workers
+    filter_stats = None if hybrid else FilterStats()
+
+    # Batches arrive in fetch order; results are put back in universe order
+    # so the report matches a fetch-everything-first run.
+    position = {ticker: i for i, ticker in enumerate(tickers)}
+    evaluated: list[tuple[int, Any]] = []
+    # the pool starts before the fetch stage so no worker is forked from a
+    # process that is already running fetch threads
+    with (
+        EvaluationPool(eval_workers) as pool,
+        use_indicator_memo(indicator_memo),
+        use_filter_stats(filter_stats),
+    ):
+        for batch in _fetched_batches(session, tickers, item_for, depth=cfg.pipeline_depth):
+            results = evaluate_cached(
+                batch,
+                lambda items: pool.evaluate(items, evaluate),
+                result_type,
+                eval_cache,
+            )
+            evaluated.extend(
+                (position[ticker], result)
+                for (ticker, _, _), result in zip(batch, results, strict=True)
+            )
+    evaluated.sort(key=lambda entry: entry[0])
+
+    failures: list[str] = [*session.notes, *universe.failures, *session.failures_for(tickers)]
+    fatal_failure = session.fatal or universe.fatal
+    latest_dates = session.latest_dates
+
+    candidates = []
+    no_signal = NO_HYBRID_SIGNAL if hybrid else "Did not meet signal criteria"
+    if filter_stats is not None:
+        for line in filter_stats.lines():
+            logger.info("Filter %s", line)
+    for _, result in evaluated:
         if result.candidate:
             candidates.append(result.candidate)
-        elif result.reason and result.reason != "Did not meet signal criteria":
-            failures.append(f"{ticker}: {result.reason}")
-            logger.warning("%s: %s", ticker, result.reason)
-
+        elif result.reason and result.reason != no_signal:
+            failures.append(f"{result.ticker}: {result.reason}")
+            logger.warning("%s: %s", result.ticker, result.reason)
+
+    if indicator_memo is not None:
+        logger.info("Indicator memo: %s", indicator_memo.describe())
+    if eval_cache is not None:
+        eval_cache.save()
+        logger.info("Eval cache: %s", eval_cache.describe())
     candidates.sort(key=lambda c: c.get("score_value", 0.0), reverse=True)
 
     for candidate in candidates:
@@ -576,7 +450,7 @@ def run_scan(
             else:
                 candidate["market_status"] = f"US market {us_market_status()}"
 
-    if tickers and not market_data:
+    if tickers and not evaluated:
         fatal_failure = True
         logger.error("Failed to retrieve market data for requested tickers")
 
@@ -586,9 +460,10 @@ def run_scan(
         universe_count=len(tickers),
         candidates=candidates,
         failures=failures,
-        cache_hint=cache_hint,
+        cache_hint=session.cache_hint,
         report_type="buy",
         strategy_mode=cfg.strategy_mode,
+        candle_note=session.refresh_note(tickers),
     )
 
     logger.info("Buy report written to: %s", out_path)
@@ -601,3 +476,28 @@ def run_scan(
         logger.warning("Scan completed with warnings. See report for details.")
 
     return 0
+
+
+def run_scan(
+    *,
+    limit: int | None,
+    watchlist_path: str | None,
+    provider: str | None,
+    screener_limit: int | None = None,
+    universe: str | None = None,
+    indicator_memo: IndicatorMemo | None = None,
+    workers: int | None = None,
+) -> int:
+    logger = logging.getLogger(__name__)
+    cfg: Config = load_config(provider_override=provider, limit_override=limit)
+    set_indicator_backend(cfg.indicator_backend)
+
+    session = MarketDataSession(cfg, logger=logger)
+    scan = scan_universe(
+        cfg,
+        session,
+        watchlist_path=watchlist_path,
+        screener_limit=screener_limit,
+        universe=universe,
+    )
+    return evaluate_scan(cfg, session, scan, indicator_memo=indicator_memo, workers=workers)
@@ -4,6 +4,7 @@ import datetime as dt
 from dataclasses import dataclass
 from typing import Any
 
+from ..data.instrument import Instrument, exchange_code
 from ..data.kis_client import KISClient
 
 
@@ -44,7 +45,7 @@ class KISOverseasScreener:
                 sym = self._symbol_from_row(row)
                 if not sym:
                     continue
-                ticker = sym if "." in sym else f"{sym}.{exch}"
+                ticker = self._ticker(sym, exch)
                 if ticker in tickers:
                     continue
                 tickers.append(ticker)
@@ -72,18 +73,16 @@ class KISOverseasScreener:
 
     @staticmethod
     def _normalize_exchange(exchange: str) -> str:
-        mapping = {
-            "US": "NAS",
-            "NASDAQ": "NAS",
-            "NASD": "NAS",
-            "NAS": "NAS",
-            "NYSE": "NYS",
-            "NYS": "NYS",
-            "AMEX": "AMS",
-            "AMS": "AMS",
-        }
         code = (exchange or "NAS").strip().upper()
-        return mapping.get(code, code)
+        return exchange_code(code) or code
+
+    @staticmethod
+    def _ticker(symbol: str, exchange: str) -> str:
+        # dotted share classes (BRK.B) still need the exchange suffix
+        parsed = Instrument.parse(symbol)
+        if parsed.exchange:
+            return parsed.ticker
+        return Instrument(symbol=symbol, exchange=exchange).ticker
 
     def _fetch_rank(self, metric: str, exchange: str, limit: int) -> list[dict[str, Any]]:
         if metric in {"market_cap", "marketcap"}:
@@ -6,6 +6,7 @@ from dataclasses import dataclass
 from typing import Any
 
 from ..data.cache import load_json, save_json
+from ..data.instrument import Instrument
 from ..data.kis_client import KISClient
 
 logger = logging.getLogger(__name__)
@@ -54,7 +55,7 @@ class KISScreener:
             if request.min_dollar_volume and amount < request.min_dollar_volume:
                 continue
 
-            ticker = str(row.get("ticker", "")).strip()
+            ticker = Instrument.parse(str(row.get("ticker", ""))).ticker
             if not ticker:
                 continue
             if ticker in tickers:
@@ -1,260 +1,34 @@
 from __future__ import annotations
 
+import functools
 import logging
 import math
+from collections.abc import Sequence
 from typing import Any
 
 from .config import Config, load_config
-from .data.cache import load_json, save_json
-from .data.kis_client import KISAuthError, KISClient, KISClientError, KISCredentials
-from .data.pykrx_client import (
-    PykrxClient,
-    PykrxClientError,
-    PykrxNotInstalledError,
+from .data.candles import CandleSeries
+from .holdings_loader import Holding
+from .market_data import (
+    MarketDataSession,
+    _infer_currency_from_ticker,
+    candle_target,
 )
-from .fx import SUFFIX_TO_EXCD, resolve_fx_rate
 from .report.sell_report import SellReportRow, write_sell_report
 from .signals.hybrid_sell import (
     HybridSellEvaluation,
     HybridSellSettings,
     evaluate_sell_signals_hybrid,
 )
+from .signals.indicator_memo import IndicatorMemo, use_indicator_memo
+from .signals.indicators import set_backend as set_indicator_backend
+from .signals.parallel import evaluate_parallel
 from .signals.sell_rules import SellEvaluation, SellSettings, evaluate_sell_signals
 
 
-def _infer_env_from_base(base_url: str) -> str:
-    return "demo" if "vts" in base_url.lower() else "real"
-
-
-def _normalize_suffix(suffix: str | None) -> str:
-    if not suffix:
-        return ""
-    return "".join(ch for ch in suffix.upper() if ch.isalnum())
-
-
-US_SUFFIXES = {_normalize_suffix(s) for s in SUFFIX_TO_EXCD.keys()}
-
-
-def _split_symbol_and_suffix(ticker: str) -> tuple[str, str | None]:
-    if "." not in ticker:
-        return ticker.strip().upper(), None
-    base, suffix = ticker.rsplit(".", 1)
-    return base.strip().upper(), suffix.strip().upper()
-
-
-def _exchange_from_suffix(suffix: str | None) -> str | None:
-    if not suffix:
-        return None
-    norm = _normalize_suffix(suffix)
-    for key, value in SUFFIX_TO_EXCD.items():
-        if _normalize_suffix(key) == norm:
-            return value
-    return SUFFIX_TO_EXCD.get(norm)
-
-
-def _infer_currency_from_ticker(ticker: str) -> str:
-    _, suffix = _split_symbol_and_suffix(ticker)
-    norm = _normalize_suffix(suffix)
-    if norm in US_SUFFIXES:
-        return "USD"
-    return "KRW"
-
-
-def run_sell(*, provider: str | None) -> int:
-    logger = logging.getLogger(__name__)
-    cfg: Config = load_config(provider_override=provider)
-
-    holdings = cfg.holdings.holdings
-    if not holdings:
-        logger.warning("No holdings configured. Generating empty sell report.")
-
-    tickers = [h.ticker for h in holdings if h.ticker]
-    unique_tickers = list(dict.fromkeys(tickers))
-
-    ticker_currency: dict[str, str] = {}
-    for holding in holdings:
-        if not holding.ticker:
-            continue
-        currency = (holding.entry_currency or "").strip().upper()
-        if not currency:
-            currency = _infer_currency_from_ticker(holding.ticker)
-        ticker_currency[holding.ticker] = currency
-
-    failures: list[str] = []
-    market_data: dict[str, list[dict[str, Any]]] = {}
-    ticker_data_source: dict[str, str] = {}
-    cache_hint: str | None = None
-    fatal_failure = False
-
-    kis_client: KISClient | None = None
-    pykrx_client: PykrxClient | None = None
-    pykrx_init_error: str | None = None
-    pykrx_warning_added = False
-    missing_logged: set[str] = set()
-
-    def ensure_pykrx_client() -> PykrxClient | None:
-        nonlocal pykrx_client, pykrx_init_error
-        if pykrx_client is not None:
-            return pykrx_client
-        if pykrx_init_error:
-            return None
-        try:
-            pykrx_client = PykrxClient(cache_dir=cfg.data_dir)
-            logger.info("PyKRX client initialized")
-            return pykrx_client
-        except PykrxNotInstalledError as exc:
-            pykrx_init_error = str(exc)
-            logger.warning("PyKRX unavailable: %s", exc)
-        except PykrxClientError as exc:
-            pykrx_init_error = str(exc)
-            logger.error("PyKRX init failed: %s", exc)
-        return None
-
-    if cfg.data_provider == "kis":
-        if not (cfg.kis_app_key and cfg.kis_app_secret and cfg.kis_base_url):
-            msg = "KIS credentials missing. Set KIS_APP_KEY, KIS_APP_SECRET, KIS_BASE_URL in .env (see docs/kis-setup.md)."
-            failures.append(msg)
-            logger.error(msg)
-            fatal_failure = True
-        else:
-            creds = KISCredentials(
-                app_key=cfg.kis_app_key,
-                app_secret=cfg.kis_app_secret,
-                base_url=cfg.kis_base_url,
-                env=_infer_env_from_base(cfg.kis_base_url),
-            )
-            min_interval = None
-            if cfg.kis_min_interval_ms is not None:
-                min_interval = max(0.0, cfg.kis_min_interval_ms / 1000.0)
-            kis_client = KISClient(creds, cache_dir=cfg.data_dir, min_interval=min_interval)
-            cache_hint = kis_client.cache_status
-    elif cfg.data_provider == "pykrx":
-        client = ensure_pykrx_client()
-        if client is None:
-            msg = "PyKRX provider selected but pykrx package is unavailable. Install with 'uv add pykrx'."
-            failures.append(msg)
-            logger.error(msg)
-            fatal_failure = True
-        else:
-            pykrx_client = client
-            cache_hint = "pykrx"
-    else:
-        failures.append(f"Provider '{cfg.data_provider}' not supported for sell command")
-        logger.error("Unsupported provider '%s'", cfg.data_provider)
-        fatal_failure = True
-
-    target_bars = max(cfg.min_history_bars, 200)
-
-    fx_rate: float | None = None
-    fx_note: str | None = None
-    if unique_tickers:
-        resolved_rate, resolved_note, fx_messages = resolve_fx_rate(
-            cfg=cfg,
-            ticker_currency=ticker_currency,
-            tickers=unique_tickers,
-            kis_client=kis_client,
-            logger=logger,
-        )
-        fx_rate = resolved_rate
-        fx_note = resolved_note
-        if fx_messages:
-            failures.extend(fx_messages)
-
-    if cfg.data_provider == "kis" and kis_client:
-        for ticker in unique_tickers:
-            base_symbol, suffix = _split_symbol_and_suffix(ticker)
-            exch = _exchange_from_suffix(suffix)
-            cache_key = (
-                f"candles_overseas_{exch}_{base_symbol}" if exch else f"candles_{base_symbol}"
-            )
-            cached = load_json(cfg.data_dir, cache_key)
-            if isinstance(cached, list) and cached:
-                market_data[ticker] = cached
-                ticker_data_source.setdefault(ticker, cfg.data_provider)
-            try:
-                if exch:
-                    candles = kis_client.overseas_daily_candles(
-                        symbol=base_symbol, exchange=exch, count=target_bars
-                    )
-                else:
-                    candles = kis_client.daily_candles(base_symbol, count=target_bars)
-                if candles:
-                    market_data[ticker] = candles
-                    ticker_data_source[ticker] = "kis"
-                    save_json(cfg.data_dir, cache_key, candles)
-                    logger.info("Fetched %s candles for %s", len(candles), ticker)
-                else:
-                    msg = f"{ticker}: No candle data returned"
-                    failures.append(msg)
-                    logger.warning(msg)
-            except (KISClientError, KISAuthError) as exc:
-                if ticker in market_data:
-                    msg = f"{ticker}: API error, using cached data ({exc})"
-                    failures.append(msg)
-                    logger.warning(msg)
-                else:
-                    fallback_client = ensure_pykrx_client()
-                    fallback_error = pykrx_init_error
-                    if fallback_client is not None and not exch:
-                        # PyKRX supports KR tickers only
-                        try:
-                            candles = fallback_client.daily_candles(base_symbol, count=target_bars)
-                        except PykrxClientError as py_exc:
-                            fallback_client = None
-                            fallback_error = str(py_exc)
-                        else:
-                            if candles:
-                                market_data[ticker] = candles
-                                ticker_data_source[ticker] = "pykrx"
-                                logger.warning(
-                                    "%s: KIS error (%s); used PyKRX fallback (%s candles)",
-                                    ticker,
-                                    exc,
-                                    len(candles),
-                                )
-                                failures.append(f"{ticker}: KIS error ({exc}); used PyKRX fallback")
-                                if not pykrx_warning_added:
-                                    failures.append(
-                                        "Warning: PyKRX fallback data is end-of-day and may differ from KIS."
-                                    )
-                                    pykrx_warning_added = True
-                                continue
-                            fallback_error = "No data from PyKRX"
-                            fallback_client = None
-                    msg = f"{ticker}: {exc}"
-                    if (fallback_client is None or exch) and fallback_error:
-                        msg += f" (PyKRX fallback unavailable: {fallback_error})"
-                    failures.append(msg)
-                    logger.error(msg)
-    elif cfg.data_provider == "pykrx" and pykrx_client:
-        for ticker in unique_tickers:
-            try:
-                candles = pykrx_client.daily_candles(ticker, count=target_bars)
-            except PykrxClientError as exc:
-                msg = f"{ticker}: PyKRX error ({exc})"
-                failures.append(msg)
-                logger.error(msg)
-                continue
-
-            if candles:
-                market_data[ticker] = candles
-                ticker_data_source[ticker] = "pykrx"
-                logger.info("Fetched %s candles via PyKRX for %s", len(candles), ticker)
-            else:
-                msg = f"{ticker}: PyKRX returned no data"
-                failures.append(msg)
-                logger.warning(msg)
-
-        if unique_tickers and not pykrx_warning_added:
-            failures.append(
-                "Warning: PyKRX provider data is end-of-day and may lag intraday feeds."
-            )
-            pykrx_warning_added = True
-
-    results: list[SellReportRow] = []
-    order = {"SELL": 0, "REVIEW": 1, "HOLD": 2}
-
-    settings = SellSettings(
+def sell_settings(cfg: Config) -> SellSettings:
+    """Sell settings for the EMA cross rules from the loaded config."""
+    return SellSettings(
         atr_trail_multiplier=cfg.sell_atr_multiplier,
         time_stop_days=cfg.sell_time_stop_days,
         require_sma200=cfg.sell_require_sma200,
@@ -265,7 +39,10 @@ def run_sell(*, provider: str | None) -> int:
         min_bars=max(cfg.sell_min_bars, 2),
     )
 
-    hybrid_settings = HybridSellSettings(
+
+def hybrid_sell_settings(cfg: Config) -> HybridSellSettings:
+    """Sell settings for the SMA+EMA hybrid rules from the loaded config."""
+    return HybridSellSettings(
         profit_target_low=cfg.hybrid_sell.profit_target_low,
         profit_target_high=cfg.hybrid_sell.profit_target_high,
         partial_profit_floor=cfg.hybrid_sell.partial_profit_floor,
@@ -282,6 +59,74 @@ def run_sell(*, provider: str | None) -> int:
         time_stop_profit_floor=cfg.hybrid_sell.time_stop_profit_floor,
     )
 
+
+def _evaluate_holdings(
+    jobs: Sequence[tuple[str, CandleSeries, dict[str, Any]]],
+    *,
+    sell_mode: str,
+    settings: SellSettings,
+    hybrid_settings: HybridSellSettings,
+) -> list[HybridSellEvaluation | SellEvaluation]:
+    if sell_mode == "sma_ema_hybrid":
+        return [
+            evaluate_sell_signals_hybrid(ticker, candles, holding, hybrid_settings)
+            for ticker, candles, holding in jobs
+        ]
+    return [
+        evaluate_sell_signals(ticker, candles, holding, settings)
+        for ticker, candles, holding in jobs
+    ]
+
+
+def holding_currencies(holdings: Sequence[Holding]) -> dict[str, str]:
+    """Currency per holdings ticker: the entry currency, else inferred from the suffix."""
+    ticker_currency: dict[str, str] = {}
+    for holding in holdings:
+        if not holding.ticker:
+            continue
+        currency = (holding.entry_currency or "").strip().upper()
+        if not currency:
+            currency = _infer_currency_from_ticker(holding.ticker)
+        ticker_currency[holding.ticker] = currency
+    return ticker_currency
+
+
+def evaluate_sell(
+    cfg: Config,
+    session: MarketDataSession,
+    *,
+    indicator_memo: IndicatorMemo | None = None,
+    workers: int | None = None,
+) -> int:
+    """Fetch (unless already loaded), evaluate and write the sell report for the holdings."""
+    logger = logging.getLogger(__name__)
+    holdings = cfg.holdings.holdings
+    if not holdings:
+        logger.warning("No holdings configured. Generating empty sell report.")
+
+    tickers = [h.ticker for h in holdings if h.ticker]
+    unique_tickers = list(dict.fromkeys(tickers))
+    ticker_currency = holding_currencies(holdings)
+
+    fx_rate: float | None = None
+    fx_note: str | None = None
+    if unique_tickers:
+        fx_rate, fx_note = session.resolve_fx(ticker_currency, unique_tickers)
+    session.fetch(unique_tickers)
+    market_data = session.candles
+
+    failures: list[str] = [*session.notes, *session.failures_for(unique_tickers)]
+    fatal_failure = session.fatal
+    missing_logged: set[str] = set()
+
+    results: list[SellReportRow] = []
+    order = {"SELL": 0, "REVIEW": 1, "HOLD": 2}
+
+    settings = sell_settings(cfg)
+    hybrid_settings = hybrid_sell_settings(cfg)
+
+    jobs: list[tuple[str, CandleSeries, dict[str, Any]]] = []
+    evaluated_holdings: list[Holding] = []
     for holding in holdings:
         ticker = holding.ticker
         candles = market_data.get(ticker)
@@ -298,23 +143,27 @@ def run_sell(*, provider: str | None) -> int:
             "strategy": holding.strategy,
             "entry_currency": holding.entry_currency or ticker_currency.get(ticker),
             "currency": ticker_currency.get(ticker),
-            "exchange": _exchange_from_suffix(suffix),
-            "data_source": ticker_data_source.get(ticker, cfg.data_provider),
+            "exchange": candle_target(ticker)[1],
+            "data_source": session.sources.get(ticker, cfg.data_provider),
         }
-        if cfg.sell_mode == "sma_ema_hybrid":
-            evaluation: HybridSellEvaluation | SellEvaluation = evaluate_sell_signals_hybrid(
-                ticker,
-                candles,
-                holding_dict,
-                hybrid_settings,
-            )
-        else:
-            evaluation = evaluate_sell_signals(
-                ticker,
-                candles,
-                holding_dict,
-                settings,
-            )
+        jobs.append((ticker, candles, holding_dict))
+        evaluated_holdings.append(holding)
+
+    with use_indicator_memo(indicator_memo):
+        evaluations = evaluate_parallel(
+            jobs,
+            functools.partial(
+                _evaluate_holdings,
+                sell_mode=cfg.sell_mode,
+                settings=settings,
+                hybrid_settings=hybrid_settings,
+            ),
+            workers=workers if workers is not None else cfg.eval_workers,
+        )
+
+    for holding, (ticker, candles, _), evaluation in zip(
+        evaluated_holdings, jobs, evaluations, strict=True
+    ):
         entry_price = holding.entry_price or None
         if entry_price is not None and (isinstance(entry_price, float) and math.isnan(entry_price)):
             entry_price = None
@@ -364,6 +213,8 @@ def run_sell(*, provider: str | None) -> int:
         )
         results.append(row)
 
+    if indicator_memo is not None:
+        logger.info("Indicator memo: %s", indicator_memo.describe())
     results.sort(key=lambda r: (order.get(r.action, 99), r.ticker))
 
     sell_mode_note: str | None = None
@@ -380,13 +231,14 @@ def run_sell(*, provider: str | None) -> int:
         provider=cfg.data_provider,
         evaluated=results,
         failures=failures,
-        cache_hint=cache_hint,
+        cache_hint=session.cache_hint,
         atr_trail_multiplier=cfg.sell_atr_multiplier,
         time_stop_days=cfg.sell_time_stop_days,
         fx_rate=fx_rate,
         fx_note=fx_note,
         sell_mode=cfg.sell_mode,
         sell_mode_note=sell_mode_note,
+        candle_note=session.refresh_note(unique_tickers),
     )
 
     logger.info("Sell report written to: %s", out_path)
@@ -401,4 +253,18 @@ def run_sell(*, provider: str | None) -> int:
     return 0
 
 
+def run_sell(
+    *,
+    provider: str | None,
+    indicator_memo: IndicatorMemo | None = None,
+    workers: int | None = None,
+) -> int:
+    logger = logging.getLogger(__name__)
+    cfg: Config = load_config(provider_override=provider)
+    set_indicator_backend(cfg.indicator_backend)
+
+    session = MarketDataSession(cfg, logger=logger)
+    return evaluate_sell(cfg, session, indicator_memo=indicator_memo, workers=workers)
+
+
 __all__ = ["run_sell"]
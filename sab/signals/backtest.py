@@ -0,0 +1,291 @@
+"""Walk-forward replay of the live buy and sell evaluators over cached history.
+
+On every bar ``i`` the live scan would have evaluated the trailing window
+of ``window`` bars ending at ``i`` (the scan loads
+``max(min_history_bars, 200)`` bars). :func:`replay_signals` builds all of
+those windows as O(1) :class:`~sab.data.candles.Candles` views and hands
+them to :func:`~sab.signals.batch_eval.evaluate_batch` /
+:func:`~sab.signals.batch_eval.evaluate_batch_hybrid` as one batch, so the
+indicators for every date are computed in a single ``dates x window``
+matrix pass. The few dates that survive the matrix screen go through the
+live per-ticker evaluator, and each date gets exactly the result the scan
+would have produced that day.
+
+:func:`simulate_trades` turns the signals into trades: a position opens at
+the next bar's open after a candidate, and from that bar on the live sell
+evaluator runs on each day's window with ``as_of`` set to the bar date
+(so time stops count backtest days). The first ``SELL`` closes the
+position at the following bar's open. While a position is open, new buy
+signals for the ticker are ignored; positions still open at the end are
+closed at the last close with reason ``"open"``.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from ..data.candles import Candles, CandleSeries, as_candles
+from .batch_eval import BatchItem, IndicatorMatrices, evaluate_batch, evaluate_batch_hybrid
+from .evaluator import EvaluationSettings
+from .hybrid_buy import HybridEvaluationSettings
+from .hybrid_sell import HybridSellSettings, evaluate_sell_signals_hybrid
+from .sell_rules import SellSettings, evaluate_sell_signals
+
+EXIT_OPEN = "open"
+
+
+@dataclass
+class BacktestSettings:
+    strategy_mode: str
+    buy: EvaluationSettings | HybridEvaluationSettings
+    sell_mode: str
+    sell: SellSettings | HybridSellSettings
+    window: int
+    start_date: str | None = None
+    end_date: str | None = None
+
+
+@dataclass
+class Signal:
+    index: int
+    date: str
+    candidate: dict[str, Any]
+
+
+@dataclass
+class Trade:
+    ticker: str
+    entry_date: str
+    entry_price: float
+    exit_date: str
+    exit_price: float
+    bars_held: int
+    exit_reason: str
+    pattern: str | None = None
+
+    @property
+    def return_pct(self) -> float:
+        return (self.exit_price - self.entry_price) / self.entry_price
+
+
+@dataclass
+class TickerBacktest:
+    ticker: str
+    signals: int = 0
+    trades: list[Trade] = field(default_factory=list)
+
+
+@dataclass
+class BacktestSummary:
+    trades: int
+    wins: int
+    win_rate: float
+    avg_return: float
+    median_return: float
+    profit_factor: float | None
+    avg_bars_held: float
+    best: float
+    worst: float
+
+
+def _bar_range(candles: Candles, settings: BacktestSettings) -> range:
+    dates = candles.date
+    start = int(np.searchsorted(dates, int(settings.start_date))) if settings.start_date else 0
+    end = (
+        int(np.searchsorted(dates, int(settings.end_date), side="right"))
+        if settings.end_date
+        else len(candles)
+    )
+    return range(start, end)
+
+
+def _window(candles: Candles, index: int, window: int) -> Candles:
+    return candles[max(0, index - window + 1) : index + 1]
+
+
+def replay_windows(
+    ticker: str,
+    candles: CandleSeries,
+    meta: dict[str, Any],
+    settings: BacktestSettings,
+) -> list[BatchItem]:
+    """One ``(ticker, window, meta)`` item per replayed bar, as the scan saw it."""
+    series = as_candles(candles)
+    return [
+        (ticker, _window(series, i, settings.window), meta) for i in _bar_range(series, settings)
+    ]
+
+
+def replay_signals(
+    ticker: str,
+    candles: CandleSeries,
+    meta: dict[str, Any],
+    settings: BacktestSettings,
+    *,
+    matrices: IndicatorMatrices | None = None,
+) -> list[Signal]:
+    """Buy candidates the live scan would have produced on each bar.
+
+    ``matrices`` (hybrid mode only) must be built from
+    :func:`replay_windows` with the same window and date range.
+    """
+    series = as_candles(candles)
+    bars = _bar_range(series, settings)
+    items = replay_windows(ticker, series, meta, settings)
+    if not items:
+        return []
+    if settings.strategy_mode == "sma_ema_hybrid":
+        results: Sequence[Any] = evaluate_batch_hybrid(
+            items,
+            settings.buy,  # type: ignore[arg-type]
+            matrices=matrices,
+        )
+    else:
+        results = evaluate_batch(items, settings.buy)  # type: ignore[arg-type]
+    dates = series.dates()
+    return [
+        Signal(i, dates[i], result.candidate)
+        for i, result in zip(bars, results, strict=True)
+        if result.candidate
+    ]
+
+
+def _price(candles: Candles, index: int) -> float:
+    """Open of bar ``index``, falling back to its close when the open is missing."""
+    value = float(candles.open[index])
+    if math.isnan(value) or value <= 0:
+        value = float(candles.close[index])
+    return value
+
+
+def simulate_trades(
+    ticker: str,
+    candles: CandleSeries,
+    meta: dict[str, Any],
+    signals: Sequence[Signal],
+    settings: BacktestSettings,
+) -> list[Trade]:
+    series = as_candles(candles)
+    dates = series.dates()
+    last = _bar_range(series, settings).stop - 1
+    trades: list[Trade] = []
+    free_from = 0
+    for signal in signals:
+        entry = signal.index + 1
+        if signal.index < free_from or entry > last:
+            continue
+        entry_price = _price(series, entry)
+        if math.isnan(entry_price) or entry_price <= 0:
+            continue
+        pattern = signal.candidate.get("pattern")
+        holding = {
+            "entry_price": entry_price,
+            "entry_date": dates[entry],
+            "strategy": pattern or "",
+            "entry_currency": meta.get("currency"),
+            "currency": meta.get("currency"),
+            "exchange": meta.get("exchange"),
+            "data_source": meta.get("data_source"),
+        }
+        exit_index, exit_price, reason = last, float(series.close[last]), EXIT_OPEN
+        for day in range(entry, last + 1):
+            as_of = dt.datetime.strptime(dates[day], "%Y%m%d").date()
+            window = _window(series, day, settings.window)
+            if settings.sell_mode == "sma_ema_hybrid":
+                evaluation: Any = evaluate_sell_signals_hybrid(
+                    ticker,
+                    window,
+                    holding,
+                    settings.sell,  # type: ignore[arg-type]
+                    as_of=as_of,
+                )
+            else:
+                evaluation = evaluate_sell_signals(
+                    ticker,
+                    window,
+                    holding,
+                    settings.sell,  # type: ignore[arg-type]
+                    as_of=as_of,
+                )
+            if evaluation.action == "SELL":
+                if day < last:
+                    exit_index, exit_price = day + 1, _price(series, day + 1)
+                else:
+                    exit_index, exit_price = day, float(series.close[day])
+                reason = "; ".join(evaluation.reasons)
+                break
+        trades.append(
+            Trade(
+                ticker=ticker,
+                entry_date=dates[entry],
+                entry_price=entry_price,
+                exit_date=dates[exit_index],
+                exit_price=exit_price,
+                bars_held=exit_index - entry,
+                exit_reason=reason,
+                pattern=pattern,
+            )
+        )
+        free_from = exit_index
+    return trades
+
+
+def backtest_ticker(
+    ticker: str,
+    candles: CandleSeries,
+    meta: dict[str, Any],
+    settings: BacktestSettings,
+) -> TickerBacktest:
+    signals = replay_signals(ticker, candles, meta, settings)
+    trades = simulate_trades(ticker, candles, meta, signals, settings)
+    return TickerBacktest(ticker, signals=len(signals), trades=trades)
+
+
+def backtest_batch(
+    items: Sequence[tuple[str, CandleSeries, dict[str, Any]]],
+    settings: BacktestSettings,
+) -> list[TickerBacktest]:
+    """:func:`backtest_ticker` for each ``(ticker, candles, meta)`` item."""
+    return [backtest_ticker(ticker, candles, meta, settings) for ticker, candles, meta in items]
+
+
+def summarize(trades: Sequence[Trade]) -> BacktestSummary:
+    if not trades:
+        return BacktestSummary(0, 0, 0.0, 0.0, 0.0, None, 0.0, 0.0, 0.0)
+    returns = np.array([t.return_pct for t in trades])
+    gains = returns[returns > 0].sum()
+    losses = -returns[returns < 0].sum()
+    wins = int((returns > 0).sum())
+    return BacktestSummary(
+        trades=len(trades),
+        wins=wins,
+        win_rate=wins / len(trades),
+        avg_return=float(returns.mean()),
+        median_return=float(np.median(returns)),
+        profit_factor=float(gains / losses) if losses > 0 else None,
+        avg_bars_held=float(np.mean([t.bars_held for t in trades])),
+        best=float(returns.max()),
+        worst=float(returns.min()),
+    )
+
+
+__all__ = [
+    "EXIT_OPEN",
+    "BacktestSettings",
+    "BacktestSummary",
+    "Signal",
+    "TickerBacktest",
+    "Trade",
+    "backtest_batch",
+    "backtest_ticker",
+    "replay_signals",
+    "replay_windows",
+    "simulate_trades",
+    "summarize",
+]
@@ -0,0 +1,312 @@
+"""Cross-sectional evaluation of a whole universe at once.
+
+The per-ticker evaluators run their cheap, data-only checks first and then
+compute indicators for every ticker that is still in play, even though
+nearly all of them then fail the first signal test (no EMA cross, or no
+hybrid pattern precondition). Here the indicators for all remaining
+tickers are computed in one pass over a ``tickers x bars`` matrix. Each row
+is left-aligned and NaN-padded after its evaluation bar, so recurrences
+and seeds see exactly the bars the per-ticker path sees. Tickers the
+matrix rejects beyond doubt get the same reason string the per-ticker
+evaluator would return. Everything else, including every candidate and
+any comparison within float noise of its threshold, goes through the
+original evaluator, so results are identical to calling it per ticker.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Mapping, Sequence
+from operator import itemgetter
+from typing import Any
+
+import numpy as np
+
+from ..data.candles import Candles, CandleSeries
+from . import indicators_np
+from .eval_index import choose_eval_index
+from .evaluator import (
+    EMA_CROSS_FILTERS,
+    EvaluationResult,
+    EvaluationSettings,
+    _evaluate_screened,
+    _TickerState,
+)
+from .filters import active_filter_stats
+from .hybrid_buy import (
+    HybridEvaluationResult,
+    HybridEvaluationSettings,
+    _basic_filters,
+    evaluate_ticker_hybrid,
+)
+
+# Relative slack for "beyond doubt" comparisons; far above the rounding
+# difference between indicator backends, far below any meaningful signal.
+_RTOL = 1e-9
+
+NO_HYBRID_SIGNAL = "Did not meet hybrid signal criteria"
+
+BatchItem = tuple[str, CandleSeries, dict[str, Any]]
+ArrayOrFloat = np.ndarray | float
+
+
+def _slack(a: ArrayOrFloat, b: ArrayOrFloat) -> np.ndarray:
+    return _RTOL * (np.abs(a) + np.abs(b) + 1.0)
+
+
+def _never_gt(a: ArrayOrFloat, b: ArrayOrFloat) -> np.ndarray:
+    """True where ``a > b`` is False on any backend (NaN counts as False)."""
+    return ~(a > b - _slack(a, b))
+
+
+def _never_ge(a: ArrayOrFloat, b: ArrayOrFloat) -> np.ndarray:
+    return ~(a >= b - _slack(a, b))
+
+
+def _never_le(a: ArrayOrFloat, b: ArrayOrFloat) -> np.ndarray:
+    return ~(a <= b + _slack(a, b))
+
+
+def _never_lt(a: ArrayOrFloat, b: ArrayOrFloat) -> np.ndarray:
+    return ~(a < b + _slack(a, b))
+
+
+def _always_gt(a: ArrayOrFloat, b: ArrayOrFloat) -> np.ndarray:
+    """True where ``a > b`` is True on any backend."""
+    return a > b + _slack(a, b)
+
+
+def _always_ge(a: ArrayOrFloat, b: ArrayOrFloat) -> np.ndarray:
+    return a >= b + _slack(a, b)
+
+
+def _always_le(a: ArrayOrFloat, b: ArrayOrFloat) -> np.ndarray:
+    return a <= b - _slack(a, b)
+
+
+def _series_matrix(
+    candles: Sequence[CandleSeries],
+    ends: Sequence[int],
+    field: str,
+    convert: Callable[[Mapping[str, Any]], Any],
+) -> np.ndarray:
+    """Left-aligned ``(rows, max_end + 1)`` float matrix, NaN after each end.
+
+    All bars are gathered in one flat pass and scattered into place, which
+    is much cheaper than filling the matrix row by row. :class:`Candles`
+    rows contribute their ``field`` column directly; dict rows go through
+    ``convert``.
+    """
+    lengths = np.asarray(ends) + 1
+    if all(isinstance(bars, Candles) for bars in candles):
+        flat = np.concatenate(
+            [bars.column(field)[: end + 1] for bars, end in zip(candles, ends, strict=True)]
+        )
+    else:
+        flat = np.array(
+            [convert(c) for bars, end in zip(candles, ends, strict=True) for c in bars[: end + 1]],
+            dtype=np.float64,
+        )
+    filled = np.arange(int(lengths.max())) < lengths[:, None]
+    out = np.full(filled.shape, np.nan)
+    out[filled] = flat
+    return out
+
+
+def _at(matrix: np.ndarray, ends: np.ndarray, offset: int = 0) -> np.ndarray:
+    return matrix[np.arange(len(ends)), ends - offset]
+
+
+# ---------------------------------------------------------------------------
+# EMA cross strategy
+
+
+def evaluate_batch(
+    items: Sequence[BatchItem], settings: EvaluationSettings
+) -> list[EvaluationResult]:
+    """Evaluate ``(ticker, candles, meta)`` items; same results as :func:`evaluate_ticker`."""
+    results: list[EvaluationResult | None] = [None] * len(items)
+    rows: list[int] = []
+    ends: list[int] = []
+    states: list[_TickerState] = []
+
+    for pos, (ticker, candles, meta) in enumerate(items):
+        # the data-only filters run per ticker, exactly as evaluate_ticker does
+        state = _TickerState(ticker, candles, settings, meta or {})
+        reason = EMA_CROSS_FILTERS.run(state, cheap_only=True)
+        if reason is not None:
+            results[pos] = EvaluationResult(ticker, None, reason)
+            continue
+        rows.append(pos)
+        ends.append(state.idx_eval)
+        states.append(state)
+
+    if rows:
+        _screen_ema_cross(items, rows, ends, results)
+
+    for pos, state in zip(rows, states, strict=True):
+        if results[pos] is None:
+            results[pos] = _evaluate_screened(state.ticker, state.candles, state)
+    return results  # type: ignore[return-value]
+
+
+def _screen_ema_cross(
+    items: Sequence[BatchItem],
+    rows: list[int],
+    ends: list[int],
+    results: list[EvaluationResult | None],
+) -> None:
+    started = time.perf_counter()
+    bars = [items[pos][1] for pos in rows]
+    closes = _series_matrix(bars, ends, "close", itemgetter("close"))
+    end = np.asarray(ends)
+
+    ema20 = indicators_np.ema(closes, 20)
+    ema50 = indicators_np.ema(closes, 50)
+    rsi14 = indicators_np.rsi(closes, 14)
+    e20, e20p = _at(ema20, end), _at(ema20, end, 1)
+    e50, e50p = _at(ema50, end), _at(ema50, end, 1)
+    r, rp = _at(rsi14, end), _at(rsi14, end, 1)
+
+    no_cross = _never_gt(e20, e50) | _never_le(e20p, e50p)
+    cross = _always_gt(e20, e50) & _always_le(e20p, e50p)
+    no_rsi = cross & (_never_gt(r, 30) | _never_le(rp, 30) | _never_lt(r, 70))
+
+    for i in np.flatnonzero(no_cross):
+        results[rows[i]] = EvaluationResult(
+            items[rows[i]][0], None, "EMA(20/50) cross not satisfied"
+        )
+    for i in np.flatnonzero(no_rsi):
+        results[rows[i]] = EvaluationResult(items[rows[i]][0], None, "RSI signal not satisfied")
+
+    stats = active_filter_stats()
+    if stats is not None:
+        # only the matrix rejections; the survivors record their own runs
+        rejected = int(no_cross.sum())
+        seconds = time.perf_counter() - started
+        stats.record("ema_cross", evaluated=rejected, rejected=rejected, seconds=seconds)
+        rejected = int(no_rsi.sum())
+        stats.record("rsi", evaluated=rejected, rejected=rejected, seconds=0.0)
+
+
+# ---------------------------------------------------------------------------
+# SMA + EMA hybrid strategy
+
+
+def _hybrid_float(field: str) -> Callable[[dict[str, Any]], float]:
+    return lambda c: float(c.get(field) or 0.0)
+
+
+def _provider(meta: dict[str, Any]) -> str:
+    return str(meta.get("data_source") or meta.get("provider") or "kis").lower()
+
+
+class IndicatorMatrices:
+    """Close matrix of a fixed item list plus indicator values computed on demand.
+
+    :func:`evaluate_batch_hybrid` builds one per call. Callers evaluating
+    many settings variants over the same items (parameter sweeps) build it
+    once with :meth:`for_items` and pass it in, so ``ema(closes, 10)`` is
+    computed once for every variant using period 10. Each row is its own
+    recurrence, so a row's values do not depend on the other rows.
+    """
+
+    def __init__(self, candles: Sequence[CandleSeries], ends: Sequence[int]) -> None:
+        self.ends = np.asarray(ends)
+        self._closes = _series_matrix(candles, ends, "close", _hybrid_float("close"))
+        self._values: dict[tuple[str, int], tuple[np.ndarray, np.ndarray]] = {}
+
+    @classmethod
+    def for_items(cls, items: Sequence[BatchItem]) -> IndicatorMatrices:
+        ends = [
+            choose_eval_index(candles, meta=meta or {}, provider=_provider(meta or {}))[0]
+            for _, candles, meta in items
+        ]
+        return cls([candles for _, candles, _ in items], ends)
+
+    def values(self, indicator: str, period: int = 0) -> tuple[np.ndarray, np.ndarray]:
+        """``(value at eval bar, value one bar earlier)`` per row; ``"close"`` for closes."""
+        key = (indicator, period)
+        cached = self._values.get(key)
+        if cached is None:
+            if indicator == "close":
+                series = self._closes
+            else:
+                series = getattr(indicators_np, indicator)(self._closes, period)
+            cached = (_at(series, self.ends), _at(series, self.ends, 1))
+            self._values[key] = cached
+        return cached
+
+
+def evaluate_batch_hybrid(
+    items: Sequence[BatchItem],
+    settings: HybridEvaluationSettings,
+    *,
+    matrices: IndicatorMatrices | None = None,
+) -> list[HybridEvaluationResult]:
+    """Evaluate items; same results as :func:`evaluate_ticker_hybrid`.
+
+    ``matrices`` must come from :meth:`IndicatorMatrices.for_items` on the
+    same ``items``.
+    """
+    results: list[HybridEvaluationResult | None] = [None] * len(items)
+    rows: list[int] = []
+    ends: list[int] = []
+
+    for pos, (ticker, candles, meta) in enumerate(items):
+        meta = meta or {}
+        idx_eval, _ = choose_eval_index(candles, meta=meta, provider=_provider(meta))
+        if idx_eval < 0:
+            results[pos] = HybridEvaluationResult(ticker, None, "No candle data")
+            continue
+        ok, reason, _, _ = _basic_filters(ticker, candles, settings, meta, idx_eval)
+        if not ok:
+            results[pos] = HybridEvaluationResult(ticker, None, reason)
+            continue
+        if idx_eval >= 1:
+            rows.append(pos)
+            ends.append(idx_eval)
+
+    if rows:
+        if matrices is not None and np.array_equal(matrices.ends[rows], ends):
+            sel: np.ndarray | slice = np.asarray(rows)
+        else:
+            matrices = IndicatorMatrices([items[pos][1] for pos in rows], ends)
+            sel = slice(None)
+
+        def at_eval(indicator: str, period: int = 0) -> np.ndarray:
+            return matrices.values(indicator, period)[0][sel]
+
+        close = at_eval("close")
+        sma_t = at_eval("sma", settings.sma_trend_period)
+        ema_s = at_eval("ema", settings.ema_short_period)
+        ema_m = at_eval("ema", settings.ema_mid_period)
+        rsi_v, rsi_p = (v[sel] for v in matrices.values("rsi", settings.rsi_period))
+
+        # Each detector's opening checks; a row failing all three cannot match.
+        no_pullback = (
+            _never_gt(close, sma_t)
+            | _never_ge(ema_s, ema_m)
+            | _never_le(settings.rsi_zone_low, rsi_v)
+            | _never_le(rsi_v, settings.rsi_zone_high)
+        )
+        no_breakout = _never_gt(ema_s, ema_m) | _never_gt(ema_m, sma_t) | _always_ge(rsi_v, 60)
+        no_reversal = (
+            _never_gt(close, sma_t)
+            | _never_le(settings.rsi_oversold_low, rsi_p)
+            | _never_le(rsi_p, settings.rsi_oversold_high)
+            | _never_gt(rsi_v, 40)
+        )
+        for i in np.flatnonzero(no_pullback & no_breakout & no_reversal):
+            pos = rows[i]
+            results[pos] = HybridEvaluationResult(items[pos][0], None, NO_HYBRID_SIGNAL)
+
+    return [
+        result
+        if result is not None
+        else evaluate_ticker_hybrid(items[pos][0], items[pos][1], settings, items[pos][2])
+        for pos, result in enumerate(results)
+    ]
+
+
+__all__ = ["BatchItem", "IndicatorMatrices", "evaluate_batch", "evaluate_batch_hybrid"]
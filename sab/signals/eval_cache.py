@@ -0,0 +1,199 @@
+"""Persistent cache of buy-evaluation results between scans.
+
+Intraday ``sab scan`` reruns see the same completed bars for most tickers,
+so their results cannot have changed. :class:`EvalResultCache` keeps the
+last result per ticker in ``data/eval_cache.json`` together with a key
+built from everything the evaluator reads:
+
+- the strategy mode and a hash of its settings dataclass (every threshold
+  from ``config.yaml``/env ends up there, so editing one invalidates all
+  entries),
+- the evaluation bar index and date, and the number of bars,
+- a digest of the evaluated window (dates and all price columns up to the
+  evaluation bar),
+- a digest of the ticker's meta (name, currency, data source). The USD/KRW
+  rate is left out: no filter reads it and the scan converts prices after
+  evaluation, so a moving rate must not miss every US ticker.
+
+A ticker whose key matches gets its stored result back without computing
+anything; any other ticker is evaluated and its entry replaced. Entries
+whose evaluation date is older than every window loaded in the run (tickers
+that left the universe long ago) are dropped on save. Bump
+``_FORMAT_VERSION`` when evaluator logic changes so old results are dropped.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import logging
+from collections.abc import Callable, Sequence
+from typing import Any
+
+import numpy as np
+
+from ..data.cache import load_json, save_json
+from ..data.candles import FIELDS, CandleSeries, as_candles
+from .eval_index import choose_eval_index
+
+logger = logging.getLogger(__name__)
+
+_FORMAT_VERSION = 2
+_CACHE_KEY = "eval_cache"
+
+BatchItem = tuple[str, CandleSeries, dict[str, Any]]
+
+# Meta fields the evaluators never read (FX is applied to candidates later).
+_UNKEYED_META = frozenset({"usd_krw_rate"})
+
+
+def _json_digest(obj: Any) -> str:
+    text = json.dumps(obj, sort_keys=True, default=str)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def settings_digest(strategy_mode: str, settings: Any) -> str:
+    """Hash of the strategy mode and every field of its settings dataclass."""
+    return _json_digest([_FORMAT_VERSION, strategy_mode, dataclasses.asdict(settings)])
+
+
+def _window_digest(candles: CandleSeries, idx_eval: int) -> str:
+    window = as_candles(candles)[: idx_eval + 1]
+    h = hashlib.blake2b(digest_size=16)
+    for name in FIELDS:
+        h.update(np.ascontiguousarray(window.column(name)).tobytes())
+    return h.hexdigest()
+
+
+class EvalResultCache:
+    """Last evaluation result per ticker, reused while its inputs are unchanged."""
+
+    def __init__(self, data_dir: str, strategy_mode: str, settings: Any) -> None:
+        self.data_dir = data_dir
+        self.settings_digest = settings_digest(strategy_mode, settings)
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        self._eval_dates: dict[str, str] = {}
+        self._window_start: str | None = None
+        raw = load_json(data_dir, _CACHE_KEY)
+        if isinstance(raw, dict) and raw.get("version") == _FORMAT_VERSION:
+            entries = raw.get("entries")
+            if isinstance(entries, dict):
+                self.entries = entries
+
+    def key(self, ticker: str, candles: CandleSeries, meta: dict[str, Any]) -> str | None:
+        """Cache key for one item, or ``None`` when it has no evaluable bar."""
+        provider = str(meta.get("data_source") or meta.get("provider") or "kis").lower()
+        idx_eval, _ = choose_eval_index(candles, meta=meta, provider=provider)
+        if idx_eval < 0:
+            return None
+        eval_date = str(candles[idx_eval].get("date") or "")
+        first = str(candles[0].get("date") or "")
+        if first and (self._window_start is None or first < self._window_start):
+            self._window_start = first
+        self._eval_dates[ticker] = eval_date
+        keyed_meta = {k: v for k, v in meta.items() if k not in _UNKEYED_META}
+        return _json_digest(
+            [
+                self.settings_digest,
+                ticker,
+                len(candles),
+                idx_eval,
+                eval_date,
+                _window_digest(candles, idx_eval),
+                _json_digest(keyed_meta),
+            ]
+        )
+
+    def get(self, ticker: str, key: str) -> dict[str, Any] | None:
+        entry = self.entries.get(ticker)
+        if entry is not None and entry.get("key") == key:
+            self.hits += 1
+            return entry["result"]
+        self.misses += 1
+        return None
+
+    def put(self, ticker: str, key: str, result: Any) -> None:
+        payload = dataclasses.asdict(result)
+        try:
+            json.dumps(payload)
+        except (TypeError, ValueError):
+            logger.debug("%s: evaluation result is not cacheable", ticker)
+            return
+        self.entries[ticker] = {
+            "key": key,
+            "date": self._eval_dates.get(ticker, ""),
+            "result": payload,
+        }
+        self.dirty = True
+
+    def prune(self) -> int:
+        """Drop entries evaluated before the oldest bar loaded in this run."""
+        if self._window_start is None:
+            return 0
+        stale = [
+            ticker
+            for ticker, entry in self.entries.items()
+            if str(entry.get("date") or "") < self._window_start
+        ]
+        for ticker in stale:
+            del self.entries[ticker]
+        if stale:
+            self.dirty = True
+        return len(stale)
+
+    def save(self) -> None:
+        self.prune()
+        if not self.dirty:
+            return
+        try:
+            save_json(
+                self.data_dir, _CACHE_KEY, {"version": _FORMAT_VERSION, "entries": self.entries}
+            )
+        except OSError as exc:  # pragma: no cover - best effort cache
+            logger.debug("Failed to save evaluation cache: %s", exc)
+            return
+        self.dirty = False
+
+    def describe(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses"
+
+
+def evaluate_cached[R](
+    items: Sequence[BatchItem],
+    evaluate: Callable[[Sequence[BatchItem]], list[R]],
+    result_type: Callable[..., R],
+    cache: EvalResultCache | None,
+) -> list[R]:
+    """Run ``evaluate`` on the items ``cache`` has no current result for.
+
+    Results keep the order of ``items``; fresh results are stored (call
+    :meth:`EvalResultCache.save` afterwards).
+    """
+    if cache is None:
+        return evaluate(items)
+    results: list[R | None] = [None] * len(items)
+    pending: list[int] = []
+    keys: list[str | None] = []
+    for pos, (ticker, candles, meta) in enumerate(items):
+        key = cache.key(ticker, candles, meta or {})
+        keys.append(key)
+        stored = cache.get(ticker, key) if key is not None else None
+        if stored is not None:
+            results[pos] = result_type(**stored)
+        else:
+            pending.append(pos)
+
+    fresh = evaluate([items[pos] for pos in pending]) if pending else []
+    for pos, result in zip(pending, fresh, strict=True):
+        results[pos] = result
+        key = keys[pos]
+        if key is not None:
+            cache.put(items[pos][0], key, result)
+    return results  # type: ignore[return-value]
+
+
+__all__ = ["EvalResultCache", "evaluate_cached", "settings_digest"]
@@ -7,6 +7,7 @@ from dataclasses import dataclass
 from typing import Any
 from zoneinfo import ZoneInfo
 
+from sab.data.candles import CandleSeries
 from sab.data.us_calendar import load_us_trading_calendar
 
 KR_ZONE = ZoneInfo("Asia/Seoul")
@@ -21,7 +22,7 @@ STATE_CLOSED = "CLOSED"
 
 @dataclass(frozen=True)
 class EvalContext:
-    candles: list[dict[str, Any]]
+    candles: CandleSeries
     meta: dict[str, Any]
     now: dt.datetime
     market: str
@@ -117,7 +118,7 @@ def _session_state(market: str, local_now: dt.datetime) -> str:
 
 
 def choose_eval_index(
-    candles: list[dict[str, Any]],
+    candles: CandleSeries,
     *,
     meta: dict[str, Any] | None = None,
     provider: str | None = None,
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
 import math
+from collections.abc import Mapping
 from dataclasses import dataclass
+from functools import cached_property
 from typing import Any
 
+import numpy as np
+
+from ..data.candles import Candles, CandleSeries, column_values, float_values
 from .etf_filters import is_etf_or_leveraged
 from .eval_index import choose_eval_index
+from .filters import Filter, FilterPipeline
+from .indicator_memo import tracks_indicators
 from .indicators import atr, ema, rsi, sma
 
 
@@ -31,139 +38,262 @@ class EvaluationSettings:
     us_min_price: float | None = None
 
 
-def _clean(values: list[float]) -> list[float]:
-    return [v for v in values if not math.isnan(v)]
+class _TickerState:
+    """Inputs of one ``evaluate_ticker`` call; derived data is computed on first use."""
+
+    def __init__(
+        self,
+        ticker: str,
+        candles: CandleSeries,
+        settings: EvaluationSettings,
+        meta: dict[str, Any],
+    ) -> None:
+        self.ticker = ticker
+        self.candles = candles
+        self.settings = settings
+        self.meta = meta
+
+    @cached_property
+    def idx_eval(self) -> int:
+        provider = str(self.meta.get("data_source") or self.meta.get("provider") or "kis").lower()
+        idx_eval, _ = choose_eval_index(self.candles, meta=self.meta, provider=provider)
+        return idx_eval
+
+    @cached_property
+    def candles_eval(self) -> CandleSeries:
+        return self.candles[: self.idx_eval + 1]
+
+    @cached_property
+    def latest(self) -> Mapping[str, Any]:
+        return self.candles[self.idx_eval]
+
+    @cached_property
+    def previous(self) -> Mapping[str, Any]:
+        return self.candles[self.idx_eval - 1]
+
+    @cached_property
+    def closes(self) -> list[float]:
+        return column_values(self.candles_eval, "close")
+
+    @cached_property
+    def highs(self) -> list[float]:
+        return column_values(self.candles_eval, "high")
+
+    @cached_property
+    def lows(self) -> list[float]:
+        return column_values(self.candles_eval, "low")
+
+    @cached_property
+    def usd(self) -> bool:
+        return self.meta.get("currency", "KRW").upper() == "USD"
+
+    @cached_property
+    def avg_dollar_volume(self) -> float:
+        candles_eval = self.candles_eval
+        window = candles_eval[-20:] if len(candles_eval) >= 20 else candles_eval
+        if not window:
+            return 0.0
+        total = 0.0
+        count = 0
+        for price, volume in zip(
+            float_values(window, "close"), float_values(window, "volume"), strict=True
+        ):
+            total += price * volume
+            count += 1
+        return total / count if count else 0.0
+
+    @cached_property
+    def ema20(self) -> list[float]:
+        return ema(self.closes, 20)
+
+    @cached_property
+    def ema50(self) -> list[float]:
+        return ema(self.closes, 50)
+
+    @cached_property
+    def rsi14(self) -> list[float]:
+        return rsi(self.closes, 14)
+
+    @cached_property
+    def atr14(self) -> list[float]:
+        return atr(self.highs, self.lows, self.closes, 14)
+
+    @cached_property
+    def sma200(self) -> list[float]:
+        return sma(self.closes, 200)
+
+    @cached_property
+    def gap_pct(self) -> float:
+        previous_close = self.previous["close"]
+        if not previous_close:
+            return 0.0
+        return (self.latest["open"] - previous_close) / previous_close
+
+    @cached_property
+    def gap_threshold(self) -> float:
+        atr_value = self.atr14[-1]
+        previous_close = self.previous["close"]
+        if (
+            self.settings.gap_atr_multiplier > 0
+            and not math.isnan(atr_value)
+            and atr_value > 0
+            and previous_close > 0
+        ):
+            return self.settings.gap_atr_multiplier * atr_value / previous_close
+        return 0.03
+
+
+def _has_values(candles: CandleSeries, field: str) -> bool:
+    if isinstance(candles, Candles):
+        return not bool(np.isnan(candles.column(field)).all())
+    return any(not math.isnan(c[field]) for c in candles)
+
+
+def _check_history(s: _TickerState) -> str | None:
+    if len(s.candles) < s.settings.min_history_bars:
+        return f"Not enough history (<{s.settings.min_history_bars} bars)"
+    return None
+
+
+def _check_completed(s: _TickerState) -> str | None:
+    return "Not enough completed candles" if s.idx_eval < 1 else None
+
+
+def _check_price_data(s: _TickerState) -> str | None:
+    candles_eval = s.candles_eval
+    if all(_has_values(candles_eval, field) for field in ("close", "high", "low")):
+        return None
+    return "Insufficient price data"
+
+
+def _check_min_price(s: _TickerState) -> str | None:
+    eff_min_price = s.settings.min_price
+    if s.usd and s.settings.us_min_price:
+        eff_min_price = s.settings.us_min_price
+    close = s.latest["close"]
+    if eff_min_price and close < eff_min_price:
+        return f"Price {close:.0f} < MIN_PRICE {eff_min_price:.0f}"
+    return None
+
+
+def _check_liquidity(s: _TickerState) -> str | None:
+    # Market-aware liquidity floor (USD for US, KRW for KR)
+    eff_min_dv = s.settings.min_dollar_volume
+    if s.usd and s.settings.us_min_dollar_volume:
+        eff_min_dv = s.settings.us_min_dollar_volume
+    if eff_min_dv > 0 and s.avg_dollar_volume < eff_min_dv:
+        return f"Avg dollar volume {s.avg_dollar_volume:,.0f} < {eff_min_dv:,.0f}"
+    return None
+
+
+def _check_etf(s: _TickerState) -> str | None:
+    # ETF/ETN exclusion heuristic (including leveraged/inverse products)
+    if s.settings.exclude_etf_etn and is_etf_or_leveraged(s.ticker, s.meta):
+        return "ETF/ETN excluded"
+    return None
+
+
+def _check_ema_cross(s: _TickerState) -> str | None:
+    if s.ema20[-1] > s.ema50[-1] and s.ema20[-2] <= s.ema50[-2]:
+        return None
+    return "EMA(20/50) cross not satisfied"
 
 
+def _check_rsi(s: _TickerState) -> str | None:
+    rsi14 = s.rsi14
+    if rsi14[-1] > 30 and rsi14[-2] <= 30 and rsi14[-1] < 70:
+        return None
+    return "RSI signal not satisfied"
+
+
+def _check_sma200(s: _TickerState) -> str | None:
+    sma200_value = s.sma200[-1]
+    if (
+        not math.isnan(sma200_value)
+        and s.latest["close"] > sma200_value
+        and s.ema20[-1] > sma200_value
+        and s.ema50[-1] > sma200_value
+    ):
+        return None
+    return "Below SMA200 filter"
+
+
+def _check_slope(s: _TickerState) -> str | None:
+    if s.ema20[-1] > s.ema20[-2] and s.ema50[-1] > s.ema50[-2]:
+        return None
+    return "EMA slope not rising"
+
+
+def _check_gap(s: _TickerState) -> str | None:
+    if abs(s.gap_pct) <= s.gap_threshold:
+        return None
+    return f"Gap {s.gap_pct * 100:.1f}% exceeds threshold"
+
+
+# Data-only checks run before any indicator is computed; the signal checks
+# keep their original relative order.
+EMA_CROSS_FILTERS: FilterPipeline[_TickerState] = FilterPipeline(
+    [
+        Filter("min_history_bars", 0, ("bars",), _check_history),
+        Filter("completed_candles", 1, ("eval_index",), _check_completed),
+        Filter("price_data", 2, ("prices",), _check_price_data),
+        Filter("min_price", 2, ("eval_index", "prices"), _check_min_price),
+        Filter("avg_dollar_volume", 3, ("prices",), _check_liquidity),
+        Filter("etf_etn", 3, ("meta",), _check_etf),
+        Filter("ema_cross", 10, ("ema20", "ema50"), _check_ema_cross),
+        Filter("rsi", 11, ("rsi14",), _check_rsi),
+        Filter(
+            "sma200",
+            12,
+            ("sma200",),
+            _check_sma200,
+            enabled=lambda s: s.settings.use_sma200_filter,
+        ),
+        Filter(
+            "ema_slope",
+            12,
+            ("ema20", "ema50"),
+            _check_slope,
+            enabled=lambda s: s.settings.require_slope_up,
+        ),
+        Filter("gap", 13, ("atr14",), _check_gap),
+    ]
+)
+
+
+@tracks_indicators
 def evaluate_ticker(
     ticker: str,
-    candles: list[dict[str, float]],
+    candles: CandleSeries,
     settings: EvaluationSettings,
     meta: dict[str, Any] | None = None,
 ) -> EvaluationResult:
-    meta = meta or {}
-    currency = meta.get("currency", "KRW")
+    state = _TickerState(ticker, candles, settings, meta or {})
+    return _finish(state, EMA_CROSS_FILTERS.run(state))
 
-    if len(candles) < settings.min_history_bars:
-        return EvaluationResult(
-            ticker,
-            None,
-            f"Not enough history (<{settings.min_history_bars} bars)",
-        )
-
-    provider = str(meta.get("data_source") or meta.get("provider") or "kis").lower()
-    idx_eval, _ = choose_eval_index(candles, meta=meta, provider=provider)
-    if idx_eval < 1:
-        return EvaluationResult(ticker, None, "Not enough completed candles")
-
-    candles_eval = candles[: idx_eval + 1]
-
-    closes = [c["close"] for c in candles_eval]
-    highs = [c["high"] for c in candles_eval]
-    lows = [c["low"] for c in candles_eval]
-
-    if not (_clean(closes) and _clean(highs) and _clean(lows)):
-        return EvaluationResult(ticker, None, "Insufficient price data")
-
-    ema20 = ema(closes, 20)
-    ema50 = ema(closes, 50)
-    rsi14 = rsi(closes, 14)
-    atr14 = atr(highs, lows, closes, 14)
-    sma200 = sma(closes, 200)
-
-    latest = candles[idx_eval]
-    previous = candles[idx_eval - 1]
-
-    # Market-aware price floor
-    eff_min_price = settings.min_price
-    if meta.get("currency", "KRW").upper() == "USD" and settings.us_min_price:
-        eff_min_price = settings.us_min_price
-
-    if eff_min_price and latest["close"] < eff_min_price:
-        return EvaluationResult(
-            ticker,
-            None,
-            f"Price {latest['close']:.0f} < MIN_PRICE {eff_min_price:.0f}",
-        )
-
-    ema_cross_up = ema20[-1] > ema50[-1] and ema20[-2] <= ema50[-2]
-    rsi_rebound = rsi14[-1] > 30 and rsi14[-2] <= 30
-    rsi_not_overbought = rsi14[-1] < 70
-    gap_pct = 0.0
-    if previous["close"]:
-        gap_pct = (latest["open"] - previous["close"]) / previous["close"]
 
-    atr_value = atr14[-1]
+@tracks_indicators
+def _evaluate_screened(ticker: str, candles: CandleSeries, state: _TickerState) -> EvaluationResult:
+    """Finish ``state`` whose data-only filters already passed (batch path)."""
+    return _finish(state, EMA_CROSS_FILTERS.run(state, skip_cheap=True))
 
-    if not ema_cross_up:
-        return EvaluationResult(ticker, None, "EMA(20/50) cross not satisfied")
-    if not (rsi_rebound and rsi_not_overbought):
-        return EvaluationResult(ticker, None, "RSI signal not satisfied")
 
-    # SMA200 filter
+def _finish(state: _TickerState, reason: str | None) -> EvaluationResult:
+    ticker, settings, meta = state.ticker, state.settings, state.meta
+    if reason is not None:
+        return EvaluationResult(ticker, None, reason)
+    currency = meta.get("currency", "KRW")
+
+    closes = state.closes
+    latest, previous = state.latest, state.previous
+    ema20, ema50, rsi14 = state.ema20, state.ema50, state.rsi14
+    atr_value = state.atr14[-1]
+    sma200_value = state.sma200[-1]
     trend_pass = True
-    sma200_value = sma200[-1]
-    if settings.use_sma200_filter:
-        trend_pass = (
-            not math.isnan(sma200_value)
-            and latest["close"] > sma200_value
-            and ema20[-1] > sma200_value
-            and ema50[-1] > sma200_value
-        )
-        if not trend_pass:
-            return EvaluationResult(ticker, None, "Below SMA200 filter")
-
-    # EMA slope requirement
     slope_pass = True
-    if settings.require_slope_up:
-        slope_pass = ema20[-1] > ema20[-2] and ema50[-1] > ema50[-2]
-        if not slope_pass:
-            return EvaluationResult(ticker, None, "EMA slope not rising")
-
-    # Gap threshold via ATR multiplier
-    gap_threshold = 0.03
-    if (
-        settings.gap_atr_multiplier > 0
-        and not math.isnan(atr_value)
-        and atr_value > 0
-        and previous["close"] > 0
-    ):
-        gap_threshold = settings.gap_atr_multiplier * atr_value / previous["close"]
-    gap_ok = abs(gap_pct) <= gap_threshold
-    if not gap_ok:
-        return EvaluationResult(
-            ticker,
-            None,
-            f"Gap {gap_pct * 100:.1f}% exceeds threshold",
-        )
-
-    # Liquidity: average dollar volume last 20 bars
-    avg_dollar_volume = 0.0
-    window = candles_eval[-20:] if len(candles_eval) >= 20 else candles_eval
-    if window:
-        total = 0.0
-        count = 0
-        for c in window:
-            price = c.get("close") or 0.0
-            volume = c.get("volume") or 0.0
-            total += price * volume
-            count += 1
-        if count:
-            avg_dollar_volume = total / count
-    # Market-aware liquidity floor (USD for US, KRW for KR)
-    eff_min_dv = settings.min_dollar_volume
-    if meta.get("currency", "KRW").upper() == "USD" and settings.us_min_dollar_volume:
-        eff_min_dv = settings.us_min_dollar_volume
-    if eff_min_dv > 0 and avg_dollar_volume < eff_min_dv:
-        return EvaluationResult(
-            ticker,
-            None,
-            f"Avg dollar volume {avg_dollar_volume:,.0f} < {eff_min_dv:,.0f}",
-        )
-
-    # ETF/ETN exclusion heuristic (including leveraged/inverse products)
-    if settings.exclude_etf_etn and is_etf_or_leveraged(ticker, meta):
-        return EvaluationResult(ticker, None, "ETF/ETN excluded")
+    gap_ok = True
+    gap_pct, gap_threshold = state.gap_pct, state.gap_threshold
+    avg_dollar_volume = state.avg_dollar_volume
 
     rs_return = None
     rs_diff = None
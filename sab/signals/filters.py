@@ -0,0 +1,134 @@
+"""Declarative, cost-ordered filter pipelines for the per-ticker evaluators.
+
+A :class:`Filter` names the data it needs (raw bars, price columns, or
+indicator series) and a relative cost, and returns a rejection reason or
+``None``. :class:`FilterPipeline` runs its filters cheapest first and stops
+at the first rejection, so indicator series, which the evaluator state
+computes lazily on first access, are only computed for tickers that passed
+every cheaper check.
+
+When a :class:`FilterStats` is active (:func:`use_filter_stats`), every
+filter run records whether it rejected and how long it took, including any
+data it was first to compute. ``sab scan`` logs the totals per filter.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+# Data a filter may declare in ``needs``; anything else is an indicator series.
+CHEAP_NEEDS = frozenset({"bars", "eval_index", "prices", "meta"})
+
+
+@dataclass(frozen=True)
+class Filter[S]:
+    name: str
+    cost: float
+    needs: tuple[str, ...]
+    check: Callable[[S], str | None]
+    enabled: Callable[[S], bool] = lambda state: True
+
+    @property
+    def cheap(self) -> bool:
+        return set(self.needs) <= CHEAP_NEEDS
+
+
+@dataclass
+class FilterStat:
+    evaluated: int = 0
+    rejected: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class FilterStats:
+    """Per-filter counters accumulated over a run."""
+
+    filters: dict[str, FilterStat] = field(default_factory=dict)
+
+    def record(self, name: str, *, evaluated: int, rejected: int, seconds: float) -> None:
+        stat = self.filters.setdefault(name, FilterStat())
+        stat.evaluated += evaluated
+        stat.rejected += rejected
+        stat.seconds += seconds
+
+    def merge(self, other: FilterStats) -> None:
+        for name, stat in other.filters.items():
+            self.record(
+                name, evaluated=stat.evaluated, rejected=stat.rejected, seconds=stat.seconds
+            )
+
+    def lines(self) -> list[str]:
+        return [
+            f"{name}: {stat.rejected}/{stat.evaluated} rejected, {stat.seconds * 1000:.1f} ms"
+            for name, stat in self.filters.items()
+        ]
+
+
+_active_stats: ContextVar[FilterStats | None] = ContextVar("sab_filter_stats", default=None)
+
+
+@contextmanager
+def use_filter_stats(stats: FilterStats | None) -> Iterator[None]:
+    """Record filter counters into ``stats`` for pipelines run in this context."""
+    token = _active_stats.set(stats)
+    try:
+        yield
+    finally:
+        _active_stats.reset(token)
+
+
+def active_filter_stats() -> FilterStats | None:
+    return _active_stats.get()
+
+
+class FilterPipeline[S]:
+    """Filters sorted by cost (declaration order breaks ties)."""
+
+    def __init__(self, filters: Sequence[Filter[S]]) -> None:
+        self.filters = sorted(filters, key=lambda f: f.cost)
+
+    def run(self, state: S, *, cheap_only: bool = False, skip_cheap: bool = False) -> str | None:
+        """Return the first rejection reason, or ``None`` when every filter passes.
+
+        With ``cheap_only`` only the leading filters that need no indicator
+        series run; ``skip_cheap`` runs the rest, for states that already
+        passed them.
+        """
+        stats = _active_stats.get()
+        for flt in self.filters:
+            if cheap_only and not flt.cheap:
+                break
+            if skip_cheap and flt.cheap:
+                continue
+            if not flt.enabled(state):
+                continue
+            if stats is None:
+                reason = flt.check(state)
+            else:
+                started = time.perf_counter()
+                reason = flt.check(state)
+                stats.record(
+                    flt.name,
+                    evaluated=1,
+                    rejected=int(reason is not None),
+                    seconds=time.perf_counter() - started,
+                )
+            if reason is not None:
+                return reason
+        return None
+
+
+__all__ = [
+    "CHEAP_NEEDS",
+    "Filter",
+    "FilterPipeline",
+    "FilterStat",
+    "FilterStats",
+    "active_filter_stats",
+    "use_filter_stats",
+]
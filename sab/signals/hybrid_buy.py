@@ -5,8 +5,10 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Any
 
+from ..data.candles import CandleSeries, float_values
 from .etf_filters import is_etf_or_leveraged
 from .eval_index import choose_eval_index
+from .indicator_memo import tracks_indicators
 from .indicators import atr, ema, rsi, sma
 
 
@@ -51,15 +53,13 @@ class HybridEvaluationResult:
     reason: str | None = None
 
 
-def _avg_dollar_volume(candles: list[dict[str, Any]], window: int) -> float:
+def _avg_dollar_volume(candles: CandleSeries, window: int) -> float:
     if not candles:
         return 0.0
     sub = candles[-window:] if len(candles) >= window else candles
     total = 0.0
     count = 0
-    for c in sub:
-        price = float(c.get("close") or 0.0)
-        volume = float(c.get("volume") or 0.0)
+    for price, volume in zip(float_values(sub, "close"), float_values(sub, "volume"), strict=True):
         total += price * volume
         count += 1
     return total / count if count else 0.0
@@ -67,7 +67,7 @@ def _avg_dollar_volume(candles: list[dict[str, Any]], window: int) -> float:
 
 def _basic_filters(
     ticker: str,
-    candles: list[dict[str, Any]],
+    candles: CandleSeries,
     settings: HybridEvaluationSettings,
     meta: dict[str, Any],
     eval_index: int,
@@ -104,10 +104,10 @@ def _basic_filters(
     return True, None, close, avg_dv
 
 
-def _volume_stats(candles: list[dict[str, Any]], lookback_days: int) -> tuple[float, float]:
+def _volume_stats(candles: CandleSeries, lookback_days: int) -> tuple[float, float]:
     if not candles:
         return 0.0, 0.0
-    vols = [float(c.get("volume") or 0.0) for c in candles]
+    vols = float_values(candles, "volume")
     prev_vol = vols[-2] if len(vols) >= 2 else vols[-1]
     window = vols[-lookback_days:] if len(vols) >= lookback_days else vols
     avg_vol = sum(window) / len(window) if window else 0.0
@@ -120,7 +120,7 @@ def _detect_trend_pullback_bounce(
     ema_short: list[float],
     ema_mid: list[float],
     rsi_vals: list[float],
-    candles: list[dict[str, Any]],
+    candles: CandleSeries,
     settings: HybridEvaluationSettings,
 ) -> tuple[bool, list[str], HybridPattern | None, dict[str, Any]]:
     reasons: list[str] = []
@@ -210,7 +210,7 @@ def _detect_swing_high_breakout(
     ema_short: list[float],
     ema_mid: list[float],
     rsi_vals: list[float],
-    candles: list[dict[str, Any]],
+    candles: CandleSeries,
     settings: HybridEvaluationSettings,
     currency: str,
 ) -> tuple[bool, list[str], HybridPattern | None, dict[str, Any]]:
@@ -261,7 +261,7 @@ def _detect_rsi_oversold_reversal(
     ema_short: list[float],
     ema_mid: list[float],
     rsi_vals: list[float],
-    candles: list[dict[str, Any]],
+    candles: CandleSeries,
     settings: HybridEvaluationSettings,
 ) -> tuple[bool, list[str], HybridPattern | None, dict[str, Any]]:
     idx = len(closes) - 1
@@ -311,9 +311,10 @@ def _detect_rsi_oversold_reversal(
     return False, ["Reversal not near EMA support"], None, {}
 
 
+@tracks_indicators
 def evaluate_ticker_hybrid(
     ticker: str,
-    candles: list[dict[str, Any]],
+    candles: CandleSeries,
     settings: HybridEvaluationSettings,
     meta: dict[str, Any] | None = None,
 ) -> HybridEvaluationResult:
@@ -331,9 +332,9 @@ def evaluate_ticker_hybrid(
     if not ok:
         return HybridEvaluationResult(ticker, None, reason)
 
-    closes = [float(c.get("close") or 0.0) for c in candles_eval]
-    highs = [float(c.get("high") or 0.0) for c in candles_eval]
-    lows = [float(c.get("low") or 0.0) for c in candles_eval]
+    closes = float_values(candles_eval, "close")
+    highs = float_values(candles_eval, "high")
+    lows = float_values(candles_eval, "low")
     sma_trend = sma(closes, settings.sma_trend_period)
     ema_short = ema(closes, settings.ema_short_period)
     ema_mid = ema(closes, settings.ema_mid_period)
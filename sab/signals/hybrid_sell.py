@@ -4,7 +4,9 @@ import datetime as dt
 from dataclasses import dataclass
 from typing import Any
 
+from ..data.candles import CandleSeries, column_values
 from .eval_index import choose_eval_index
+from .indicator_memo import tracks_indicators
 from .indicators import ema, rsi, sma
 
 
@@ -57,11 +59,14 @@ def _compute_pnl_pct(entry_price: float | None, last_close: float | None) -> flo
         return None
 
 
+@tracks_indicators
 def evaluate_sell_signals_hybrid(
     ticker: str,
-    candles: list[dict[str, float]],
+    candles: CandleSeries,
     holding: dict[str, Any],
     settings: HybridSellSettings,
+    *,
+    as_of: dt.date | None = None,
 ) -> HybridSellEvaluation:
     if len(candles) < max(settings.min_bars, 2):
         return HybridSellEvaluation(
@@ -80,7 +85,7 @@ def evaluate_sell_signals_hybrid(
         )
 
     candles_eval = candles[: idx_eval + 1]
-    closes = [float(c["close"]) for c in candles_eval]
+    closes = [float(v) for v in column_values(candles_eval, "close")]
     latest = candles[idx_eval]
     last_close = float(latest.get("close") or 0.0)
     eval_date = str(latest.get("date") or "") or None
@@ -194,7 +199,7 @@ def evaluate_sell_signals_hybrid(
     if entry_date_str and time_stop_days > 0:
         try:
             entry_date = dt.date.fromisoformat(str(entry_date_str))
-            days_in_trade = (dt.date.today() - entry_date).days
+            days_in_trade = ((as_of or dt.date.today()) - entry_date).days
             if days_in_trade >= time_stop_days:
                 reasons.append(f"Time stop: {days_in_trade} days ≥ {time_stop_days} days")
                 if action != "SELL":
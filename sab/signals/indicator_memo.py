@@ -0,0 +1,127 @@
+"""Per-run indicator memoization shared by the buy and sell evaluators.
+
+A ticker often goes through more than one evaluator in a run (a holding
+that is also on the watchlist, or scan and sell in one process), and each
+of them asks for the same ``ema(closes, 20)`` or ``rsi(closes, 14)``.
+:class:`IndicatorMemo` caches those series for the lifetime of a run,
+keyed by ``(ticker, eval_index, indicator, period)`` where ``eval_index``
+is the last bar the series covers. A digest of the inputs is part of the
+key as well, so evaluators that clean the same bars differently (e.g.
+``None`` closes as NaN vs. 0.0) never share a result.
+
+Evaluators decorated with :func:`tracks_indicators` consult the memo
+active via :func:`use_indicator_memo` before the backend.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+import numpy as np
+
+from ..data.candles import CandleSeries
+from .indicators import series_hook
+
+MemoKey = tuple[str, int, str, int, str]
+
+
+def _digest(inputs: tuple[list[float], ...]) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for values in inputs:
+        h.update(np.asarray(values, dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+class IndicatorMemo:
+    """Run-scoped cache of indicator series with hit/miss counters."""
+
+    def __init__(self) -> None:
+        self._series: dict[MemoKey, list[float]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def scope(self, ticker: str) -> _TickerMemo:
+        return _TickerMemo(self, ticker)
+
+    def lookup(
+        self,
+        key: MemoKey,
+        inputs: tuple[list[float], ...],
+        period: int,
+        compute: Callable[..., list[float]],
+    ) -> list[float]:
+        cached = self._series.get(key)
+        if cached is not None:
+            self.hits += 1
+            return list(cached)
+        self.misses += 1
+        values = compute(*inputs, period)
+        self._series[key] = list(values)
+        return values
+
+    def describe(self) -> str:
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        return f"{self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate)"
+
+
+class _TickerMemo:
+    """:class:`~sab.signals.indicators.SeriesHook` view of the memo for one ticker."""
+
+    def __init__(self, memo: IndicatorMemo, ticker: str) -> None:
+        self.memo = memo
+        self.ticker = ticker
+
+    def series(
+        self,
+        name: str,
+        period: int,
+        inputs: tuple[list[float], ...],
+        compute: Callable[..., list[float]],
+    ) -> list[float]:
+        if any(len(values) != len(inputs[0]) for values in inputs):
+            return compute(*inputs, period)
+        key = (self.ticker, len(inputs[0]) - 1, name, period, _digest(inputs))
+        return self.memo.lookup(key, inputs, period, compute)
+
+
+_active_memo: ContextVar[IndicatorMemo | None] = ContextVar("sab_indicator_memo", default=None)
+
+
+@contextmanager
+def use_indicator_memo(memo: IndicatorMemo | None) -> Iterator[None]:
+    """Share ``memo`` between every tracked evaluator called in this context."""
+    token = _active_memo.set(memo)
+    try:
+        yield
+    finally:
+        _active_memo.reset(token)
+
+
+def active_memo() -> IndicatorMemo | None:
+    return _active_memo.get()
+
+
+def tracks_indicators[F: Callable[..., Any]](func: F) -> F:
+    """Run an evaluator ``func(ticker, candles, ...)`` through the active memo."""
+
+    @functools.wraps(func)
+    def wrapper(ticker: str, candles: CandleSeries, *args: Any, **kwargs: Any) -> Any:
+        memo = _active_memo.get()
+        if memo is None or not candles:
+            return func(ticker, candles, *args, **kwargs)
+        with series_hook(memo.scope(ticker)):
+            return func(ticker, candles, *args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
+__all__ = ["IndicatorMemo", "active_memo", "tracks_indicators", "use_indicator_memo"]
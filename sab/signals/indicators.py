@@ -1,10 +1,135 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from math import isnan
+from typing import Any, Protocol
+
+from . import indicators_np
+
+BACKEND_PYTHON = "python"
+BACKEND_NUMPY = "numpy"
+INDICATOR_BACKENDS = (BACKEND_PYTHON, BACKEND_NUMPY)
+
+_backend = BACKEND_PYTHON
+
+
+def set_backend(name: str) -> None:
+    """Select the implementation behind :func:`ema`/:func:`rsi`/:func:`atr`/:func:`sma`.
+
+    ``python`` (default) keeps the original per-element loops; ``numpy``
+    runs :mod:`indicators_np` and converts the result back to a list. Both
+    produce the same values and NaN placement, but a single series is
+    faster in the loops: the array recurrences only pay off across the
+    ``(tickers, bars)`` matrices of :mod:`batch_eval`, which use them
+    directly whatever the backend.
+    """
+    global _backend
+    if name not in INDICATOR_BACKENDS:
+        raise ValueError(f"Unknown indicator backend: {name!r}")
+    _backend = name
+
+
+def get_backend() -> str:
+    return _backend
+
+
+class SeriesHook(Protocol):
+    """Intercepts indicator calls, e.g. to reuse run-scoped series (see ``indicator_memo``)."""
+
+    def series(
+        self,
+        name: str,
+        period: int,
+        inputs: tuple[list[float], ...],
+        compute: Callable[..., list[float]],
+    ) -> list[float]: ...
+
+
+_hooks: ContextVar[tuple[SeriesHook, ...]] = ContextVar("sab_indicator_hooks", default=())
+
+
+@contextmanager
+def series_hook(hook: SeriesHook | None) -> Iterator[None]:
+    """Route :func:`ema`/:func:`rsi`/:func:`atr`/:func:`sma` through ``hook`` in this context.
+
+    Nested hooks stack: the outermost sees each call first and its
+    ``compute`` runs the next hook in, down to the backend.
+    """
+    token = _hooks.set(_hooks.get() + ((hook,) if hook is not None else ()))
+    try:
+        yield
+    finally:
+        _hooks.reset(token)
+
+
+def _chain(
+    hook: SeriesHook, name: str, inner: Callable[..., list[float]]
+) -> Callable[..., list[float]]:
+    def compute(*args: Any) -> list[float]:
+        *inputs, period = args
+        return hook.series(name, period, tuple(inputs), inner)
+
+    return compute
+
+
+def _dispatch(
+    name: str, period: int, inputs: tuple[Iterable[float], ...], compute: Callable[..., list[float]]
+) -> list[float]:
+    hooks = _hooks.get()
+    if not hooks:
+        return compute(*inputs, period)
+    for hook in reversed(hooks):
+        compute = _chain(hook, name, compute)
+    return compute(*(list(values) for values in inputs), period)
 
 
 def ema(values: Iterable[float], period: int) -> list[float]:
+    return _dispatch("ema", period, (values,), _ema_backend)
+
+
+def rsi(closes: Iterable[float], period: int = 14) -> list[float]:
+    return _dispatch("rsi", period, (closes,), _rsi_backend)
+
+
+def atr(
+    highs: Iterable[float], lows: Iterable[float], closes: Iterable[float], period: int = 14
+) -> list[float]:
+    return _dispatch("atr", period, (highs, lows, closes), _atr_backend)
+
+
+def sma(values: Iterable[float], period: int) -> list[float]:
+    return _dispatch("sma", period, (values,), _sma_backend)
+
+
+def _ema_backend(values: Iterable[float], period: int) -> list[float]:
+    if _backend == BACKEND_NUMPY:
+        return indicators_np.ema(values, period).tolist()
+    return _ema(values, period)
+
+
+def _rsi_backend(closes: Iterable[float], period: int) -> list[float]:
+    if _backend == BACKEND_NUMPY:
+        return indicators_np.rsi(closes, period).tolist()
+    return _rsi(closes, period)
+
+
+def _atr_backend(
+    highs: Iterable[float], lows: Iterable[float], closes: Iterable[float], period: int
+) -> list[float]:
+    if _backend == BACKEND_NUMPY:
+        return indicators_np.atr(highs, lows, closes, period).tolist()
+    return _atr(highs, lows, closes, period)
+
+
+def _sma_backend(values: Iterable[float], period: int) -> list[float]:
+    if _backend == BACKEND_NUMPY:
+        return indicators_np.sma(values, period).tolist()
+    return _sma(values, period)
+
+
+def _ema(values: Iterable[float], period: int) -> list[float]:
     vals = list(values)
     if period <= 0 or not vals:
         return [float("nan")] * len(vals)
@@ -22,7 +147,7 @@ def ema(values: Iterable[float], period: int) -> list[float]:
     return out
 
 
-def rsi(closes: Iterable[float], period: int = 14) -> list[float]:
+def _rsi(closes: Iterable[float], period: int = 14) -> list[float]:
     c = list(closes)
     if period <= 0 or len(c) < 2:
         return [float("nan")] * len(c)
@@ -45,7 +170,7 @@ def rsi(closes: Iterable[float], period: int = 14) -> list[float]:
     return rsis
 
 
-def atr(
+def _atr(
     highs: Iterable[float], lows: Iterable[float], closes: Iterable[float], period: int = 14
 ) -> list[float]:
     H, L, C = list(highs), list(lows), list(closes)
@@ -70,7 +195,7 @@ def atr(
     return out
 
 
-def sma(values: Iterable[float], period: int) -> list[float]:
+def _sma(values: Iterable[float], period: int) -> list[float]:
     vals = list(values)
     n = len(vals)
     if period <= 0 or n == 0:
@@ -0,0 +1,154 @@
+"""Array implementations of :mod:`sab.signals.indicators`.
+
+Every function takes float arrays (anything ``np.asarray`` accepts, with
+``None`` read as NaN) and works along the last axis, so a ``(tickers, bars)``
+matrix is processed in one call. Recurrences (EMA, Wilder smoothing, the
+SMA window sum) still run bar by bar with the list versions' arithmetic, so
+results are bit-identical to them; the speed-up comes from handling every
+ticker of a bar in one array operation, so only matrices gain from it.
+NaN handling and seeding match: EMA seeds with the first value and a NaN
+poisons the rest of the series, RSI/ATR use Wilder smoothing seeded with
+the simple mean of the first ``period`` changes, and SMA treats NaN as zero
+inside the window.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+
+def as_array(values: ArrayLike | Iterable[float]) -> np.ndarray:
+    """Float64 array of ``values`` (no copy for float64 input); ``None`` becomes NaN."""
+    if not isinstance(values, (np.ndarray, list, tuple)):
+        values = list(values)  # type: ignore[arg-type]
+    return np.asarray(values, dtype=np.float64)
+
+
+def _nan_like(x: np.ndarray) -> np.ndarray:
+    return np.full(x.shape, np.nan)
+
+
+def _recurrence(prev: np.ndarray, step: Callable[..., Any], *inputs: np.ndarray) -> np.ndarray:
+    """Evaluate ``y[t] = step(y[t-1], *(x[t] for x in inputs))`` with ``y[-1] = prev``.
+
+    ``step`` is the exact expression of the list version and runs one bar at
+    a time, on Python floats for a single series and on one column of all
+    rows otherwise, so the results are bit-identical to the loops; only the
+    ticker axis is vectorised. (A closed-form solution of the recurrence
+    drifts in the last bits, enough to flip an ema20 - ema50 sign on flat
+    series.)
+    """
+    shape = inputs[0].shape
+    n = shape[-1]
+    rows = [x.reshape(-1, n) for x in inputs]
+    out = np.empty(rows[0].shape)
+    if n == 0:
+        return out.reshape(shape)
+    start = np.broadcast_to(prev, shape[:-1]).reshape(-1)
+    if out.shape[0] == 1:
+        value = float(start[0])
+        values = []
+        for bar in zip(*(r[0].tolist() for r in rows), strict=True):
+            value = step(value, *bar)
+            values.append(value)
+        out[0] = values
+    else:
+        columns = [np.ascontiguousarray(r.T) for r in rows]
+        value = start.astype(np.float64)
+        for t in range(n):
+            value = step(value, *(c[t] for c in columns))
+            out[:, t] = value
+    return out.reshape(shape)
+
+
+def ema(values: ArrayLike, period: int) -> np.ndarray:
+    x = as_array(values)
+    if period <= 0 or x.shape[-1] == 0:
+        return _nan_like(x)
+    k = 2 / (period + 1)
+    out = np.empty_like(x)
+    out[..., 0] = x[..., 0]
+    out[..., 1:] = _recurrence(x[..., 0], lambda prev, v: (v * k) + (prev * (1 - k)), x[..., 1:])
+    return out
+
+
+def _wilder(series: np.ndarray, period: int) -> np.ndarray:
+    """Wilder average of ``series[1:]`` seeded at index ``period``; NaN before."""
+    out = _nan_like(series)
+    n = series.shape[-1]
+    if n <= period:
+        return out
+    # built-in sum() (compensated since 3.12) like the list versions
+    head = series[..., 1 : period + 1].reshape(-1, period)
+    seed = np.array([sum(row) for row in head.tolist()]).reshape(series.shape[:-1]) / period
+    out[..., period] = seed
+    out[..., period + 1 :] = _recurrence(
+        seed, lambda prev, v: ((prev * (period - 1)) + v) / period, series[..., period + 1 :]
+    )
+    return out
+
+
+def rsi(closes: ArrayLike, period: int = 14) -> np.ndarray:
+    c = as_array(closes)
+    n = c.shape[-1]
+    if period <= 0 or n < 2:
+        return _nan_like(c)
+    change = np.zeros_like(c)
+    change[..., 1:] = np.diff(c, axis=-1)
+    # comparisons are False for NaN, matching max(0.0, nan) == 0.0
+    gains = np.where(change > 0, change, 0.0)
+    losses = np.where(-change > 0, -change, 0.0)
+    avg_gain = _wilder(gains, period)
+    avg_loss = _wilder(losses, period)
+    if n <= period:
+        return avg_gain
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = 100 - (100 / (1 + (avg_gain / avg_loss)))
+    return np.where(avg_loss == 0, 100.0, values)
+
+
+def true_range(highs: ArrayLike, lows: ArrayLike, closes: ArrayLike) -> np.ndarray:
+    h, low, c = as_array(highs), as_array(lows), as_array(closes)
+    n = min(h.shape[-1], low.shape[-1], c.shape[-1])
+    h, low, c = h[..., :n], low[..., :n], c[..., :n]
+    prev = np.empty_like(c)
+    if n:
+        prev[..., 0] = c[..., 0]
+        prev[..., 1:] = c[..., :-1]
+    # sequential max() semantics: a NaN first operand is kept
+    tr = h - low
+    for cand in (np.abs(h - prev), np.abs(low - prev)):
+        tr = np.where(cand > tr, cand, tr)
+    return tr
+
+
+def atr(highs: ArrayLike, lows: ArrayLike, closes: ArrayLike, period: int = 14) -> np.ndarray:
+    tr = true_range(highs, lows, closes)
+    if period <= 0 or tr.shape[-1] == 0:
+        return _nan_like(tr)
+    return _wilder(tr, period)
+
+
+def sma(values: ArrayLike, period: int) -> np.ndarray:
+    x = as_array(values)
+    n = x.shape[-1]
+    out = _nan_like(x)
+    if period <= 0 or n < period:
+        return out
+    # running window sum in the list version's order: add the new bar, then
+    # drop the one leaving the window (nothing to drop before ``period`` bars)
+    filled = np.where(np.isnan(x), 0.0, x)
+    leaving = np.zeros_like(filled)
+    leaving[..., period:] = filled[..., : n - period]
+    window = _recurrence(
+        np.zeros(x.shape[:-1]), lambda total, v, old: (total + v) - old, filled, leaving
+    )
+    out[..., period - 1 :] = window[..., period - 1 :] / period
+    return out
+
+
+__all__ = ["as_array", "atr", "ema", "rsi", "sma", "true_range"]
@@ -0,0 +1,206 @@
+"""Process-pool evaluation for very large universes.
+
+With the candles cached, evaluating several thousand symbols is CPU bound
+in one interpreter. :func:`evaluate_parallel` splits the items into
+contiguous shards, evaluates them in a :class:`ProcessPoolExecutor` and
+concatenates the shard results in submission order, so the output is
+exactly what the serial call returns.
+
+Items are ``(ticker, candles, extra)`` tuples (scan batch items or sell
+jobs). The candles of all items are laid out once in a shared-memory
+:class:`~sab.data.candle_arena.CandleArena`; shards carry only the arena
+handle, tickers and extras, and workers evaluate on views of the shared
+pages, so memory stays flat as workers are added. The arena is unlinked
+when evaluation finishes or fails. :class:`EvaluationPool` keeps the
+worker processes and the arena across several calls; workers are started
+from a ``forkserver``/``spawn`` context, never forked from the (possibly
+multi-threaded) caller. If shared memory is unavailable the
+candles are shipped per shard as pickled :class:`~sab.data.candles.Candles`
+arrays instead. ``evaluate`` must be picklable: a module-level function or
+a :func:`functools.partial` of one.
+
+Workers select the parent's indicator backend. Filter counters recorded in the
+workers are merged into the parent's active :class:`FilterStats`. The run
+indicator memo stays in the parent and is not consulted by the workers.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import multiprocessing
+import multiprocessing.context
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any
+
+from ..data.candle_arena import ArenaHandle, CandleArena
+from ..data.candles import Candles, CandleSeries, as_candles
+from .filters import FilterStats, active_filter_stats, use_filter_stats
+from .indicators import get_backend, set_backend
+
+logger = logging.getLogger(__name__)
+
+# Shards per worker; several small shards balance uneven tickers better
+# than one large shard each.
+_SHARDS_PER_WORKER = 4
+
+Item = tuple[str, CandleSeries, dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class WorkerContext:
+    indicator_backend: str
+
+
+def shard_bounds(count: int, shards: int) -> list[tuple[int, int]]:
+    """Split ``range(count)`` into at most ``shards`` contiguous, near-equal slices."""
+    shards = max(1, min(shards, count))
+    size, extra = divmod(count, shards)
+    bounds: list[tuple[int, int]] = []
+    start = 0
+    for i in range(shards):
+        end = start + size + (1 if i < extra else 0)
+        if end > start:
+            bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def _run_shard[R](
+    evaluate: Callable[[Sequence[Item]], list[R]],
+    items: list[Item],
+    context: WorkerContext,
+    arena: ArenaHandle | None = None,
+    start: int = 0,
+) -> tuple[list[R], FilterStats]:
+    set_backend(context.indicator_backend)
+    stats = FilterStats()
+    with contextlib.ExitStack() as stack:
+        if arena is not None:
+            attached = stack.enter_context(arena.attach())
+            items = [
+                (ticker, attached.candles(start + i), extra)
+                for i, (ticker, _, extra) in enumerate(items)
+            ]
+        with use_filter_stats(stats):
+            results = evaluate(items)
+        # drop the views before the arena is unmapped
+        del items
+    return results, stats
+
+
+def _start_context() -> multiprocessing.context.BaseContext:
+    # Workers are never forked from the calling process: it may be running
+    # fetch threads (scan pipeline, KIS workers), and forking a threaded
+    # process can deadlock the child on a lock held by another thread.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class EvaluationPool:
+    """One worker pool and shared-memory arena reused across evaluation calls.
+
+    ``workers`` processes are started from a ``forkserver`` (``spawn`` where
+    unavailable) context when the pool is entered, so callers that evaluate
+    in batches (the scan pipeline) pay for process start-up once and never
+    fork while their own threads are running. The arena grows to the largest
+    batch seen and is refilled in place for smaller ones. With ``workers``
+    of 1 everything runs inline.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = max(1, workers)
+        self._pool: ProcessPoolExecutor | None = None
+        self._arena: CandleArena | None = None
+        self._arena_failed = False
+
+    def __enter__(self) -> EvaluationPool:
+        if self.workers > 1:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=_start_context())
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        pool, self._pool = self._pool, None
+        arena, self._arena = self._arena, None
+        try:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        finally:
+            if arena is not None:
+                arena.close()
+
+    def _load_arena(self, items: Sequence[Item]) -> ArenaHandle | None:
+        if self._arena_failed:
+            return None
+        series = [candles for _, candles, _ in items]
+        if self._arena is not None and self._arena.refill(series):
+            return self._arena.handle
+        capacity = self._arena.handle.bars * 2 if self._arena is not None else 0
+        if self._arena is not None:
+            self._arena.close()
+            self._arena = None
+        try:
+            self._arena = CandleArena.build(series, capacity=capacity)
+        except OSError as exc:
+            logger.warning("Shared-memory arena unavailable (%s); shipping candles per shard", exc)
+            self._arena_failed = True
+            return None
+        return self._arena.handle
+
+    def evaluate[R](
+        self, items: Sequence[Item], evaluate: Callable[[Sequence[Item]], list[R]]
+    ) -> list[R]:
+        """``evaluate(items)``, sharded over the pool's workers."""
+        if self._pool is None or len(items) < 2:
+            return evaluate(items)
+
+        context = WorkerContext(indicator_backend=get_backend())
+        bounds = shard_bounds(len(items), self.workers * _SHARDS_PER_WORKER)
+        stats = active_filter_stats()
+
+        handle = self._load_arena(items)
+        if handle is not None:
+            packed: list[Item] = [(ticker, Candles.empty(), extra) for ticker, _, extra in items]
+        else:
+            packed = [(ticker, as_candles(candles), extra) for ticker, candles, extra in items]
+        futures = [
+            self._pool.submit(_run_shard, evaluate, packed[start:end], context, handle, start)
+            for start, end in bounds
+        ]
+        results: list[R] = []
+        try:
+            for future in futures:
+                shard_results, shard_stats = future.result()
+                results.extend(shard_results)
+                if stats is not None:
+                    stats.merge(shard_stats)
+        finally:
+            # the arena is only refilled once no shard still reads it
+            for future in futures:
+                future.cancel()
+            wait(futures)
+        logger.debug(
+            "Evaluated %s items in %s shards on %s workers", len(items), len(bounds), self.workers
+        )
+        return results
+
+
+def evaluate_parallel[R](
+    items: Sequence[Item],
+    evaluate: Callable[[Sequence[Item]], list[R]],
+    *,
+    workers: int,
+) -> list[R]:
+    """``evaluate(items)``, sharded over ``workers`` processes when ``workers > 1``."""
+    if workers <= 1 or len(items) < 2:
+        return evaluate(items)
+    with EvaluationPool(workers) as pool:
+        return pool.evaluate(items, evaluate)
+
+
+__all__ = ["EvaluationPool", "WorkerContext", "evaluate_parallel", "shard_bounds"]
@@ -4,7 +4,9 @@ import datetime as dt
 from dataclasses import dataclass
 from typing import Any
 
+from ..data.candles import CandleSeries, column_values
 from .eval_index import choose_eval_index
+from .indicator_memo import tracks_indicators
 from .indicators import atr, ema, rsi, sma
 
 
@@ -31,11 +33,14 @@ class SellEvaluation:
     eval_date: str | None = None
 
 
+@tracks_indicators
 def evaluate_sell_signals(
     ticker: str,
-    candles: list[dict[str, float]],
+    candles: CandleSeries,
     holding: dict[str, Any],
     settings: SellSettings,
+    *,
+    as_of: dt.date | None = None,
 ) -> SellEvaluation:
     if len(candles) < settings.min_bars:
         return SellEvaluation(action="REVIEW", reasons=["Insufficient data for sell evaluation"])
@@ -50,9 +55,9 @@ def evaluate_sell_signals(
         return SellEvaluation(action="REVIEW", reasons=["Not enough completed candles"])
 
     candles_eval = candles[: idx_eval + 1]
-    closes = [c["close"] for c in candles_eval]
-    highs = [c["high"] for c in candles_eval]
-    lows = [c["low"] for c in candles_eval]
+    closes = column_values(candles_eval, "close")
+    highs = column_values(candles_eval, "high")
+    lows = column_values(candles_eval, "low")
 
     atr_values = atr(highs, lows, closes, 14)
     stop_override = holding.get("stop_override")
@@ -116,7 +121,7 @@ def evaluate_sell_signals(
     if entry_date_str and time_stop_days > 0:
         try:
             entry_date = dt.date.fromisoformat(str(entry_date_str))
-            days_in_trade = (dt.date.today() - entry_date).days
+            days_in_trade = ((as_of or dt.date.today()) - entry_date).days
             if days_in_trade >= time_stop_days:
                 reasons.append(f"Time stop: {days_in_trade} days >= {time_stop_days} days")
                 action = "REVIEW" if action != "SELL" else action
@@ -0,0 +1,219 @@
+"""Parameter sweeps of the hybrid strategy over cached history.
+
+A sweep spec maps dotted config paths under ``strategy.hybrid`` and
+``sell.hybrid`` to lists of values. :func:`expand_combos` turns it into
+the full grid (or a seeded random sample of it) of settings variants, and
+:func:`sweep_ticker` backtests every variant on one ticker, sharing as
+much work as it can:
+
+- the replay windows and their close matrix are built once, and an
+  indicator pass such as ``ema(closes, 10)`` is reused by every variant
+  with the same period (:class:`~sab.signals.batch_eval.IndicatorMatrices`);
+- variants that differ only in sell settings replay the buy signals once;
+- the per-ticker buy and sell evaluators run under one
+  :class:`~sab.signals.indicator_memo.IndicatorMemo`, so their indicator
+  series on a given day are computed once across variants.
+
+Tickers are independent, so callers parallelize across ticker shards and
+merge per-variant trades with :func:`rank_combos`.
+"""
+
+from __future__ import annotations
+
+import itertools
+import math
+import random
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, fields, replace
+from typing import Any
+
+from ..data.candles import CandleSeries, as_candles
+from .backtest import (
+    BacktestSettings,
+    BacktestSummary,
+    TickerBacktest,
+    replay_signals,
+    replay_windows,
+    simulate_trades,
+    summarize,
+)
+from .batch_eval import IndicatorMatrices
+from .hybrid_buy import HybridEvaluationSettings
+from .hybrid_sell import HybridSellSettings
+from .indicator_memo import IndicatorMemo, use_indicator_memo
+
+BUY_SECTION = "strategy.hybrid"
+SELL_SECTION = "sell.hybrid"
+
+RANK_METRICS = ("avg_return", "median_return", "win_rate", "profit_factor")
+
+# (low, high) field pairs; a variant with low > high can never be intended
+_ORDERED_FIELDS = (
+    ("rsi_zone_low", "rsi_zone_high"),
+    ("rsi_oversold_low", "rsi_oversold_high"),
+    ("breakout_consolidation_min_bars", "breakout_consolidation_max_bars"),
+    ("profit_target_low", "profit_target_high"),
+    ("stop_loss_pct_min", "stop_loss_pct_max"),
+)
+
+
+@dataclass
+class SweepCombo:
+    overrides: dict[str, Any]
+    buy: HybridEvaluationSettings
+    sell: Any
+
+
+@dataclass
+class SweepResult:
+    combo: SweepCombo
+    signals: int
+    summary: BacktestSummary
+
+
+def _field_names(settings: Any) -> set[str]:
+    return {f.name for f in fields(settings)}
+
+
+def _ordered(settings: Any) -> bool:
+    return all(
+        getattr(settings, low) <= getattr(settings, high)
+        for low, high in _ORDERED_FIELDS
+        if hasattr(settings, low) and hasattr(settings, high)
+    )
+
+
+def expand_combos(
+    spec: Mapping[str, Sequence[Any]],
+    base: BacktestSettings,
+    *,
+    samples: int | None = None,
+    seed: int | None = None,
+) -> list[SweepCombo]:
+    """Settings variants for every grid point of ``spec`` (or ``samples`` of them).
+
+    Grid points whose low/high thresholds are out of order (e.g.
+    ``rsi_zone_low > rsi_zone_high``) are dropped before sampling.
+    """
+    buy_fields = _field_names(base.buy)
+    sell_fields = _field_names(base.sell)
+    for path in spec:
+        section, _, name = path.rpartition(".")
+        if section == BUY_SECTION and name in buy_fields:
+            continue
+        if section == SELL_SECTION and name in sell_fields:
+            if not isinstance(base.sell, HybridSellSettings):
+                raise ValueError(f"{path} needs sell.mode: sma_ema_hybrid")
+            continue
+        raise ValueError(f"Unknown sweep parameter: {path}")
+
+    paths = list(spec)
+    combos: list[SweepCombo] = []
+    for values in itertools.product(*(spec[path] for path in paths)):
+        overrides = dict(zip(paths, values, strict=True))
+        buy = replace(
+            base.buy,
+            **{p.rpartition(".")[2]: v for p, v in overrides.items() if p.startswith(BUY_SECTION)},
+        )
+        sell = replace(
+            base.sell,
+            **{p.rpartition(".")[2]: v for p, v in overrides.items() if p.startswith(SELL_SECTION)},
+        )
+        if _ordered(buy) and _ordered(sell):
+            combos.append(SweepCombo(overrides, buy, sell))  # type: ignore[arg-type]
+
+    if samples is not None and samples < len(combos):
+        picked = sorted(random.Random(seed).sample(range(len(combos)), samples))
+        combos = [combos[i] for i in picked]
+    return combos
+
+
+def sweep_ticker(
+    ticker: str,
+    candles: CandleSeries,
+    meta: dict[str, Any],
+    base: BacktestSettings,
+    combos: Sequence[SweepCombo],
+) -> list[TickerBacktest]:
+    """One :class:`TickerBacktest` per combo, in ``combos`` order."""
+    series = as_candles(candles)
+    matrices = IndicatorMatrices.for_items(replay_windows(ticker, series, meta, base))
+    signals_by_buy: dict[tuple[Any, ...], list[Any]] = {}
+    out: list[TickerBacktest] = []
+    with use_indicator_memo(IndicatorMemo()):
+        for combo in combos:
+            settings = replace(base, buy=combo.buy, sell=combo.sell)
+            key = tuple(getattr(combo.buy, f.name) for f in fields(combo.buy))
+            signals = signals_by_buy.get(key)
+            if signals is None:
+                signals = replay_signals(ticker, series, meta, settings, matrices=matrices)
+                signals_by_buy[key] = signals
+            trades = simulate_trades(ticker, series, meta, signals, settings)
+            out.append(TickerBacktest(ticker, signals=len(signals), trades=trades))
+    return out
+
+
+def sweep_batch(
+    items: Sequence[tuple[str, CandleSeries, dict[str, Any]]],
+    base: BacktestSettings,
+    combos: Sequence[SweepCombo],
+) -> list[list[TickerBacktest]]:
+    """:func:`sweep_ticker` for each ``(ticker, candles, meta)`` item."""
+    return [sweep_ticker(ticker, candles, meta, base, combos) for ticker, candles, meta in items]
+
+
+def _metric(summary: BacktestSummary, rank_by: str) -> float:
+    value = getattr(summary, rank_by)
+    if value is None:
+        # profit factor without a losing trade
+        return math.inf
+    return float(value)
+
+
+def rank_combos(
+    combos: Sequence[SweepCombo],
+    per_ticker: Sequence[Sequence[TickerBacktest]],
+    *,
+    rank_by: str = "avg_return",
+    min_trades: int = 1,
+) -> list[SweepResult]:
+    """Pool each combo's trades across tickers and rank by ``rank_by``, best first.
+
+    Combos with fewer than ``min_trades`` trades are left out.
+    """
+    if rank_by not in RANK_METRICS:
+        raise ValueError(f"rank_by must be one of {', '.join(RANK_METRICS)}")
+    results: list[SweepResult] = []
+    for j, combo in enumerate(combos):
+        runs = [ticker_runs[j] for ticker_runs in per_ticker]
+        summary = summarize([t for run in runs for t in run.trades])
+        if summary.trades >= max(min_trades, 1):
+            results.append(SweepResult(combo, sum(run.signals for run in runs), summary))
+    results.sort(key=lambda r: (_metric(r.summary, rank_by), r.summary.trades), reverse=True)
+    return results
+
+
+def config_block(overrides: Mapping[str, Any]) -> dict[str, Any]:
+    """Nest dotted ``overrides`` into the ``config.yaml`` layout."""
+    block: dict[str, Any] = {}
+    for path, value in overrides.items():
+        *parents, name = path.split(".")
+        node = block
+        for part in parents:
+            node = node.setdefault(part, {})
+        node[name] = value
+    return block
+
+
+__all__ = [
+    "BUY_SECTION",
+    "RANK_METRICS",
+    "SELL_SECTION",
+    "SweepCombo",
+    "SweepResult",
+    "config_block",
+    "expand_combos",
+    "rank_combos",
+    "sweep_batch",
+    "sweep_ticker",
+]
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import dataclasses
+import functools
+import logging
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from .backtest import backtest_settings, load_history
+from .config import Config, HybridSellConfig, HybridStrategyConfig, load_config, load_watchlist
+from .report.sweep_report import write_sweep_report
+from .signals.indicators import set_backend as set_indicator_backend
+from .signals.parallel import evaluate_parallel
+from .signals.sweep import (
+    BUY_SECTION,
+    SELL_SECTION,
+    config_block,
+    expand_combos,
+    rank_combos,
+    sweep_batch,
+)
+
+_SWEEPABLE = {
+    BUY_SECTION: {f.name for f in dataclasses.fields(HybridStrategyConfig)},
+    SELL_SECTION: {f.name for f in dataclasses.fields(HybridSellConfig)},
+}
+
+
+def _flatten(node: Any, prefix: str = "") -> dict[str, list[Any]]:
+    if not isinstance(node, dict):
+        values = node if isinstance(node, list) else [node]
+        return {prefix: values}
+    out: dict[str, list[Any]] = {}
+    for key, value in node.items():
+        out.update(_flatten(value, f"{prefix}.{key}" if prefix else str(key)))
+    return out
+
+
+def load_sweep_spec(path: str) -> dict[str, list[Any]]:
+    """Read a sweep spec: ``config.yaml``-shaped YAML whose leaves are value lists."""
+    with Path(path).open("r", encoding="utf-8") as f:
+        raw = yaml.safe_load(f) or {}
+    spec = _flatten(raw)
+    for key, values in spec.items():
+        section, _, name = key.rpartition(".")
+        if name not in _SWEEPABLE.get(section, ()):
+            raise ValueError(
+                f"Unknown sweep parameter {key!r} (use {BUY_SECTION}.* or {SELL_SECTION}.*)"
+            )
+        if not values:
+            raise ValueError(f"Sweep parameter {key!r} has no values")
+    return spec
+
+
+def run_sweep(
+    *,
+    spec_path: str,
+    watchlist_path: str | None,
+    provider: str | None,
+    samples: int | None = None,
+    seed: int | None = None,
+    rank_by: str = "avg_return",
+    min_trades: int = 10,
+    top: int = 20,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    workers: int | None = None,
+) -> int:
+    """Backtest every hybrid settings variant of the spec and rank them."""
+    logger = logging.getLogger(__name__)
+    cfg: Config = load_config(provider_override=provider)
+    set_indicator_backend(cfg.indicator_backend)
+
+    spec = load_sweep_spec(spec_path)
+    # the sweep always tunes the hybrid buy strategy, whatever strategy.mode says
+    base = backtest_settings(
+        dataclasses.replace(cfg, strategy_mode="sma_ema_hybrid"),
+        start_date=start_date,
+        end_date=end_date,
+    )
+    combos = expand_combos(spec, base, samples=samples, seed=seed)
+    if not combos:
+        logger.error("Sweep spec %s yields no valid settings combination", spec_path)
+        return 1
+
+    tickers = load_watchlist(watchlist_path or cfg.watchlist_path or "watchlist.txt")
+    failures: list[str] = []
+    if not tickers:
+        msg = "No tickers provided (watchlist empty or missing)"
+        failures.append(msg)
+        logger.error(msg)
+    items = load_history(cfg, tickers, failures)
+
+    logger.info("Sweep: %s combinations x %s tickers", len(combos), len(items))
+    per_ticker = evaluate_parallel(
+        items,
+        functools.partial(sweep_batch, base=base, combos=combos),
+        workers=workers if workers is not None else cfg.eval_workers,
+    )
+    ranked = rank_combos(combos, per_ticker, rank_by=rank_by, min_trades=min_trades)
+
+    best_block = None
+    if ranked:
+        best = ranked[0]
+        best_block = config_block({"strategy.mode": "sma_ema_hybrid", **best.combo.overrides})
+        logger.info(
+            "Best of %s ranked combinations by %s: %s (%s trades)",
+            len(ranked),
+            rank_by,
+            best.combo.overrides,
+            best.summary.trades,
+        )
+    else:
+        logger.warning("No combination reached %s trades", min_trades)
+
+    out_path = write_sweep_report(
+        report_dir=cfg.report_dir,
+        spec_path=spec_path,
+        params=list(spec),
+        ranked=ranked[: max(top, 1)],
+        combos=len(combos),
+        tickers=len(items),
+        rank_by=rank_by,
+        min_trades=min_trades,
+        best_block=best_block,
+        start_date=start_date,
+        end_date=end_date,
+        failures=failures,
+    )
+    logger.info("Sweep report written to: %s", out_path)
+    return 1 if not items else 0
+
+
+__all__ = ["load_sweep_spec", "run_sweep"]
@@ -0,0 +1,71 @@
+"""Bounded producer/consumer stage between candle fetching and evaluation.
+
+:func:`staged` runs a producer iterator on a background thread and hands
+its items to the caller through a :class:`queue.Queue` of ``depth`` slots,
+so the caller can evaluate one item while the producer is still waiting on
+the network for the next. A full queue blocks the producer, which keeps the
+number of in-flight items (and their candles) at ``depth`` no matter how
+large the universe is. Items arrive in the order the producer yields them;
+an exception in the producer is re-raised in the caller, and a caller that
+stops early (or fails) makes the producer stop at its next item.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from collections.abc import Iterable, Iterator
+
+# Seconds a blocked producer waits before re-checking whether the consumer left.
+_PUT_POLL = 0.1
+
+_DONE = object()
+
+
+class _Failure:
+    __slots__ = ("exc",)
+
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+
+
+def staged[T](source: Iterable[T], *, depth: int, name: str = "sab-pipeline") -> Iterator[T]:
+    """Yield the items of ``source``, produced on a thread at most ``depth`` ahead."""
+    slots: queue.Queue[object] = queue.Queue(maxsize=max(1, depth))
+    stop = threading.Event()
+
+    def put(item: object) -> bool:
+        while not stop.is_set():
+            try:
+                slots.put(item, timeout=_PUT_POLL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in source:
+                if not put(item):
+                    return
+        except BaseException as exc:
+            put(_Failure(exc))
+            return
+        put(_DONE)
+
+    thread = threading.Thread(target=produce, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = slots.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.exc
+            yield item  # type: ignore[misc]
+    finally:
+        stop.set()
+        thread.join()
+
+
+__all__ = ["staged"]
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import datetime as dt
+from dataclasses import replace
+from unittest.mock import patch
+
+import numpy as np
+from sab.backfill import run_backfill
+from sab.config import Config
+from sab.data.backfill import (
+    STATUS_DONE,
+    STATUS_RESTATED,
+    BackfillCursor,
+    BackfillState,
+    backfill_earliest,
+    backfill_series,
+    start_cursor,
+)
+from sab.data.candle_store import open_candle_store
+from sab.data.candles import Candles
+
+TODAY = dt.date(2024, 3, 8)
+
+
+def _weekdays(start: dt.date, end: dt.date) -> list[int]:
+    days = []
+    cursor = start
+    while cursor <= end:
+        if cursor.weekday() < 5:
+            days.append(int(cursor.strftime("%Y%m%d")))
+        cursor += dt.timedelta(days=1)
+    return days
+
+
+def _series(dates: list[int], shift: float = 0.0) -> Candles:
+    close = np.array([100.0 + (d % 1000) / 10 for d in dates]) + shift
+    return Candles(
+        {
+            "date": dates,
+            "open": close,
+            "high": close + 1,
+            "low": close - 1,
+            "close": close,
+            "volume": np.full(len(dates), 1000.0),
+        }
+    )
+
+
+class _FakeClient:
+    def __init__(self, listed: dt.date, *, shift: float = 0.0, fail_at: int | None = None):
+        self.history = _series(_weekdays(listed, TODAY), shift)
+        self.calls: list[tuple[str, str, str]] = []
+        self.fail_at = fail_at
+
+    def candle_chunk(self, symbol, *, start_date, end_date, exchange=None, adjusted=True):
+        if self.fail_at is not None and len(self.calls) == self.fail_at:
+            raise KeyboardInterrupt
+        self.calls.append((symbol, start_date, end_date))
+        lo = int(np.searchsorted(self.history.date, int(start_date)))
+        hi = int(np.searchsorted(self.history.date, int(end_date), side="right"))
+        return self.history[lo:hi]
+
+
+def _run(client, store, state, key, earliest):
+    cursor = start_cursor(store.load(key), state.get(key), earliest=earliest, today=TODAY)
+    return backfill_series(
+        client,
+        store,
+        key,
+        "005930",
+        cursor=cursor,
+        on_chunk=lambda c: state.put(key, c),
+        today=TODAY,
+    )
+
+
+def test_backfill_prepends_history_down_to_the_depth(tmp_path):
+    store = open_candle_store(str(tmp_path))
+    recent = _weekdays(dt.date(2024, 1, 1), TODAY)
+    store.save("candles_005930", _series(recent))
+    client = _FakeClient(dt.date(2015, 1, 1))
+    earliest = backfill_earliest(TODAY, 3)
+
+    cursor = _run(client, store, BackfillState(str(tmp_path)), "candles_005930", earliest)
+
+    assert cursor.status == STATUS_DONE
+    saved = store.load("candles_005930")
+    assert saved.dates()[0] >= earliest and saved.dates()[-1] == "20240308"
+    expected = [d for d in client.history.date.tolist() if d >= int(saved.date[0])]
+    assert saved.date.tolist() == expected
+    assert cursor.bars == len(saved) - len(recent)
+    # every request ends on the stored first bar or an older day
+    ends = [end for _, _, end in client.calls]
+    assert ends == sorted(ends, reverse=True) and len(set(ends)) == len(ends)
+
+
+def test_interrupted_backfill_resumes_without_repeating_requests(tmp_path):
+    store = open_candle_store(str(tmp_path))
+    store.save("candles_005930", _series(_weekdays(dt.date(2024, 1, 1), TODAY)))
+    earliest = backfill_earliest(TODAY, 4)
+    first = _FakeClient(dt.date(2015, 1, 1), fail_at=3)
+    try:
+        _run(first, store, BackfillState(str(tmp_path)), "candles_005930", earliest)
+    except KeyboardInterrupt:
+        pass
+    assert len(first.calls) == 3
+
+    second = _FakeClient(dt.date(2015, 1, 1))
+    cursor = _run(second, store, BackfillState(str(tmp_path)), "candles_005930", earliest)
+    assert cursor.status == STATUS_DONE
+    assert not set(first.calls) & set(second.calls)
+    assert second.calls[0][2] < first.calls[-1][2]
+
+    reference = tmp_path / "reference"
+    ref_store = open_candle_store(str(reference))
+    ref_store.save("candles_005930", _series(_weekdays(dt.date(2024, 1, 1), TODAY)))
+    _run(
+        _FakeClient(dt.date(2015, 1, 1)),
+        ref_store,
+        BackfillState(str(reference)),
+        "candles_005930",
+        earliest,
+    )
+    assert store.load("candles_005930") == ref_store.load("candles_005930")
+
+    # a finished key makes no requests until the depth moves back
+    third = _FakeClient(dt.date(2015, 1, 1))
+    _run(third, store, BackfillState(str(tmp_path)), "candles_005930", earliest)
+    assert third.calls == []
+    _run(third, store, BackfillState(str(tmp_path)), "candles_005930", backfill_earliest(TODAY, 5))
+    assert third.calls and store.load("candles_005930").dates()[0] < earliest
+
+
+def test_listing_date_and_restated_history_stop_the_cursor(tmp_path):
+    store = open_candle_store(str(tmp_path))
+    store.save("candles_NEW", _series(_weekdays(dt.date(2024, 1, 1), TODAY)))
+    client = _FakeClient(dt.date(2023, 6, 1))
+    cursor = _run(
+        client, store, BackfillState(str(tmp_path)), "candles_NEW", backfill_earliest(TODAY, 10)
+    )
+    assert cursor.status == STATUS_DONE and cursor.empty == 3
+    assert store.load("candles_NEW").dates()[0] == "20230601"
+
+    recent = _series(_weekdays(dt.date(2024, 1, 1), TODAY))
+    store.save("candles_ADJ", recent)
+    state = BackfillState(str(tmp_path))
+    split = _FakeClient(dt.date(2015, 1, 1), shift=-50.0)
+    earliest = backfill_earliest(TODAY, 3)
+    cursor = _run(split, store, state, "candles_ADJ", earliest)
+    # the stale series is dropped and rebuilt from today on the restated basis
+    assert cursor.status == STATUS_DONE
+    assert split.calls[1][2] == "20240308"
+    saved = store.load("candles_ADJ")
+    assert saved.dates()[0] >= earliest and saved.dates()[-1] == "20240308"
+    lo = int(np.searchsorted(split.history.date, saved.date[0]))
+    assert saved == split.history[lo:]
+
+
+def test_parked_restated_key_recovers_on_a_later_run(tmp_path):
+    store = open_candle_store(str(tmp_path))
+    store.save("candles_ADJ", _series(_weekdays(dt.date(2024, 1, 1), TODAY)))
+    state = BackfillState(str(tmp_path))
+    earliest = backfill_earliest(TODAY, 3)
+    state.put(
+        "candles_ADJ",
+        BackfillCursor(
+            next_end="20240101", earliest=earliest, first="20240101", status=STATUS_RESTATED
+        ),
+    )
+
+    cursor = _run(
+        _FakeClient(dt.date(2015, 1, 1), shift=-50.0),
+        store,
+        BackfillState(str(tmp_path)),
+        "candles_ADJ",
+        earliest,
+    )
+    assert cursor.status == STATUS_DONE
+    saved = store.load("candles_ADJ")
+    assert cursor.first == saved.dates()[0]
+    assert saved.dates()[0] < "20240101" and float(saved.close[-1]) == 100.0 + 308 / 10 - 50
+
+
+def test_run_backfill_saves_cursors(tmp_path):
+    cfg = replace(
+        Config(),
+        data_dir=str(tmp_path),
+        kis_app_key="key",
+        kis_app_secret="secret",
+        kis_base_url="https://openapivts.koreainvestment.com:29443",
+        backfill_years=5,
+        backfill_pause_seconds=0.0,
+    )
+    open_candle_store(str(tmp_path)).save(
+        "candles_005930", _series(_weekdays(dt.date(2024, 1, 1), TODAY))
+    )
+    fake = _FakeClient(dt.date(2015, 1, 1))
+    with (
+        patch("sab.backfill.load_config", return_value=cfg),
+        patch("sab.backfill.load_watchlist", return_value=["005930"]),
+        patch("sab.backfill.KISClient", return_value=fake),
+        patch("sab.backfill._lower_priority"),
+    ):
+        assert run_backfill(watchlist_path=None) == 0
+    assert fake.calls and {symbol for symbol, _, _ in fake.calls} == {"005930"}
+    state = BackfillState(str(tmp_path))
+    assert state.get("candles_005930").status == STATUS_DONE
+    saved = open_candle_store(str(tmp_path)).load("candles_005930")
+    assert saved.dates()[0] < "20240101" and saved.dates()[-1] == "20240308"
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import datetime as dt
+from dataclasses import replace
+from unittest.mock import patch
+
+import numpy as np
+from sab.backtest import run_backtest
+from sab.config import Config
+from sab.data.candle_store import open_candle_store
+from sab.data.candles import Candles
+from sab.signals.backtest import (
+    EXIT_OPEN,
+    BacktestSettings,
+    backtest_ticker,
+    replay_signals,
+    summarize,
+)
+from sab.signals.hybrid_buy import HybridEvaluationSettings, evaluate_ticker_hybrid
+from sab.signals.hybrid_sell import HybridSellSettings
+
+WINDOW = 150
+META = {"data_source": "pykrx", "currency": "KRW"}
+
+
+def _candles(n: int, seed: int = 1) -> Candles:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n)))
+    start = dt.date(2020, 1, 1)
+    return Candles(
+        {
+            "date": [int((start + dt.timedelta(days=i)).strftime("%Y%m%d")) for i in range(n)],
+            "open": close * (1 + rng.normal(0, 0.005, n)),
+            "high": close * 1.01,
+            "low": close * 0.99,
+            "close": close,
+            "volume": rng.uniform(1e5, 2e5, n),
+        }
+    )
+
+
+def _settings(**kwargs) -> BacktestSettings:
+    buy = HybridEvaluationSettings(
+        sma_trend_period=20,
+        ema_short_period=10,
+        ema_mid_period=21,
+        rsi_period=14,
+        rsi_zone_low=45,
+        rsi_zone_high=60,
+        rsi_oversold_low=30,
+        rsi_oversold_high=40,
+        pullback_max_bars=5,
+        breakout_consolidation_min_bars=5,
+        breakout_consolidation_max_bars=20,
+        volume_lookback_days=5,
+        max_gap_pct=0.03,
+        use_sma60_filter=False,
+        sma60_period=60,
+        kr_breakout_requires_confirmation=False,
+        gap_atr_multiplier=1.0,
+        min_history_bars=120,
+        min_price=0.0,
+        us_min_price=None,
+        min_dollar_volume=0.0,
+        us_min_dollar_volume=None,
+        exclude_etf_etn=False,
+    )
+    return BacktestSettings(
+        strategy_mode="sma_ema_hybrid",
+        buy=buy,
+        sell_mode="sma_ema_hybrid",
+        sell=HybridSellSettings(),
+        window=WINDOW,
+        **kwargs,
+    )
+
+
+def test_replay_matches_the_live_evaluator_on_each_date():
+    candles = _candles(400)
+    settings = _settings()
+    expected = [
+        i
+        for i in range(len(candles))
+        if evaluate_ticker_hybrid(
+            "A", candles[max(0, i - WINDOW + 1) : i + 1], settings.buy, META
+        ).candidate
+    ]
+    signals = replay_signals("A", candles, META, settings)
+    assert expected and [s.index for s in signals] == expected
+    assert signals[0].date == candles[signals[0].index]["date"]
+
+
+def test_trades_open_after_signals_and_do_not_overlap():
+    candles = _candles(600, seed=3)
+    result = backtest_ticker("A", candles, META, _settings())
+    assert result.trades and result.signals >= len(result.trades)
+    dates = candles.dates()
+    previous_exit = ""
+    for trade in result.trades:
+        entry = dates.index(trade.entry_date)
+        assert trade.entry_price == candles.open[entry]
+        assert trade.entry_date >= previous_exit
+        assert trade.bars_held == dates.index(trade.exit_date) - entry
+        previous_exit = trade.exit_date
+    assert all(t.exit_reason != EXIT_OPEN for t in result.trades[:-1])
+
+    summary = summarize(result.trades)
+    assert summary.trades == len(result.trades)
+    assert summary.worst <= summary.median_return <= summary.best
+
+
+def test_date_range_limits_signals():
+    candles = _candles(400)
+    everything = replay_signals("A", candles, META, _settings())
+    middle = everything[len(everything) // 2].date
+    later = replay_signals("A", candles, META, _settings(start_date=middle))
+    assert later == [s for s in everything if s.date >= middle]
+
+
+def test_run_backtest_writes_report_and_trades(tmp_path):
+    cfg = replace(
+        Config(),
+        data_dir=str(tmp_path),
+        report_dir=str(tmp_path / "reports"),
+        data_provider="pykrx",
+        strategy_mode="sma_ema_hybrid",
+        sell_mode="sma_ema_hybrid",
+        min_dollar_volume=0.0,
+        min_price=0.0,
+        exclude_etf_etn=False,
+    )
+    store = open_candle_store(cfg.data_dir, backend=cfg.candle_store)
+    store.save("candles_005930", _candles(500, seed=3))
+    with (
+        patch("sab.backtest.load_config", return_value=cfg),
+        patch("sab.backtest.load_watchlist", return_value=["005930", "000660"]),
+    ):
+        assert run_backtest(watchlist_path=None, provider=None) == 0
+    report = next((tmp_path / "reports").glob("*.backtest.md")).read_text(encoding="utf-8")
+    assert "## Summary" in report and "000660: no cached candles" in report
+    trades = next((tmp_path / "reports").glob("*.trades.csv")).read_text(encoding="utf-8")
+    assert trades.startswith("ticker,entry_date") and "005930" in trades
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import datetime as dt
+
+import numpy as np
+import pytest
+from sab.signals import indicators
+from sab.signals.batch_eval import evaluate_batch, evaluate_batch_hybrid
+from sab.signals.evaluator import EvaluationSettings, evaluate_ticker
+from sab.signals.hybrid_buy import HybridEvaluationSettings, evaluate_ticker_hybrid
+
+
+def _walk(n: int, seed: int) -> list[dict[str, float | str]]:
+    rng = np.random.default_rng(seed)
+    # mean-reverting walk so EMA crosses and RSI swings happen often
+    closes = [100.0]
+    for _ in range(n - 1):
+        closes.append(closes[-1] + rng.normal(scale=2.0) + (100.0 - closes[-1]) * 0.05)
+    start = dt.date(2024, 1, 1)
+    candles = []
+    for i, close in enumerate(closes):
+        open_ = close + rng.normal(scale=1.0)
+        candles.append(
+            {
+                "date": (start + dt.timedelta(days=i)).strftime("%Y%m%d"),
+                "open": open_,
+                "high": max(open_, close) + abs(rng.normal()),
+                "low": min(open_, close) - abs(rng.normal()),
+                "close": close,
+                "volume": float(rng.integers(1_000, 2_000_000)),
+            }
+        )
+    return candles
+
+
+def _universe() -> list[tuple[str, list[dict], dict]]:
+    items = []
+    for seed in range(25):
+        series = _walk(260, seed)
+        meta = {"data_source": "pykrx" if seed % 2 else "kis"}
+        if seed % 5 == 0:
+            meta["currency"] = "USD"
+        # every prefix length from 180 bars up exercises many signal days
+        for end in range(180, 261, 2):
+            items.append((f"T{seed}_{end}", series[:end], dict(meta)))
+    items.append(("SHORT", _walk(30, 99), {"data_source": "pykrx"}))
+    broken = _walk(220, 98)
+    for candle in broken:
+        candle["close"] = float("nan")
+    items.append(("NOPRICE", broken, {"data_source": "pykrx"}))
+    return items
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request):
+    previous = indicators.get_backend()
+    indicators.set_backend(request.param)
+    yield request.param
+    indicators.set_backend(previous)
+
+
+def test_batch_matches_per_ticker_ema_cross(backend):
+    settings = EvaluationSettings(
+        min_history_bars=120, min_price=90.0, us_min_price=95.0, rs_lookback_days=20
+    )
+    items = _universe()
+    batch = evaluate_batch(items, settings)
+    expected = [evaluate_ticker(t, c, settings, m) for t, c, m in items]
+    assert batch == expected
+    reasons = {r.reason for r in batch}
+    assert "EMA(20/50) cross not satisfied" in reasons
+    assert "Insufficient price data" in reasons
+
+
+def test_batch_matches_per_ticker_hybrid(backend):
+    settings = HybridEvaluationSettings(
+        sma_trend_period=20,
+        ema_short_period=10,
+        ema_mid_period=21,
+        rsi_period=14,
+        rsi_zone_low=45,
+        rsi_zone_high=60,
+        rsi_oversold_low=30,
+        rsi_oversold_high=40,
+        pullback_max_bars=5,
+        breakout_consolidation_min_bars=5,
+        breakout_consolidation_max_bars=20,
+        volume_lookback_days=5,
+        max_gap_pct=0.03,
+        use_sma60_filter=False,
+        sma60_period=60,
+        kr_breakout_requires_confirmation=False,
+        gap_atr_multiplier=1.0,
+        min_history_bars=120,
+        min_price=0.0,
+        us_min_price=None,
+        min_dollar_volume=1_000_000.0,
+        us_min_dollar_volume=None,
+        exclude_etf_etn=False,
+    )
+    items = _universe()
+    batch = evaluate_batch_hybrid(items, settings)
+    expected = [evaluate_ticker_hybrid(t, c, settings, m) for t, c, m in items]
+    assert batch == expected
+    assert any(r.candidate for r in batch)
+    assert any(r.reason == "Did not meet hybrid signal criteria" for r in batch)
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import datetime as dt
+from unittest.mock import MagicMock
+
+from sab.data.candle_refresh import REFRESH_FULL, REFRESH_TAIL, merge_tail, refresh_candles
+from sab.data.kis_client import KISClient, KISCredentials
+
+
+def _bars(start: dt.date, n: int, close_start: float = 100.0) -> list[dict[str, float | str]]:
+    out: list[dict[str, float | str]] = []
+    for i in range(n):
+        d = start + dt.timedelta(days=i)
+        close = close_start + i
+        out.append(
+            {
+                "date": d.strftime("%Y%m%d"),
+                "open": close,
+                "high": close + 1,
+                "low": close - 1,
+                "close": close,
+                "volume": 1000.0,
+            }
+        )
+    return out
+
+
+def test_merge_tail_appends_and_trims_to_count():
+    cached = _bars(dt.date(2025, 1, 1), 10)
+    tail = _bars(dt.date(2025, 1, 9), 4, close_start=108.0)
+    merged = merge_tail(cached, tail, count=10)
+    assert merged is not None
+    assert len(merged) == 10
+    assert merged[0]["date"] == "20250103"
+    assert merged[-1]["date"] == "20250112"
+
+
+def test_merge_tail_replaces_last_cached_bar():
+    cached = _bars(dt.date(2025, 1, 1), 5)
+    cached[-1] = dict(cached[-1], close=999.0)  # stale intraday snapshot
+    tail = _bars(dt.date(2025, 1, 4), 2, close_start=103.0)
+    merged = merge_tail(cached, tail, count=10)
+    assert merged is not None
+    assert merged[-1]["close"] == 104.0
+
+
+def test_merge_tail_detects_adjustment():
+    cached = _bars(dt.date(2025, 1, 1), 5)
+    tail = _bars(dt.date(2025, 1, 4), 3, close_start=51.5)  # split-adjusted closes
+    assert merge_tail(cached, tail, count=10) is None
+
+
+def test_merge_tail_detects_gap():
+    cached = _bars(dt.date(2025, 1, 1), 5)
+    tail = _bars(dt.date(2025, 1, 10), 3, close_start=110.0)
+    assert merge_tail(cached, tail, count=10) is None
+
+
+def test_refresh_candles_uses_tail_when_cache_is_full():
+    cached = _bars(dt.date(2025, 1, 1), 5)
+    client = MagicMock()
+    client.daily_candles.return_value = _bars(dt.date(2025, 1, 4), 3, close_start=103.0)
+
+    candles, mode = refresh_candles(client, symbol="005930", exchange=None, count=5, cached=cached)
+
+    assert mode == REFRESH_TAIL
+    assert candles[-1]["date"] == "20250106"
+    client.daily_candles.assert_called_once_with("005930", count=5, since="20250104")
+
+
+def test_refresh_candles_falls_back_to_full_on_mismatch():
+    cached = _bars(dt.date(2025, 1, 1), 5)
+    full = _bars(dt.date(2025, 1, 2), 5, close_start=50.0)
+    client = MagicMock()
+    client.overseas_daily_candles.side_effect = [
+        _bars(dt.date(2025, 1, 4), 3, close_start=51.5),
+        full,
+    ]
+
+    candles, mode = refresh_candles(client, symbol="AAPL", exchange="NAS", count=5, cached=cached)
+
+    assert mode == REFRESH_FULL
+    assert candles == full
+    assert client.overseas_daily_candles.call_count == 2
+    assert "since" not in client.overseas_daily_candles.call_args.kwargs
+
+
+def test_refresh_candles_short_cache_fetches_full():
+    client = MagicMock()
+    client.daily_candles.return_value = _bars(dt.date(2025, 1, 1), 3)
+    _, mode = refresh_candles(
+        client, symbol="005930", exchange=None, count=200, cached=_bars(dt.date(2025, 1, 1), 3)
+    )
+    assert mode == REFRESH_FULL
+    client.daily_candles.assert_called_once_with("005930", count=200)
+
+
+def test_kis_daily_candles_since_stops_after_reaching_start():
+    creds = KISCredentials(app_key="k", app_secret="s", base_url="https://example.com", env="demo")
+    client = KISClient(creds, session=MagicMock(), cache_dir=None)
+    client.ensure_token = MagicMock()  # type: ignore[method-assign]
+    today = dt.date.today()
+    since = today - dt.timedelta(days=3)
+    rows = [
+        {"stck_bsop_date": (since + dt.timedelta(days=i)).strftime("%Y%m%d"), "stck_clpr": "1"}
+        for i in range(4)
+    ]
+    client._fetch_candle_chunk = MagicMock(return_value=rows)  # type: ignore[method-assign]
+
+    candles = client.daily_candles("005930", count=200, since=since.strftime("%Y%m%d"))
+
+    client._fetch_candle_chunk.assert_called_once()
+    assert client._fetch_candle_chunk.call_args.kwargs["start_date"] == since.strftime("%Y%m%d")
+    assert [c["date"] for c in candles] == [r["stck_bsop_date"] for r in rows]
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import datetime as dt
+import math
+import os
+
+import numpy as np
+import pytest
+from sab.data.cache import json_path, save_json
+from sab.data.candle_store import (
+    ColumnarCandleStore,
+    JsonCandleStore,
+    migrate_json_cache,
+    open_candle_store,
+)
+
+
+def _bars(start: dt.date, n: int, close_start: float = 100.0) -> list[dict[str, float | str]]:
+    out: list[dict[str, float | str]] = []
+    for i in range(n):
+        close = close_start + i
+        out.append(
+            {
+                "date": (start + dt.timedelta(days=i)).strftime("%Y%m%d"),
+                "open": close,
+                "high": close + 1,
+                "low": close - 1,
+                "close": close,
+                "volume": 1000.0 + i,
+                "prev_close_diff": 1.0,
+            }
+        )
+    return out
+
+
+def test_roundtrip_and_limit(tmp_path):
+    store = ColumnarCandleStore(str(tmp_path))
+    bars = _bars(dt.date(2025, 1, 1), 10)
+    bars[3]["volume"] = float("nan")
+    store.save("candles_005930", bars)
+
+    loaded = store.load("candles_005930")
+    assert loaded is not None
+    assert [b["date"] for b in loaded] == [b["date"] for b in bars]
+    assert loaded[0]["close"] == 100.0
+    assert math.isnan(loaded[3]["volume"])
+
+    tail = store.load("candles_005930", limit=3)
+    assert [b["date"] for b in tail or []] == ["20250108", "20250109", "20250110"]
+
+    cols = store.load_columns("candles_005930")
+    assert cols is not None
+    assert cols["close"].dtype == np.float64 and cols["close"].flags["C_CONTIGUOUS"]
+    assert cols["date"][0] == 20250101
+
+
+def test_save_appends_without_rewriting_history(tmp_path):
+    store = ColumnarCandleStore(str(tmp_path))
+    store.save("k", _bars(dt.date(2025, 1, 1), 10))
+    close_file = os.path.join(tmp_path, "k", "close.f8")
+    before = open(close_file, "rb").read()
+
+    # sliding window: drops the two oldest bars, corrects the last, adds one
+    window = _bars(dt.date(2025, 1, 3), 9, close_start=102.0)
+    window[-2]["close"] = 555.0
+    store.save("k", window)
+
+    after = open(close_file, "rb").read()
+    assert after[: 8 * 8] == before[: 8 * 8]  # untouched prefix
+    loaded = store.load("k")
+    assert loaded is not None
+    assert len(loaded) == 11  # history before the window is kept
+    assert loaded[0]["date"] == "20250101"
+    assert loaded[-2]["close"] == 555.0
+    assert store.header("k") == {
+        "version": 1,
+        "rows": 11,
+        "first": 20250101,
+        "last": 20250111,
+        "columns": ["date", "open", "high", "low", "close", "volume", "prev_close_diff"],
+    }
+
+
+def test_uncommitted_tail_bytes_are_ignored(tmp_path):
+    store = ColumnarCandleStore(str(tmp_path))
+    store.save("k", _bars(dt.date(2025, 1, 1), 5))
+    with open(os.path.join(tmp_path, "k", "close.f8"), "ab") as fh:
+        np.array([1.0, 2.0]).tofile(fh)  # simulated crash mid-write
+    loaded = store.load("k")
+    assert loaded is not None and len(loaded) == 5
+    store.save("k", _bars(dt.date(2025, 1, 5), 2, close_start=104.0))
+    assert [b["close"] for b in store.load("k") or []] == [100.0, 101.0, 102.0, 103.0, 104.0, 105.0]
+
+
+def test_legacy_json_is_imported_on_first_load(tmp_path):
+    data_dir = str(tmp_path)
+    save_json(data_dir, "candles_AAPL", _bars(dt.date(2025, 1, 1), 4))
+    old = dt.datetime(2025, 1, 4, 12, 0, tzinfo=dt.UTC).timestamp()
+    os.utime(json_path(data_dir, "candles_AAPL"), (old, old))
+
+    store = open_candle_store(data_dir)
+    assert isinstance(store, ColumnarCandleStore)
+    assert store.modified_at("candles_AAPL") == dt.datetime.fromtimestamp(old, tz=dt.UTC)
+    loaded = store.load("candles_AAPL")
+    assert loaded is not None and len(loaded) == 4
+    assert store.header("candles_AAPL") is not None
+    assert store.modified_at("candles_AAPL") == dt.datetime.fromtimestamp(old, tz=dt.UTC)
+
+
+def test_migrate_json_cache(tmp_path):
+    data_dir = str(tmp_path)
+    save_json(data_dir, "candles_005930", _bars(dt.date(2025, 1, 1), 3))
+    save_json(data_dir, "candles_overseas_NAS_AAPL", _bars(dt.date(2025, 1, 1), 3))
+    save_json(data_dir, "fx_usdkrw", {"rate": 1400})
+
+    assert migrate_json_cache(data_dir, remove=True) == 2
+    assert not os.path.exists(json_path(data_dir, "candles_005930"))
+    assert os.path.exists(json_path(data_dir, "fx_usdkrw"))
+    store = ColumnarCandleStore(os.path.join(data_dir, "candles"))
+    assert store.keys() == ["candles_005930", "candles_overseas_NAS_AAPL"]
+
+
+def test_json_backend_is_selectable(tmp_path):
+    store = open_candle_store(str(tmp_path), backend="json")
+    assert isinstance(store, JsonCandleStore)
+    store.save("candles_X", _bars(dt.date(2025, 1, 1), 5))
+    assert len(store.load("candles_X", limit=2) or []) == 2
+    assert store.modified_at("candles_X") is not None
+
+
+def test_map_columns_is_read_only_tail_view(tmp_path):
+    store = ColumnarCandleStore(str(tmp_path))
+    store.save("k", _bars(dt.date(2025, 1, 1), 300))
+
+    cols = store.map_columns("k", limit=250)
+    assert cols is not None
+    close = cols["close"]
+    assert isinstance(close, np.memmap)
+    assert len(close) == 250 and close[0] == 150.0 and close[-1] == 399.0
+    with pytest.raises(ValueError):
+        close[0] = 1.0
+
+
+def test_live_map_survives_shorter_save(tmp_path):
+    store = ColumnarCandleStore(str(tmp_path))
+    store.save("k", _bars(dt.date(2025, 1, 1), 20))
+    cols = store.map_columns("k")
+    assert cols is not None
+    size = os.path.getsize(os.path.join(tmp_path, "k", "close.f8"))
+
+    # a corrected tail ending earlier shortens the committed rows, not the file
+    tail = _bars(dt.date(2025, 1, 11), 5, close_start=110.0)
+    tail[-1]["close"] = 54.0
+    store.save("k", tail)
+
+    assert os.path.getsize(os.path.join(tmp_path, "k", "close.f8")) == size
+    assert float(cols["close"][-1]) == 119.0  # stale bytes past the header, still mapped
+    loaded = store.load("k")
+    assert loaded is not None and len(loaded) == 15
+    assert loaded[-1]["close"] == 54.0
+
+
+def test_restated_overlap_replaces_the_stored_history(tmp_path):
+    store = ColumnarCandleStore(str(tmp_path))
+    store.save("k", _bars(dt.date(2025, 1, 1), 300))
+    # a split: the live window's first close no longer matches the stored one
+    window = _bars(dt.date(2025, 1, 1) + dt.timedelta(days=100), 200)
+    for bar in window:
+        bar["close"] = 50.0
+    store.save("k", window)
+
+    loaded = store.load("k")
+    assert loaded is not None and len(loaded) == 200
+    assert set(loaded.close.tolist()) == {50.0}
+    assert store.header("k")["first"] == int(window[0]["date"])
+
+    # a single corrected last bar is not a restatement
+    store.save("k", [{**window[-1], "close": 51.0}])
+    assert len(store.load("k") or []) == 200
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import datetime as dt
+import math
+import sys
+import types
+
+import numpy as np
+import pandas as pd
+from sab.data.candle_store import ColumnarCandleStore, JsonCandleStore
+from sab.data.candles import Bar, Candles
+from sab.data.pykrx_client import PykrxClient
+from sab.signals.batch_eval import evaluate_batch_hybrid
+from sab.signals.evaluator import EvaluationSettings, evaluate_ticker
+from sab.signals.hybrid_buy import HybridEvaluationSettings, evaluate_ticker_hybrid
+from sab.signals.hybrid_sell import HybridSellSettings, evaluate_sell_signals_hybrid
+from sab.signals.sell_rules import SellSettings, evaluate_sell_signals
+
+
+def _rows(n: int, seed: int = 0) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    closes = 100.0 + np.cumsum(rng.normal(scale=1.5, size=n))
+    start = dt.date(2024, 1, 1)
+    rows = []
+    for i, close in enumerate(closes.tolist()):
+        rows.append(
+            {
+                "date": (start + dt.timedelta(days=i)).strftime("%Y%m%d"),
+                "open": close + 0.3,
+                "high": close + 1.0,
+                "low": close - 1.2,
+                "close": close,
+                "volume": float(rng.integers(10_000, 90_000)),
+                "prev_close_diff": 0.5,
+            }
+        )
+    return rows
+
+
+def test_bars_behave_like_candle_dicts():
+    rows = _rows(5)
+    rows[2]["volume"] = None
+    candles = Candles.from_dicts(rows)
+    assert len(candles) == 5
+    bar = candles[-1]
+    assert isinstance(bar, Bar)
+    assert bar["date"] == rows[-1]["date"] and bar["close"] == rows[-1]["close"]
+    assert bar.get("missing", 1.0) == 1.0
+    assert dict(candles[0]) == rows[0]
+    assert math.isnan(candles[2]["volume"])
+    assert candles[:2] == rows[:2]
+    assert Candles.from_dicts(candles.to_dicts()) == candles
+
+
+def test_slices_are_views():
+    candles = Candles.from_dicts(_rows(50))
+    head = candles[:20]
+    assert isinstance(head, Candles) and len(head) == 20
+    assert np.shares_memory(head.close, candles.close)
+    assert head[-1]["date"] == candles[19]["date"]
+    assert candles.nbytes == 50 * (4 + 6 * 8)
+
+
+def test_stores_return_candles(tmp_path):
+    rows = _rows(10)
+    for store in (JsonCandleStore(str(tmp_path / "json")), ColumnarCandleStore(str(tmp_path))):
+        store.save("k", Candles.from_dicts(rows))
+        loaded = store.load("k", limit=4)
+        assert isinstance(loaded, Candles)
+        assert loaded == rows[-4:]
+
+
+def test_evaluators_match_dict_input():
+    rows = _rows(260, seed=4)
+    candles = Candles.from_dicts(rows)
+    buy = EvaluationSettings(min_history_bars=120)
+    hybrid = HybridEvaluationSettings(
+        sma_trend_period=20,
+        ema_short_period=10,
+        ema_mid_period=21,
+        rsi_period=14,
+        rsi_zone_low=45,
+        rsi_zone_high=60,
+        rsi_oversold_low=30,
+        rsi_oversold_high=40,
+        pullback_max_bars=5,
+        breakout_consolidation_min_bars=5,
+        breakout_consolidation_max_bars=20,
+        volume_lookback_days=5,
+        max_gap_pct=0.03,
+        use_sma60_filter=False,
+        sma60_period=60,
+        kr_breakout_requires_confirmation=False,
+        gap_atr_multiplier=1.0,
+        min_history_bars=120,
+        min_price=0.0,
+        us_min_price=None,
+        min_dollar_volume=0.0,
+        us_min_dollar_volume=None,
+        exclude_etf_etn=False,
+    )
+    holding = {"entry_price": rows[-30]["close"], "entry_date": rows[-30]["date"]}
+    meta = {"data_source": "pykrx"}
+    assert evaluate_ticker("A", candles, buy, meta) == evaluate_ticker("A", rows, buy, meta)
+    assert evaluate_ticker_hybrid("A", candles, hybrid, meta) == evaluate_ticker_hybrid(
+        "A", rows, hybrid, meta
+    )
+    assert evaluate_sell_signals("A", candles, holding, SellSettings()) == evaluate_sell_signals(
+        "A", rows, holding, SellSettings()
+    )
+    assert evaluate_sell_signals_hybrid(
+        "A", candles, holding, HybridSellSettings()
+    ) == evaluate_sell_signals_hybrid("A", rows, holding, HybridSellSettings())
+
+    items = [(f"T{end}", rows[:end], meta) for end in range(200, 261, 3)]
+    as_candles = [(t, Candles.from_dicts(c), m) for t, c, m in items]
+    assert evaluate_batch_hybrid(as_candles, hybrid) == evaluate_batch_hybrid(items, hybrid)
+
+
+def test_pykrx_daily_candles_builds_columns(monkeypatch):
+    frame = pd.DataFrame(
+        {"시가": [10, 11, 12], "고가": [11, 12, 13], "저가": [9, 10, 11], "종가": [10, 0, 12]},
+        index=pd.to_datetime(["2025-01-02", "2025-01-03", "2025-01-06"]),
+    ).assign(거래량=[100, 200, 300])
+    stock = types.ModuleType("pykrx.stock")
+    stock.get_market_ohlcv_by_date = lambda *args, **kwargs: frame
+    monkeypatch.setitem(sys.modules, "pykrx", types.ModuleType("pykrx"))
+    monkeypatch.setitem(sys.modules, "pykrx.stock", stock)
+
+    candles = PykrxClient().daily_candles("005930", count=2)
+    assert isinstance(candles, Candles)
+    assert candles.dates() == ["20250103", "20250106"]
+    assert candles[0]["prev_close_diff"] == -10.0
+    # the previous close was 0, so no diff is reported
+    assert math.isnan(candles[1]["prev_close_diff"])
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import datetime as dt
+
+import numpy as np
+from sab.data.candles import Candles
+from sab.signals.batch_eval import evaluate_batch
+from sab.signals.eval_cache import EvalResultCache, evaluate_cached
+from sab.signals.evaluator import EvaluationResult, EvaluationSettings
+
+
+def _candles(n: int, seed: int = 0) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    closes = 100.0 + np.cumsum(rng.normal(scale=1.5, size=n))
+    start = dt.date(2024, 1, 1)
+    return [
+        {
+            "date": (start + dt.timedelta(days=i)).strftime("%Y%m%d"),
+            "open": float(c),
+            "high": float(c) + 1.0,
+            "low": float(c) - 1.5,
+            "close": float(c),
+            "volume": 5000.0,
+        }
+        for i, c in enumerate(closes)
+    ]
+
+
+def _run(tmp_path, items, settings, calls):
+    def evaluate(batch):
+        calls.append([ticker for ticker, _, _ in batch])
+        return evaluate_batch(batch, settings)
+
+    cache = EvalResultCache(str(tmp_path), "ema_cross", settings)
+    results = evaluate_cached(items, evaluate, EvaluationResult, cache)
+    cache.save()
+    return results, cache
+
+
+def test_unchanged_inputs_reuse_results(tmp_path):
+    settings = EvaluationSettings(min_history_bars=120)
+    items = [(f"T{i}", _candles(260, seed=i), {"name": f"T{i}"}) for i in range(6)]
+    calls: list[list[str]] = []
+
+    first, cache = _run(tmp_path, items, settings, calls)
+    assert cache.misses == 6 and (tmp_path / "eval_cache.json").exists()
+    second, cache = _run(tmp_path, items, settings, calls)
+    assert second == first
+    assert cache.hits == 6 and calls == [[t for t, _, _ in items]]
+
+    # stored dict candles and columnar candles produce the same key
+    columnar = [(t, Candles.from_dicts(c), m) for t, c, m in items]
+    assert _run(tmp_path, columnar, settings, calls)[1].hits == 6
+
+
+def test_changed_bars_settings_or_meta_invalidate(tmp_path):
+    settings = EvaluationSettings(min_history_bars=120)
+    items = [(f"T{i}", _candles(260, seed=i), {}) for i in range(3)]
+    calls: list[list[str]] = []
+    _run(tmp_path, items, settings, calls)
+
+    changed = list(items)
+    bars = [dict(c) for c in items[0][1]]
+    bars[10]["close"] += 1.0
+    changed[0] = ("T0", bars, {})
+    changed[1] = ("T1", items[1][1] + _candles(261, seed=1)[-1:], {})
+    changed[2] = ("T2", items[2][1], {"currency": "USD"})
+    _run(tmp_path, changed, settings, calls)
+    assert calls[-1] == ["T0", "T1", "T2"]
+
+    _run(tmp_path, changed, EvaluationSettings(min_history_bars=121), calls)
+    assert calls[-1] == ["T0", "T1", "T2"]
+
+
+def test_fx_rate_moves_do_not_invalidate_us_tickers(tmp_path):
+    settings = EvaluationSettings(min_history_bars=120)
+    meta = {"currency": "USD", "usd_krw_rate": 1380.5}
+    items = [("AAPL.NAS", _candles(260, seed=7), meta)]
+    calls: list[list[str]] = []
+    _run(tmp_path, items, settings, calls)
+
+    moved = [("AAPL.NAS", items[0][1], {**meta, "usd_krw_rate": 1391.0})]
+    assert _run(tmp_path, moved, settings, calls)[1].hits == 1
+    assert len(calls) == 1
+
+
+def test_entries_older_than_the_loaded_window_are_pruned(tmp_path):
+    settings = EvaluationSettings(min_history_bars=120)
+    history = _candles(600, seed=3)
+    calls: list[list[str]] = []
+    _run(tmp_path, [("OLD", history[:260], {}), ("KEEP", history[:260], {})], settings, calls)
+
+    # a later run loads a window that starts after OLD's evaluation date
+    _, cache = _run(tmp_path, [("KEEP", history[-260:], {})], settings, calls)
+    assert set(cache.entries) == {"KEEP"}
+    reloaded = EvalResultCache(str(tmp_path), "ema_cross", settings)
+    assert set(reloaded.entries) == {"KEEP"}
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import datetime as dt
+
+import numpy as np
+from sab.signals.batch_eval import evaluate_batch
+from sab.signals.evaluator import EMA_CROSS_FILTERS, EvaluationSettings, evaluate_ticker
+from sab.signals.filters import Filter, FilterPipeline, FilterStats, use_filter_stats
+from sab.signals.indicator_memo import IndicatorMemo, use_indicator_memo
+
+
+def _candles(n: int, seed: int = 0, volume: float = 1000.0) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    closes = 100.0 + np.cumsum(rng.normal(scale=1.5, size=n))
+    start = dt.date(2024, 1, 1)
+    return [
+        {
+            "date": (start + dt.timedelta(days=i)).strftime("%Y%m%d"),
+            "open": float(c),
+            "high": float(c) + 1.0,
+            "low": float(c) - 1.5,
+            "close": float(c),
+            "volume": volume,
+        }
+        for i, c in enumerate(closes)
+    ]
+
+
+def test_pipeline_runs_cheapest_first_and_stops():
+    calls: list[str] = []
+
+    def check(name: str, reason: str | None):
+        def run(state: object) -> str | None:
+            calls.append(name)
+            return reason
+
+        return run
+
+    pipeline = FilterPipeline(
+        [
+            Filter("slow", 10, ("ema20",), check("slow", None)),
+            Filter("off", 0, ("bars",), check("off", "never"), enabled=lambda s: False),
+            Filter("fast", 1, ("bars",), check("fast", None)),
+            Filter("reject", 5, ("prices",), check("reject", "rejected")),
+        ]
+    )
+    assert [f.name for f in pipeline.filters] == ["off", "fast", "reject", "slow"]
+    assert pipeline.run(object()) == "rejected"
+    assert calls == ["fast", "reject"]
+    calls.clear()
+    assert pipeline.run(object(), skip_cheap=True) is None
+    assert calls == ["slow"]
+
+
+def test_cheap_rejections_skip_indicators():
+    settings = EvaluationSettings(min_history_bars=120, min_dollar_volume=1e9)
+    memo = IndicatorMemo()
+    with use_indicator_memo(memo):
+        result = evaluate_ticker("A", _candles(260), settings)
+    assert result.reason.startswith("Avg dollar volume")
+    assert memo.misses == 0
+
+
+def test_liquidity_is_reported_before_the_cross():
+    candles = _candles(260, seed=3)
+    loose = evaluate_ticker("A", candles, EvaluationSettings(min_history_bars=120))
+    assert loose.reason == "EMA(20/50) cross not satisfied"
+    strict = EvaluationSettings(min_history_bars=120, min_dollar_volume=1e9)
+    assert evaluate_ticker("A", candles, strict).reason.startswith("Avg dollar volume")
+
+
+def test_stats_count_each_filter_once_per_ticker():
+    settings = EvaluationSettings(min_history_bars=120)
+    items = [(f"T{i}", _candles(260, seed=i), {}) for i in range(12)]
+    items.append(("SHORT", _candles(50), {}))
+
+    per_ticker = FilterStats()
+    with use_filter_stats(per_ticker):
+        expected = [evaluate_ticker(t, c, settings, m) for t, c, m in items]
+    batched = FilterStats()
+    with use_filter_stats(batched):
+        assert evaluate_batch(items, settings) == expected
+
+    for stats in (per_ticker, batched):
+        history = stats.filters["min_history_bars"]
+        assert (history.evaluated, history.rejected) == (13, 1)
+        cross = stats.filters["ema_cross"]
+        assert cross.evaluated == 12
+        assert cross.rejected == sum(r.reason == "EMA(20/50) cross not satisfied" for r in expected)
+    assert "sma200" not in per_ticker.filters
+    assert per_ticker.lines()[0].startswith("min_history_bars: 1/13 rejected")
+
+
+def test_evaluator_filters_are_cost_ordered():
+    costs = [f.cost for f in EMA_CROSS_FILTERS.filters]
+    assert costs == sorted(costs)
+    cheap = [f.name for f in EMA_CROSS_FILTERS.filters if f.cheap]
+    assert cheap[-1] == "etf_etn" and "ema_cross" not in cheap
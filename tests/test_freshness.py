@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from sab.data.freshness import KR_ZONE, US_ZONE, FreshnessChecker, SessionCalendar
+
+
+def _candles(last: str) -> list[dict[str, str | float]]:
+    return [{"date": "20250101", "close": 1.0}, {"date": last, "close": 1.0}]
+
+
+def test_latest_completed_session_skips_weekend_and_holiday():
+    cal = SessionCalendar("KR", {"20250303"})  # Monday holiday
+    now = dt.datetime(2025, 3, 4, 8, 0, tzinfo=KR_ZONE)  # Tuesday pre-open
+    assert cal.latest_completed_session(now) == dt.date(2025, 2, 28)
+
+
+def test_latest_completed_session_after_close_is_today():
+    cal = SessionCalendar("US", set())
+    now = dt.datetime(2025, 3, 4, 16, 30, tzinfo=US_ZONE)
+    assert cal.latest_completed_session(now) == dt.date(2025, 3, 4)
+    assert not cal.in_session(now)
+
+
+def test_fresh_when_cached_after_close(tmp_path):
+    now = dt.datetime(2025, 3, 4, 20, 0, tzinfo=KR_ZONE)
+    checker = FreshnessChecker(str(tmp_path), now=now)
+    cached_at = dt.datetime(2025, 3, 4, 16, 0, tzinfo=KR_ZONE)
+    assert checker.is_fresh(_candles("20250304"), "KR", cached_at)
+
+
+def test_not_fresh_when_cached_before_close(tmp_path):
+    now = dt.datetime(2025, 3, 4, 20, 0, tzinfo=KR_ZONE)
+    checker = FreshnessChecker(str(tmp_path), now=now)
+    cached_at = dt.datetime(2025, 3, 4, 14, 0, tzinfo=KR_ZONE)  # intraday snapshot
+    assert not checker.is_fresh(_candles("20250304"), "KR", cached_at)
+
+
+def test_not_fresh_when_last_bar_is_stale(tmp_path):
+    now = dt.datetime(2025, 3, 5, 20, 0, tzinfo=KR_ZONE)
+    checker = FreshnessChecker(str(tmp_path), now=now)
+    cached_at = dt.datetime(2025, 3, 4, 16, 0, tzinfo=KR_ZONE)
+    assert not checker.is_fresh(_candles("20250304"), "KR", cached_at)
+
+
+def test_not_fresh_during_session(tmp_path):
+    now = dt.datetime(2025, 3, 5, 10, 0, tzinfo=US_ZONE)
+    checker = FreshnessChecker(str(tmp_path), now=now)
+    cached_at = dt.datetime(2025, 3, 4, 17, 0, tzinfo=US_ZONE)
+    assert not checker.is_fresh(_candles("20250304"), "US", cached_at)
+
+
+def test_weekend_run_uses_friday_bar(tmp_path):
+    now = dt.datetime(2025, 3, 8, 12, 0, tzinfo=US_ZONE)  # Saturday
+    checker = FreshnessChecker(str(tmp_path), now=now)
+    cached_at = dt.datetime(2025, 3, 7, 16, 5, tzinfo=US_ZONE)
+    assert checker.is_fresh(_candles("20250307"), "US", cached_at)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import datetime as dt
+
+import numpy as np
+from sab.signals import indicators
+from sab.signals.evaluator import EvaluationSettings, evaluate_ticker
+from sab.signals.hybrid_sell import HybridSellSettings, evaluate_sell_signals_hybrid
+from sab.signals.indicator_memo import IndicatorMemo, use_indicator_memo
+from sab.signals.sell_rules import SellSettings, evaluate_sell_signals
+
+
+def _candles(n: int, seed: int = 0) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    closes = 100.0 + np.cumsum(rng.normal(scale=1.5, size=n))
+    start = dt.date(2024, 1, 1)
+    return [
+        {
+            "date": (start + dt.timedelta(days=i)).strftime("%Y%m%d"),
+            "open": float(c),
+            "high": float(c) + 1.0,
+            "low": float(c) - 1.5,
+            "close": float(c),
+            "volume": 1000.0,
+        }
+        for i, c in enumerate(closes)
+    ]
+
+
+def test_buy_and_sell_evaluators_share_series():
+    candles = _candles(260)
+    holding = {"entry_price": candles[-20]["close"], "entry_date": candles[-20]["date"]}
+    buy = EvaluationSettings(min_history_bars=120)
+    sell = SellSettings()
+    expected = (
+        evaluate_ticker("A", candles, buy),
+        evaluate_sell_signals("A", candles, holding, sell),
+    )
+
+    memo = IndicatorMemo()
+    with use_indicator_memo(memo):
+        got = (
+            evaluate_ticker("A", candles, buy),
+            evaluate_sell_signals("A", candles, holding, sell),
+        )
+    assert got == expected
+    # the buy side computes ema20/ema50 for its cross check; sell reuses them
+    assert memo.hits >= 2
+    assert memo.misses == len(memo)
+    assert "hits" in memo.describe()
+
+
+def test_keys_separate_tickers_and_eval_index():
+    candles = _candles(200, seed=1)
+    closes = [c["close"] for c in candles]
+    memo = IndicatorMemo()
+    with use_indicator_memo(memo):
+        evaluate_sell_signals_hybrid("A", candles, {}, HybridSellSettings())
+        misses = memo.misses
+        evaluate_sell_signals_hybrid("B", candles, {}, HybridSellSettings())
+        assert memo.misses == 2 * misses
+        evaluate_sell_signals_hybrid("A", candles[:-1], {}, HybridSellSettings())
+        assert memo.misses == 3 * misses
+        evaluate_sell_signals_hybrid("A", candles, {}, HybridSellSettings())
+    assert memo.misses == 3 * misses
+    assert memo.hits == misses
+    # outside any tracked evaluator the memo is not consulted
+    with use_indicator_memo(memo):
+        indicators.ema(closes, 20)
+    assert memo.hits == misses
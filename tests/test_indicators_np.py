@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from sab.signals import indicators, indicators_np
+
+
+@pytest.fixture
+def python_backend():
+    previous = indicators.get_backend()
+    indicators.set_backend(indicators.BACKEND_PYTHON)
+    yield
+    indicators.set_backend(previous)
+
+
+def _walk(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 100.0 + np.cumsum(rng.normal(scale=1.5, size=n))
+
+
+def _assert_same(expected: list[float], actual: np.ndarray) -> None:
+    exp = np.asarray(expected, dtype=float)
+    assert exp.shape == actual.shape
+    # bit-identical, not just close: ema20 - ema50 signs decide crosses
+    np.testing.assert_array_equal(actual, exp)
+
+
+SERIES = {
+    "walk": _walk(300),
+    "long": _walk(3000, seed=1),
+    "flat": np.full(40, 50.0),
+    "flat_long": np.full(400, 123.45),
+    "near_tie": 100.0 + np.where(np.arange(300) % 2 == 0, 1e-12, -1e-12),
+    "short": _walk(5, seed=2),
+    "nan_mid": np.where(np.arange(120) == 60, np.nan, _walk(120, seed=3)),
+    "nan_first": np.where(np.arange(50) == 0, np.nan, _walk(50, seed=4)),
+    "empty": np.empty(0),
+}
+PERIODS = [0, 1, 2, 5, 14, 50, 200]
+
+
+@pytest.mark.parametrize("name", sorted(SERIES))
+@pytest.mark.parametrize("period", PERIODS)
+def test_parity_single_series(python_backend, name, period):
+    closes = SERIES[name]
+    highs, lows = closes + 1.25, closes - 0.75
+    values = closes.tolist()
+    _assert_same(indicators.ema(values, period), indicators_np.ema(closes, period))
+    _assert_same(indicators.sma(values, period), indicators_np.sma(closes, period))
+    _assert_same(indicators.rsi(values, period), indicators_np.rsi(closes, period))
+    _assert_same(
+        indicators.atr(highs.tolist(), lows.tolist(), values, period),
+        indicators_np.atr(highs, lows, closes, period),
+    )
+
+
+def test_none_values_match_nan_handling(python_backend):
+    values = [10.0, 11.0, None, 12.0, 13.0, 12.5]
+    _assert_same(indicators.ema(values, 3), indicators_np.ema(values, 3))
+    _assert_same(indicators.sma(values, 2), indicators_np.sma(values, 2))
+
+
+def test_atr_truncates_to_shortest_input(python_backend):
+    closes = _walk(30)
+    expected = indicators.atr((closes + 1)[:25].tolist(), (closes - 1).tolist(), closes.tolist(), 5)
+    _assert_same(expected, indicators_np.atr((closes + 1)[:25], closes - 1, closes, 5))
+
+
+def test_batched_rows_match_row_by_row():
+    matrix = np.vstack([_walk(250, seed=s) for s in range(6)])
+    for fn in (indicators_np.ema, indicators_np.sma, indicators_np.rsi):
+        batched = fn(matrix, 14)
+        for row, series in zip(batched, matrix, strict=True):
+            np.testing.assert_array_equal(row, fn(series, 14))
+    batched = indicators_np.atr(matrix + 1, matrix - 1, matrix, 14)
+    for row, series in zip(batched, matrix, strict=True):
+        np.testing.assert_array_equal(row, indicators_np.atr(series + 1, series - 1, series, 14))
+
+
+def test_public_functions_dispatch_to_numpy_backend(python_backend):
+    closes = _walk(80).tolist()
+    indicators.set_backend(indicators.BACKEND_NUMPY)
+    result = indicators.rsi(closes, 14)
+    assert isinstance(result, list)
+    _assert_same(result, indicators_np.rsi(closes, 14))
+    with pytest.raises(ValueError):
+        indicators.set_backend("fortran")
+
+
+@pytest.mark.parametrize(
+    "closes",
+    [
+        np.full(260, 73.1),
+        np.r_[np.full(200, 10.0), np.full(60, 10.0 + 1e-13)],
+        100.0 + 1e-11 * np.sin(np.arange(260)),
+    ],
+)
+def test_cross_decisions_match_on_flat_and_near_tie_series(python_backend, closes):
+    values = closes.tolist()
+    expected = np.sign(
+        np.asarray(indicators.ema(values, 20)) - np.asarray(indicators.ema(values, 50))
+    )
+    single = np.sign(indicators_np.ema(closes, 20) - indicators_np.ema(closes, 50))
+    batch = np.vstack([closes, closes])
+    batched = np.sign(indicators_np.ema(batch, 20) - indicators_np.ema(batch, 50))
+    np.testing.assert_array_equal(single, expected)
+    np.testing.assert_array_equal(batched[1], expected)
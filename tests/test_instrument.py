@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pytest
+from sab.data.candle_store import STORE_BACKENDS, open_candle_store
+from sab.data.candles import Candles
+from sab.data.instrument import Instrument, merge_duplicate_keys
+from sab.screener.kis_overseas_screener import KISOverseasScreener, ScreenRequest
+
+
+def _series(dates: list[int], close: float) -> Candles:
+    closes = np.full(len(dates), close)
+    return Candles(
+        {
+            "date": dates,
+            "open": closes,
+            "high": closes + 1,
+            "low": closes - 1,
+            "close": closes,
+            "volume": np.full(len(dates), 1000.0),
+        }
+    )
+
+
+def test_every_spelling_maps_to_one_key():
+    kr = {Instrument.parse(t).cache_key for t in ("005930", "005930.KS", " 005930 ", "005930.kq")}
+    assert kr == {"candles_005930"}
+    us = {Instrument.parse(t) for t in ("AAPL.US", "aapl.nasd", "AAPL.NASDAQ", "AAPL.NAS")}
+    assert us == {Instrument(symbol="AAPL", exchange="NAS")}
+
+    brk = Instrument.parse("BRK.B.NYSE")
+    assert (brk.symbol, brk.exchange, brk.market, brk.currency) == ("BRK.B", "NYS", "US", "USD")
+    assert brk.ticker == "BRK.B.NYS" and Instrument.parse(brk.ticker) == brk
+    assert Instrument.parse("005930", adjusted=False).cache_key == "candles_005930_raw"
+
+    for key in ("candles_005930", "candles_overseas_NYS_BRK.B", "candles_005930_raw"):
+        assert Instrument.from_cache_key(key).cache_key == key
+    assert Instrument.from_cache_key("candles_overseas_US_aapl").cache_key == (
+        "candles_overseas_NAS_AAPL"
+    )
+    assert Instrument.from_cache_key("fx_usdkrw") is None
+
+
+def test_overseas_screener_suffixes_dotted_symbols():
+    class _Client:
+        def overseas_trade_volume_rank(self, *, exchange, limit):
+            return [{"symb": "brk.b"}, {"symb": "KO"}]
+
+    result = KISOverseasScreener(_Client()).screen(
+        ScreenRequest(limit=2, metric="volume", exchange="NYSE")
+    )
+    assert result.tickers == ["BRK.B.NYS", "KO.NYS"]
+    assert Instrument.parse(result.tickers[0]).cache_key == "candles_overseas_NYS_BRK.B"
+
+
+@pytest.mark.parametrize("backend", STORE_BACKENDS)
+def test_merge_duplicate_keys_folds_series_into_the_canonical_key(tmp_path, backend):
+    store = open_candle_store(str(tmp_path), backend)
+    store.save("candles_005930", _series([20240102, 20240103], 10.0))
+    store.save("candles_005930.KS", _series([20240103, 20240104], 20.0))
+    store.save("candles_overseas_US_AAPL", _series([20240102], 30.0))
+    store.save("candles_000660", _series([20240102], 40.0))
+    for key, stamp in (
+        ("candles_005930", 1_700_000_000),
+        ("candles_005930.KS", 1_700_000_500),
+        ("candles_overseas_US_AAPL", 1_700_000_100),
+    ):
+        store.set_modified_at(key, stamp)
+
+    assert merge_duplicate_keys(store, dry_run=True) == {
+        "candles_005930": ["candles_005930.KS"],
+        "candles_overseas_NAS_AAPL": ["candles_overseas_US_AAPL"],
+    }
+    merge_duplicate_keys(store)
+
+    assert sorted(store.keys()) == [
+        "candles_000660",
+        "candles_005930",
+        "candles_overseas_NAS_AAPL",
+    ]
+    merged = store.load("candles_005930")
+    assert merged.dates() == ["20240102", "20240103", "20240104"]
+    # the shared day comes from the series saved last
+    assert merged.close.tolist() == [10.0, 20.0, 20.0]
+    assert store.modified_at("candles_005930").timestamp() == pytest.approx(1_700_000_500)
+    assert store.load("candles_overseas_NAS_AAPL").close.tolist() == [30.0]
+    assert merge_duplicate_keys(store) == {}
+    if backend == "json":
+        assert not os.path.exists(tmp_path / "candles_005930.KS.json")
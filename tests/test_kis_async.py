@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import threading
+from typing import Any
+
+from sab.data.kis_async import AsyncKISClient
+from sab.data.kis_client import KISClientError, KISCredentials, _token_lock_file
+
+CREDS = KISCredentials(app_key="k", app_secret="s", base_url="https://example.com", env="demo")
+
+
+class _Resp:
+    def __init__(self, payload: Any, status: int = 200, headers: dict[str, str] | None = None):
+        self._payload = payload
+        self.status_code = status
+        self.headers = headers or {}
+        self.text = str(payload)
+
+    def json(self) -> Any:
+        return self._payload
+
+
+class _FakeSession:
+    """Routes requests by URL suffix; token calls are counted separately."""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+        self.token_calls = 0
+
+    async def request(self, method, url, *, headers=None, params=None, json=None, timeout=None):
+        await asyncio.sleep(0)
+        if url.endswith("/oauth2/tokenP"):
+            self.token_calls += 1
+            return _Resp(
+                {"access_token": f"tok{self.token_calls}", "expires_in": 86400},
+            )
+        self.calls.append((url, {"headers": dict(headers or {}), "params": dict(params or {})}))
+        return self.handler(url, headers or {}, params or {})
+
+
+def _client(session: _FakeSession) -> AsyncKISClient:
+    return AsyncKISClient(CREDS, session=session, min_interval=0, retry_delay=0)
+
+
+def test_daily_candles_parses_and_trims():
+    today = dt.date.today()
+    rows = [
+        {"stck_bsop_date": (today - dt.timedelta(days=i)).strftime("%Y%m%d"), "stck_clpr": str(i)}
+        for i in range(5)
+    ]
+
+    def handler(url, headers, params):
+        return _Resp({"rt_cd": "0", "output2": rows})
+
+    session = _FakeSession(handler)
+    candles = asyncio.run(_client(session).daily_candles("005930", count=3))
+
+    assert [c["date"] for c in candles] == sorted(r["stck_bsop_date"] for r in rows)[-3:]
+    assert session.token_calls == 1
+    assert session.calls[0][1]["headers"]["tr_id"] == CREDS.tr_id
+
+
+def test_expired_token_refreshes_once_across_coroutines():
+    def handler(url, headers, params):
+        if headers["authorization"] == "Bearer tok1":
+            return _Resp({"rt_cd": "1", "msg_cd": "EGW00123", "msg1": "expired"}, status=500)
+        return _Resp({"rt_cd": "0", "output": {"last": "1"}})
+
+    session = _FakeSession(handler)
+    client = _client(session)
+
+    async def run() -> list[dict[str, Any]]:
+        await client.ensure_token()
+        return await asyncio.gather(
+            *(client.overseas_price_detail(symbol=f"S{i}", exchange="NAS") for i in range(8))
+        )
+
+    results = asyncio.run(run())
+
+    assert results == [{"last": "1"}] * 8
+    assert session.token_calls == 2  # initial issue + one single-flight refresh
+
+
+def test_overseas_rank_follows_keyb_pagination():
+    pages = [
+        _Resp({"rt_cd": "0", "output2": [{"symb": "A"}], "keyb": "K1"}, headers={"tr_cont": "M"}),
+        _Resp({"rt_cd": "0", "output2": [{"symb": "B"}]}, headers={"tr_cont": ""}),
+    ]
+
+    def handler(url, headers, params):
+        return pages.pop(0)
+
+    session = _FakeSession(handler)
+    items = asyncio.run(_client(session).overseas_trade_volume_rank(exchange="NAS", limit=5))
+
+    assert [it["symb"] for it in items] == ["A", "B"]
+    assert session.calls[1][1]["params"]["KEYB"] == "K1"
+    assert session.calls[1][1]["headers"]["tr_cont"] == "M"
+
+
+def test_gather_candles_returns_errors_in_place():
+    def handler(url, headers, params):
+        if params.get("SYMB") == "BAD":
+            return _Resp({"rt_cd": "1", "msg_cd": "X", "msg1": "nope"})
+        return _Resp({"rt_cd": "0", "output2": []})
+
+    session = _FakeSession(handler)
+    results = asyncio.run(
+        _client(session).gather_candles([("AAPL", "NAS"), ("BAD", "NAS")], count=5)
+    )
+
+    assert results[0] == []
+    assert isinstance(results[1], KISClientError)
+
+
+def test_token_file_lock_is_awaited_without_blocking_the_loop(tmp_path):
+    session = _FakeSession(lambda url, headers, params: _Resp({"rt_cd": "0"}))
+    client = AsyncKISClient(
+        CREDS,
+        session=session,
+        cache_dir=str(tmp_path),
+        min_interval=0.01,
+        shared_limiter=True,
+        retry_delay=0,
+    )
+    held = threading.Event()
+    release = threading.Event()
+
+    def other_process() -> None:
+        with _token_lock_file(str(tmp_path), client._token_cache_key):
+            held.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=other_process)
+    holder.start()
+    held.wait(5)
+
+    async def run() -> int:
+        ticks = 0
+        issue = asyncio.create_task(client.ensure_token())
+        while not issue.done():
+            ticks += 1
+            if ticks == 5:
+                release.set()
+            await asyncio.sleep(0.01)
+        await issue
+        return ticks
+
+    try:
+        ticks = asyncio.run(run())
+    finally:
+        release.set()
+        holder.join()
+    assert ticks >= 5  # the loop kept running while another holder had the lock
+    assert session.token_calls == 1
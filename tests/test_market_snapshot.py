@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+from sab.data.candle_store import open_candle_store
+from sab.data.candles import Candles
+from sab.data.freshness import KR_ZONE, FreshnessChecker, SessionCalendar
+from sab.data.market_snapshot import merge_snapshot_bar, refresh_from_snapshots
+from sab.data.pykrx_client import PykrxClient
+
+# Friday 2024-03-08, after the KR close
+NOW = dt.datetime(2024, 3, 8, 16, 0, tzinfo=KR_ZONE)
+CALENDAR = SessionCalendar("KR", set())
+
+
+def _series(dates: list[int], start: float = 100.0) -> Candles:
+    close = start + np.arange(len(dates), dtype=float)
+    return Candles(
+        {
+            "date": dates,
+            "open": close,
+            "high": close + 1,
+            "low": close - 1,
+            "close": close,
+            "volume": np.full(len(dates), 1000.0),
+        }
+    )
+
+
+def _bar(date: int, close: float, prev_close: float) -> dict[str, float]:
+    change = round((close / prev_close - 1) * 100, 2)
+    return {
+        "date": date,
+        "open": close,
+        "high": close,
+        "low": close,
+        "close": close,
+        "volume": 5.0,
+        "change_pct": change,
+    }
+
+
+WEEK = [20240304, 20240305, 20240306, 20240307]
+
+
+def test_merge_appends_replaces_and_trims():
+    cached = _series(WEEK)  # closes 100..103
+    appended = merge_snapshot_bar(cached, _bar(20240308, 105.0, 103.0), count=4)
+    assert appended.dates() == ["20240305", "20240306", "20240307", "20240308"]
+    assert appended[-1]["close"] == 105.0 and appended[-1]["prev_close_diff"] == 2.0
+
+    replaced = merge_snapshot_bar(cached, _bar(20240307, 104.0, 102.0), count=10)
+    assert len(replaced) == 4 and replaced[-1]["close"] == 104.0
+    assert merge_snapshot_bar(cached, _bar(20240306, 1.0, 1.0), count=10) is cached
+
+
+def test_merge_rejects_gaps_and_restated_history():
+    cached = _series(WEEK[:2])
+    # 2024-03-06 and 07 are trading days missing from the cache
+    assert (
+        merge_snapshot_bar(cached, _bar(20240308, 102.0, 101.0), count=10, calendar=CALENDAR)
+        is None
+    )
+    # a 2:1 split: KRX reports +1% against the halved base price
+    split = {**_bar(20240306, 51.0, 50.5), "change_pct": 1.0}
+    assert merge_snapshot_bar(cached, split, count=10) is None
+    # rounding of the reported rate is tolerated
+    ok = {**_bar(20240306, 101.6, 101.0), "change_pct": 0.59}
+    assert merge_snapshot_bar(cached, ok, count=10) is not None
+
+
+class _FakeSource:
+    def __init__(self, snapshots: dict[str, dict[str, dict]]) -> None:
+        self.snapshots = snapshots
+        self.calls: list[str] = []
+
+    def market_snapshot(self, date: str, *, market: str = "ALL") -> dict[str, dict]:
+        self.calls.append(date)
+        return self.snapshots.get(date, {})
+
+
+def test_refresh_appends_one_call_per_session(tmp_path):
+    store = open_candle_store(str(tmp_path))
+    store.save("candles_AAA", _series(WEEK))  # needs 03-08
+    store.save("candles_BBB", _series(WEEK[:3]))  # needs 03-07 and 03-08
+    store.save("candles_OLD", _series([20240226, 20240227]))  # beyond the session window
+    store.save("candles_ETF", _series(WEEK))  # absent from the snapshots
+    store.save("candles_ADJ", _series(WEEK))  # restated on 03-08
+    source = _FakeSource(
+        {
+            "20240307": {"BBB": _bar(20240307, 103.0, 102.0)},
+            "20240308": {
+                "AAA": _bar(20240308, 104.0, 103.0),
+                "BBB": _bar(20240308, 104.0, 103.0),
+                "ADJ": {**_bar(20240308, 52.0, 51.5), "change_pct": 1.0},
+            },
+        }
+    )
+    keys = {t: f"candles_{t}" for t in ("AAA", "BBB", "NEW", "OLD", "ETF", "ADJ")}
+    result = refresh_from_snapshots(
+        source,
+        store,
+        keys,
+        count=200,
+        checker=FreshnessChecker(str(tmp_path), now=NOW),
+        now=NOW,
+        max_sessions=3,
+    )
+
+    assert source.calls == ["20240306", "20240307", "20240308"]
+    assert set(result.candles) == {"AAA", "BBB"} and result.appended == 2
+    assert set(result.refetch) == {"NEW", "OLD", "ETF", "ADJ"}
+    assert result.refetch["NEW"] == "not cached"
+    saved = store.load("candles_BBB")
+    assert saved.dates()[-3:] == ["20240306", "20240307", "20240308"]
+    assert store.load("candles_ADJ").dates()[-1] == "20240307"
+
+    # the saved series are now fresh, so a second run makes no calls
+    again = refresh_from_snapshots(
+        source,
+        store,
+        {"AAA": "candles_AAA"},
+        count=200,
+        checker=FreshnessChecker(str(tmp_path), now=NOW),
+        now=NOW,
+    )
+    assert again.fresh == 1 and again.calls == 0
+
+
+def test_pykrx_market_snapshot_parses_by_ticker_frame():
+    frame = pd.DataFrame(
+        {
+            "시가": [100, 0],
+            "고가": [110, 0],
+            "저가": [95, 0],
+            "종가": [105, 0],
+            "거래량": [1000, 0],
+            "거래대금": [105000, 0],
+            "등락률": [1.5, 0.0],
+        },
+        index=pd.Index(["005930", "999999"], name="티커"),
+    )
+
+    class _Stock:
+        def get_market_ohlcv_by_ticker(self, date: str, market: str = "KOSPI") -> pd.DataFrame:
+            assert (date, market) == ("20240308", "ALL")
+            return frame
+
+    client = PykrxClient.__new__(PykrxClient)
+    client._stock_module = _Stock()  # type: ignore[assignment]
+    snapshot = client.market_snapshot("20240308")
+    assert list(snapshot) == ["005930"]
+    assert snapshot["005930"]["date"] == 20240308
+    assert snapshot["005930"]["close"] == 105.0 and snapshot["005930"]["change_pct"] == 1.5
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import datetime as dt
+import functools
+import os
+import pickle
+import warnings
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pytest
+from sab.data.candle_arena import CandleArena
+from sab.data.candles import Candles
+from sab.sell import _evaluate_holdings
+from sab.signals.batch_eval import evaluate_batch
+from sab.signals.evaluator import EvaluationSettings
+from sab.signals.filters import FilterStats, use_filter_stats
+from sab.signals.parallel import EvaluationPool, evaluate_parallel, shard_bounds
+from sab.signals.sell_rules import SellSettings
+
+
+def _candles(n: int, seed: int = 0) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    closes = 100.0 + np.cumsum(rng.normal(scale=1.5, size=n))
+    start = dt.date(2024, 1, 1)
+    return [
+        {
+            "date": (start + dt.timedelta(days=i)).strftime("%Y%m%d"),
+            "open": float(c),
+            "high": float(c) + 1.0,
+            "low": float(c) - 1.5,
+            "close": float(c),
+            "volume": 5000.0,
+        }
+        for i, c in enumerate(closes)
+    ]
+
+
+def _explode(items):
+    raise ValueError("boom")
+
+
+def test_shard_bounds_cover_items_in_order():
+    assert shard_bounds(10, 4) == [(0, 3), (3, 6), (6, 8), (8, 10)]
+    assert shard_bounds(2, 8) == [(0, 1), (1, 2)]
+    assert shard_bounds(0, 3) == []
+
+
+def test_candles_pickle_as_arrays():
+    rows = _candles(250)
+    candles = Candles.from_dicts(rows)
+    restored = pickle.loads(pickle.dumps(candles))
+    assert restored == candles
+    assert len(pickle.dumps(candles)) < len(pickle.dumps(rows))
+
+
+def test_parallel_scan_matches_serial():
+    settings = EvaluationSettings(min_history_bars=120)
+    items = [(f"T{i:02d}", _candles(200 + i, seed=i), {"name": f"T{i}"}) for i in range(24)]
+    items.append(("SHORT", _candles(40), {}))
+    evaluate = functools.partial(evaluate_batch, settings=settings)
+
+    serial_stats = FilterStats()
+    with use_filter_stats(serial_stats):
+        expected = evaluate(items)
+    parallel_stats = FilterStats()
+    with use_filter_stats(parallel_stats):
+        got = evaluate_parallel(items, evaluate, workers=2)
+    assert got == expected
+    assert [r.ticker for r in got] == [t for t, _, _ in items]
+    assert parallel_stats.filters.keys() == serial_stats.filters.keys()
+    for name, stat in serial_stats.filters.items():
+        other = parallel_stats.filters[name]
+        assert (other.evaluated, other.rejected) == (stat.evaluated, stat.rejected)
+
+
+def test_parallel_sell_matches_serial():
+    jobs = [
+        (f"H{i}", _candles(220, seed=i), {"entry_price": 100.0, "entry_date": "20240301"})
+        for i in range(5)
+    ]
+    evaluate = functools.partial(
+        _evaluate_holdings, sell_mode="ema_cross", settings=SellSettings(), hybrid_settings=None
+    )
+    assert evaluate_parallel(jobs, evaluate, workers=2) == evaluate(jobs)
+
+
+def test_arena_views_match_series_and_release():
+    series = [Candles.from_dicts(_candles(n, seed=n)) for n in (30, 0, 45)]
+    with CandleArena.build(series) as arena:
+        assert arena.handle.spans == ((0, 30), (30, 0), (30, 45))
+        with arena.handle.attach() as attached:
+            for i, candles in enumerate(series):
+                view = attached.candles(i)
+                assert view == candles
+                assert not view.close.flags.writeable
+            del view
+        name = arena.handle.name
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=name, track=False)
+
+
+def test_arena_is_released_when_a_worker_fails():
+    items = [("A", _candles(60), {}), ("B", _candles(60, seed=1), {})]
+    before = set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+    with pytest.raises(ValueError):
+        evaluate_parallel(items, _explode, workers=2)
+    if os.path.isdir("/dev/shm"):
+        assert set(os.listdir("/dev/shm")) <= before
+
+
+def test_arena_refills_in_place_up_to_its_capacity():
+    first = [Candles.from_dicts(_candles(40, seed=1))]
+    with CandleArena.build(first, capacity=100) as arena:
+        name = arena.handle.name
+        smaller = [Candles.from_dicts(_candles(n, seed=n)) for n in (30, 50)]
+        assert arena.refill(smaller)
+        assert arena.handle.name == name and arena.handle.spans == ((0, 30), (30, 50))
+        with arena.handle.attach() as attached:
+            assert attached.candles(1) == smaller[1]
+        assert not arena.refill([Candles.from_dicts(_candles(101))])
+
+
+def test_pool_is_reused_across_batches_without_forking_threads():
+    settings = EvaluationSettings(min_history_bars=120)
+    evaluate = functools.partial(evaluate_batch, settings=settings)
+    batches = [[(f"T{i:02d}", _candles(n, seed=i), {}) for i in range(6)] for n in (260, 200, 320)]
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        with EvaluationPool(2) as pool:
+            executor = pool._pool
+            for batch in batches:
+                assert pool.evaluate(batch, evaluate) == evaluate(batch)
+                assert pool._pool is executor
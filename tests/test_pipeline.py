@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import datetime as dt
+import threading
+from dataclasses import replace
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from sab.config import Config
+from sab.data.candles import Candles
+from sab.holdings_loader import HoldingsData, HoldingSettings
+from sab.market_data import MarketDataSession
+from sab.scan import run_scan
+from sab.utils.pipeline import staged
+
+WATCHLIST = ["005930", "000660", "035420", "051910", "006400", "068270", "105560"]
+
+
+def _candles(seed: int, n: int = 260) -> Candles:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.002, 0.02, n)))
+    start = dt.date(2023, 1, 2)
+    return Candles(
+        {
+            "date": [int((start + dt.timedelta(days=i)).strftime("%Y%m%d")) for i in range(n)],
+            "open": close * 0.995,
+            "high": close * 1.01,
+            "low": close * 0.99,
+            "close": close,
+            "volume": np.full(n, 2e5),
+        }
+    )
+
+
+class _FakePykrx:
+    def __init__(self, *, cache_dir: str | None = None) -> None:
+        pass
+
+    def daily_candles(self, ticker: str, *, count: int = 120, adjusted: bool = True) -> Candles:
+        if ticker == "068270":
+            return Candles.empty()
+        return _candles(seed=int(ticker) % 89)
+
+
+def _config(tmp_path, **overrides) -> Config:
+    return replace(
+        Config(),
+        data_provider="pykrx",
+        data_dir=str(tmp_path / "data"),
+        snapshot_refresh=False,
+        screener_enabled=False,
+        fx_mode="off",
+        eval_cache=False,
+        holdings=HoldingsData(path=None, settings=HoldingSettings(), holdings=[]),
+        **overrides,
+    )
+
+
+def _report(path) -> list[str]:
+    (report,) = path.iterdir()
+    return [
+        line for line in report.read_text(encoding="utf-8").splitlines() if "Run at" not in line
+    ]
+
+
+def test_staged_keeps_order_bounds_the_queue_and_reraises():
+    produced: list[int] = []
+    consumed: list[int] = []
+
+    def source():
+        for i in range(20):
+            produced.append(i)
+            yield i
+
+    for item in staged(source(), depth=3):
+        # at most the queue plus the item being put are ahead of the consumer
+        assert len(produced) - len(consumed) <= 3 + 2
+        consumed.append(item)
+    assert consumed == list(range(20))
+
+    def failing():
+        yield 1
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        list(staged(failing(), depth=2))
+
+    stopped = threading.Event()
+
+    def endless():
+        try:
+            i = 0
+            while True:
+                yield i
+                i += 1
+        finally:
+            stopped.set()
+
+    for item in staged(endless(), depth=2):
+        if item == 5:
+            break
+    assert stopped.wait(1.0)
+
+
+@pytest.mark.parametrize("mode", ["ema_cross", "sma_ema_hybrid"])
+def test_pipelined_scan_writes_the_same_report(tmp_path, mode):
+    reports = {}
+    for depth in (0, 2, 256):
+        cfg = _config(
+            tmp_path,
+            strategy_mode=mode,
+            pipeline_depth=depth,
+            report_dir=str(tmp_path / f"r{depth}"),
+        )
+        with (
+            patch("sab.market_data.PykrxClient", _FakePykrx),
+            patch("sab.scan.load_watchlist", return_value=WATCHLIST),
+            patch("sab.scan.load_config", return_value=cfg),
+        ):
+            run_scan(limit=None, watchlist_path=None, provider=None)
+        reports[depth] = _report(tmp_path / f"r{depth}")
+    assert any("068270" in line for line in reports[0])
+    assert reports[2] == reports[0] and reports[256] == reports[0]
+
+
+def test_stream_hands_series_over_without_keeping_them(tmp_path):
+    with patch("sab.market_data.PykrxClient", _FakePykrx):
+        session = MarketDataSession(_config(tmp_path))
+        session.fetch(["005930"])
+        streamed = dict(session.stream(["000660", "005930", "068270"], keep=False))
+
+    assert list(streamed) == ["005930", "000660", "068270"]
+    assert streamed["068270"] is None and len(streamed["000660"]) == 260
+    # only the series fetched with keep=True stays in the session
+    assert set(session.candles) == {"005930"}
+    assert set(session.latest_dates) == {"005930", "000660"}
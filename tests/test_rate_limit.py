@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import os
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from sab.data.candle_refresh import RefreshJob, refresh_many
+from sab.data.candle_store import JsonCandleStore
+from sab.data.kis_client import KISClient, KISClientError, KISCredentials
+from sab.data.rate_limit import (
+    AdaptiveTokenBucket,
+    BackgroundStore,
+    TokenBucket,
+    build_limiter,
+    load_learned_rate,
+    rate_cache_key,
+    save_learned_rate,
+)
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def test_token_bucket_spaces_requests_by_interval():
+    clock = _FakeClock()
+    bucket = TokenBucket(0.5, clock=clock, sleep=clock.sleep)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.5
+    assert bucket.reserve() == 1.0  # reservations queue behind each other
+    clock.now = 10.0
+    assert bucket.reserve() == 0.0  # idle period refills (capped at burst)
+    assert bucket.reserve() == 0.5
+
+
+def test_token_bucket_is_thread_safe():
+    clock = _FakeClock()
+    bucket = TokenBucket(0.1, clock=clock, sleep=clock.sleep)
+    waits: list[float] = []
+    lock = threading.Lock()
+
+    def worker() -> None:
+        for _ in range(25):
+            w = bucket.reserve()
+            with lock:
+                waits.append(w)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(round(w, 6) for w in waits) == [round(i * 0.1, 6) for i in range(100)]
+
+
+def _bars(n: int) -> list[dict[str, float | str]]:
+    start = dt.date(2025, 1, 1)
+    return [
+        {"date": (start + dt.timedelta(days=i)).strftime("%Y%m%d"), "close": 1.0} for i in range(n)
+    ]
+
+
+def test_refresh_many_yields_in_job_order_and_captures_errors(tmp_path):
+    client = MagicMock()
+
+    def fake_daily(symbol: str, count: int) -> list[dict[str, float | str]]:
+        if symbol == "BAD":
+            raise KISClientError("boom")
+        time.sleep(0.02 if symbol == "A" else 0.0)
+        return _bars(3)
+
+    client.daily_candles.side_effect = fake_daily
+    jobs = [
+        RefreshJob(ticker=t, symbol=t, exchange=None, cache_key=f"candles_{t}")
+        for t in ["A", "BAD", "C", "D", "E"]
+    ]
+
+    results = list(
+        refresh_many(client, jobs, count=3, store=JsonCandleStore(str(tmp_path)), workers=3)
+    )
+
+    assert [r.job.ticker for r in results] == ["A", "BAD", "C", "D", "E"]
+    assert isinstance(results[1].error, KISClientError)
+    assert all(r.error is None and len(r.candles) == 3 for i, r in enumerate(results) if i != 1)
+    assert (tmp_path / "candles_C.json").exists()
+    assert not (tmp_path / "candles_BAD.json").exists()
+
+
+def test_expired_token_is_refreshed_once_across_workers():
+    creds = KISCredentials(app_key="k", app_secret="s", base_url="https://example.com", env="demo")
+    client = KISClient(creds, session=MagicMock(), cache_dir=None, min_interval=0)
+    client._access_token = "Bearer old"
+    client._token_expiry = dt.datetime.now(dt.UTC) + dt.timedelta(hours=1)
+    issued: list[int] = []
+
+    def fake_issue(**_: object) -> None:
+        issued.append(1)
+        client._access_token = "Bearer new"
+        client._token_expiry = dt.datetime.now(dt.UTC) + dt.timedelta(hours=1)
+
+    client._issue_token = fake_issue  # type: ignore[method-assign]
+    threads = [
+        threading.Thread(target=client._refresh_expired_token, args=("Bearer old",))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(issued) == 1
+    assert client._access_token == "Bearer new"
+
+
+def test_adaptive_bucket_ramps_up_and_halves_on_throttle():
+    clock = _FakeClock()
+    stored: list[float] = []
+    bucket = AdaptiveTokenBucket(
+        2.0, max_rate=20.0, store=stored.append, clock=clock, sleep=clock.sleep
+    )
+    for _ in range(20):
+        bucket.on_success()
+    assert bucket.rate > 2.0
+    assert stored and stored[-1] <= bucket.rate
+
+    before = bucket.rate
+    bucket.on_throttle()
+    assert bucket.rate == before * 0.5
+    assert bucket.interval == 1.0 / bucket.rate
+    assert stored[-1] == bucket.rate
+
+    bucket.on_throttle()  # same burst of in-flight rejections
+    assert bucket.rate == before * 0.5
+    clock.now += 2.0
+    bucket.on_throttle()
+    assert bucket.rate == before * 0.25
+
+
+def test_adaptive_bucket_respects_bounds():
+    bucket = AdaptiveTokenBucket(50.0, min_rate=1.0, max_rate=5.0, cooldown=0.0)
+    assert bucket.rate == 5.0
+    for _ in range(10):
+        bucket.on_throttle()
+    assert bucket.rate == 1.0
+
+
+def test_build_limiter_resumes_learned_rate(tmp_path):
+    data_dir = str(tmp_path)
+    save_learned_rate(data_dir, "real", "app-key", 7.5)
+
+    limiter = build_limiter(0.1, adaptive=True, data_dir=data_dir, env="real", app_key="app-key")
+    assert isinstance(limiter, AdaptiveTokenBucket)
+    assert limiter.rate == 7.5
+
+    other = build_limiter(0.1, adaptive=True, data_dir=data_dir, env="real", app_key="other")
+    assert isinstance(other, AdaptiveTokenBucket)
+    assert other.rate == 10.0  # no learned rate for this key: start from min interval
+
+    limiter.on_throttle()
+    assert load_learned_rate(data_dir, "real", "app-key") == 3.75
+    assert "app-key" not in rate_cache_key("real", "app-key")
+
+    assert type(build_limiter(0.1, adaptive=False, data_dir=data_dir)) is TokenBucket
+
+
+def test_learned_rate_overrides_the_interval_up_to_the_ceiling(tmp_path):
+    data_dir = str(tmp_path)
+    save_learned_rate(data_dir, "real", "app-key", 15.0)
+    assert os.listdir(data_dir) == [f"{rate_cache_key('real', 'app-key')}.json"]
+
+    limiter = build_limiter(0.2, adaptive=True, data_dir=data_dir, env="real", app_key="app-key")
+    assert isinstance(limiter, AdaptiveTokenBucket)
+    assert limiter.rate == 15.0  # not re-probed up from the configured 5/s
+
+    save_learned_rate(data_dir, "demo", "app-key", 15.0)
+    demo = build_limiter(0.2, adaptive=True, data_dir=data_dir, env="demo", app_key="app-key")
+    assert isinstance(demo, AdaptiveTokenBucket)
+    assert demo.rate == 2.0  # documented demo ceiling
+
+
+def test_kis_request_reports_throttling_to_limiter():
+    creds = KISCredentials(app_key="k", app_secret="s", base_url="https://example.com", env="demo")
+    session = MagicMock()
+    session.request.side_effect = [MagicMock(status_code=429), MagicMock(status_code=200)]
+    limiter = MagicMock()
+    client = KISClient(creds, session=session, cache_dir=None, limiter=limiter)
+
+    with patch("sab.data.kis_client.time.sleep"):
+        resp = client._request("GET", "https://example.com/x")
+
+    assert resp.status_code == 200
+    limiter.on_throttle.assert_called_once()
+    limiter.on_success.assert_called_once()
+
+
+def test_kis_request_does_not_count_a_rate_limited_body_as_success():
+    creds = KISCredentials(app_key="k", app_secret="s", base_url="https://example.com", env="demo")
+    body = '{"rt_cd": "1", "msg_cd": "EGW00201", "msg1": "rate exceeded"}'
+    throttled = MagicMock(status_code=200, text=body)
+    throttled.json.return_value = {"rt_cd": "1", "msg_cd": "EGW00201"}
+    session = MagicMock()
+    session.request.return_value = throttled
+    limiter = MagicMock()
+    client = KISClient(creds, session=session, cache_dir=None, limiter=limiter)
+
+    assert client._request("GET", "https://example.com/x") is throttled
+    limiter.on_success.assert_not_called()
+
+
+def test_background_store_writes_off_the_event_loop():
+    writes: list[tuple[float, int]] = []
+    bucket = AdaptiveTokenBucket(
+        4.0, store=BackgroundStore(lambda rate: writes.append((rate, threading.get_ident())))
+    )
+
+    async def run() -> int:
+        bucket.on_throttle()
+        await asyncio.sleep(0.05)
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert [rate for rate, _ in writes] == [2.0]
+    assert writes[0][1] != loop_thread
+
+    bucket._last_decrease = None
+    bucket.on_throttle()  # no running loop: written inline
+    assert writes[-1] == (1.0, threading.get_ident())
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import datetime as dt
+from dataclasses import replace
+from unittest.mock import patch
+
+import numpy as np
+from sab.config import Config
+from sab.data.candles import Candles
+from sab.holdings_loader import Holding, HoldingsData, HoldingSettings
+from sab.market_data import MarketDataSession, candle_target
+from sab.run import run_all
+from sab.scan import run_scan
+from sab.sell import run_sell
+from sab.signals.indicator_memo import IndicatorMemo, use_indicator_memo
+
+
+def _candles(n: int = 260, seed: int = 1) -> Candles:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, n)))
+    start = dt.date(2023, 1, 2)
+    return Candles(
+        {
+            "date": [int((start + dt.timedelta(days=i)).strftime("%Y%m%d")) for i in range(n)],
+            "open": close,
+            "high": close * 1.01,
+            "low": close * 0.99,
+            "close": close,
+            "volume": np.full(n, 2e5),
+        }
+    )
+
+
+class _FakePykrx:
+    calls: list[str] = []
+
+    def __init__(self, *, cache_dir: str | None = None) -> None:
+        pass
+
+    def daily_candles(self, ticker: str, *, count: int = 120, adjusted: bool = True) -> Candles:
+        _FakePykrx.calls.append(ticker)
+        return _candles(seed=int(ticker) % 97)
+
+
+def _config(tmp_path) -> Config:
+    holdings = HoldingsData(
+        path=None,
+        settings=HoldingSettings(),
+        holdings=[
+            Holding(ticker="005930", quantity=1, entry_price=100.0, entry_date="2023-06-01"),
+            Holding(ticker="000660", quantity=1, entry_price=100.0, entry_date="2023-06-01"),
+        ],
+    )
+    return replace(
+        Config(),
+        data_provider="pykrx",
+        data_dir=str(tmp_path),
+        report_dir=str(tmp_path / "reports"),
+        snapshot_refresh=False,
+        screener_enabled=False,
+        fx_mode="off",
+        holdings=holdings,
+    )
+
+
+def _report_body(path) -> list[str]:
+    # drop the run timestamp line
+    return [line for line in path.read_text(encoding="utf-8").splitlines() if "Run at" not in line]
+
+
+def test_run_fetches_the_union_once_and_matches_separate_reports(tmp_path):
+    cfg = _config(tmp_path)
+    watchlist = ["005930", "035420"]
+    patches = (
+        patch("sab.market_data.PykrxClient", _FakePykrx),
+        patch("sab.scan.load_watchlist", return_value=watchlist),
+    )
+
+    _FakePykrx.calls = []
+    with patches[0], patches[1], patch("sab.run.load_config", return_value=cfg):
+        assert run_all(limit=None, watchlist_path=None, provider=None) == 0
+    assert sorted(_FakePykrx.calls) == ["000660", "005930", "035420"]
+    combined = {p.name: _report_body(p) for p in (tmp_path / "reports").iterdir()}
+    assert {name.split(".", 1)[1] for name in combined} == {"buy.md", "sell.md"}
+
+    separate_cfg = replace(cfg, report_dir=str(tmp_path / "separate"))
+    _FakePykrx.calls = []
+    with (
+        patches[0],
+        patches[1],
+        patch("sab.scan.load_config", return_value=separate_cfg),
+        patch("sab.sell.load_config", return_value=separate_cfg),
+    ):
+        assert run_scan(limit=None, watchlist_path=None, provider=None) == 0
+        assert run_sell(provider=None) == 0
+    # the overlapping ticker is fetched by both commands
+    assert sorted(_FakePykrx.calls) == ["000660", "005930", "005930", "035420"]
+    separate = {p.name: _report_body(p) for p in (tmp_path / "separate").iterdir()}
+    assert separate == combined
+
+
+def test_only_run_shares_an_indicator_memo(tmp_path):
+    cfg = _config(tmp_path)
+    memos: list[IndicatorMemo | None] = []
+
+    def record(memo):
+        memos.append(memo)
+        return use_indicator_memo(memo)
+
+    with (
+        patch("sab.market_data.PykrxClient", _FakePykrx),
+        patch("sab.scan.load_watchlist", return_value=["005930"]),
+        patch("sab.scan.use_indicator_memo", record),
+        patch("sab.sell.use_indicator_memo", record),
+        patch("sab.scan.load_config", return_value=cfg),
+        patch("sab.sell.load_config", return_value=cfg),
+        patch("sab.run.load_config", return_value=cfg),
+    ):
+        run_scan(limit=None, watchlist_path=None, provider=None)
+        run_sell(provider=None)
+        assert memos == [None, None]
+        run_all(limit=None, watchlist_path=None, provider=None)
+    shared = memos[2:]
+    assert len(shared) == 2 and isinstance(shared[0], IndicatorMemo) and shared[0] is shared[1]
+
+
+def test_session_keeps_per_ticker_failures_apart(tmp_path):
+    class _Failing(_FakePykrx):
+        def daily_candles(self, ticker, *, count=120, adjusted=True):
+            if ticker == "000660":
+                return Candles.from_dicts([])
+            return super().daily_candles(ticker, count=count)
+
+    with patch("sab.market_data.PykrxClient", _Failing):
+        session = MarketDataSession(_config(tmp_path))
+        session.fetch(["005930", "000660"])
+        session.fetch(["005930"])
+
+    assert set(session.candles) == {"005930"}
+    assert session.failures_for(["005930"]) == []
+    assert session.failures_for(["000660"]) == ["000660: PyKRX returned no data"]
+    assert session.refresh_note(["005930", "000660"]) == "1 full"
+    assert candle_target("AAPL.US") == ("AAPL", "NAS", "candles_overseas_NAS_AAPL")
+
+
+def test_fresh_but_short_kis_cache_gets_the_full_window(tmp_path):
+    class _FakeKIS:
+        calls: list[tuple[str, int, str | None]] = []
+
+        def __init__(self, *args, **kwargs) -> None:
+            self.cache_status = None
+
+        def daily_candles(self, symbol, *, count=120, since=None):
+            _FakeKIS.calls.append((symbol, count, since))
+            return _candles(n=count)
+
+    class _AlwaysFresh:
+        def is_fresh(self, candles, market, cached_at):
+            return True
+
+    cfg = replace(
+        _config(tmp_path),
+        data_provider="kis",
+        kis_app_key="key",
+        kis_app_secret="secret",
+        kis_base_url="https://openapivts.koreainvestment.com:29443",
+    )
+    with patch("sab.market_data.KISClient", _FakeKIS):
+        session = MarketDataSession(cfg)
+        session.freshness = _AlwaysFresh()
+        session.store.save(candle_target("005930")[2], _candles(n=120))
+        session.store.save(candle_target("000660")[2], _candles(n=session.target_bars))
+        session.fetch(["005930", "000660"])
+
+    # only the short series is refetched, and in full rather than as a tail
+    assert _FakeKIS.calls == [("005930", session.target_bars, None)]
+    assert len(session.candles["005930"]) == session.target_bars
+    assert session.refresh_note(["005930", "000660"]) == "1 fresh from cache, 1 full"
@@ -65,12 +65,17 @@ class RunScanUSScreenerMetaETFTests(unittest.TestCase):
 
             captured_meta: dict[str, object] = {}
 
-            def fake_eval_hybrid(ticker, candles, settings, meta):
+            def fake_eval_hybrid(items, settings):
                 # Capture meta passed from scan so we can assert name propagation.
-                captured_meta.update(meta)
                 from sab.signals.hybrid_buy import HybridEvaluationResult
 
-                return HybridEvaluationResult(ticker, None, "Did not meet hybrid signal criteria")
+                results = []
+                for ticker, _candles, meta in items:
+                    captured_meta.update(meta)
+                    results.append(
+                        HybridEvaluationResult(ticker, None, "Did not meet hybrid signal criteria")
+                    )
+                return results
 
             with (
                 patch("sab.scan.load_config", return_value=cfg),
@@ -82,7 +87,7 @@ class RunScanUSScreenerMetaETFTests(unittest.TestCase):
                     "sab.scan.KISClient.overseas_daily_candles",
                     return_value=_build_us_candles(),
                 ),
-                patch("sab.scan.evaluate_ticker_hybrid", side_effect=fake_eval_hybrid),
+                patch("sab.scan.evaluate_batch_hybrid", side_effect=fake_eval_hybrid),
             ):
                 run_scan(
                     limit=None,
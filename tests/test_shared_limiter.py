@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import sys
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from sab.data.kis_client import KISClient, KISCredentials
+from sab.data.rate_limit import SharedTokenBucket, TokenBucket, build_limiter
+
+CREDS = KISCredentials(app_key="k", app_secret="s", base_url="https://example.com", env="demo")
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_shared_buckets_queue_behind_each_other(tmp_path):
+    clock = _FakeClock()
+    state = str(tmp_path / "limiter.state")
+    a = SharedTokenBucket(TokenBucket(0.5), state, clock=clock)
+    b = SharedTokenBucket(TokenBucket(0.5), state, clock=clock)
+
+    assert a.reserve() == 0.0
+    assert b.reserve() == 0.5
+    assert a.reserve() == 1.0
+    clock.now += 5.0
+    assert b.reserve() == 0.0
+
+
+def test_build_limiter_shared_requires_data_dir(tmp_path):
+    assert isinstance(build_limiter(0.1, shared=True, data_dir=str(tmp_path)), SharedTokenBucket)
+    assert not isinstance(build_limiter(0.1, shared=True, data_dir=None), SharedTokenBucket)
+
+
+def _reserve_many(state: str, n: int, out: multiprocessing.Queue) -> None:
+    seen: list[float] = []
+
+    def clock() -> float:
+        seen.append(time.time())
+        return seen[-1]
+
+    bucket = SharedTokenBucket(TokenBucket(0.02), state, clock=clock)
+    slots = []
+    for _ in range(n):
+        wait = bucket.reserve()
+        slots.append(seen[-1] + wait)
+    out.put(slots)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="fork start method")
+def test_shared_bucket_spaces_requests_across_processes(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    out: multiprocessing.Queue = ctx.Queue()
+    state = os.path.join(tmp_path, "limiter.state")
+    procs = [ctx.Process(target=_reserve_many, args=(state, 5, out)) for _ in range(3)]
+    for p in procs:
+        p.start()
+    slots = sorted(s for _ in procs for s in out.get(timeout=10))
+    for p in procs:
+        p.join()
+
+    assert len(slots) == 15
+    gaps = [b - a for a, b in zip(slots, slots[1:], strict=False)]
+    assert min(gaps) >= 0.02 - 0.005
+
+
+def _token_response() -> MagicMock:
+    resp = MagicMock(status_code=200)
+    resp.json.return_value = {"access_token": "fresh", "expires_in": 86400}
+    return resp
+
+
+def test_second_process_adopts_token_issued_by_first(tmp_path):
+    first_session = MagicMock()
+    first_session.request.return_value = _token_response()
+    second_session = MagicMock()
+    first = KISClient(CREDS, session=first_session, cache_dir=str(tmp_path), min_interval=0)
+    second = KISClient(CREDS, session=second_session, cache_dir=str(tmp_path), min_interval=0)
+    assert second.cache_status == "miss"
+
+    first.ensure_token()
+    second.ensure_token()
+
+    assert first_session.request.call_count == 1
+    second_session.request.assert_not_called()
+    assert second._access_token == "Bearer fresh"
+
+
+def test_revoked_cached_token_is_not_adopted(tmp_path):
+    session = MagicMock()
+    session.request.return_value = _token_response()
+    seed = MagicMock()
+    seed.request.return_value = MagicMock(
+        status_code=200, json=MagicMock(return_value={"access_token": "old", "expires_in": 86400})
+    )
+    KISClient(CREDS, session=seed, cache_dir=str(tmp_path), min_interval=0).ensure_token()
+
+    client = KISClient(CREDS, session=session, cache_dir=str(tmp_path), min_interval=0)
+    assert client._access_token == "Bearer old"
+    client._refresh_expired_token("Bearer old")
+
+    session.request.assert_called_once()
+    assert client._access_token == "Bearer fresh"
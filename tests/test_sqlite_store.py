@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import datetime as dt
+import math
+import os
+import sqlite3
+
+from sab.data.cache import json_path, save_json
+from sab.data.candle_store import migrate_json_cache, open_candle_store
+from sab.data.sqlite_store import SqliteCandleStore, join_cache_key, split_cache_key
+
+
+def _bars(start: dt.date, n: int, close_start: float = 100.0) -> list[dict[str, float | str]]:
+    out: list[dict[str, float | str]] = []
+    for i in range(n):
+        close = close_start + i
+        out.append(
+            {
+                "date": (start + dt.timedelta(days=i)).strftime("%Y%m%d"),
+                "open": close,
+                "high": close + 1,
+                "low": close - 1,
+                "close": close,
+                "volume": 1000.0 + i,
+                "prev_close_diff": 1.0,
+            }
+        )
+    return out
+
+
+def test_cache_key_mapping():
+    assert split_cache_key("candles_005930") == ("KR", "005930")
+    assert split_cache_key("candles_overseas_NAS_AAPL") == ("NAS", "AAPL")
+    for key in ("candles_005930", "candles_overseas_NYS_BRK_B"):
+        assert join_cache_key(*split_cache_key(key)) == key
+
+
+def test_roundtrip_limit_and_wal(tmp_path):
+    path = str(tmp_path / "market.sqlite3")
+    store = SqliteCandleStore(path)
+    bars = _bars(dt.date(2025, 1, 1), 10)
+    bars[3]["volume"] = float("nan")
+    store.save("candles_005930", bars)
+
+    loaded = store.load("candles_005930", limit=4)
+    assert [c["date"] for c in loaded] == [b["date"] for b in bars[-4:]]
+    assert store.load("candles_005930")[0]["close"] == 100.0
+    assert math.isnan(store.load("candles_005930")[3]["volume"])
+    assert store.load("candles_missing") is None
+    assert store.modified_at("candles_005930") is not None
+    assert store.keys() == ["candles_005930"]
+
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_save_upserts_and_drops_superseded_tail(tmp_path):
+    store = SqliteCandleStore(str(tmp_path / "db.sqlite3"))
+    store.save("candles_A", _bars(dt.date(2025, 1, 1), 10))
+    # a corrected, shorter tail replaces the last rows but keeps history
+    tail = _bars(dt.date(2025, 1, 6), 3, close_start=105.0)
+    tail[1]["close"], tail[2]["close"] = 501.0, 502.0
+    store.save("candles_A", tail)
+
+    loaded = store.load("candles_A")
+    assert len(loaded) == 8
+    assert loaded[0]["close"] == 100.0
+    assert [c["close"] for c in loaded[-3:]] == [105.0, 501.0, 502.0]
+
+
+def test_restated_overlap_replaces_the_stored_history(tmp_path):
+    store = SqliteCandleStore(str(tmp_path / "db.sqlite3"))
+    store.save("candles_A", _bars(dt.date(2025, 1, 1), 300))
+    # a split: the live window's first close no longer matches the stored one
+    window = _bars(dt.date(2025, 1, 1) + dt.timedelta(days=100), 200)
+    for bar in window:
+        bar["close"] = 50.0
+    store.save("candles_A", window)
+
+    loaded = store.load("candles_A")
+    assert len(loaded) == 200 and set(loaded.close.tolist()) == {50.0}
+
+    # a single corrected last bar is not a restatement
+    store.save("candles_A", [{**window[-1], "close": 51.0}])
+    assert len(store.load("candles_A")) == 200
+
+
+def test_load_many_returns_tails_in_one_call(tmp_path):
+    store = SqliteCandleStore(str(tmp_path / "db.sqlite3"))
+    store.save("candles_A", _bars(dt.date(2025, 1, 1), 10))
+    store.save("candles_overseas_NAS_B", _bars(dt.date(2025, 2, 1), 5, close_start=50.0))
+
+    loaded = store.load_many(["candles_A", "candles_overseas_NAS_B", "candles_C"], limit=3)
+    assert set(loaded) == {"candles_A", "candles_overseas_NAS_B"}
+    assert [c["close"] for c in loaded["candles_A"]] == [107.0, 108.0, 109.0]
+    assert [c["close"] for c in loaded["candles_overseas_NAS_B"]] == [52.0, 53.0, 54.0]
+
+
+def test_batch_commits_once_on_exit(tmp_path):
+    path = str(tmp_path / "db.sqlite3")
+    store = SqliteCandleStore(path)
+    other = SqliteCandleStore(path)
+    with store.batch():
+        store.save("candles_A", _bars(dt.date(2025, 1, 1), 3))
+        store.save("candles_B", _bars(dt.date(2025, 1, 1), 3))
+        # visible to the writer, not yet to other connections
+        assert store.load("candles_A") is not None
+        assert other.load("candles_A") is None
+    assert set(other.load_many(["candles_A", "candles_B"])) == {"candles_A", "candles_B"}
+
+
+def test_legacy_json_import_and_migration(tmp_path):
+    data_dir = str(tmp_path)
+    save_json(data_dir, "candles_A", _bars(dt.date(2025, 1, 1), 5))
+    save_json(data_dir, "candles_B", _bars(dt.date(2025, 1, 1), 5))
+    os.utime(json_path(data_dir, "candles_A"), (1_700_000_000, 1_700_000_000))
+
+    store = open_candle_store(data_dir, backend="sqlite")
+    assert isinstance(store, SqliteCandleStore)
+    assert len(store.load("candles_A")) == 5
+    assert store.modified_at("candles_A").timestamp() == 1_700_000_000
+
+    assert migrate_json_cache(data_dir, remove=True, backend="sqlite") == 2
+    assert not os.path.exists(json_path(data_dir, "candles_B"))
+    assert len(open_candle_store(data_dir, backend="sqlite").load("candles_B")) == 5
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import datetime as dt
+from dataclasses import replace
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from sab.config import Config
+from sab.data.candle_store import open_candle_store
+from sab.data.candles import Candles
+from sab.signals.backtest import BacktestSettings, backtest_ticker
+from sab.signals.batch_eval import IndicatorMatrices, evaluate_batch_hybrid
+from sab.signals.hybrid_buy import HybridEvaluationSettings
+from sab.signals.hybrid_sell import HybridSellSettings
+from sab.signals.sweep import config_block, expand_combos, rank_combos, sweep_ticker
+from sab.sweep import load_sweep_spec, run_sweep
+
+WINDOW = 150
+META = {"data_source": "pykrx", "currency": "KRW"}
+
+
+def _candles(n: int, seed: int = 1) -> Candles:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n)))
+    start = dt.date(2020, 1, 1)
+    return Candles(
+        {
+            "date": [int((start + dt.timedelta(days=i)).strftime("%Y%m%d")) for i in range(n)],
+            "open": close * (1 + rng.normal(0, 0.005, n)),
+            "high": close * 1.01,
+            "low": close * 0.99,
+            "close": close,
+            "volume": rng.uniform(1e5, 2e5, n),
+        }
+    )
+
+
+def _settings(**kwargs) -> BacktestSettings:
+    buy = HybridEvaluationSettings(
+        sma_trend_period=20,
+        ema_short_period=10,
+        ema_mid_period=21,
+        rsi_period=14,
+        rsi_zone_low=45,
+        rsi_zone_high=60,
+        rsi_oversold_low=30,
+        rsi_oversold_high=40,
+        pullback_max_bars=5,
+        breakout_consolidation_min_bars=5,
+        breakout_consolidation_max_bars=20,
+        volume_lookback_days=5,
+        max_gap_pct=0.03,
+        use_sma60_filter=False,
+        sma60_period=60,
+        kr_breakout_requires_confirmation=False,
+        gap_atr_multiplier=1.0,
+        min_history_bars=120,
+        min_price=0.0,
+        us_min_price=None,
+        min_dollar_volume=0.0,
+        us_min_dollar_volume=None,
+        exclude_etf_etn=False,
+    )
+    return BacktestSettings(
+        strategy_mode="sma_ema_hybrid",
+        buy=buy,
+        sell_mode="sma_ema_hybrid",
+        sell=HybridSellSettings(),
+        window=WINDOW,
+        **kwargs,
+    )
+
+
+SPEC = {
+    "strategy.hybrid.rsi_zone_low": [40.0, 45.0, 65.0],
+    "strategy.hybrid.ema_short_period": [8, 10],
+    "sell.hybrid.stop_loss_pct_min": [0.03, 0.06],
+}
+
+
+def test_expand_combos_drops_out_of_order_thresholds_and_samples():
+    base = _settings()
+    combos = expand_combos(SPEC, base)
+    # rsi_zone_low 65 > rsi_zone_high 60; stop_loss_pct_min 0.06 > max 0.05
+    assert len(combos) == 2 * 2 * 1
+    assert {c.buy.rsi_zone_low for c in combos} == {40.0, 45.0}
+    assert all(c.sell.stop_loss_pct_min == 0.03 for c in combos)
+    assert combos[0].buy.rsi_zone_high == base.buy.rsi_zone_high
+
+    sampled = expand_combos(SPEC, base, samples=3, seed=7)
+    assert len(sampled) == 3
+    assert [c.overrides for c in sampled] == [
+        c.overrides for c in expand_combos(SPEC, base, samples=3, seed=7)
+    ]
+    with pytest.raises(ValueError):
+        expand_combos({"strategy.hybrid.nope": [1]}, base)
+
+
+def test_shared_matrices_match_a_fresh_evaluation():
+    candles = _candles(300)
+    items = [("A", candles[max(0, i - 149) : i + 1], META) for i in range(300)]
+    matrices = IndicatorMatrices.for_items(items)
+    for period in (8, 10):
+        settings = replace(_settings().buy, ema_short_period=period)
+        assert evaluate_batch_hybrid(items, settings, matrices=matrices) == evaluate_batch_hybrid(
+            items, settings
+        )
+
+
+def test_sweep_ticker_matches_a_backtest_per_combo():
+    candles = _candles(500, seed=3)
+    base = _settings()
+    combos = expand_combos({**SPEC, "sell.hybrid.stop_loss_pct_max": [0.05, 0.08]}, base)
+    runs = sweep_ticker("A", candles, META, base, combos)
+    for combo, run in zip(combos, runs, strict=True):
+        expected = backtest_ticker(
+            "A", candles, META, replace(base, buy=combo.buy, sell=combo.sell)
+        )
+        assert run == expected
+
+    ranked = rank_combos(combos, [runs], rank_by="avg_return", min_trades=1)
+    returns = [r.summary.avg_return for r in ranked]
+    assert returns == sorted(returns, reverse=True)
+    with pytest.raises(ValueError):
+        rank_combos(combos, [runs], rank_by="sharpe")
+
+
+def test_config_block_nests_dotted_paths():
+    block = config_block({"strategy.mode": "sma_ema_hybrid", "strategy.hybrid.rsi_zone_low": 40.0})
+    assert block == {"strategy": {"mode": "sma_ema_hybrid", "hybrid": {"rsi_zone_low": 40.0}}}
+
+
+def test_run_sweep_writes_ranked_report(tmp_path):
+    spec = tmp_path / "sweep.yaml"
+    spec.write_text(
+        "strategy:\n  hybrid:\n    rsi_zone_low: [40, 45]\n"
+        "sell:\n  hybrid:\n    stop_loss_pct_min: 0.03\n",
+        encoding="utf-8",
+    )
+    assert load_sweep_spec(str(spec)) == {
+        "strategy.hybrid.rsi_zone_low": [40, 45],
+        "sell.hybrid.stop_loss_pct_min": [0.03],
+    }
+    bad = tmp_path / "bad.yaml"
+    bad.write_text("strategy:\n  min_price: [1, 2]\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_sweep_spec(str(bad))
+
+    cfg = replace(
+        Config(),
+        data_dir=str(tmp_path),
+        report_dir=str(tmp_path / "reports"),
+        data_provider="pykrx",
+        sell_mode="sma_ema_hybrid",
+        min_dollar_volume=0.0,
+        min_price=0.0,
+        exclude_etf_etn=False,
+    )
+    open_candle_store(cfg.data_dir, backend=cfg.candle_store).save(
+        "candles_005930", _candles(500, seed=3)
+    )
+    with (
+        patch("sab.sweep.load_config", return_value=cfg),
+        patch("sab.sweep.load_watchlist", return_value=["005930"]),
+    ):
+        assert run_sweep(spec_path=str(spec), watchlist_path=None, provider=None, min_trades=1) == 0
+    report = next((tmp_path / "reports").glob("*.sweep.md")).read_text(encoding="utf-8")
+    assert "mode: sma_ema_hybrid" in report and "rsi_zone_low:" in report
+    assert "| rsi_zone_low | sell.stop_loss_pct_min |" in report